@@ -0,0 +1,105 @@
+"""Compare `docker push` with jvdeploy's registry push client.
+
+Starts a throwaway ``registry:2`` container, then pushes the same local
+image into fresh repositories with both clients:
+
+    python benchmarks/push_benchmark.py my-app:latest --runs 3 --concurrency 8
+
+Each run uses a new repository, so nothing is deduplicated by the target
+repository itself. The second repository of every jvdeploy run shows the
+effect of cross-repository mounts: only blobs not yet in the registry are
+uploaded. Needs Docker and a local image to push.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jvdeploy.image.push import push_image  # noqa: E402
+from jvdeploy.registry import RegistryClient  # noqa: E402
+
+
+def _run(*cmd: str) -> str:
+    return subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _docker_push(image: str, registry: str, repository: str) -> float:
+    target = f"{registry}/{repository}:bench"
+    _run("docker", "tag", image, target)
+    start = time.perf_counter()
+    _run("docker", "push", target)
+    elapsed = time.perf_counter() - start
+    _run("docker", "rmi", target)
+    return elapsed
+
+
+def _registry_push(
+    tarball: str, registry: str, repository: str, concurrency: int, chunk_mb: int
+) -> float:
+    start = time.perf_counter()
+    push_image(
+        tarball,
+        repository,
+        "bench",
+        RegistryClient(registry, insecure=True),
+        concurrency=concurrency,
+        chunk_size=chunk_mb * 1024 * 1024,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("image", help="Local image to push")
+    parser.add_argument("--runs", type=int, default=3, help="Pushes per client (default: 3)")
+    parser.add_argument("--port", type=int, default=5055, help="Registry port (default: 5055)")
+    parser.add_argument("--concurrency", type=int, default=4, help="jvdeploy upload concurrency")
+    parser.add_argument("--chunk-mb", type=int, default=16, help="jvdeploy chunk size in MB")
+    args = parser.parse_args()
+
+    registry = f"localhost:{args.port}"
+    container = _run("docker", "run", "-d", "--rm", "-p", f"{args.port}:5000", "registry:2")
+    tarball = Path(f"/tmp/jvdeploy-bench-{uuid.uuid4().hex}.tar")
+    try:
+        time.sleep(1)
+        # Saving is shared by every jvdeploy run and not part of its timing
+        _run("docker", "save", "-o", str(tarball), args.image)
+
+        results = {"docker push": [], "jvdeploy push": [], "jvdeploy push (mounted)": []}
+        for run in range(args.runs):
+            results["docker push"].append(_docker_push(args.image, registry, f"docker-{run}"))
+            # A fresh blob index, so the first jvdeploy push has nothing to mount from
+            os.environ["JVDEPLOY_CACHE_DIR"] = tempfile.mkdtemp(prefix="jvdeploy-bench-")
+            results["jvdeploy push"].append(
+                _registry_push(
+                    str(tarball), registry, f"jvdeploy-{run}", args.concurrency, args.chunk_mb
+                )
+            )
+            results["jvdeploy push (mounted)"].append(
+                _registry_push(
+                    str(tarball), registry, f"jvdeploy-{run}-b", args.concurrency, args.chunk_mb
+                )
+            )
+
+        print(f"{'client':<26} {'median':>8} {'min':>8} {'max':>8}")
+        for name, times in results.items():
+            print(
+                f"{name:<26} {statistics.median(times):>7.2f}s "
+                f"{min(times):>7.2f}s {max(times):>7.2f}s"
+            )
+    finally:
+        tarball.unlink(missing_ok=True)
+        subprocess.run(["docker", "stop", container], capture_output=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Cached AWS identity and ECR authorization lookups.
+
+Caches the STS account ID and ECR authorization tokens on disk, scoped to
+the active AWS credentials, so tight deploy loops do not repeat
+``sts.get_caller_identity``, ``ecr.get_authorization_token`` and
+``docker login`` on every run.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from jvdeploy.cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+# Account IDs never change for a given key, but temporary keys rotate often
+ACCOUNT_ID_TTL = 24 * 3600
+# Refresh ECR tokens (valid for 12 hours) a little before they expire
+TOKEN_EXPIRY_MARGIN = 15 * 60
+
+
+def credential_scope(session: Any = None) -> Optional[str]:
+    """Get a stable, non-secret identifier for the active AWS credentials.
+
+    Args:
+        session: boto3 Session (default: a new default session)
+
+    Returns:
+        Short hash of the access key and profile, or None if credentials
+        cannot be resolved locally
+    """
+    try:
+        import boto3
+
+        session = session or boto3.Session()
+        credentials = session.get_credentials()
+        if credentials is None:
+            return None
+        access_key = credentials.get_frozen_credentials().access_key
+    except Exception as e:
+        logger.debug(f"Could not resolve AWS credentials for caching: {e}")
+        return None
+
+    profile = getattr(session, "profile_name", None) or ""
+    return hashlib.sha256(f"{profile}:{access_key}".encode("utf-8")).hexdigest()[:16]
+
+
+def get_account_id(
+    region: str,
+    session: Any = None,
+    use_cache: bool = True,
+    sts_client: Optional[Callable[[], Any]] = None,
+) -> str:
+    """Get the AWS account ID for the active credentials, using the on-disk cache.
+
+    Args:
+        region: AWS region for the STS client
+        session: boto3 Session (default: a new default session)
+        use_cache: If False, always call STS (the result is still cached)
+        sts_client: Function returning the STS client to call on a cache miss
+            (default: a client of the session)
+
+    Returns:
+        AWS account ID
+    """
+    import boto3
+
+    session = session or boto3.Session()
+    scope = credential_scope(session)
+    cache = JsonCache("aws-identity")
+
+    if scope and use_cache:
+        account_id = cache.get(f"account:{scope}")
+        if account_id:
+            logger.debug(f"Using cached AWS account ID: {account_id}")
+            return str(account_id)
+
+    client = sts_client() if sts_client else session.client("sts", region_name=region)
+    response = client.get_caller_identity()
+    account_id = str(response["Account"])
+
+    if scope:
+        cache.set(f"account:{scope}", account_id, ttl=ACCOUNT_ID_TTL)
+
+    return account_id
+
+
+def get_ecr_authorization(
+    region: str, session: Any = None, use_cache: bool = True
+) -> Dict[str, Any]:
+    """Get ECR registry credentials, reusing a cached token while it is valid.
+
+    Args:
+        region: AWS region of the registry
+        session: boto3 Session (default: a new default session)
+        use_cache: If False, always request a new token (the result is still cached)
+
+    Returns:
+        Dictionary with 'username', 'password', 'endpoint' and 'expires_at'
+        (Unix timestamp)
+    """
+    import boto3
+
+    session = session or boto3.Session()
+    scope = credential_scope(session)
+    cache = JsonCache("ecr-auth")
+    key = f"{scope}:{region}"
+
+    if scope and use_cache:
+        cached = cache.get(key)
+        if cached:
+            logger.debug(f"Using cached ECR authorization token for {region}")
+            return dict(cached)
+
+    response = session.client("ecr", region_name=region).get_authorization_token()
+    auth_data = response["authorizationData"][0]
+
+    # Token is base64 encoded "AWS:password"
+    decoded = base64.b64decode(auth_data["authorizationToken"]).decode("utf-8")
+    username, password = decoded.split(":", 1)
+
+    expires = auth_data.get("expiresAt")
+    expires_at = expires.timestamp() if hasattr(expires, "timestamp") else time.time() + 12 * 3600
+
+    auth = {
+        "username": username,
+        "password": password,
+        "endpoint": auth_data["proxyEndpoint"],
+        "expires_at": expires_at,
+    }
+
+    if scope:
+        cache.set(key, auth, expires_at=expires_at - TOKEN_EXPIRY_MARGIN)
+
+    return auth
+
+
+def docker_login_is_current(registry: str, auth: Dict[str, Any]) -> bool:
+    """Check whether docker is already logged in to a registry with this token.
+
+    Args:
+        registry: Registry host
+        auth: Authorization returned by get_ecr_authorization
+
+    Returns:
+        True if a login with the same token was recorded, has not expired
+        and docker still holds credentials for the registry
+    """
+    recorded = JsonCache("docker-logins").get(registry)
+    if not recorded or recorded != _token_fingerprint(auth):
+        return False
+    # The record survives 'docker logout' and a change of DOCKER_CONFIG
+    return docker_has_credentials(registry)
+
+
+def docker_has_credentials(registry: str) -> bool:
+    """Check whether docker's config holds credentials for a registry.
+
+    Reads config.json in DOCKER_CONFIG (default: ~/.docker). 'docker login'
+    adds the registry to 'auths', also when the secret itself is kept in a
+    credsStore, and 'docker logout' removes it; a credHelpers entry makes
+    docker fetch credentials on its own.
+
+    Args:
+        registry: Registry host
+
+    Returns:
+        True if docker can authenticate to the registry without a login
+    """
+    config_dir = os.environ.get("DOCKER_CONFIG") or str(Path.home() / ".docker")
+    try:
+        config = json.loads((Path(config_dir) / "config.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    if not isinstance(config, dict):
+        return False
+
+    if registry in (config.get("credHelpers") or {}):
+        return True
+    for server in config.get("auths") or {}:
+        if server.split("://", 1)[-1].rstrip("/") == registry:
+            return True
+    return False
+
+
+def record_docker_login(registry: str, auth: Dict[str, Any]) -> None:
+    """Remember a successful docker login until the token expires.
+
+    Args:
+        registry: Registry host
+        auth: Authorization used for the login
+    """
+    JsonCache("docker-logins").set(
+        registry,
+        _token_fingerprint(auth),
+        expires_at=float(auth["expires_at"]) - TOKEN_EXPIRY_MARGIN,
+    )
+
+
+def forget_docker_login(registry: str) -> None:
+    """Forget a recorded docker login (e.g., after a push was denied).
+
+    Args:
+        registry: Registry host
+    """
+    JsonCache("docker-logins").delete(registry)
+
+
+def _token_fingerprint(auth: Dict[str, Any]) -> str:
+    """Hash a token so the login record does not store the secret twice."""
+    return hashlib.sha256(str(auth["password"]).encode("utf-8")).hexdigest()[:32]
@@ -4,14 +4,153 @@ Handles end-to-end deployment of jvagent applications to AWS Lambda,
 including ECR image management, IAM roles, Lambda functions, and API Gateway.
 """
 
+import base64
+import hashlib
+import io
+import json
 import logging
-import time
-from typing import Any, Dict, List, Optional, cast
+import re
+import tempfile
+import threading
+import urllib.request
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, cast
 
 from botocore.exceptions import ClientError
 
+from jvdeploy.aws.lambda_plan import (
+    NEW_ACCESS_POINT_ARN,
+    NEW_API_ID,
+    NEW_VERSION,
+    build_plan,
+    code_up_to_date,
+    diff_architectures,
+    diff_function_config,
+    diff_function_url,
+    fill_placeholders,
+    integrations_to_route,
+    policy_statement_ids,
+)
+from jvdeploy.aws.prewarm import (
+    MAX_PREWARM_CONCURRENCY,
+    WARMUP_EVENT,
+    format_prewarm,
+    http_request,
+    invoke_request,
+    warm_up,
+)
+from jvdeploy.aws.scheduler import DEFAULT_MAX_WORKERS, Steps, format_timings, run_steps
+from jvdeploy.aws.state import DeploymentState
+from jvdeploy.aws.waiters import WaitTimeoutError, format_waits, retry, wait_until
+from jvdeploy.config import LAMBDA_PLATFORMS
+from jvdeploy.docker_builder import parse_image_uri
+
 logger = logging.getLogger(__name__)
 
+# ECR repository prefix of the public.ecr.aws pull-through cache rule
+DEFAULT_PULL_THROUGH_PREFIX = "ecr-public"
+
+# Seconds to wait for resources to become usable
+ROLE_PROPAGATION_TIMEOUT = 120.0
+ACCESS_POINT_TIMEOUT = 90.0
+FUNCTION_READY_TIMEOUT = 600.0
+PROVISIONED_CONCURRENCY_TIMEOUT = 900.0
+
+# Alias the Function URL and API Gateway invoke when versions are published
+DEFAULT_ALIAS = "live"
+
+# Application Auto Scaling of an alias's provisioned concurrency
+PROVISIONED_CONCURRENCY_DIMENSION = "lambda:function:ProvisionedConcurrency"
+DEFAULT_TARGET_UTILIZATION = 0.7
+
+# EventBridge rules that keep the function warm, and targets per rule (the
+# EventBridge limit); larger fan-outs use several rules
+WARMER_SUFFIX = "-warmer"
+WARMER_TARGETS_PER_RULE = 5
+# A missed warmup is not redelivered: a late retry would not run alongside the others
+WARMER_RETRY_POLICY = {"MaximumRetryAttempts": 0, "MaximumEventAgeInSeconds": 60}
+_WARMER_RATE = re.compile(r"^(\d+)\s*(m|min|minutes?|h|hours?|d|days?)$")
+_WARMER_UNITS = {"m": "minute", "min": "minute", "h": "hour", "d": "day"}
+
+# Lambda architecture of each image config architecture
+_IMAGE_ARCHITECTURES = {"amd64": "x86_64", "arm64": "arm64"}
+
+# Manifest types to read an image's platform from
+_MANIFEST_MEDIA_TYPES = [
+    "application/vnd.docker.distribution.manifest.v2+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.oci.image.index.v1+json",
+]
+
+# Tag identifying the function an HTTP API was created for
+API_FUNCTION_TAG = "JvDeployFunction"
+
+# Helper function that sets up SQLite on EFS, and the access point tag
+# recording that it ran for a database path
+SQLITE_INIT_SUFFIX = "-sqlite-init"
+SQLITE_INIT_RUNTIME = "python3.12"
+SQLITE_INIT_TAG = "JvDeploySqliteInit"
+
+_SQLITE_INIT_HANDLER = """import os
+
+
+def handler(event, context):
+    db_path = event["db_path"]
+    directory = os.path.dirname(db_path)
+    os.makedirs(directory, exist_ok=True)
+    open(db_path, "a").close()
+    os.chmod(db_path, 0o666)
+    os.chmod(directory, 0o777)
+    return {"db_path": db_path}
+"""
+
+# Lambda errors while a new role or its policies have not propagated yet
+_ROLE_NOT_READY_MESSAGES = ("cannot be assumed", "does not have permissions")
+
+
+def _role_not_ready(error: Exception) -> bool:
+    """Check whether Lambda rejected a call because the role has not propagated."""
+    if not isinstance(error, ClientError):
+        return False
+    details = error.response.get("Error", {})
+    return details.get("Code") == "InvalidParameterValueException" and any(
+        message in details.get("Message", "") for message in _ROLE_NOT_READY_MESSAGES
+    )
+
+
+def _warmer_schedule(rate: str) -> str:
+    """Turn lambda.warmer.rate (e.g. '5m') into an EventBridge schedule expression.
+
+    Args:
+        rate: Interval such as '5m', '1h' or '1 day', or a rate()/cron() expression
+
+    Returns:
+        Schedule expression
+    """
+    rate = str(rate).strip()
+    if rate.startswith(("rate(", "cron(")):
+        return rate
+    match = _WARMER_RATE.match(rate)
+    if not match or int(match.group(1)) < 1:
+        raise LambdaDeployerError(
+            f"Invalid lambda.warmer.rate '{rate}': use e.g. 5m, 1h or rate(5 minutes)"
+        )
+    value, unit = int(match.group(1)), match.group(2)
+    unit = _WARMER_UNITS.get(unit, unit.rstrip("s"))
+    return f"rate({value} {unit}{'s' if value > 1 else ''})"
+
+
+def _sqlite_helper_zip() -> bytes:
+    """Package the SQLite init handler (byte-identical on every call)."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        info = zipfile.ZipInfo("index.py", date_time=(1980, 1, 1, 0, 0, 0))
+        info.external_attr = 0o644 << 16
+        archive.writestr(info, _SQLITE_INIT_HANDLER)
+    return buffer.getvalue()
+
 
 class LambdaDeployerError(Exception):
     """Exception raised for Lambda deployment errors."""
@@ -42,94 +181,124 @@ class LambdaDeployer:
         self._apigatewayv2_client = None
         self._sts_client = None
         self._efs_client = None
+        self._s3_client = None
+        self._autoscaling_client = None
+        self._events_client = None
+        self._session = None
+        self._client_lock = threading.Lock()
+
+        # EFS lookups shared by the deployment steps, by file system ID
+        self._efs_access_points: Dict[str, str] = {}
+        self._efs_vpc_configs: Dict[str, Dict[str, Any]] = {}
+
+        # HTTP APIs of the region by name, listed once per run
+        self._http_apis: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._http_apis_lock = threading.Lock()
+
+        # Record of every wait for AWS resources (see jvdeploy.aws.waiters)
+        self.waits: List[Dict[str, Any]] = []
+
+        # Resources recorded by earlier runs (see jvdeploy.aws.state)
+        self.state = DeploymentState.from_config(config, s3_client=lambda: self.s3_client)
 
         logger.info(f"Initialized Lambda deployer for region {self.region}")
         if self.dry_run:
             logger.info("Running in DRY RUN mode - no changes will be made")
 
+    def _get_client(self, attribute: str, service: str) -> Any:
+        """Get a boto3 client, creating it from this deployer's session on first use.
+
+        Deployment steps run on several threads and boto3 sessions are not
+        thread-safe, so clients are created under a lock.
+        """
+        client = getattr(self, attribute)
+        if client is None:
+            with self._client_lock:
+                client = getattr(self, attribute)
+                if client is None:
+                    client = self._create_client(service)
+                    setattr(self, attribute, client)
+        return client
+
+    def _create_client(self, service: str, **kwargs: Any) -> Any:
+        """Create a boto3 client from this deployer's session (hold the client lock)."""
+        return self._ensure_session().client(service, region_name=self.region, **kwargs)
+
+    def _ensure_session(self) -> Any:
+        """Get this deployer's boto3 session, creating it on first use (hold the client lock)."""
+        try:
+            import boto3
+        except ImportError:
+            raise LambdaDeployerError(
+                "boto3 is required for Lambda deployment. Install with: pip install boto3"
+            )
+
+        if self._session is None:
+            self._session = boto3.session.Session()
+        return self._session
+
     @property
     def ecr_client(self):
         """Lazy-load ECR client."""
-        if self._ecr_client is None:
-            try:
-                import boto3
-
-                self._ecr_client = boto3.client("ecr", region_name=self.region)
-            except ImportError:
-                raise LambdaDeployerError(
-                    "boto3 is required for Lambda deployment. Install with: pip install boto3"
-                )
-        return self._ecr_client
+        return self._get_client("_ecr_client", "ecr")
 
     @property
     def iam_client(self):
         """Lazy-load IAM client."""
-        if self._iam_client is None:
-            try:
-                import boto3
-
-                self._iam_client = boto3.client("iam", region_name=self.region)
-            except ImportError:
-                raise LambdaDeployerError(
-                    "boto3 is required for Lambda deployment. Install with: pip install boto3"
-                )
-        return self._iam_client
+        return self._get_client("_iam_client", "iam")
 
     @property
     def lambda_client(self):
         """Lazy-load Lambda client."""
-        if self._lambda_client is None:
-            try:
-                import boto3
-
-                self._lambda_client = boto3.client("lambda", region_name=self.region)
-            except ImportError:
-                raise LambdaDeployerError(
-                    "boto3 is required for Lambda deployment. Install with: pip install boto3"
-                )
-        return self._lambda_client
+        return self._get_client("_lambda_client", "lambda")
 
     @property
     def apigatewayv2_client(self):
         """Lazy-load API Gateway V2 client (for HTTP APIs)."""
-        if self._apigatewayv2_client is None:
-            try:
-                import boto3
-
-                self._apigatewayv2_client = boto3.client("apigatewayv2", region_name=self.region)
-            except ImportError:
-                raise LambdaDeployerError(
-                    "boto3 is required for Lambda deployment. Install with: pip install boto3"
-                )
-        return self._apigatewayv2_client
+        return self._get_client("_apigatewayv2_client", "apigatewayv2")
 
     @property
     def sts_client(self):
         """Lazy-load STS client."""
-        if self._sts_client is None:
-            try:
-                import boto3
-
-                self._sts_client = boto3.client("sts", region_name=self.region)
-            except ImportError:
-                raise LambdaDeployerError(
-                    "boto3 is required for Lambda deployment. Install with: pip install boto3"
-                )
-        return self._sts_client
+        return self._get_client("_sts_client", "sts")
 
     @property
     def efs_client(self):
         """Lazy-load EFS client."""
-        if self._efs_client is None:
-            try:
-                import boto3
+        return self._get_client("_efs_client", "efs")
 
-                self._efs_client = boto3.client("efs", region_name=self.region)
-            except ImportError:
-                raise LambdaDeployerError(
-                    "boto3 is required for Lambda deployment. Install with: pip install boto3"
-                )
-        return self._efs_client
+    @property
+    def s3_client(self):
+        """Lazy-load S3 client (for deployment state kept in S3)."""
+        return self._get_client("_s3_client", "s3")
+
+    @property
+    def events_client(self):
+        """Lazy-load EventBridge client (for the keep-warm rule)."""
+        return self._get_client("_events_client", "events")
+
+    @property
+    def autoscaling_client(self):
+        """Lazy-load Application Auto Scaling client (for provisioned concurrency)."""
+        return self._get_client("_autoscaling_client", "application-autoscaling")
+
+    def _invoke_client(self, max_pool_connections: int) -> Any:
+        """Create a Lambda client for concurrent synchronous invocations.
+
+        Unlike lambda_client, it keeps a connection per invocation in
+        flight, waits as long as the function may run and does not retry
+        (a retried invocation would land on another environment).
+        """
+        from botocore.config import Config
+
+        timeout = self.config.get("function", {}).get("timeout", 300)
+        config = Config(
+            max_pool_connections=max_pool_connections,
+            read_timeout=timeout + 30,
+            retries={"total_max_attempts": 1},
+        )
+        with self._client_lock:
+            return self._create_client("lambda", config=config)
 
     def get_account_id(self) -> str:
         """Get AWS account ID from credentials.
@@ -144,13 +313,31 @@ class LambdaDeployer:
             return str(self.account_id)
 
         try:
-            response = self.sts_client.get_caller_identity()
-            self.account_id = str(response["Account"])
+            from jvdeploy.aws.credentials import get_account_id
+
+            with self._client_lock:
+                session = self._ensure_session()
+            # The cache is scoped to this session's credentials; STS is only called on a miss
+            self.account_id = get_account_id(
+                self.region, session=session, sts_client=lambda: self.sts_client
+            )
             logger.info(f"Auto-detected AWS account ID: {self.account_id}")
             return str(self.account_id)
         except Exception as e:
             raise LambdaDeployerError(f"Failed to get AWS account ID: {e}") from e
 
+    def _state_key(self, function_name: Optional[str] = None) -> str:
+        """Get the key of this deployment's records in the deployment state.
+
+        Args:
+            function_name: Function name (uses config if not provided)
+
+        Returns:
+            'account/region/function'
+        """
+        name = function_name or self.config.get("function", {}).get("name", "")
+        return f"{self.get_account_id()}/{self.region}/{name}"
+
     def deploy(
         self,
         image_uri: str,
@@ -158,6 +345,7 @@ class LambdaDeployer:
         push_image: bool = True,
         update_function: bool = True,
         create_api: bool = True,
+        prewarm: int = 0,
     ) -> Dict[str, Any]:
         """Execute full Lambda deployment pipeline.
 
@@ -167,9 +355,28 @@ class LambdaDeployer:
             push_image: Whether to push image to ECR
             update_function: Whether to update/create Lambda function
             create_api: Whether to create/update API Gateway
+            prewarm: Execution environments to initialize with concurrent
+                requests: on the new version before the alias is moved to
+                it, or without an alias once the function, Function URL
+                and API are deployed
+
+        Steps run concurrently as soon as the steps they depend on are done:
+        the IAM role, EFS access point and VPC lookup overlap with the image
+        build, and the Function URL and API Gateway are configured together.
+
+        With an alias (lambda.alias, or implied by
+        lambda.provisioned_concurrency), the deployed code and settings are
+        published as a version, the alias is moved to it and the Function
+        URL and API Gateway invoke the alias instead of $LATEST.
+
+        Resources recorded in the deployment state by an earlier run are
+        trusted instead of looked up again. If the deployment fails, its
+        records are dropped so the next run rediscovers everything.
 
         Returns:
-            Dictionary with deployment results
+            Dictionary with deployment results, including 'timings' (seconds
+            per step), 'waits' (how long AWS resources took to become usable)
+            and 'prewarm' (one entry per pre-warm request)
         """
         results: Dict[str, Any] = {
             "success": False,
@@ -177,67 +384,47 @@ class LambdaDeployer:
             "image_uri": image_uri,
             "iam_role_arn": None,
             "function_arn": None,
+            "function_version": None,
             "api_url": None,
             "function_url": None,
             "errors": [],
+            "timings": {},
+            "waits": [],
+            "prewarm": [],
+            "warmer_rules": [],
         }
 
-        try:
-            # Step 0: Ensure we have account_id
+        function_config = self.config.get("function", {})
+        ecr_config = self.config.get("ecr", {})
+        efs_config = self.config.get("efs", {})
+        alias_name = self._alias_name()
+        # Values steps hand to the steps that depend on them
+        shared: Dict[str, Any] = {"pull_through_cache": None, "role_arn": None}
+
+        def ensure_account() -> None:
             if not self.account_id:
                 logger.info("Auto-detecting AWS account ID...")
                 self.account_id = self.get_account_id()
 
-            # Step 1: Ensure ECR repository exists
+        def ensure_ecr() -> None:
             logger.info("Step 1: Ensuring ECR repository exists...")
-            ecr_config = self.config.get("ecr", {})
             repository_name = ecr_config.get("repository_name")
-
             if not repository_name:
                 raise LambdaDeployerError("ECR repository_name is required")
 
-            repo = self._ensure_ecr_repository(repository_name)
-            results["ecr_repository"] = repo
+            results["ecr_repository"] = self._ensure_ecr_repository(repository_name)
 
-            # Step 2: Build and push image (if requested)
-            if build_image or push_image:
-                logger.info("Step 2: Building and pushing Docker image...")
-                if self.dry_run:
-                    logger.info(f"[DRY RUN] Would build and push image: {image_uri}")
-                else:
-                    # Import docker builder
-                    try:
-                        from jvdeploy.docker_builder import DockerBuilder
-                    except ImportError as e:
-                        raise LambdaDeployerError(f"Failed to import docker_builder: {e}")
-
-                    # Get image config from config
-                    image_config = self.config.get("image", {})
-                    # app_config = self.config.get("app", {})
-
-                    # Determine app root (parent of config if not in config)
-                    app_root = self.config.get("app_root", ".")
-
-                    # Create Docker builder
-                    builder = DockerBuilder(
-                        app_root=app_root,
-                        image_name=image_config.get("name", "app"),
-                        image_tag=image_config.get("tag", "latest"),
-                        platform=image_config.get("build", {}).get("platform", "linux/amd64"),
-                        builder=image_config.get("build", {}).get("builder"),
-                    )
+            pull_through_config = ecr_config.get("pull_through_cache") or {}
+            if pull_through_config.get("enabled", False):
+                shared["pull_through_cache"] = self._ensure_pull_through_cache_rule(
+                    pull_through_config.get("prefix", DEFAULT_PULL_THROUGH_PREFIX)
+                )
 
-                    # Build and push to ECR
-                    logger.info("Building and pushing Docker image to ECR...")
-                    builder.build_and_push_to_ecr(
-                        ecr_uri=image_uri,
-                        region=self.region,
-                        account_id=self.account_id,
-                        no_cache=not image_config.get("build", {}).get("cache", True),
-                    )
-                    logger.info(f"✓ Image ready: {image_uri}")
+        def build() -> None:
+            logger.info("Step 2: Building and pushing Docker image...")
+            self._build_and_push_image(image_uri, shared["pull_through_cache"])
 
-            # Step 3: Ensure IAM role exists
+        def ensure_role() -> None:
             logger.info("Step 3: Ensuring IAM role exists...")
             iam_config = self.config.get("iam", {})
             role_arn = iam_config.get("role_arn")
@@ -252,54 +439,593 @@ class LambdaDeployer:
 
                 role_arn = self._ensure_iam_role(role_name, iam_config.get("policies", []))
 
-            results["iam_role_arn"] = role_arn
+            shared["role_arn"] = results["iam_role_arn"] = role_arn
 
-            # Step 4: Create or update Lambda function
-            if update_function:
-                logger.info("Step 4: Creating/updating Lambda function...")
-                function_config = self.config.get("function", {})
-                function_arn = self._deploy_lambda_function(
-                    image_uri=image_uri,
-                    role_arn=role_arn,
-                    function_config=function_config,
-                )
-                results["function_arn"] = function_arn
+        def ensure_access_point() -> None:
+            self._ensure_efs_access_point(
+                efs_config["file_system_id"], efs_config.get("access_point_arn")
+            )
 
-                # Ensure SQLite permissions if needed
-                self._ensure_sqlite_permissions(
-                    image_uri=image_uri,
-                    role_arn=role_arn,
-                    function_config=function_config,
-                )
+        def discover_vpc() -> None:
+            self._get_efs_vpc_config(efs_config["file_system_id"])
 
-            # Step 5: Create or update API Gateway / Function URL
-            if create_api:
-                # Function URL
-                function_url_config = self.config.get("function_url", {})
-                if function_url_config.get("enabled", False):
-                    logger.info("Step 5a: Configuring Lambda Function URL...")
-                    function_url = self._deploy_function_url(
-                        function_config.get("name"), function_url_config
-                    )
-                    results["function_url"] = function_url
+        def deploy_function() -> None:
+            logger.info("Step 4: Creating/updating Lambda function...")
+            results["function_arn"] = self._deploy_lambda_function(
+                image_uri=image_uri,
+                role_arn=shared["role_arn"],
+                function_config=function_config,
+            )
+
+        def ensure_sqlite() -> None:
+            self._ensure_sqlite_permissions(
+                image_uri=image_uri,
+                role_arn=shared["role_arn"],
+                function_config=function_config,
+            )
+
+        def publish_version() -> None:
+            logger.info("Step 4b: Publishing version and updating alias...")
+            function_name = function_config.get("name")
+            published = self._publish_alias(function_name, alias_name, prewarm)
+            results["function_version"] = published["version"]
+            results["prewarm"] = published["prewarm"]
+            self._configure_provisioned_concurrency(function_name, alias_name)
+
+        def deploy_function_url() -> None:
+            logger.info("Step 5a: Configuring Lambda Function URL...")
+            results["function_url"] = self._deploy_function_url(
+                function_config.get("name"), self.config.get("function_url", {})
+            )
+
+        def deploy_api() -> None:
+            logger.info("Step 5b: Creating/updating API Gateway...")
+            results["api_url"] = self._deploy_api_gateway(
+                function_config.get("name"), self.config.get("api_gateway", {})
+            )
 
-                # API Gateway
-                api_config = self.config.get("api_gateway", {})
-                if api_config.get("enabled", False):
-                    logger.info("Step 5b: Creating/updating API Gateway...")
-                    api_url = self._deploy_api_gateway(function_config.get("name"), api_config)
-                    results["api_url"] = api_url
+        def ensure_warmer() -> None:
+            logger.info("Step 4c: Configuring keep-warm schedule...")
+            results["warmer_rules"] = self._ensure_warmer(function_config.get("name"))
+
+        def prewarm_latest() -> None:
+            logger.info("Step 6: Pre-warming execution environments...")
+            # Go through the URL users call when there is one
+            url = results["function_url"] or results["api_url"]
+            results["prewarm"] = self.prewarm(prewarm, function_config.get("name"), url=url)
+
+        # Steps and the steps they wait for. The image build, the IAM role
+        # and the EFS lookups are independent of each other.
+        steps: Steps = {
+            "account": (ensure_account, []),
+            "ecr": (ensure_ecr, ["account"]),
+            "iam": (ensure_role, ["account"]),
+        }
+        if build_image or push_image:
+            steps["build"] = (build, ["ecr"])
+        if update_function:
+            function_deps = ["account", "iam"] + (["build"] if "build" in steps else [])
+            if efs_config.get("enabled", False) and efs_config.get("file_system_id"):
+                steps["efs"] = (ensure_access_point, ["account"])
+                function_deps.append("efs")
+                if not self.config.get("vpc", {}).get("enabled", False):
+                    steps["vpc"] = (discover_vpc, ["account"])
+                    function_deps.append("vpc")
+            steps["function"] = (deploy_function, function_deps)
+            steps["sqlite"] = (ensure_sqlite, ["function"])
+            if alias_name:
+                steps["alias"] = (publish_version, ["function"])
+            # Also runs without lambda.warmer, to remove rules an earlier deploy left
+            steps["warmer"] = (ensure_warmer, ["function"] + (["alias"] if alias_name else []))
+        if create_api:
+            api_deps = ["account"] + [name for name in ("function", "alias") if name in steps]
+            if self.config.get("function_url", {}).get("enabled", False):
+                steps["function_url"] = (deploy_function_url, api_deps)
+            if self.config.get("api_gateway", {}).get("enabled", False):
+                steps["api"] = (deploy_api, api_deps)
+        if prewarm and not alias_name:
+            prewarm_deps = ["account"] + [
+                name for name in ("function", "function_url", "api") if name in steps
+            ]
+            steps["prewarm"] = (prewarm_latest, prewarm_deps)
+
+        first_wait = len(self.waits)
+        try:
+            run_steps(
+                steps,
+                max_workers=self.config.get("deploy_concurrency", DEFAULT_MAX_WORKERS),
+                timings=results["timings"],
+            )
 
+            self.state.save()
             results["success"] = True
+            results["waits"] = self.waits[first_wait:]
             logger.info("✓ Lambda deployment completed successfully!")
+            logger.info(f"Step timings:\n{format_timings(results['timings'])}")
+            if results["waits"]:
+                logger.info(f"Waits:\n{format_waits(results['waits'])}")
 
             return results
 
         except Exception as e:
             logger.error(f"Deployment failed: {e}")
             cast(List[str], results["errors"]).append(str(e))
+            # A recorded resource may be what failed (e.g. deleted outside jvdeploy)
+            self.state.forget(self._state_key())
+            self.state.save()
             raise LambdaDeployerError(f"Deployment failed: {e}") from e
 
+    def _build_and_push_image(self, image_uri: str, pull_through_cache: Optional[str]) -> None:
+        """Build the app image and push it to ECR.
+
+        Args:
+            image_uri: Full ECR image URI
+            pull_through_cache: Pull-through cache path to pull the base image
+                through, if enabled
+        """
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would build and push image: {image_uri}")
+            return
+
+        # Import docker builder
+        try:
+            from jvdeploy.docker_builder import DockerBuilder
+        except ImportError as e:
+            raise LambdaDeployerError(f"Failed to import docker_builder: {e}")
+
+        # Get image config from config
+        image_config = self.config.get("image", {})
+
+        # Determine app root (parent of config if not in config)
+        app_root = self.config.get("app_root", ".")
+
+        # Create Docker builder
+        build_config = image_config.get("build", {})
+        platforms = self._build_platforms(build_config)
+        if build_config.get("manifest_list", False):
+            # Lambda cannot run an image index; the tag must be the function's platform image
+            logger.warning(
+                "image.build.manifest_list is ignored for Lambda: the function's tag is "
+                f"published as the {platforms[0]} image"
+            )
+        builder = DockerBuilder(
+            app_root=app_root,
+            image_name=image_config.get("name", "app"),
+            image_tag=image_config.get("tag", "latest"),
+            platform=platforms[0],
+            builder=build_config.get("builder"),
+            backend=build_config.get("backend", "cli"),
+            platforms=platforms if build_config.get("platforms") else None,
+            manifest_list=False,
+            compression=build_config.get("compression"),
+            compression_level=build_config.get("compression_level"),
+            lambda_target=True,
+            budget=image_config.get("budget"),
+            code_only_updates=build_config.get("code_only_updates", False),
+            push_client=build_config.get("push_client", "docker"),
+            push_concurrency=build_config.get("push_concurrency"),
+            push_chunk_mb=build_config.get("push_chunk_mb"),
+            # Images are looked up with the deploying credentials (profile or assumed role)
+            ecr_client=self.ecr_client,
+        )
+
+        with tempfile.TemporaryDirectory(prefix="jvdeploy-") as tmp_dir:
+            dockerfile_path = None
+            if pull_through_cache:
+                dockerfile_path = self._use_pull_through_cache(
+                    Path(app_root), pull_through_cache, Path(tmp_dir)
+                )
+                # The base image is now pulled from this account's registry
+                builder.ecr_login(region=self.region, account_id=self.account_id)
+
+            # Build and push to ECR
+            logger.info("Building and pushing Docker image to ECR...")
+            builder.build_and_push_to_ecr(
+                ecr_uri=image_uri,
+                region=self.region,
+                account_id=self.account_id,
+                dockerfile_path=dockerfile_path,
+                no_cache=not build_config.get("cache", True),
+            )
+        logger.info(f"✓ Image ready: {image_uri}")
+
+    def _function_architecture(self) -> str:
+        """Get the configured instruction set architecture of the function.
+
+        Returns:
+            'x86_64' or 'arm64'
+        """
+        architecture = str(self.config.get("function", {}).get("architecture", "x86_64"))
+        if architecture not in LAMBDA_PLATFORMS:
+            raise LambdaDeployerError(
+                f"function.architecture must be one of {', '.join(LAMBDA_PLATFORMS)}, "
+                f"got '{architecture}'"
+            )
+        return architecture
+
+    def _build_platforms(self, build_config: Dict[str, Any]) -> List[str]:
+        """Get the platforms to build, the function's platform first.
+
+        Args:
+            build_config: image.build configuration
+
+        Returns:
+            Docker platforms; the first is the one tagged for the function
+
+        Raises:
+            LambdaDeployerError: If the configured platforms do not include
+                the function's architecture
+        """
+        architecture = self._function_architecture()
+        platform = LAMBDA_PLATFORMS[architecture]
+        platforms = list(build_config.get("platforms") or [build_config.get("platform", platform)])
+        if platform not in platforms:
+            raise LambdaDeployerError(
+                f"Image is built for {', '.join(platforms)}, but function.architecture is "
+                f"{architecture}: set image.build.platform to {platform} (or remove it)"
+            )
+        platforms.remove(platform)
+        return [platform] + platforms
+
+    def _get_image_architectures(self, image_uri: str) -> List[str]:
+        """Look up the Lambda architectures an ECR image can run on.
+
+        Args:
+            image_uri: Full ECR image URI
+
+        Returns:
+            Architectures (e.g. ['arm64']), or an empty list if they cannot be
+            determined
+        """
+        _, repository, tag = parse_image_uri(image_uri)
+        image_id = (
+            {"imageDigest": image_uri.split("@", 1)[1]} if "@" in image_uri else {"imageTag": tag}
+        )
+        try:
+            response = self.ecr_client.batch_get_image(
+                repositoryName=repository,
+                imageIds=[image_id],
+                acceptedMediaTypes=_MANIFEST_MEDIA_TYPES,
+            )
+            images = response.get("images", [])
+            if not images:
+                return []
+            manifest = json.loads(images[0]["imageManifest"])
+
+            if "manifests" in manifest:
+                found = [m.get("platform", {}).get("architecture") for m in manifest["manifests"]]
+            else:
+                # Single-platform image: the architecture is in its config blob
+                url = self.ecr_client.get_download_url_for_layer(
+                    repositoryName=repository, layerDigest=manifest["config"]["digest"]
+                )["downloadUrl"]
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    found = [json.loads(response.read()).get("architecture")]
+        except Exception as e:
+            logger.debug(f"Could not determine the architecture of {image_uri}: {e}")
+            return []
+
+        return [_IMAGE_ARCHITECTURES[arch] for arch in found if arch in _IMAGE_ARCHITECTURES]
+
+    def _check_image_architecture(self, image_uri: str, architectures: List[str]) -> None:
+        """Make sure an image can run on the function's architecture.
+
+        Lambda accepts a mismatched image and only fails when the function
+        is invoked, so this is checked before the image is deployed.
+
+        Args:
+            image_uri: Full ECR image URI
+            architectures: Function architectures (e.g. ['arm64'])
+
+        Raises:
+            LambdaDeployerError: If the image was built for another architecture
+        """
+        image_architectures = self._get_image_architectures(image_uri)
+        if image_architectures and not set(architectures) <= set(image_architectures):
+            raise LambdaDeployerError(
+                f"Image {image_uri} is built for {', '.join(image_architectures)}, but the "
+                f"function runs on {', '.join(architectures)}: rebuild it for "
+                f"{LAMBDA_PLATFORMS[architectures[0]]} or change function.architecture"
+            )
+
+    def plan(self, image_uri: str) -> Dict[str, Any]:
+        """Compare the configured deployment with the live AWS resources.
+
+        Live state is read once (function configuration and code, alias and
+        its provisioned concurrency, Function URL, resource policy, HTTP API
+        and IAM role policies); nothing is changed. Autoscaling of
+        provisioned concurrency is only configured by deploy.
+
+        Args:
+            image_uri: Full ECR image URI the function should run
+
+        Returns:
+            Dictionary with 'function_name', 'image_uri', 'function_arn',
+            'live' and 'actions' (see lambda_plan.build_plan)
+        """
+        function_config = self.config.get("function", {})
+        function_name = function_config.get("name")
+        if not function_name:
+            raise LambdaDeployerError("function.name is required")
+
+        if not self.account_id:
+            self.account_id = self.get_account_id()
+
+        iam_config = self.config.get("iam", {})
+        role_name = None if iam_config.get("role_arn") else iam_config.get("role_name")
+        if not iam_config.get("role_arn") and not role_name:
+            raise LambdaDeployerError("Either iam.role_arn or iam.role_name must be provided")
+
+        api_config = self.config.get("api_gateway", {})
+        api_name = None
+        if api_config.get("enabled", False):
+            if api_config.get("type", "HTTP") != "HTTP":
+                raise LambdaDeployerError(
+                    f"API Gateway type '{api_config.get('type')}' not yet supported"
+                )
+            api_name = api_config.get("name", f"{function_name}-api")
+
+        try:
+            live = self._fetch_live_state(function_name, role_name, api_name, self._alias_name())
+            desired = self._desired_state(image_uri, live)
+        except LambdaDeployerError:
+            raise
+        except Exception as e:
+            raise LambdaDeployerError(f"Failed to read deployment state: {e}") from e
+
+        actions = build_plan(desired, live)
+        if any(
+            a["call"] in ("lambda.create_function", "lambda.update_function_code") for a in actions
+        ):
+            self._check_image_architecture(image_uri, desired["function"]["Architectures"])
+
+        return {
+            "function_name": function_name,
+            "image_uri": image_uri,
+            "function_arn": (
+                f"arn:aws:lambda:{self.region}:{self.account_id}:function:{function_name}"
+            ),
+            "live": live,
+            "actions": actions,
+        }
+
+    def _fetch_live_state(
+        self,
+        function_name: str,
+        role_name: Optional[str],
+        api_name: Optional[str],
+        alias_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Read the live state of the deployment's resources.
+
+        Args:
+            function_name: Lambda function name
+            role_name: IAM role managed by jvdeploy (None if its ARN is given)
+            api_name: HTTP API name (None if API Gateway is disabled)
+            alias_name: Alias the function is invoked through (None for $LATEST)
+
+        Returns:
+            Live state as expected by lambda_plan.build_plan
+        """
+        live: Dict[str, Any] = {
+            "function": None,
+            "alias": None,
+            "alias_function": None,
+            "provisioned_concurrency": None,
+            "function_url": None,
+            "statement_ids": [],
+            "api": None,
+            "api_integrations": [],
+            "role": None,
+        }
+
+        try:
+            live["function"] = self.lambda_client.get_function(FunctionName=function_name)
+        except self.lambda_client.exceptions.ResourceNotFoundException:
+            pass
+
+        # The Function URL and permissions belong to the alias, if there is one
+        function = {"FunctionName": function_name}
+        if alias_name:
+            function["Qualifier"] = alias_name
+
+        if live["function"] is not None and alias_name:
+            try:
+                live["alias"] = self.lambda_client.get_alias(
+                    FunctionName=function_name, Name=alias_name
+                )
+                live["alias_function"] = self.lambda_client.get_function_configuration(**function)
+                live["provisioned_concurrency"] = (
+                    self.lambda_client.get_provisioned_concurrency_config(**function)
+                )
+            except (
+                self.lambda_client.exceptions.ResourceNotFoundException,
+                self.lambda_client.exceptions.ProvisionedConcurrencyConfigNotFoundException,
+            ):
+                pass
+
+        if live["function"] is not None:
+            try:
+                live["function_url"] = self.lambda_client.get_function_url_config(**function)
+            except self.lambda_client.exceptions.ResourceNotFoundException:
+                pass
+            try:
+                policy = self.lambda_client.get_policy(**function)["Policy"]
+                live["statement_ids"] = policy_statement_ids(policy)
+            except self.lambda_client.exceptions.ResourceNotFoundException:
+                pass
+
+        if api_name:
+            live["api"] = self._find_http_api(api_name)
+            if live["api"]:
+                live["api_integrations"] = self.apigatewayv2_client.get_integrations(
+                    ApiId=live["api"]["ApiId"]
+                ).get("Items", [])
+
+        if role_name:
+            try:
+                role = self.iam_client.get_role(RoleName=role_name)["Role"]
+                live["role"] = {
+                    "arn": str(role["Arn"]),
+                    "policies": self._attached_role_policies(role_name),
+                }
+            except self.iam_client.exceptions.NoSuchEntityException:
+                pass
+
+        return live
+
+    def _desired_state(self, image_uri: str, live: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the desired state of the deployment from the configuration.
+
+        Args:
+            image_uri: Full ECR image URI the function should run
+            live: Result of _fetch_live_state
+
+        Returns:
+            Desired state as expected by lambda_plan.build_plan
+        """
+        function_config = self.config.get("function", {})
+        function_name = function_config["name"]
+        desired: Dict[str, Any] = {
+            "role": None,
+            "access_point": None,
+            "alias": None,
+            "function_url": None,
+            "api": None,
+            "image_digest": self._get_image_digest(image_uri),
+        }
+
+        iam_config = self.config.get("iam", {})
+        role_arn = iam_config.get("role_arn")
+        if not role_arn:
+            role_name = iam_config["role_name"]
+            desired["role"] = {"name": role_name, "policies": iam_config.get("policies", [])}
+            role_arn = (live.get("role") or {}).get("arn") or (
+                f"arn:aws:iam::{self.account_id}:role/{role_name}"
+            )
+
+        # Look the access point up without creating it; creating is an action
+        access_point_arn = None
+        efs_config = self.config.get("efs", {})
+        if efs_config.get("enabled", False) and efs_config.get("file_system_id"):
+            file_system_id = efs_config["file_system_id"]
+            access_point_arn = efs_config.get("access_point_arn") or self._find_efs_access_point(
+                file_system_id
+            )
+            if not access_point_arn:
+                desired["access_point"] = {"file_system_id": file_system_id}
+                access_point_arn = NEW_ACCESS_POINT_ARN
+
+        desired["function"] = self._build_lambda_config(
+            image_uri, role_arn, function_config, access_point_arn=access_point_arn
+        )
+
+        alias_name = self._alias_name()
+        if alias_name:
+            settings = self._provisioned_concurrency()
+            desired["alias"] = {
+                "name": alias_name,
+                "provisioned_concurrency": settings["count"],
+                "autoscaling": settings["autoscaling"] is not None,
+            }
+
+        url_config = self.config.get("function_url", {})
+        if url_config.get("enabled", False):
+            desired["function_url"] = self._function_url_params(function_name, url_config)
+
+        api_config = self.config.get("api_gateway", {})
+        if api_config.get("enabled", False):
+            params = self._http_api_params(function_name, api_config)
+            desired["api"] = {
+                "name": params["Name"],
+                "params": params,
+                "source_arn_prefix": f"arn:aws:execute-api:{self.region}:{self.account_id}",
+            }
+
+        return desired
+
+    def apply(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the actions of a plan.
+
+        Args:
+            plan: Result of plan()
+
+        Returns:
+            Dictionary with 'applied' (number of actions), 'function_arn',
+            'function_url' and 'api_url'
+        """
+        function_name = plan["function_name"]
+        live = plan["live"]
+        results: Dict[str, Any] = {
+            "applied": 0,
+            "function_arn": plan["function_arn"],
+            "function_url": (live.get("function_url") or {}).get("FunctionUrl"),
+            "api_url": None,
+        }
+        api_config = self.config.get("api_gateway", {})
+        api_id = (live.get("api") or {}).get("ApiId")
+        outputs: Dict[str, str] = {}
+
+        for action in plan["actions"]:
+            service, operation = action["call"].split(".", 1)
+            params = fill_placeholders(action["params"], outputs)
+            if self.dry_run:
+                logger.info(f"[DRY RUN] Would call {action['call']} for {action['name']}")
+                continue
+
+            logger.info(f"{action['call']}: {action['name']}")
+            try:
+                if action["call"] == "iam.create_role":
+                    self._ensure_iam_role(params["RoleName"], action.get("policies", []))
+                elif action["call"] == "efs.create_access_point":
+                    outputs[NEW_ACCESS_POINT_ARN] = self._ensure_efs_access_point(
+                        params["FileSystemId"]
+                    )
+                else:
+                    method = getattr(getattr(self, f"{service}_client"), operation)
+                    if operation in ("create_function", "update_function_configuration"):
+                        # A role created moments ago may not be assumable yet
+                        response = self._call_with_role(method, params)
+                    else:
+                        response = method(**params)
+
+                    if operation == "create_function":
+                        results["function_arn"] = str(response["FunctionArn"])
+                        self._wait_for_function(function_name, "function to become active")
+                    elif operation in ("update_function_code", "update_function_configuration"):
+                        self._wait_for_function(function_name, "function update")
+                    elif operation in (
+                        "create_function_url_config",
+                        "update_function_url_config",
+                    ):
+                        results["function_url"] = str(response["FunctionUrl"])
+                    elif operation == "publish_version":
+                        outputs[NEW_VERSION] = str(response["Version"])
+                    elif operation == "put_provisioned_concurrency_config":
+                        self._wait_for_provisioned_concurrency(function_name, params["Qualifier"])
+                    elif operation == "create_api":
+                        api_id = outputs[NEW_API_ID] = str(response["ApiId"])
+                        self._record_http_api(function_name, dict(params, **response))
+            except LambdaDeployerError:
+                raise
+            except Exception as e:
+                raise LambdaDeployerError(
+                    f"Failed to apply {action['call']} for {action['name']}: {e}"
+                ) from e
+            results["applied"] += 1
+
+        if api_id:
+            results["api_url"] = self._http_api_url(api_id, api_config)
+
+        if results["applied"]:
+            # The function changed, so its record no longer describes it
+            key = self._state_key(function_name)
+            self.state.forget(key, "function")
+            self.state.save()
+
+        logger.info(f"✓ Applied {results['applied']} change(s) to {function_name}")
+        return results
+
     def _ensure_efs_access_point(
         self, file_system_id: str, access_point_arn: Optional[str] = None
     ) -> str:
@@ -323,28 +1049,24 @@ class LambdaDeployer:
             # If ARN provided, just use it
             if access_point_arn:
                 return access_point_arn
+            if file_system_id in self._efs_access_points:
+                return self._efs_access_points[file_system_id]
 
             app_name = self.config.get("app", {}).get("name", "jvagent")
+            state_key = self._state_key()
+            state_config = {"file_system_id": file_system_id, "app": app_name}
 
-            # Look for existing access points
-            try:
-                paginator = self.efs_client.get_paginator("describe_access_points")
-                for page in paginator.paginate(FileSystemId=file_system_id):
-                    for ap in page.get("AccessPoints", []):
-                        # Check tags for app name
-                        tags = {t["Key"]: t["Value"] for t in ap.get("Tags", [])}
-                        if tags.get("JvAgentApp") == app_name:
-                            arn = str(ap["AccessPointArn"])
-                            logger.info(f"Found existing EFS access point for {app_name}: {arn}")
-                            return arn
-            except ClientError as e:
-                if e.response["Error"]["Code"] == "FileSystemNotFound":
-                    logger.warning(
-                        f"File system {file_system_id} reported as not found during access point search. "
-                        "Attempting to create access point anyway..."
-                    )
-                else:
-                    raise
+            record = self.state.get(state_key, "efs_access_point", state_config)
+            if record:
+                logger.info(f"Using recorded EFS access point: {record['arn']}")
+                self._efs_access_points[file_system_id] = record["arn"]
+                return str(record["arn"])
+
+            existing = self._find_efs_access_point(file_system_id)
+            if existing:
+                self._efs_access_points[file_system_id] = existing
+                self.state.put(state_key, "efs_access_point", {"arn": existing}, state_config)
+                return existing
 
             # None found, create one
             logger.info(f"Creating new EFS access point for {app_name} on {file_system_id}...")
@@ -375,32 +1097,72 @@ class LambdaDeployer:
             )
             arn = str(response["AccessPointArn"])
             access_point_id = response["AccessPointId"]
+            self._efs_access_points[file_system_id] = arn
+            self.state.put(state_key, "efs_access_point", {"arn": arn}, state_config)
             logger.info(f"✓ Created EFS access point: {arn}")
 
             # Wait for access point to be available
             logger.info("Waiting for access point to become available...")
-            max_retries = 30
-            for _ in range(max_retries):
+
+            def available() -> bool:
                 try:
                     desc = self.efs_client.describe_access_points(AccessPointId=access_point_id)
                     state = desc["AccessPoints"][0]["LifeCycleState"]
-                    if state == "available":
-                        logger.info("✓ Access point is available")
-                        return arn
-                    logger.debug(f"Access point state: {state}, waiting...")
-                except Exception as e:
+                    logger.debug(f"Access point state: {state}")
+                    return bool(state == "available")
+                except ClientError as e:
                     logger.warning(f"Error checking access point state: {e}")
+                    return False
 
-                time.sleep(2)
-
-            logger.warning(
-                "Timed out waiting for access point to become available. Proceeding anyway..."
-            )
+            try:
+                wait_until(
+                    available,
+                    "EFS access point to become available",
+                    timeout=ACCESS_POINT_TIMEOUT,
+                    stats=self.waits,
+                )
+                logger.info("✓ Access point is available")
+            except WaitTimeoutError:
+                logger.warning(
+                    "Timed out waiting for access point to become available. Proceeding anyway..."
+                )
             return arn
 
         except Exception as e:
             raise LambdaDeployerError(f"Failed to ensure EFS access point: {e}") from e
 
+    def _find_efs_access_point(self, file_system_id: str) -> Optional[str]:
+        """Look up the access point jvdeploy created for this app.
+
+        Args:
+            file_system_id: EFS File System ID
+
+        Returns:
+            Access Point ARN, or None if there is none yet
+        """
+        app_name = self.config.get("app", {}).get("name", "jvagent")
+
+        try:
+            paginator = self.efs_client.get_paginator("describe_access_points")
+            for page in paginator.paginate(FileSystemId=file_system_id):
+                for ap in page.get("AccessPoints", []):
+                    # Check tags for app name
+                    tags = {t["Key"]: t["Value"] for t in ap.get("Tags", [])}
+                    if tags.get("JvAgentApp") == app_name:
+                        arn = str(ap["AccessPointArn"])
+                        logger.info(f"Found existing EFS access point for {app_name}: {arn}")
+                        return arn
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "FileSystemNotFound":
+                logger.warning(
+                    f"File system {file_system_id} reported as not found during access point search. "
+                    "Attempting to create access point anyway..."
+                )
+            else:
+                raise
+
+        return None
+
     def _ensure_ecr_repository(self, repository_name: str) -> Dict[str, Any]:
         """Ensure ECR repository exists, create if missing.
 
@@ -414,10 +1176,17 @@ class LambdaDeployer:
             logger.info(f"[DRY RUN] Would ensure ECR repository: {repository_name}")
             return {"repositoryName": repository_name, "repositoryUri": "dry-run-uri"}
 
+        state_key = self._state_key()
+        record = self.state.get(state_key, "ecr_repository", repository_name)
+        if record:
+            logger.info(f"ECR repository '{repository_name}' recorded in deployment state")
+            return record
+
         try:
             response = self.ecr_client.describe_repositories(repositoryNames=[repository_name])
             repository = response["repositories"][0]
             logger.info(f"ECR repository '{repository_name}' already exists")
+            self._record_ecr_repository(state_key, repository)
             return dict(repository)
 
         except self.ecr_client.exceptions.RepositoryNotFoundException:
@@ -436,8 +1205,88 @@ class LambdaDeployer:
             )
             repository = response["repository"]
             logger.info(f"✓ Created ECR repository: {repository['repositoryUri']}")
+            self._record_ecr_repository(state_key, repository)
             return dict(repository)
 
+    def _record_ecr_repository(self, state_key: str, repository: Dict[str, Any]) -> None:
+        """Record an ECR repository in the deployment state."""
+        fields = ("repositoryName", "repositoryUri", "repositoryArn")
+        self.state.put(
+            state_key,
+            "ecr_repository",
+            {field: repository[field] for field in fields if field in repository},
+            repository["repositoryName"],
+        )
+
+    def _ensure_pull_through_cache_rule(self, prefix: str) -> str:
+        """Ensure an ECR pull-through cache rule for public.ecr.aws exists.
+
+        Args:
+            prefix: ECR repository prefix of the rule (e.g., 'ecr-public')
+
+        Returns:
+            Pull-through cache path (e.g.,
+            '123456789012.dkr.ecr.us-east-1.amazonaws.com/ecr-public')
+        """
+        from jvdeploy.base_image import PUBLIC_ECR_REGISTRY
+
+        cache_uri = f"{self.account_id}.dkr.ecr.{self.region}.amazonaws.com/{prefix}"
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would ensure ECR pull-through cache rule: {prefix}")
+            return cache_uri
+
+        try:
+            response = self.ecr_client.describe_pull_through_cache_rules(
+                ecrRepositoryPrefixes=[prefix]
+            )
+            rule = response["pullThroughCacheRules"][0]
+            if rule.get("upstreamRegistryUrl") != PUBLIC_ECR_REGISTRY:
+                raise LambdaDeployerError(
+                    f"ECR pull-through cache prefix '{prefix}' already mirrors "
+                    f"{rule.get('upstreamRegistryUrl')}, not {PUBLIC_ECR_REGISTRY}"
+                )
+            logger.info(f"ECR pull-through cache rule '{prefix}' already exists")
+        except self.ecr_client.exceptions.PullThroughCacheRuleNotFoundException:
+            logger.info(f"Creating ECR pull-through cache rule: {prefix} -> {PUBLIC_ECR_REGISTRY}")
+            self.ecr_client.create_pull_through_cache_rule(
+                ecrRepositoryPrefix=prefix, upstreamRegistryUrl=PUBLIC_ECR_REGISTRY
+            )
+            logger.info(f"✓ Created ECR pull-through cache rule: {cache_uri}")
+
+        return cache_uri
+
+    def _use_pull_through_cache(
+        self, app_root: Path, cache_uri: str, build_dir: Path
+    ) -> Optional[str]:
+        """Write a copy of the app's Dockerfile that pulls its base image through the cache.
+
+        The app's own Dockerfile is left untouched: the cache path is
+        specific to an account and region.
+
+        Args:
+            app_root: App root containing the Dockerfile
+            cache_uri: Pull-through cache path
+            build_dir: Directory for the copy (outside the build context)
+
+        Returns:
+            Path of the copy to build from, or None to build the app's
+            Dockerfile as is
+        """
+        from jvdeploy.base_image import use_pull_through_cache
+
+        dockerfile_path = app_root / "Dockerfile"
+        if not dockerfile_path.exists():
+            return None
+
+        content = dockerfile_path.read_text()
+        updated = use_pull_through_cache(content, cache_uri)
+        if updated == content:
+            return None
+        build_dockerfile = build_dir / "Dockerfile"
+        build_dockerfile.write_text(updated)
+        logger.info(f"✓ Pulling the Dockerfile base image through {cache_uri}")
+        return str(build_dockerfile)
+
     def _ensure_iam_role(self, role_name: str, policies: list) -> str:
         """Ensure IAM role exists with required policies.
 
@@ -452,6 +1301,13 @@ class LambdaDeployer:
             logger.info(f"[DRY RUN] Would ensure IAM role: {role_name}")
             return f"arn:aws:iam::123456789012:role/{role_name}"
 
+        state_key = self._state_key()
+        state_config = {"role_name": role_name, "policies": sorted(policies)}
+        record = self.state.get(state_key, "iam_role", state_config)
+        if record:
+            logger.info(f"IAM role '{role_name}' recorded in deployment state")
+            return str(record["arn"])
+
         try:
             # Check if role exists
             response = self.iam_client.get_role(RoleName=role_name)
@@ -459,13 +1315,17 @@ class LambdaDeployer:
             logger.info(f"IAM role '{role_name}' already exists")
 
             # Ensure policies are attached
+            attached = self._attached_role_policies(role_name)
             for policy_arn in policies:
+                if policy_arn in attached:
+                    continue
                 try:
                     self.iam_client.attach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
-                    logger.debug(f"Attached policy {policy_arn} to role {role_name}")
+                    logger.info(f"✓ Attached policy: {policy_arn}")
                 except Exception as e:
                     logger.debug(f"Policy {policy_arn} may already be attached: {e}")
 
+            self.state.put(state_key, "iam_role", {"arn": role_arn}, state_config)
             return role_arn
 
         except self.iam_client.exceptions.NoSuchEntityException:
@@ -497,12 +1357,27 @@ class LambdaDeployer:
                 self.iam_client.attach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
                 logger.info(f"✓ Attached policy: {policy_arn}")
 
-            # Wait for role to propagate
-            logger.info("Waiting for IAM role to propagate...")
-            time.sleep(10)
-
+            # The role takes a few seconds to propagate; calls that pass it to
+            # Lambda retry until it can be assumed (see _call_with_role)
+            self.state.put(state_key, "iam_role", {"arn": role_arn}, state_config)
             return role_arn
 
+    def _attached_role_policies(self, role_name: str) -> List[str]:
+        """List the managed policy ARNs attached to an IAM role.
+
+        Args:
+            role_name: Name of the IAM role
+
+        Returns:
+            Policy ARNs
+        """
+        paginator = self.iam_client.get_paginator("list_attached_role_policies")
+        return [
+            policy["PolicyArn"]
+            for page in paginator.paginate(RoleName=role_name)
+            for policy in page.get("AttachedPolicies", [])
+        ]
+
     def _get_efs_vpc_config(self, file_system_id: str) -> Dict[str, Any]:
         """Auto-detect VPC configuration from EFS file system.
 
@@ -512,6 +1387,16 @@ class LambdaDeployer:
         Returns:
             VPC configuration dictionary with SubnetIds and SecurityGroupIds
         """
+        if file_system_id in self._efs_vpc_configs:
+            return self._efs_vpc_configs[file_system_id]
+
+        state_key = self._state_key()
+        record = self.state.get(state_key, "efs_vpc_config", file_system_id)
+        if record:
+            logger.info(f"Using recorded VPC configuration of EFS {file_system_id}")
+            self._efs_vpc_configs[file_system_id] = record
+            return record
+
         try:
             logger.info(f"Auto-detecting VPC configuration from EFS {file_system_id}...")
 
@@ -541,13 +1426,19 @@ class LambdaDeployer:
             logger.info(
                 f"✓ Auto-detected VPC config: {len(subnet_ids)} subnets, {len(security_group_ids)} SGs"
             )
+            self._efs_vpc_configs[file_system_id] = vpc_config
+            self.state.put(state_key, "efs_vpc_config", vpc_config, file_system_id)
             return vpc_config
 
         except Exception as e:
             raise LambdaDeployerError(f"Failed to auto-detect VPC config from EFS: {e}") from e
 
     def _build_lambda_config(
-        self, image_uri: str, role_arn: str, function_config: Dict[str, Any]
+        self,
+        image_uri: str,
+        role_arn: str,
+        function_config: Dict[str, Any],
+        access_point_arn: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Build Lambda function configuration dictionary.
 
@@ -555,6 +1446,8 @@ class LambdaDeployer:
             image_uri: Full ECR image URI
             role_arn: IAM role ARN
             function_config: Function configuration
+            access_point_arn: EFS Access Point to mount (default: ensured,
+                i.e. looked up or created)
 
         Returns:
             Configuration dictionary for create/update_function
@@ -569,6 +1462,7 @@ class LambdaDeployer:
             "Timeout": function_config.get("timeout", 300),
             "MemorySize": function_config.get("memory", 1024),
             "EphemeralStorage": {"Size": function_config.get("ephemeral_storage", 512)},
+            "Architectures": [self._function_architecture()],
         }
 
         # Add description if provided
@@ -580,117 +1474,653 @@ class LambdaDeployer:
         if env_vars:
             config["Environment"] = {"Variables": env_vars}
 
-        # Add VPC configuration if enabled
-        vpc_config = self.config.get("vpc", {})
-        if vpc_config.get("enabled", False):
-            config["VpcConfig"] = {
-                "SubnetIds": vpc_config.get("subnet_ids", []),
-                "SecurityGroupIds": vpc_config.get("security_group_ids", []),
-            }
+        # Add VPC configuration if enabled
+        vpc_config = self.config.get("vpc", {})
+        if vpc_config.get("enabled", False):
+            config["VpcConfig"] = {
+                "SubnetIds": vpc_config.get("subnet_ids", []),
+                "SecurityGroupIds": vpc_config.get("security_group_ids", []),
+            }
+
+        # Add EFS configuration if enabled
+        efs_config = self.config.get("efs", {})
+        if efs_config.get("enabled", False):
+            file_system_id = efs_config.get("file_system_id")
+            if not file_system_id:
+                raise LambdaDeployerError("efs.file_system_id is required when EFS is enabled")
+
+            if not access_point_arn:
+                access_point_arn = self._ensure_efs_access_point(
+                    file_system_id, efs_config.get("access_point_arn")
+                )
+
+            config["FileSystemConfigs"] = [
+                {
+                    "Arn": access_point_arn,
+                    "LocalMountPath": efs_config.get("mount_path", "/mnt/efs"),
+                }
+            ]
+
+            # EFS requires VPC, so if not configured, try to auto-detect from EFS
+            if "VpcConfig" not in config:
+                logger.info("EFS enabled but VPC not configured. Auto-detecting from EFS...")
+                config["VpcConfig"] = self._get_efs_vpc_config(file_system_id)
+
+        return config
+
+    def _get_image_digest(self, image_uri: str) -> Optional[str]:
+        """Look up the ECR manifest digest for an image URI.
+
+        Args:
+            image_uri: Full ECR image URI
+
+        Returns:
+            Digest string (e.g., 'sha256:...'), or None if it cannot be resolved
+        """
+        if "@" in image_uri:
+            return image_uri.split("@", 1)[1]
+
+        _, repository, tag = parse_image_uri(image_uri)
+        try:
+            response = self.ecr_client.describe_images(
+                repositoryName=repository, imageIds=[{"imageTag": tag}]
+            )
+            details = response.get("imageDetails", [])
+            return str(details[0]["imageDigest"]) if details else None
+        except Exception as e:
+            logger.debug(f"Could not resolve image digest for {image_uri}: {e}")
+            return None
+
+    def _deploy_lambda_function(
+        self, image_uri: str, role_arn: str, function_config: Dict[str, Any]
+    ) -> str:
+        """Create or update Lambda function.
+
+        Args:
+            image_uri: Full ECR image URI
+            role_arn: IAM role ARN
+            function_config: Function configuration
+
+        Returns:
+            Function ARN
+        """
+        function_name = function_config.get("name")
+        if not function_name:
+            raise LambdaDeployerError("function.name is required")
+
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would deploy Lambda function: {function_name}")
+            return f"arn:aws:lambda:{self.region}:123456789012:function:{function_name}"
+
+        # Build function configuration
+        config = self._build_lambda_config(image_uri, role_arn, function_config)
+        digest = self._get_image_digest(image_uri)
+
+        # Deployed by an earlier run from the same image and configuration
+        state_key = self._state_key(function_name)
+        record = self.state.get(state_key, "function", config)
+        if digest and record and record.get("digest") == digest:
+            logger.info(f"Function '{function_name}' unchanged since the last deploy, skipping")
+            return str(record["arn"])
+
+        try:
+            # Try to update existing function
+            logger.info(f"Checking if function '{function_name}' exists...")
+            current = self.lambda_client.get_function(FunctionName=function_name)
+
+            # Function exists, update only what differs: every update
+            # replaces the warm execution environments of the function
+            arch_change = diff_architectures(config, current.get("Configuration", {}))
+            if not arch_change and code_up_to_date(current, image_uri, digest):
+                logger.info(f"Function code already at {digest}, skipping code update")
+            else:
+                self._check_image_architecture(image_uri, config["Architectures"])
+                params = {"FunctionName": function_name, "ImageUri": image_uri}
+                if arch_change:
+                    change = arch_change["Architectures"]
+                    logger.info(
+                        f"Switching {function_name} from {change['old'][0]} to {change['new'][0]}"
+                    )
+                    params["Architectures"] = change["new"]
+                logger.info(f"Updating Lambda function code: {function_name}")
+                self.lambda_client.update_function_code(**params)
+
+                # Wait for update to complete
+                logger.info("Waiting for function code update to complete...")
+                self._wait_for_function(function_name, "function code update")
+
+            changes = diff_function_config(config, current.get("Configuration", {}))
+            if changes:
+                logger.info(f"Updating function configuration: {', '.join(changes)}")
+                params = {field: change["new"] for field, change in changes.items()}
+                self._call_with_role(
+                    self.lambda_client.update_function_configuration,
+                    dict(params, FunctionName=function_name),
+                )
+
+                # Wait for configuration update
+                logger.info("Waiting for function configuration update to complete...")
+                self._wait_for_function(function_name, "function configuration update")
+            else:
+                logger.info("Function configuration unchanged, skipping configuration update")
+
+            function_arn = str(current["Configuration"]["FunctionArn"])
+            logger.info(f"✓ Updated Lambda function: {function_arn}")
+            if digest:
+                self.state.put(
+                    state_key, "function", {"arn": function_arn, "digest": digest}, config
+                )
+
+            return function_arn
+
+        except self.lambda_client.exceptions.ResourceNotFoundException:
+            # Function doesn't exist, create it
+            self._check_image_architecture(image_uri, config["Architectures"])
+            logger.info(f"Creating Lambda function: {function_name}")
+
+            response = self._call_with_role(self.lambda_client.create_function, config)
+            function_arn = str(response["FunctionArn"])
+
+            # Wait for function to be active
+            logger.info("Waiting for function to become active...")
+            self._wait_for_function(function_name, "function to become active")
+
+            logger.info(f"✓ Created Lambda function: {function_arn}")
+            if digest:
+                self.state.put(
+                    state_key, "function", {"arn": function_arn, "digest": digest}, config
+                )
+            return function_arn
+
+    def _call_with_role(self, method: Any, params: Dict[str, Any]) -> Any:
+        """Call a Lambda API that passes the execution role, retrying while
+        the role has not propagated to Lambda yet.
+
+        Args:
+            method: Lambda client method (e.g. create_function)
+            params: Keyword arguments, including 'Role' if it changes
+
+        Returns:
+            The method's response
+        """
+        if "Role" not in params:
+            return method(**params)
+        return retry(
+            lambda: method(**params),
+            _role_not_ready,
+            "IAM role to be assumable by Lambda",
+            timeout=ROLE_PROPAGATION_TIMEOUT,
+            initial_delay=1.0,
+            stats=self.waits,
+        )
+
+    def _wait_for_function(self, function_name: str, description: str) -> None:
+        """Wait until a function is active and no update is in progress.
+
+        Args:
+            function_name: Lambda function name
+            description: What is waited for (for logs and wait stats)
+
+        Raises:
+            LambdaDeployerError: If the function or its last update failed
+        """
+
+        def ready() -> bool:
+            config = self.lambda_client.get_function_configuration(FunctionName=function_name)
+            state = config.get("State")
+            update_status = config.get("LastUpdateStatus")
+            if state == "Failed" or update_status == "Failed":
+                reason = (
+                    config.get("LastUpdateStatusReason")
+                    or config.get("StateReason")
+                    or "no reason given"
+                )
+                raise LambdaDeployerError(f"Function '{function_name}' failed: {reason}")
+            return state == "Active" and update_status != "InProgress"
+
+        try:
+            wait_until(ready, description, timeout=FUNCTION_READY_TIMEOUT, stats=self.waits)
+        except WaitTimeoutError as e:
+            raise LambdaDeployerError(str(e)) from e
+
+    def _alias_name(self) -> Optional[str]:
+        """Get the alias traffic is routed through.
+
+        Provisioned concurrency can only be configured on a version or
+        alias, so configuring it enables the alias.
+
+        Returns:
+            Alias name, or None to invoke $LATEST
+        """
+        alias_config = self.config.get("alias") or {}
+        settings = self._provisioned_concurrency()
+        if alias_config.get("enabled", False) or settings["count"] or settings["autoscaling"]:
+            return str(alias_config.get("name") or DEFAULT_ALIAS)
+        return None
+
+    def _provisioned_concurrency(self) -> Dict[str, Any]:
+        """Read lambda.provisioned_concurrency (a count, or a mapping).
+
+        Returns:
+            {'count': initial executions, 'autoscaling': settings or None}
+        """
+        value = self.config.get("provisioned_concurrency") or {}
+        if not isinstance(value, dict):
+            value = {"count": value}
+        autoscaling = value.get("autoscaling") or {}
+        if not autoscaling.get("enabled", False):
+            return {"count": int(value.get("count") or 0), "autoscaling": None}
+        autoscaling = {
+            "min": int(autoscaling.get("min", 1)),
+            "max": int(autoscaling.get("max", autoscaling.get("min", 1))),
+            "target_utilization": autoscaling.get("target_utilization", DEFAULT_TARGET_UTILIZATION),
+            "schedules": list(autoscaling.get("schedules") or []),
+        }
+        if autoscaling["min"] > autoscaling["max"]:
+            raise LambdaDeployerError("provisioned_concurrency.autoscaling.min must not exceed max")
+        count = int(value.get("count") or 0) or autoscaling["min"]
+        return {"count": count, "autoscaling": autoscaling}
+
+    def _function_target(self, function_name: str) -> str:
+        """Get the ARN the Function URL and API Gateway invoke (the alias, if any)."""
+        arn = f"arn:aws:lambda:{self.region}:{self.account_id}:function:{function_name}"
+        alias_name = self._alias_name()
+        return f"{arn}:{alias_name}" if alias_name else arn
+
+    def _publish_alias(
+        self, function_name: str, alias_name: str, prewarm: int = 0
+    ) -> Dict[str, Any]:
+        """Publish the function's $LATEST as a version and point an alias at it.
+
+        Lambda does not publish a new version if nothing changed since the
+        last one, so an unchanged deployment leaves the alias where it is.
+
+        Args:
+            function_name: Lambda function name
+            alias_name: Alias to move
+            prewarm: Execution environments to initialize on the new version
+                before the alias is moved to it
+
+        Returns:
+            Dictionary with 'version' (published version number) and
+            'prewarm' (see prewarm())
+        """
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would publish {function_name} and update alias {alias_name}")
+            return {"version": "1", "prewarm": self.prewarm(prewarm)}
+
+        version = str(self.lambda_client.publish_version(FunctionName=function_name)["Version"])
+        warmed = self.prewarm(prewarm, function_name, qualifier=version)
+        try:
+            current = self.lambda_client.get_alias(FunctionName=function_name, Name=alias_name)
+        except self.lambda_client.exceptions.ResourceNotFoundException:
+            current = None
+
+        if current is None:
+            self.lambda_client.create_alias(
+                FunctionName=function_name, Name=alias_name, FunctionVersion=version
+            )
+            logger.info(f"✓ Created alias {alias_name} -> version {version}")
+        elif current.get("FunctionVersion") != version:
+            self.lambda_client.update_alias(
+                FunctionName=function_name, Name=alias_name, FunctionVersion=version
+            )
+            logger.info(
+                f"✓ Moved alias {alias_name} from version {current.get('FunctionVersion')}"
+                f" to {version}"
+            )
+        else:
+            logger.info(f"Alias {alias_name} already at version {version}")
+        return {"version": version, "prewarm": warmed}
+
+    def prewarm(
+        self,
+        count: int,
+        function_name: Optional[str] = None,
+        qualifier: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Initialize execution environments by sending concurrent requests.
+
+        Args:
+            count: Number of requests (and environments to initialize)
+            function_name: Function name (uses config if not provided)
+            qualifier: Version or alias to invoke (default: $LATEST)
+            url: Function URL or API URL to request instead of invoking
+
+        Returns:
+            Per request: 'seconds', 'init_ms', 'status' and 'error' (see
+            jvdeploy.aws.prewarm)
+        """
+        if count <= 0:
+            return []
+        function_name = function_name or self.config.get("function", {}).get("name")
+        target = url or f"{function_name}:{qualifier or '$LATEST'}"
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would pre-warm {count} environment(s) of {target}")
+            return []
+
+        workers = min(count, MAX_PREWARM_CONCURRENCY)
+        if url:
+            timeout = self.config.get("function", {}).get("timeout", 300) + 30
+            request = http_request(url, timeout=timeout)
+        else:
+            request = invoke_request(self._invoke_client(workers), function_name, qualifier)
+
+        logger.info(f"Pre-warming {count} execution environment(s) of {target}...")
+        results = warm_up(request, count, max_concurrency=workers)
+        logger.info(f"✓ Pre-warmed {target}:\n{format_prewarm(results)}")
+        return results
 
-        # Add EFS configuration if enabled
-        efs_config = self.config.get("efs", {})
-        if efs_config.get("enabled", False):
-            file_system_id = efs_config.get("file_system_id")
-            if not file_system_id:
-                raise LambdaDeployerError("efs.file_system_id is required when EFS is enabled")
+    def _configure_provisioned_concurrency(self, function_name: str, alias_name: str) -> None:
+        """Apply lambda.provisioned_concurrency to an alias, with its autoscaling.
+
+        Args:
+            function_name: Lambda function name
+            alias_name: Alias the concurrency is provisioned on
+        """
+        settings = self._provisioned_concurrency()
+        count, autoscaling = settings["count"], settings["autoscaling"]
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would provision {count} execution(s) on {alias_name}")
+            return
 
-            access_point_arn = self._ensure_efs_access_point(
-                file_system_id, efs_config.get("access_point_arn")
+        try:
+            current = self.lambda_client.get_provisioned_concurrency_config(
+                FunctionName=function_name, Qualifier=alias_name
             )
+        except self.lambda_client.exceptions.ProvisionedConcurrencyConfigNotFoundException:
+            current = None
 
-            config["FileSystemConfigs"] = [
-                {
-                    "Arn": access_point_arn,
-                    "LocalMountPath": efs_config.get("mount_path", "/mnt/efs"),
-                }
-            ]
+        if not count:
+            if current is not None:
+                self.lambda_client.delete_provisioned_concurrency_config(
+                    FunctionName=function_name, Qualifier=alias_name
+                )
+                logger.info(f"✓ Removed provisioned concurrency from {alias_name}")
+                self._configure_autoscaling(function_name, alias_name, None)
+            return
 
-            # EFS requires VPC, so if not configured, try to auto-detect from EFS
-            if "VpcConfig" not in config:
-                logger.info("EFS enabled but VPC not configured. Auto-detecting from EFS...")
-                config["VpcConfig"] = self._get_efs_vpc_config(file_system_id)
+        requested = (current or {}).get("RequestedProvisionedConcurrentExecutions")
+        # With autoscaling, the count only seeds the config; scaling owns it after that
+        if current is None or (requested != count and not autoscaling):
+            self.lambda_client.put_provisioned_concurrency_config(
+                FunctionName=function_name,
+                Qualifier=alias_name,
+                ProvisionedConcurrentExecutions=count,
+            )
+            logger.info(f"✓ Provisioned {count} execution environment(s) on {alias_name}")
 
-        return config
+        self._configure_autoscaling(function_name, alias_name, autoscaling)
+        self._wait_for_provisioned_concurrency(function_name, alias_name)
 
-    def _deploy_lambda_function(
-        self, image_uri: str, role_arn: str, function_config: Dict[str, Any]
-    ) -> str:
-        """Create or update Lambda function.
+    def _wait_for_provisioned_concurrency(self, function_name: str, alias_name: str) -> None:
+        """Wait until an alias's provisioned concurrency is allocated.
+
+        Allocation continues in the background, so running out of time
+        is only a warning.
 
         Args:
-            image_uri: Full ECR image URI
-            role_arn: IAM role ARN
-            function_config: Function configuration
+            function_name: Lambda function name
+            alias_name: Alias the concurrency is provisioned on
 
-        Returns:
-            Function ARN
+        Raises:
+            LambdaDeployerError: If the allocation failed
         """
-        function_name = function_config.get("name")
-        if not function_name:
-            raise LambdaDeployerError("function.name is required")
-
-        if self.dry_run:
-            logger.info(f"[DRY RUN] Would deploy Lambda function: {function_name}")
-            return f"arn:aws:lambda:{self.region}:123456789012:function:{function_name}"
 
-        # Build function configuration
-        config = self._build_lambda_config(image_uri, role_arn, function_config)
+        def ready() -> bool:
+            config = self.lambda_client.get_provisioned_concurrency_config(
+                FunctionName=function_name, Qualifier=alias_name
+            )
+            if config.get("Status") == "FAILED":
+                reason = config.get("StatusReason") or "no reason given"
+                raise LambdaDeployerError(
+                    f"Provisioned concurrency on {function_name}:{alias_name} failed: {reason}"
+                )
+            return config.get("Status") == "READY"
 
         try:
-            # Try to update existing function
-            logger.info(f"Checking if function '{function_name}' exists...")
-            self.lambda_client.get_function(FunctionName=function_name)
+            wait_until(
+                ready,
+                "provisioned concurrency",
+                timeout=PROVISIONED_CONCURRENCY_TIMEOUT,
+                initial_delay=5.0,
+                stats=self.waits,
+            )
+            logger.info(f"✓ Provisioned concurrency on {alias_name} is ready")
+        except WaitTimeoutError:
+            logger.warning(
+                f"Provisioned concurrency on {alias_name} is still being allocated; "
+                "it keeps warming up in the background"
+            )
 
-            # Function exists, update it
-            logger.info(f"Updating Lambda function: {function_name}")
+    def _configure_autoscaling(
+        self, function_name: str, alias_name: str, autoscaling: Optional[Dict[str, Any]]
+    ) -> None:
+        """Register (or remove) Application Auto Scaling of an alias's provisioned concurrency.
 
-            # Update function code
-            self.lambda_client.update_function_code(FunctionName=function_name, ImageUri=image_uri)
+        Target tracking keeps LambdaProvisionedConcurrencyUtilization at the
+        target; scheduled actions change the capacity range at set times.
+        Scheduled actions no longer configured are deleted.
 
-            # Wait for update to complete
-            logger.info("Waiting for function code update to complete...")
-            waiter = self.lambda_client.get_waiter("function_updated")
-            waiter.wait(FunctionName=function_name)
+        Args:
+            function_name: Lambda function name
+            alias_name: Alias the concurrency is provisioned on
+            autoscaling: Settings from _provisioned_concurrency, or None to
+                deregister the scalable target
+        """
+        client = self.autoscaling_client
+        target = {
+            "ServiceNamespace": "lambda",
+            "ResourceId": f"function:{function_name}:{alias_name}",
+            "ScalableDimension": PROVISIONED_CONCURRENCY_DIMENSION,
+        }
 
-            # Update function configuration
-            update_config = {
-                k: v for k, v in config.items() if k not in ["FunctionName", "Code", "PackageType"]
-            }
-            self.lambda_client.update_function_configuration(
-                FunctionName=function_name, **update_config
+        if autoscaling is None:
+            registered = client.describe_scalable_targets(
+                ServiceNamespace="lambda",
+                ResourceIds=[target["ResourceId"]],
+                ScalableDimension=PROVISIONED_CONCURRENCY_DIMENSION,
+            ).get("ScalableTargets", [])
+            if registered:
+                # Also removes the target's scaling policies and scheduled actions
+                client.deregister_scalable_target(**target)
+                logger.info(f"✓ Removed autoscaling of {alias_name}")
+            return
+
+        client.register_scalable_target(
+            **target, MinCapacity=autoscaling["min"], MaxCapacity=autoscaling["max"]
+        )
+
+        policy_name = f"{function_name}-{alias_name}-utilization"
+        if autoscaling["target_utilization"]:
+            client.put_scaling_policy(
+                PolicyName=policy_name,
+                PolicyType="TargetTrackingScaling",
+                TargetTrackingScalingPolicyConfiguration={
+                    "TargetValue": float(autoscaling["target_utilization"]),
+                    "PredefinedMetricSpecification": {
+                        "PredefinedMetricType": "LambdaProvisionedConcurrencyUtilization"
+                    },
+                },
+                **target,
             )
+        else:
+            policies = client.describe_scaling_policies(PolicyNames=[policy_name], **target).get(
+                "ScalingPolicies", []
+            )
+            if policies:
+                client.delete_scaling_policy(PolicyName=policy_name, **target)
+
+        names = set()
+        for schedule in autoscaling["schedules"]:
+            names.add(schedule["name"])
+            params: Dict[str, Any] = {
+                "ScheduledActionName": schedule["name"],
+                "Schedule": schedule["schedule"],
+                "ScalableTargetAction": {
+                    "MinCapacity": int(schedule.get("min", autoscaling["min"])),
+                    "MaxCapacity": int(schedule.get("max", autoscaling["max"])),
+                },
+            }
+            if schedule.get("timezone"):
+                params["Timezone"] = schedule["timezone"]
+            client.put_scheduled_action(**params, **target)
+
+        scheduled = client.describe_scheduled_actions(**target).get("ScheduledActions", [])
+        for action in scheduled:
+            if action["ScheduledActionName"] not in names:
+                client.delete_scheduled_action(
+                    ScheduledActionName=action["ScheduledActionName"], **target
+                )
+                logger.info(f"Deleted scheduled action {action['ScheduledActionName']}")
 
-            # Wait for configuration update
-            logger.info("Waiting for function configuration update to complete...")
-            waiter.wait(FunctionName=function_name)
+        logger.info(
+            f"✓ Autoscaling {alias_name} between {autoscaling['min']} and "
+            f"{autoscaling['max']} provisioned execution(s)"
+        )
 
-            response = self.lambda_client.get_function(FunctionName=function_name)
-            function_arn = str(response["Configuration"]["FunctionArn"])
-            logger.info(f"✓ Updated Lambda function: {function_arn}")
+    def _warmer_rule_names(self, function_name: str, count: int) -> List[str]:
+        """Get the names of the keep-warm rules for a number of targets."""
+        rules = -(-count // WARMER_TARGETS_PER_RULE)
+        base = f"{function_name}{WARMER_SUFFIX}"
+        return [base if i == 0 else f"{base}-{i + 1}" for i in range(rules)]
 
-            return function_arn
+    def _ensure_warmer(self, function_name: str) -> List[str]:
+        """Create or update the EventBridge rules of lambda.warmer.
 
-        except self.lambda_client.exceptions.ResourceNotFoundException:
-            # Function doesn't exist, create it
-            logger.info(f"Creating Lambda function: {function_name}")
+        Every rate interval, each of 'concurrency' targets asynchronously
+        invokes the function (its alias, if any) with the warmup event, so
+        that many execution environments stay initialized. Handlers can
+        recognize the event by its 'source' and return at once.
 
-            response = self.lambda_client.create_function(**config)
-            function_arn = str(response["FunctionArn"])
+        Args:
+            function_name: Lambda function name
 
-            # Wait for function to be active
-            logger.info("Waiting for function to become active...")
-            waiter = self.lambda_client.get_waiter("function_active")
-            waiter.wait(FunctionName=function_name)
+        Returns:
+            Names of the rules; when the warmer is disabled, rules left by
+            an earlier deploy are removed and [] is returned
+        """
+        warmer_config = self.config.get("warmer") or {}
+        count = int(warmer_config.get("concurrency", 1) or 0)
+        if not warmer_config.get("enabled", False) or count < 1:
+            try:
+                self._remove_warmer(function_name)
+            except Exception as e:
+                logger.warning(f"Could not check for keep-warm rules to remove: {e}")
+            return []
 
-            logger.info(f"✓ Created Lambda function: {function_arn}")
-            return function_arn
+        schedule = _warmer_schedule(warmer_config.get("rate", "5m"))
+        rule_names = self._warmer_rule_names(function_name, count)
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would keep {count} environment(s) warm, {schedule}")
+            return rule_names
+
+        alias_name = self._alias_name()
+        target_arn = self._function_target(function_name)
+        for number, rule_name in enumerate(rule_names):
+            rule_arn = str(
+                self.events_client.put_rule(
+                    Name=rule_name,
+                    ScheduleExpression=schedule,
+                    State="ENABLED",
+                    Description=f"Keeps {function_name} warm (managed by jvdeploy)",
+                )["RuleArn"]
+            )
+
+            first = number * WARMER_TARGETS_PER_RULE
+            indexes = range(first, min(count, first + WARMER_TARGETS_PER_RULE))
+            targets = [
+                {
+                    "Id": f"warmup-{index + 1}",
+                    "Arn": target_arn,
+                    "Input": json.dumps(dict(WARMUP_EVENT, concurrency=count, index=index)),
+                    "RetryPolicy": WARMER_RETRY_POLICY,
+                }
+                for index in indexes
+            ]
+            response = self.events_client.put_targets(Rule=rule_name, Targets=targets)
+            if response.get("FailedEntryCount"):
+                failures = {e.get("ErrorMessage") for e in response.get("FailedEntries", [])}
+                raise LambdaDeployerError(
+                    f"Failed to add keep-warm targets to {rule_name}: {'; '.join(map(str, failures))}"
+                )
+            wanted = {target["Id"] for target in targets}
+            existing = self.events_client.list_targets_by_rule(Rule=rule_name).get("Targets", [])
+            stale = [target["Id"] for target in existing if target["Id"] not in wanted]
+            if stale:
+                self.events_client.remove_targets(Rule=rule_name, Ids=stale)
+
+            try:
+                self.lambda_client.add_permission(
+                    FunctionName=function_name,
+                    StatementId=rule_name,
+                    Action="lambda:InvokeFunction",
+                    Principal="events.amazonaws.com",
+                    SourceArn=rule_arn,
+                    **({"Qualifier": alias_name} if alias_name else {}),
+                )
+            except self.lambda_client.exceptions.ResourceConflictException:
+                logger.debug(f"Keep-warm permission for {rule_name} already exists")
+
+        self._remove_warmer(function_name, keep=rule_names)
+        logger.info(f"✓ Keeping {count} environment(s) of {function_name} warm, {schedule}")
+        return rule_names
+
+    def _remove_warmer(self, function_name: str, keep: Iterable[str] = ()) -> List[str]:
+        """Delete keep-warm rules of a function (with their targets and permissions).
+
+        Args:
+            function_name: Lambda function name
+            keep: Rules to leave in place
+
+        Returns:
+            Names of the deleted rules
+        """
+        base = f"{function_name}{WARMER_SUFFIX}"
+        pattern = re.compile(rf"^{re.escape(base)}(-\d+)?$")
+        keep = set(keep)
+        rule_names = []
+        paginator = self.events_client.get_paginator("list_rules")
+        for page in paginator.paginate(NamePrefix=base):
+            for rule in page.get("Rules", []):
+                if pattern.match(rule["Name"]) and rule["Name"] not in keep:
+                    rule_names.append(rule["Name"])
+
+        for rule_name in rule_names:
+            if self.dry_run:
+                logger.info(f"[DRY RUN] Would delete keep-warm rule {rule_name}")
+                continue
+            targets = self.events_client.list_targets_by_rule(Rule=rule_name).get("Targets", [])
+            if targets:
+                self.events_client.remove_targets(
+                    Rule=rule_name, Ids=[target["Id"] for target in targets]
+                )
+            self.events_client.delete_rule(Name=rule_name)
+            # The permission was added to the alias the targets invoked, if any
+            arn = targets[0]["Arn"].split(":") if targets else []
+            qualifier = arn[7] if len(arn) > 7 else None
+            try:
+                self.lambda_client.remove_permission(
+                    FunctionName=function_name,
+                    StatementId=rule_name,
+                    **({"Qualifier": qualifier} if qualifier else {}),
+                )
+            except self.lambda_client.exceptions.ResourceNotFoundException:
+                pass
+            logger.info(f"✓ Deleted keep-warm rule {rule_name}")
+        return rule_names
 
     def _ensure_sqlite_permissions(
         self, image_uri: str, role_arn: str, function_config: Dict[str, Any]
     ) -> None:
         """Ensure SQLite database permissions are correct on EFS.
 
+        Runs once per access point and database path: success is recorded
+        as a tag on the access point (and in the deployment state), and
+        later deploys skip the step. The permissions are fixed by a small
+        helper function that is kept between deploys.
+
         Args:
             image_uri: Full ECR image URI
             role_arn: IAM role ARN
@@ -705,7 +2135,8 @@ class LambdaDeployer:
             return
 
         # Check if EFS is enabled
-        if not self.config.get("efs", {}).get("enabled", False):
+        efs_config = self.config.get("efs", {})
+        if not efs_config.get("enabled", False):
             return
 
         logger.info(f"Ensuring write permissions for SQLite DB at {db_path}...")
@@ -714,70 +2145,106 @@ class LambdaDeployer:
             logger.info("[DRY RUN] Would run permission fix lambda")
             return
 
-        setup_function_name = f"{function_config.get('name')}-setup-{int(time.time())}"
+        function_name = function_config.get("name")
+        helper_name = f"{function_name}{SQLITE_INIT_SUFFIX}"
 
         try:
-            # Build config for setup function
-            setup_config = self._build_lambda_config(image_uri, role_arn, function_config)
-            setup_config["FunctionName"] = setup_function_name
-
-            # Override command to fix permissions and satisfy Lambda Adapter
-            # 1. Create directory/file and set permissions
-            # 2. Start a dummy web server on 8080 so Lambda Adapter thinks we are healthy
-            #    and the Invoke request succeeds.
-            cmd = (
-                f"mkdir -p $(dirname {db_path}) && "
-                f"touch {db_path} && "
-                f"chmod 666 {db_path} && "
-                f"chmod 777 $(dirname {db_path}) && "
-                "python3 -c 'import http.server, socketserver; "
-                'print("Starting dummy server..."); '
-                'server = socketserver.TCPServer(("0.0.0.0", 8080), http.server.SimpleHTTPRequestHandler); '
-                "server.serve_forever()'"
-            )
-
-            setup_config["ImageConfig"] = {
-                "EntryPoint": ["/bin/sh", "-c"],
-                "Command": [cmd],
-            }
-
-            # Create setup function
-            logger.info(f"Creating temporary setup function: {setup_function_name}")
-            self.lambda_client.create_function(**setup_config)
-
-            # Wait for active
-            waiter = self.lambda_client.get_waiter("function_active")
-            waiter.wait(FunctionName=setup_function_name)
-
-            # Invoke function
-            logger.info("Invoking setup function...")
+            # Mount the file system the way the app function does
+            app_config = self._build_lambda_config(image_uri, role_arn, function_config)
+            access_point_arn = app_config["FileSystemConfigs"][0]["Arn"]
+            access_point_id = access_point_arn.split("/")[-1]
+
+            state_key = self._state_key(function_name)
+            state_config = {"access_point": access_point_arn, "db_path": db_path}
+            if self.state.get(state_key, "sqlite_init", state_config):
+                logger.info("SQLite permissions already set up (deployment state), skipping")
+                return
+
+            tags = self.efs_client.describe_access_points(AccessPointId=access_point_id)[
+                "AccessPoints"
+            ][0].get("Tags", [])
+            if {"Key": SQLITE_INIT_TAG, "Value": db_path} in tags:
+                logger.info("SQLite permissions already set up (access point tag), skipping")
+                self.state.put(state_key, "sqlite_init", {"done": True}, state_config)
+                return
+
+            self._ensure_sqlite_helper(helper_name, role_arn, app_config)
+
+            logger.info(f"Invoking SQLite init function: {helper_name}")
             response = self.lambda_client.invoke(
-                FunctionName=setup_function_name,
+                FunctionName=helper_name,
                 InvocationType="RequestResponse",
                 LogType="Tail",
+                Payload=json.dumps({"db_path": db_path}).encode("utf-8"),
             )
 
             if response.get("FunctionError"):
                 logger.error(f"Setup function failed: {response.get('FunctionError')}")
                 # Try to get logs
-                import base64
-
                 if "LogResult" in response:
                     logs = base64.b64decode(response["LogResult"]).decode("utf-8")
                     logger.error(f"Logs:\n{logs}")
-            else:
-                logger.info("✓ SQLite permissions fixed successfully")
+                return
+
+            self.efs_client.tag_resource(
+                ResourceId=access_point_id, Tags=[{"Key": SQLITE_INIT_TAG, "Value": db_path}]
+            )
+            self.state.put(state_key, "sqlite_init", {"done": True}, state_config)
+            logger.info("✓ SQLite permissions fixed successfully")
 
         except Exception as e:
             logger.warning(f"Failed to fix SQLite permissions: {e}")
 
-        finally:
-            # Cleanup
-            try:
-                logger.info(f"Deleting temporary setup function: {setup_function_name}")
-                self.lambda_client.delete_function(FunctionName=setup_function_name)
-            except Exception as e:
-                logger.warning(f"Failed to delete setup function: {e}")
+    def _ensure_sqlite_helper(
+        self, helper_name: str, role_arn: str, app_config: Dict[str, Any]
+    ) -> None:
+        """Create or update the function that sets up SQLite on EFS.
+
+        The helper is a small zip package instead of the app image, so it
+        becomes active in seconds, and it is kept for the next time the
+        database needs setting up.
+
+        Args:
+            helper_name: Name of the helper function
+            role_arn: IAM role ARN
+            app_config: App function configuration (for VPC and EFS settings)
+        """
+        code = _sqlite_helper_zip()
+        config: Dict[str, Any] = {
+            "FunctionName": helper_name,
+            "Role": role_arn,
+            "Runtime": SQLITE_INIT_RUNTIME,
+            "Handler": "index.handler",
+            "Description": f"Sets up SQLite on EFS for {app_config['FunctionName']}",
+            "Timeout": 60,
+            "MemorySize": 128,
+            "VpcConfig": app_config["VpcConfig"],
+            "FileSystemConfigs": app_config["FileSystemConfigs"],
+        }
+
+        try:
+            current = self.lambda_client.get_function(FunctionName=helper_name)["Configuration"]
+        except self.lambda_client.exceptions.ResourceNotFoundException:
+            logger.info(f"Creating SQLite init function: {helper_name}")
+            self._call_with_role(
+                self.lambda_client.create_function, dict(config, Code={"ZipFile": code})
+            )
+            self._wait_for_function(helper_name, "SQLite init function to become active")
+            return
+
+        code_sha = base64.b64encode(hashlib.sha256(code).digest()).decode("ascii")
+        if current.get("CodeSha256") != code_sha:
+            self.lambda_client.update_function_code(FunctionName=helper_name, ZipFile=code)
+            self._wait_for_function(helper_name, "SQLite init function code update")
+
+        changes = diff_function_config(config, current)
+        if changes:
+            params = {field: change["new"] for field, change in changes.items()}
+            self._call_with_role(
+                self.lambda_client.update_function_configuration,
+                dict(params, FunctionName=helper_name),
+            )
+            self._wait_for_function(helper_name, "SQLite init function update")
 
     def _deploy_api_gateway(self, function_name: str, api_config: Dict[str, Any]) -> str:
         """Create or update API Gateway.
@@ -814,58 +2281,185 @@ class LambdaDeployer:
             suffix = f"/{stage_name}" if stage_name != "$default" else ""
             return f"https://api-id.execute-api.{self.region}.amazonaws.com{suffix}"
 
-        # Check if API already exists
-        response = self.apigatewayv2_client.get_apis()
-        existing_api = None
-        for api in response.get("Items", []):
-            if api["Name"] == api_name:
-                existing_api = api
-                break
+        existing_api = self._find_http_api(api_name, function_name)
 
         if existing_api:
             api_id = existing_api["ApiId"]
             logger.info(f"HTTP API '{api_name}' already exists: {api_id}")
+            self._route_http_api(api_id, self._function_target(function_name))
         else:
             # Create new API
             logger.info(f"Creating HTTP API: {api_name}")
-
-            cors_config = api_config.get("cors", {})
-            create_params = {
-                "Name": api_name,
-                "ProtocolType": "HTTP",
-                "Target": f"arn:aws:lambda:{self.region}:{self.account_id}:function:{function_name}",
-            }
-
-            if cors_config.get("enabled", False):
-                create_params["CorsConfiguration"] = {
-                    "AllowOrigins": cors_config.get("allow_origins", ["*"]),
-                    "AllowMethods": cors_config.get("allow_methods", ["*"]),
-                    "AllowHeaders": cors_config.get("allow_headers", ["*"]),
-                }
-
-            response = self.apigatewayv2_client.create_api(**create_params)
+            response = self.apigatewayv2_client.create_api(
+                **self._http_api_params(function_name, api_config)
+            )
             api_id = str(response["ApiId"])
+            self._record_http_api(function_name, {"Name": api_name, **response})
             logger.info(f"✓ Created HTTP API: {api_id}")
 
-        # Get the API endpoint
-        stage_name = api_config.get("stage_name", "$default")
-        if stage_name == "$default":
-            api_url = f"https://{api_id}.execute-api.{self.region}.amazonaws.com"
-        else:
-            api_url = f"https://{api_id}.execute-api.{self.region}.amazonaws.com/{stage_name}"
+        api_url = self._http_api_url(api_id, api_config)
 
         # Ensure Lambda permission exists
-        self._add_api_gateway_permission(function_name, api_id)
+        self._add_api_gateway_permission(function_name, api_id, self._alias_name())
 
         logger.info(f"✓ API Gateway URL: {api_url}")
         return api_url
 
-    def _add_api_gateway_permission(self, function_name: str, api_id: str):
+    def _route_http_api(self, api_id: str, target: str) -> None:
+        """Point an HTTP API's Lambda integration at the function's alias (or $LATEST).
+
+        Args:
+            api_id: API Gateway ID
+            target: Function ARN the API should invoke
+        """
+        integrations = self.apigatewayv2_client.get_integrations(ApiId=api_id).get("Items", [])
+        for integration in integrations_to_route(integrations, target):
+            self.apigatewayv2_client.update_integration(
+                ApiId=api_id, IntegrationId=integration["IntegrationId"], IntegrationUri=target
+            )
+            logger.info(f"✓ Routed HTTP API {api_id} to {target}")
+
+    def _find_http_api(
+        self, api_name: str, function_name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Look up an HTTP API by name.
+
+        An API recorded in the deployment state is verified with a single
+        get_api call instead of listing every API. Otherwise the region's
+        APIs are indexed by name (see _http_api_index); if several share
+        the name, the one tagged with the function is used.
+
+        Args:
+            api_name: API name
+            function_name: Function the API proxies to (uses config if not provided)
+
+        Returns:
+            API as returned by get_apis, or None if it does not exist
+        """
+        function_name = function_name or self.config.get("function", {}).get("name")
+        state_key = self._state_key(function_name)
+        record = self.state.get(state_key, "http_api", api_name)
+        if record:
+            try:
+                response = self.apigatewayv2_client.get_api(ApiId=record["ApiId"])
+                if response.get("Name") == api_name:
+                    response.pop("ResponseMetadata", None)
+                    return dict(response)
+            except self.apigatewayv2_client.exceptions.NotFoundException:
+                pass
+            logger.info(f"Recorded HTTP API {record['ApiId']} is gone, looking up '{api_name}'")
+            self.state.forget(state_key, "http_api")
+
+        candidates = self._http_api_index().get(api_name, [])
+        tagged = [
+            api
+            for api in candidates
+            if (api.get("Tags") or {}).get(API_FUNCTION_TAG) == function_name
+        ]
+        matches = tagged or candidates
+        if not matches:
+            return None
+        if len(matches) > 1:
+            logger.warning(
+                f"{len(matches)} HTTP APIs are named '{api_name}', using {matches[0]['ApiId']}"
+            )
+        self.state.put(state_key, "http_api", {"ApiId": matches[0]["ApiId"]}, api_name)
+        return dict(matches[0])
+
+    def _http_api_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Index the region's HTTP APIs by name.
+
+        All pages of get_apis are read on first use; the index is kept for
+        the rest of the run and updated as APIs are created or deleted.
+
+        Returns:
+            APIs as returned by get_apis, by name
+        """
+        with self._http_apis_lock:
+            if self._http_apis is None:
+                index: Dict[str, List[Dict[str, Any]]] = {}
+                paginator = self.apigatewayv2_client.get_paginator("get_apis")
+                for page in paginator.paginate():
+                    for api in page.get("Items", []):
+                        index.setdefault(api["Name"], []).append(dict(api))
+                logger.debug(f"Indexed {sum(map(len, index.values()))} HTTP APIs")
+                self._http_apis = index
+            return self._http_apis
+
+    def _record_http_api(self, function_name: str, api: Dict[str, Any]) -> None:
+        """Add a newly created HTTP API to the index and the deployment state.
+
+        Args:
+            function_name: Function the API proxies to
+            api: create_api response
+        """
+        api = {key: value for key, value in api.items() if key != "ResponseMetadata"}
+        with self._http_apis_lock:
+            if self._http_apis is not None:
+                self._http_apis.setdefault(api["Name"], []).append(api)
+        self.state.put(
+            self._state_key(function_name), "http_api", {"ApiId": api["ApiId"]}, api["Name"]
+        )
+
+    def _forget_http_api(self, function_name: str, api: Dict[str, Any]) -> None:
+        """Remove a deleted HTTP API from the index and the deployment state."""
+        with self._http_apis_lock:
+            if self._http_apis is not None:
+                remaining = [
+                    other
+                    for other in self._http_apis.get(api["Name"], [])
+                    if other["ApiId"] != api["ApiId"]
+                ]
+                self._http_apis[api["Name"]] = remaining
+        self.state.forget(self._state_key(function_name), "http_api")
+
+    def _http_api_params(self, function_name: str, api_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Build create_api parameters for an HTTP API proxying to a function.
+
+        Args:
+            function_name: Lambda function name
+            api_config: API Gateway configuration
+
+        Returns:
+            Parameters for create_api
+        """
+        cors_config = api_config.get("cors", {})
+        params: Dict[str, Any] = {
+            "Name": api_config.get("name", f"{function_name}-api"),
+            "ProtocolType": "HTTP",
+            "Target": self._function_target(function_name),
+            # Tells this API apart from others of the same name
+            "Tags": {
+                "JvAgentApp": self.config.get("app", {}).get("name", "jvagent"),
+                API_FUNCTION_TAG: function_name,
+            },
+        }
+
+        if cors_config.get("enabled", False):
+            params["CorsConfiguration"] = {
+                "AllowOrigins": cors_config.get("allow_origins", ["*"]),
+                "AllowMethods": cors_config.get("allow_methods", ["*"]),
+                "AllowHeaders": cors_config.get("allow_headers", ["*"]),
+            }
+
+        return params
+
+    def _http_api_url(self, api_id: str, api_config: Dict[str, Any]) -> str:
+        """Get the invoke URL of an HTTP API stage."""
+        stage_name = api_config.get("stage_name", "$default")
+        if stage_name == "$default":
+            return f"https://{api_id}.execute-api.{self.region}.amazonaws.com"
+        return f"https://{api_id}.execute-api.{self.region}.amazonaws.com/{stage_name}"
+
+    def _add_api_gateway_permission(
+        self, function_name: str, api_id: str, qualifier: Optional[str] = None
+    ):
         """Add permission for API Gateway to invoke Lambda function.
 
         Args:
             function_name: Lambda function name
             api_id: API Gateway ID
+            qualifier: Alias the API invokes, if any
         """
         statement_id = f"ApiGatewayInvoke-{api_id}"
         source_arn = f"arn:aws:execute-api:{self.region}:{self.account_id}:{api_id}/*/*"
@@ -877,6 +2471,7 @@ class LambdaDeployer:
                 Action="lambda:InvokeFunction",
                 Principal="apigateway.amazonaws.com",
                 SourceArn=source_arn,
+                **({"Qualifier": qualifier} if qualifier else {}),
             )
             logger.info("✓ Added API Gateway invocation permission")
         except self.lambda_client.exceptions.ResourceConflictException:
@@ -899,18 +2494,61 @@ class LambdaDeployer:
             logger.info(f"[DRY RUN] Would create Function URL for: {function_name}")
             return f"https://dry-run-url.lambda-url.{self.region}.on.aws/"
 
-        auth_type = url_config.get("auth_type", "NONE")
-        invoke_mode = url_config.get("invoke_mode", "BUFFERED")
-        cors_config = url_config.get("cors", {})
+        params = self._function_url_params(function_name, url_config)
+        # The function, qualified with the alias if there is one
+        function = {key: params[key] for key in ("FunctionName", "Qualifier") if key in params}
 
         logger.info(f"Configuring Function URL for: {function_name}")
 
-        # Prepare configuration parameters
-        params = {
+        try:
+            current = self.lambda_client.get_function_url_config(**function)
+        except self.lambda_client.exceptions.ResourceNotFoundException:
+            current = None
+
+        changes = diff_function_url(params, current) if current is not None else {}
+        if current is None:
+            response = self.lambda_client.create_function_url_config(**params)
+            function_url = str(response["FunctionUrl"])
+            logger.info(f"✓ Created Function URL: {function_url}")
+        elif changes:
+            logger.info(f"Updating Function URL config: {', '.join(changes)}")
+            response = self.lambda_client.update_function_url_config(
+                **function,
+                **{field: change["new"] for field, change in changes.items()},
+            )
+            function_url = str(response["FunctionUrl"])
+            logger.info(f"✓ Updated Function URL: {function_url}")
+        else:
+            function_url = str(current["FunctionUrl"])
+            logger.info(f"Function URL unchanged: {function_url}")
+
+        # Add permission for public access if AuthType is NONE
+        if params["AuthType"] == "NONE":
+            self._add_function_url_permission(function_name, params.get("Qualifier"))
+
+        return function_url
+
+    def _function_url_params(
+        self, function_name: str, url_config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build create_function_url_config parameters.
+
+        Args:
+            function_name: Lambda function name
+            url_config: Function URL configuration
+
+        Returns:
+            Parameters for create_function_url_config
+        """
+        cors_config = url_config.get("cors", {})
+        params: Dict[str, Any] = {
             "FunctionName": function_name,
-            "AuthType": auth_type,
-            "InvokeMode": invoke_mode,
+            "AuthType": url_config.get("auth_type", "NONE"),
+            "InvokeMode": url_config.get("invoke_mode", "BUFFERED"),
         }
+        alias_name = self._alias_name()
+        if alias_name:
+            params["Qualifier"] = alias_name
 
         if cors_config.get("enabled", False):
             params["Cors"] = {
@@ -921,37 +2559,14 @@ class LambdaDeployer:
                 "AllowCredentials": cors_config.get("allow_credentials", False),
             }
 
-        try:
-            # Try to create function URL
-            response = self.lambda_client.create_function_url_config(**params)
-            function_url = str(response["FunctionUrl"])
-            logger.info(f"✓ Created Function URL: {function_url}")
-
-        except self.lambda_client.exceptions.ResourceConflictException:
-            # URL config already exists, update it
-            logger.info("Function URL config already exists, updating...")
-
-            # Update params for update call (remove FunctionName from kwargs if we passed it as arg)
-            update_params = params.copy()
-            update_params.pop("FunctionName")
-
-            response = self.lambda_client.update_function_url_config(
-                FunctionName=function_name, **update_params
-            )
-            function_url = response["FunctionUrl"]
-            logger.info(f"✓ Updated Function URL: {function_url}")
-
-        # Add permission for public access if AuthType is NONE
-        if auth_type == "NONE":
-            self._add_function_url_permission(function_name)
-
-        return function_url
+        return params
 
-    def _add_function_url_permission(self, function_name: str):
+    def _add_function_url_permission(self, function_name: str, qualifier: Optional[str] = None):
         """Add permission for public access to Function URL.
 
         Args:
             function_name: Lambda function name
+            qualifier: Alias the Function URL belongs to, if any
         """
         statement_id = "FunctionURLAllowPublicAccess"
 
@@ -962,6 +2577,7 @@ class LambdaDeployer:
                 Action="lambda:InvokeFunctionUrl",
                 Principal="*",
                 FunctionUrlAuthType="NONE",
+                **({"Qualifier": qualifier} if qualifier else {}),
             )
             logger.info("✓ Added public access permission for Function URL")
         except self.lambda_client.exceptions.ResourceConflictException:
@@ -1054,9 +2670,19 @@ class LambdaDeployer:
                 FunctionName=function_name, Environment={"Variables": env_vars}
             )
             logger.info(f"✓ Updated environment variables for {function_name}")
+
+            # Traffic goes to the alias, so publish the change
+            alias_name = self._alias_name()
+            if alias_name:
+                self._wait_for_function(function_name, "function configuration update")
+                self._publish_alias(function_name, alias_name)
         except Exception as e:
             raise LambdaDeployerError(f"Failed to update env vars: {e}") from e
 
+        # The function no longer matches the configuration it was deployed from
+        self.state.forget(self._state_key(function_name), "function")
+        self.state.save()
+
     def destroy(
         self,
         function_name: Optional[str] = None,
@@ -1097,6 +2723,21 @@ class LambdaDeployer:
                 logger.info("[DRY RUN] Would delete EFS access point")
             return results
 
+        # Keep-warm rules outlive the function, whether or not lambda.warmer is still set
+        try:
+            for rule_name in self._remove_warmer(function_name):
+                results["deleted"].append(f"rule:{rule_name}")
+        except Exception as e:
+            logger.warning(f"Failed to remove keep-warm rules: {e}")
+
+        # Autoscaling targets outlive the function, unlike its aliases and versions
+        alias_name = self._alias_name()
+        if alias_name:
+            try:
+                self._configure_autoscaling(function_name, alias_name, None)
+            except Exception as e:
+                logger.warning(f"Failed to remove autoscaling of {alias_name}: {e}")
+
         # Delete Lambda function
         try:
             self.lambda_client.delete_function(FunctionName=function_name)
@@ -1109,17 +2750,27 @@ class LambdaDeployer:
             logger.error(error)
             cast(List[str], results["errors"]).append(error)
 
+        # Delete the SQLite init helper, if one was created
+        helper_name = f"{function_name}{SQLITE_INIT_SUFFIX}"
+        try:
+            self.lambda_client.delete_function(FunctionName=helper_name)
+            logger.info(f"✓ Deleted SQLite init function: {helper_name}")
+            results["deleted"].append(f"function:{helper_name}")
+        except self.lambda_client.exceptions.ResourceNotFoundException:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to delete SQLite init function: {e}")
+
         # Delete API Gateway if requested
         if delete_api:
             try:
                 api_name = self.config.get("api_gateway", {}).get("name", f"{function_name}-api")
-                response = self.apigatewayv2_client.get_apis()
-                for api in response.get("Items", []):
-                    if api["Name"] == api_name:
-                        self.apigatewayv2_client.delete_api(ApiId=api["ApiId"])
-                        logger.info(f"✓ Deleted API Gateway: {api_name}")
-                        results["deleted"].append(f"api:{api_name}")
-                        break
+                api = self._find_http_api(api_name, function_name)
+                if api:
+                    self.apigatewayv2_client.delete_api(ApiId=api["ApiId"])
+                    self._forget_http_api(function_name, api)
+                    logger.info(f"✓ Deleted API Gateway: {api_name}")
+                    results["deleted"].append(f"api:{api_name}")
             except Exception as e:
                 error = f"Failed to delete API Gateway: {e}"
                 logger.error(error)
@@ -1208,4 +2859,8 @@ class LambdaDeployer:
                 logger.error(error)
                 cast(List[str], results["errors"]).append(error)
 
+        # Records of deleted resources would be trusted by the next deploy
+        self.state.forget(self._state_key(function_name))
+        self.state.save()
+
         return results
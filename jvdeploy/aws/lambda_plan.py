@@ -0,0 +1,643 @@
+"""Desired-state planning for Lambda deployments.
+
+Compares the resources a deploy.yaml describes with what is live in AWS and
+lists the mutating calls needed to reconcile them. Every Lambda update
+replaces the warm execution environments of the function, so a call is only
+planned for what actually differs: an unchanged image digest skips
+``update_function_code`` and only changed settings are sent to
+``update_function_configuration``.
+
+Plans are plain dictionaries so they can be printed, serialized to JSON and
+applied later by LambdaDeployer.apply.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+# Stand-ins for identifiers that only exist once an earlier action has run
+NEW_API_ID = "<new-api-id>"
+NEW_ACCESS_POINT_ARN = "<new-access-point-arn>"
+NEW_VERSION = "<new-version>"
+
+# Function settings managed by jvdeploy, with the value AWS reports when unset
+FUNCTION_FIELDS: Dict[str, Any] = {
+    "Role": None,
+    "Timeout": None,
+    "MemorySize": None,
+    "EphemeralStorage": None,
+    "Description": "",
+    "Environment": {"Variables": {}},
+    "VpcConfig": {"SubnetIds": [], "SecurityGroupIds": []},
+    "FileSystemConfigs": [],
+}
+
+# Architecture of functions created without one; it can only be changed
+# together with the code (update_function_code)
+DEFAULT_ARCHITECTURES = ["x86_64"]
+
+URL_FIELDS: Dict[str, Any] = {"AuthType": "NONE", "InvokeMode": "BUFFERED", "Cors": {}}
+
+_URL_CORS_KEYS = ("AllowOrigins", "AllowMethods", "AllowHeaders", "MaxAge", "AllowCredentials")
+_API_CORS_KEYS = ("AllowOrigins", "AllowMethods", "AllowHeaders")
+
+
+def _normalize(field: str, value: Any) -> Any:
+    """Bring a desired or live setting into a comparable form."""
+    if value is None:
+        return None
+    if field == "Environment":
+        return dict(value.get("Variables") or {})
+    if field == "EphemeralStorage":
+        return value.get("Size")
+    if field == "VpcConfig":
+        return (sorted(value.get("SubnetIds") or []), sorted(value.get("SecurityGroupIds") or []))
+    if field == "FileSystemConfigs":
+        return sorted((c.get("Arn"), c.get("LocalMountPath")) for c in value)
+    if field == "Cors":
+        return {k: value[k] for k in _URL_CORS_KEYS if value.get(k) not in (None, [], "")}
+    return value
+
+
+def _diff(fields: Dict[str, Any], desired: Dict[str, Any], live: Dict[str, Any]) -> Dict[str, Any]:
+    changes = {}
+    for field, default in fields.items():
+        new = desired.get(field, default)
+        if new is None:
+            continue
+        old = live.get(field, default)
+        if _normalize(field, old) != _normalize(field, new):
+            changes[field] = {"old": old, "new": new}
+    return changes
+
+
+def diff_function_config(desired: Dict[str, Any], live: Dict[str, Any]) -> Dict[str, Any]:
+    """Compare function settings with a live function configuration.
+
+    Settings missing from the desired configuration are compared with their
+    unset value, so e.g. removing all environment variables is detected.
+
+    Args:
+        desired: Configuration from LambdaDeployer._build_lambda_config
+        live: 'Configuration' of a get_function response
+
+    Returns:
+        Changed settings, each as {'old': ..., 'new': ...}
+    """
+    return _diff(FUNCTION_FIELDS, desired, live)
+
+
+def diff_architectures(desired: Dict[str, Any], live: Dict[str, Any]) -> Dict[str, Any]:
+    """Compare a function's instruction set architecture with the live one.
+
+    Args:
+        desired: Configuration from LambdaDeployer._build_lambda_config
+        live: 'Configuration' of a get_function response
+
+    Returns:
+        {'Architectures': {'old': ..., 'new': ...}} if it differs, else {}
+    """
+    new = desired.get("Architectures")
+    old = live.get("Architectures") or DEFAULT_ARCHITECTURES
+    if new is None or list(new) == list(old):
+        return {}
+    return {"Architectures": {"old": old, "new": new}}
+
+
+def alias_up_to_date(live: Dict[str, Any], alias_function: Optional[Dict[str, Any]]) -> bool:
+    """Check whether the version an alias points to matches the function's $LATEST.
+
+    Args:
+        live: get_function response ($LATEST)
+        alias_function: get_function_configuration response for the alias
+
+    Returns:
+        True if the published version runs the same code and settings
+    """
+    if not alias_function:
+        return False
+    latest = live.get("Configuration", {})
+    return (
+        latest.get("CodeSha256") == alias_function.get("CodeSha256")
+        and not _diff(FUNCTION_FIELDS, latest, alias_function)
+        and not diff_architectures(latest, alias_function)
+    )
+
+
+def diff_function_url(desired: Dict[str, Any], live: Dict[str, Any]) -> Dict[str, Any]:
+    """Compare Function URL parameters with a get_function_url_config response.
+
+    Args:
+        desired: Parameters for create_function_url_config
+        live: get_function_url_config response
+
+    Returns:
+        Changed settings, each as {'old': ..., 'new': ...}
+    """
+    return _diff(URL_FIELDS, desired, live)
+
+
+def diff_api_cors(desired: Optional[Dict[str, Any]], live: Dict[str, Any]) -> bool:
+    """Check whether an HTTP API's CORS configuration differs from the desired one.
+
+    Args:
+        desired: CorsConfiguration for create_api, or None for no CORS
+        live: API as returned by get_apis
+
+    Returns:
+        True if the API must be updated
+    """
+
+    def comparable(cors: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {k: sorted(cors[k]) for k in _API_CORS_KEYS if (cors or {}).get(k)}
+
+    return comparable(desired) != comparable(live.get("CorsConfiguration"))
+
+
+def code_up_to_date(live: Dict[str, Any], image_uri: str, digest: Optional[str]) -> bool:
+    """Check whether a function already runs an image.
+
+    Args:
+        live: get_function response
+        image_uri: Desired image URI
+        digest: Manifest digest of the desired image, if known
+
+    Returns:
+        True if the function runs the same digest from the same repository
+    """
+    from jvdeploy.docker_builder import parse_image_uri
+
+    if not digest:
+        return False
+    current_sha = live.get("Configuration", {}).get("CodeSha256")
+    current_uri = live.get("Code", {}).get("ImageUri", "")
+    same_repo = parse_image_uri(current_uri)[:2] == parse_image_uri(image_uri)[:2]
+    return same_repo and digest.split(":")[-1] == current_sha
+
+
+def integrations_to_route(integrations: List[Dict[str, Any]], target: str) -> List[Dict[str, Any]]:
+    """Find the HTTP API integrations that invoke a function under another qualifier.
+
+    Args:
+        integrations: Items of a get_integrations response
+        target: Function ARN the API should invoke (qualified with an alias or not)
+
+    Returns:
+        Integrations whose IntegrationUri must be changed to the target
+    """
+
+    def unqualified(arn: str) -> str:
+        return ":".join(arn.split(":")[:7])
+
+    return [
+        integration
+        for integration in integrations
+        if integration.get("IntegrationUri", target) != target
+        and unqualified(integration["IntegrationUri"]) == unqualified(target)
+    ]
+
+
+def policy_statement_ids(policy: Optional[str]) -> List[str]:
+    """Get the statement IDs of a function's resource policy.
+
+    Args:
+        policy: 'Policy' document of a get_policy response
+
+    Returns:
+        Statement IDs
+    """
+    if not policy:
+        return []
+    return [s["Sid"] for s in json.loads(policy).get("Statement", []) if "Sid" in s]
+
+
+def _action(
+    resource: str, name: str, action: str, call: str, params: Dict[str, Any], **extra: Any
+) -> Dict[str, Any]:
+    return {
+        "resource": resource,
+        "name": name,
+        "action": action,
+        "call": call,
+        "params": params,
+        **extra,
+    }
+
+
+def build_plan(desired: Dict[str, Any], live: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """List the calls that turn the live state into the desired state.
+
+    Args:
+        desired: Desired state with 'function' (create_function parameters),
+            'image_digest', 'role' ({'name', 'policies'} or None when the
+            role ARN is given), 'access_point' ({'file_system_id'} when one
+            must be created, else None), 'alias' ({'name',
+            'provisioned_concurrency', 'autoscaling'} or None to invoke
+            $LATEST), 'function_url' (parameters or None) and 'api'
+            ({'name', 'params', 'source_arn_prefix'} or None)
+        live: Live state with 'function' (get_function response or None),
+            'alias' (get_alias response), 'alias_function' (configuration
+            of the aliased version), 'provisioned_concurrency',
+            'function_url', 'statement_ids', 'api', 'api_integrations' and
+            'role' ({'arn', 'policies'} or None)
+
+    Returns:
+        Actions in execution order, each with 'resource', 'name', 'action'
+        ('create', 'update', 'add' or 'delete'), 'call' ('service.operation'),
+        'params' and optionally 'changes'
+    """
+    actions: List[Dict[str, Any]] = []
+    function = desired["function"]
+    function_name = function["FunctionName"]
+
+    if desired.get("access_point"):
+        file_system_id = desired["access_point"]["file_system_id"]
+        actions.append(
+            _action(
+                "efs_access_point",
+                file_system_id,
+                "create",
+                "efs.create_access_point",
+                {"FileSystemId": file_system_id},
+            )
+        )
+
+    role = desired.get("role")
+    if role:
+        if live.get("role") is None:
+            actions.append(
+                _action(
+                    "iam_role",
+                    role["name"],
+                    "create",
+                    "iam.create_role",
+                    {"RoleName": role["name"]},
+                    policies=list(role["policies"]),
+                )
+            )
+        else:
+            for policy_arn in role["policies"]:
+                if policy_arn not in live["role"]["policies"]:
+                    actions.append(
+                        _action(
+                            "iam_role_policy",
+                            role["name"],
+                            "add",
+                            "iam.attach_role_policy",
+                            {"RoleName": role["name"], "PolicyArn": policy_arn},
+                        )
+                    )
+
+    current = live.get("function")
+    statement_ids = set(live.get("statement_ids") or [])
+    if current is None:
+        actions.append(
+            _action("function", function_name, "create", "lambda.create_function", function)
+        )
+    else:
+        image_uri = function["Code"]["ImageUri"]
+        # The architecture can only change together with the code
+        code_changes = diff_architectures(function, current.get("Configuration", {}))
+        if not code_up_to_date(current, image_uri, desired.get("image_digest")):
+            old_uri = current.get("Code", {}).get("ImageUri")
+            code_changes["ImageUri"] = {"old": old_uri, "new": image_uri}
+        if code_changes:
+            params = {"FunctionName": function_name, "ImageUri": image_uri}
+            if "Architectures" in code_changes:
+                params["Architectures"] = code_changes["Architectures"]["new"]
+            actions.append(
+                _action(
+                    "function",
+                    function_name,
+                    "update",
+                    "lambda.update_function_code",
+                    params,
+                    changes=code_changes,
+                )
+            )
+        changes = diff_function_config(function, current.get("Configuration", {}))
+        if changes:
+            params = {"FunctionName": function_name}
+            params.update({field: change["new"] for field, change in changes.items()})
+            actions.append(
+                _action(
+                    "function",
+                    function_name,
+                    "update",
+                    "lambda.update_function_configuration",
+                    params,
+                    changes=changes,
+                )
+            )
+
+    alias = desired.get("alias")
+    qualifier: Dict[str, Any] = {"Qualifier": alias["name"]} if alias else {}
+    if alias:
+        live_alias = live.get("alias")
+        function_changed = any(a["resource"] == "function" for a in actions)
+        if (
+            live_alias is None
+            or function_changed
+            or not alias_up_to_date(current or {}, live.get("alias_function"))
+        ):
+            actions.append(
+                _action(
+                    "version",
+                    function_name,
+                    "create",
+                    "lambda.publish_version",
+                    {"FunctionName": function_name},
+                )
+            )
+            params = {
+                "FunctionName": function_name,
+                "Name": alias["name"],
+                "FunctionVersion": NEW_VERSION,
+            }
+            if live_alias is None:
+                actions.append(
+                    _action("alias", alias["name"], "create", "lambda.create_alias", params)
+                )
+            else:
+                change = {"old": live_alias.get("FunctionVersion"), "new": NEW_VERSION}
+                actions.append(
+                    _action(
+                        "alias",
+                        alias["name"],
+                        "update",
+                        "lambda.update_alias",
+                        params,
+                        changes={"FunctionVersion": change},
+                    )
+                )
+
+        count = alias.get("provisioned_concurrency") or 0
+        live_count = (live.get("provisioned_concurrency") or {}).get(
+            "RequestedProvisionedConcurrentExecutions"
+        )
+        # With autoscaling, the count only seeds the config; scaling owns it after that
+        if count and (live_count is None or (live_count != count and not alias.get("autoscaling"))):
+            actions.append(
+                _action(
+                    "provisioned_concurrency",
+                    alias["name"],
+                    "create" if live_count is None else "update",
+                    "lambda.put_provisioned_concurrency_config",
+                    {
+                        "FunctionName": function_name,
+                        "Qualifier": alias["name"],
+                        "ProvisionedConcurrentExecutions": count,
+                    },
+                    changes={"ProvisionedConcurrentExecutions": {"old": live_count, "new": count}},
+                )
+            )
+        elif not count and live_count is not None:
+            actions.append(
+                _action(
+                    "provisioned_concurrency",
+                    alias["name"],
+                    "delete",
+                    "lambda.delete_provisioned_concurrency_config",
+                    {"FunctionName": function_name, "Qualifier": alias["name"]},
+                )
+            )
+
+    url = desired.get("function_url")
+    if url:
+        if live.get("function_url") is None:
+            actions.append(
+                _action(
+                    "function_url",
+                    function_name,
+                    "create",
+                    "lambda.create_function_url_config",
+                    url,
+                )
+            )
+        else:
+            changes = diff_function_url(url, live["function_url"])
+            if changes:
+                params = {"FunctionName": function_name, **qualifier}
+                params.update({field: change["new"] for field, change in changes.items()})
+                actions.append(
+                    _action(
+                        "function_url",
+                        function_name,
+                        "update",
+                        "lambda.update_function_url_config",
+                        params,
+                        changes=changes,
+                    )
+                )
+        if url.get("AuthType", "NONE") == "NONE" and (
+            "FunctionURLAllowPublicAccess" not in statement_ids
+        ):
+            actions.append(
+                _action(
+                    "permission",
+                    "FunctionURLAllowPublicAccess",
+                    "add",
+                    "lambda.add_permission",
+                    {
+                        "FunctionName": function_name,
+                        "StatementId": "FunctionURLAllowPublicAccess",
+                        "Action": "lambda:InvokeFunctionUrl",
+                        "Principal": "*",
+                        "FunctionUrlAuthType": "NONE",
+                        **qualifier,
+                    },
+                )
+            )
+
+    api = desired.get("api")
+    if api:
+        live_api = live.get("api")
+        cors = api["params"].get("CorsConfiguration")
+        if live_api is None:
+            actions.append(
+                _action("api", api["name"], "create", "apigatewayv2.create_api", api["params"])
+            )
+            api_id = NEW_API_ID
+        else:
+            api_id = live_api["ApiId"]
+            if diff_api_cors(cors, live_api):
+                change = {"old": live_api.get("CorsConfiguration"), "new": cors}
+                if cors:
+                    actions.append(
+                        _action(
+                            "api",
+                            api["name"],
+                            "update",
+                            "apigatewayv2.update_api",
+                            {"ApiId": api_id, "CorsConfiguration": cors},
+                            changes={"CorsConfiguration": change},
+                        )
+                    )
+                else:
+                    actions.append(
+                        _action(
+                            "api",
+                            api["name"],
+                            "update",
+                            "apigatewayv2.delete_cors_configuration",
+                            {"ApiId": api_id},
+                            changes={"CorsConfiguration": change},
+                        )
+                    )
+
+            # Route the API to the alias (or back to $LATEST)
+            target = api["params"]["Target"]
+            for integration in integrations_to_route(live.get("api_integrations") or [], target):
+                actions.append(
+                    _action(
+                        "api_integration",
+                        api["name"],
+                        "update",
+                        "apigatewayv2.update_integration",
+                        {
+                            "ApiId": api_id,
+                            "IntegrationId": integration["IntegrationId"],
+                            "IntegrationUri": target,
+                        },
+                        changes={
+                            "IntegrationUri": {"old": integration["IntegrationUri"], "new": target}
+                        },
+                    )
+                )
+
+        statement_id = f"ApiGatewayInvoke-{api_id}"
+        if statement_id not in statement_ids:
+            actions.append(
+                _action(
+                    "permission",
+                    statement_id,
+                    "add",
+                    "lambda.add_permission",
+                    {
+                        "FunctionName": function_name,
+                        "StatementId": statement_id,
+                        "Action": "lambda:InvokeFunction",
+                        "Principal": "apigateway.amazonaws.com",
+                        "SourceArn": f"{api['source_arn_prefix']}:{api_id}/*/*",
+                        **qualifier,
+                    },
+                )
+            )
+
+    return actions
+
+
+def fill_placeholders(value: Any, outputs: Dict[str, str]) -> Any:
+    """Replace NEW_* stand-ins with identifiers created by earlier actions.
+
+    Args:
+        value: Action parameters (any JSON-like value)
+        outputs: Stand-in to identifier
+
+    Returns:
+        Value with the stand-ins replaced
+    """
+    if isinstance(value, str):
+        for placeholder, actual in outputs.items():
+            value = value.replace(placeholder, actual)
+        return value
+    if isinstance(value, dict):
+        return {k: fill_placeholders(v, outputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [fill_placeholders(v, outputs) for v in value]
+    return value
+
+
+# Stand-in for environment variable values, which may hold secrets
+REDACTED = "***"
+
+
+def _redact_environment(environment: Any) -> Any:
+    if not isinstance(environment, dict) or not isinstance(environment.get("Variables"), dict):
+        return environment
+    return dict(environment, Variables={k: REDACTED for k in environment["Variables"]})
+
+
+def redact_plan(actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Mask environment variable values in a plan, as format_plan does.
+
+    Args:
+        actions: Result of build_plan
+
+    Returns:
+        Copy of the actions with every Environment.Variables value replaced
+        by REDACTED; the variable names are kept, and an Environment change
+        lists the names of changed values under 'changed'
+    """
+    redacted = []
+    for action in actions:
+        copy = dict(action)
+        if "Environment" in action["params"]:
+            copy["params"] = dict(
+                action["params"], Environment=_redact_environment(action["params"]["Environment"])
+            )
+        change = (action.get("changes") or {}).get("Environment")
+        if change:
+            # Keep the names of changed values, which format_plan marks with ~
+            old = _normalize("Environment", change["old"]) or {}
+            new = _normalize("Environment", change["new"]) or {}
+            copy["changes"] = dict(
+                action["changes"],
+                Environment={
+                    "old": _redact_environment(change["old"]),
+                    "new": _redact_environment(change["new"]),
+                    "changed": sorted(k for k in set(old) & set(new) if old[k] != new[k]),
+                },
+            )
+        redacted.append(copy)
+    return redacted
+
+
+def _short(value: Any) -> str:
+    text = json.dumps(value, sort_keys=True, default=str) if not isinstance(value, str) else value
+    return text if len(text) <= 80 else text[:77] + "..."
+
+
+_SYMBOLS = {"create": "+", "add": "+", "update": "~", "delete": "-"}
+
+
+def format_plan(actions: List[Dict[str, Any]]) -> str:
+    """Format a plan for the terminal.
+
+    Args:
+        actions: Result of build_plan
+
+    Returns:
+        Printable plan
+    """
+    if not actions:
+        return "No changes. The deployment matches the configuration."
+
+    lines = []
+    for action in actions:
+        operation = action["call"].split(".", 1)[1]
+        lines.append(
+            f"  {_SYMBOLS.get(action['action'], '~')} {action['resource']} {action['name']}"
+            f" ({operation})"
+        )
+        for field, change in (action.get("changes") or {}).items():
+            if field == "Environment":
+                old = _normalize(field, change["old"]) or {}
+                new = _normalize(field, change["new"]) or {}
+                for key in sorted(set(old) | set(new)):
+                    if key not in new:
+                        lines.append(f"      - Environment.{key}")
+                    elif key not in old:
+                        lines.append(f"      + Environment.{key}")
+                    elif old[key] != new[key]:
+                        lines.append(f"      ~ Environment.{key}")
+            else:
+                lines.append(f"      {field}: {_short(change['old'])} -> {_short(change['new'])}")
+
+    counts = {symbol: 0 for symbol in ("+", "~", "-")}
+    for action in actions:
+        counts[_SYMBOLS.get(action["action"], "~")] += 1
+    summary = f"Plan: {counts['+']} to add, {counts['~']} to change"
+    if counts["-"]:
+        summary += f", {counts['-']} to remove"
+    lines.append(summary + ".")
+    return "\n".join(lines)
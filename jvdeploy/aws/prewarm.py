@@ -0,0 +1,176 @@
+"""Pre-warming of Lambda execution environments after a deploy.
+
+A new version starts without initialized execution environments, so the
+first users after a deploy each hit a cold start. Sending N requests at
+the same time makes Lambda initialize N environments, which later requests
+reuse. Requests are either synchronous invocations (whose log tail reports
+each cold start's init duration) or HTTP requests to the Function URL or
+API Gateway (which only show the response time).
+"""
+
+import base64
+import json
+import logging
+import re
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Requests in flight at once, whatever count is asked for
+MAX_PREWARM_CONCURRENCY = 50
+
+# Event of warmup invocations, recognizable by the function's handler
+WARMUP_EVENT = {"source": "jvdeploy.warmup"}
+
+_INIT_DURATION = re.compile(r"Init Duration: ([\d.]+) ms")
+
+# A request returns {'seconds', 'init_ms', 'status', 'error'}
+Request = Callable[[], Dict[str, Any]]
+
+
+def parse_init_duration(log_result: Optional[str]) -> Optional[float]:
+    """Read the init duration from the log tail of an invocation.
+
+    Args:
+        log_result: Base64 'LogResult' of an invoke response (LogType=Tail)
+
+    Returns:
+        Init duration in milliseconds, or None if the environment was warm
+    """
+    if not log_result:
+        return None
+    try:
+        text = base64.b64decode(log_result).decode("utf-8", errors="replace")
+    except ValueError:
+        return None
+    match = _INIT_DURATION.search(text)
+    return float(match.group(1)) if match else None
+
+
+def invoke_request(client: Any, function_name: str, qualifier: Optional[str] = None) -> Request:
+    """Make a request that synchronously invokes a function with the warmup event.
+
+    Args:
+        client: boto3 Lambda client
+        function_name: Lambda function name
+        qualifier: Version or alias to invoke (default: $LATEST)
+
+    Returns:
+        Request function
+    """
+    params: Dict[str, Any] = {
+        "FunctionName": function_name,
+        "InvocationType": "RequestResponse",
+        "LogType": "Tail",
+        "Payload": json.dumps(WARMUP_EVENT).encode("utf-8"),
+    }
+    if qualifier:
+        params["Qualifier"] = qualifier
+
+    def request() -> Dict[str, Any]:
+        response = client.invoke(**params)
+        # The handler may reject the warmup event; the environment is initialized anyway
+        return {
+            "init_ms": parse_init_duration(response.get("LogResult")),
+            "status": response.get("StatusCode"),
+            "error": response.get("FunctionError"),
+        }
+
+    return request
+
+
+def http_request(url: str, timeout: float = 60.0) -> Request:
+    """Make a request that GETs a URL (the Function URL or API Gateway).
+
+    Args:
+        url: URL to request
+        timeout: Seconds to wait for the response
+
+    Returns:
+        Request function
+    """
+
+    def request() -> Dict[str, Any]:
+        http = urllib.request.Request(url, headers={"User-Agent": "jvdeploy-prewarm"})
+        try:
+            with urllib.request.urlopen(http, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            # Any response means an environment served it
+            status = e.code
+        return {"init_ms": None, "status": status, "error": None}
+
+    return request
+
+
+def warm_up(
+    request: Request, count: int, max_concurrency: int = MAX_PREWARM_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """Send requests at the same time so that each lands on its own environment.
+
+    Args:
+        request: Request function (see invoke_request and http_request)
+        count: Number of requests
+        max_concurrency: Requests in flight at once
+
+    Returns:
+        Per request: 'seconds' (response time), 'init_ms' (init duration
+        of a cold start, if reported), 'status' and 'error'
+    """
+    if count <= 0:
+        return []
+    workers = max(1, min(count, max_concurrency))
+    if count > workers:
+        logger.warning(
+            f"Pre-warming {count} environments {workers} at a time; later requests may "
+            "reuse environments warmed by earlier ones"
+        )
+
+    def timed() -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = request()
+        except Exception as e:
+            result = {"init_ms": None, "status": None, "error": str(e)}
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prewarm") as pool:
+        futures = [pool.submit(timed) for _ in range(count)]
+        return [future.result() for future in futures]
+
+
+def format_prewarm(results: List[Dict[str, Any]]) -> str:
+    """Format pre-warm results for the terminal.
+
+    Args:
+        results: Result of warm_up
+
+    Returns:
+        Printable summary
+    """
+    if not results:
+        return "  No requests sent"
+
+    seconds = [r["seconds"] for r in results]
+    failed = sum(1 for r in results if r.get("status") is None)
+    lines = [
+        f"  {len(results)} request(s), {failed} failed: median {statistics.median(seconds):.2f}s,"
+        f" slowest {max(seconds):.2f}s"
+    ]
+    inits = [r["init_ms"] for r in results if r.get("init_ms") is not None]
+    if inits:
+        lines.append(
+            f"  {len(inits)} cold start(s): init {min(inits):.0f}-{max(inits):.0f} ms,"
+            f" median {statistics.median(inits):.0f} ms"
+        )
+    errors = sorted({str(r["error"]) for r in results if r.get("error")})
+    if errors:
+        lines.append(f"  Errors: {'; '.join(errors)}")
+    return "\n".join(lines)
@@ -0,0 +1,129 @@
+"""Dependency-ordered execution of deployment steps.
+
+Steps declare the steps they depend on and run on a thread pool as soon as
+those have finished, so independent work (e.g. creating an IAM role and
+building the image) overlaps. After a failure no further steps are started;
+steps already running are waited for and the first error is raised.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+# Step name -> (function, names of the steps it depends on)
+Steps = Dict[str, Tuple[Callable[[], None], Iterable[str]]]
+
+
+class StepGraphError(Exception):
+    """Exception raised for invalid step dependencies."""
+
+    pass
+
+
+def order_steps(steps: Steps) -> List[str]:
+    """Order steps so that each comes after its dependencies.
+
+    Args:
+        steps: Steps to order
+
+    Returns:
+        Step names in a valid execution order
+
+    Raises:
+        StepGraphError: If a dependency is unknown or the dependencies form a cycle
+    """
+    for name, (_, deps) in steps.items():
+        for dep in deps:
+            if dep not in steps:
+                raise StepGraphError(f"Step '{name}' depends on unknown step '{dep}'")
+
+    ordered: List[str] = []
+    remaining = {name: set(deps) for name, (_, deps) in steps.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if deps <= set(ordered)]
+        if not ready:
+            raise StepGraphError(f"Steps have circular dependencies: {', '.join(remaining)}")
+        for name in ready:
+            ordered.append(name)
+            del remaining[name]
+    return ordered
+
+
+def run_steps(
+    steps: Steps,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, float]:
+    """Run steps concurrently in dependency order.
+
+    Args:
+        steps: Steps to run
+        max_workers: Largest number of steps running at the same time
+        timings: Dictionary to record step durations in as they finish
+            (also filled when a step fails)
+
+    Returns:
+        Seconds each step took, by step name
+
+    Raises:
+        StepGraphError: If the dependencies are invalid
+        Exception: The first exception raised by a step
+    """
+    order = order_steps(steps)
+    timings = {} if timings is None else timings
+    done: set = set()
+    error: Optional[BaseException] = None
+
+    def timed(name: str) -> None:
+        start = time.perf_counter()
+        try:
+            steps[name][0]()
+        finally:
+            timings[name] = time.perf_counter() - start
+
+    pending = list(order)
+    running: Dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while True:
+            if error is None:
+                for name in [n for n in pending if set(steps[n][1]) <= done]:
+                    pending.remove(name)
+                    running[pool.submit(timed, name)] = name
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                exc = future.exception()
+                if exc is None:
+                    done.add(name)
+                elif error is None:
+                    error = exc
+                    if pending:
+                        logger.debug(f"Step '{name}' failed, skipping: {', '.join(pending)}")
+
+    if error is not None:
+        raise error
+    return timings
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """Format step durations for the terminal, slowest first.
+
+    Args:
+        timings: Result of run_steps
+
+    Returns:
+        One line per step
+    """
+    width = max((len(name) for name in timings), default=0)
+    return "\n".join(
+        f"  {name:<{width}} {seconds:>7.1f}s"
+        for name, seconds in sorted(timings.items(), key=lambda item: -item[1])
+    )
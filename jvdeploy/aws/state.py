@@ -0,0 +1,240 @@
+"""Persistent record of the AWS resources a Lambda deployment manages.
+
+Deploys used to rediscover everything they created last time: ECR
+repository, IAM role and its policies, HTTP API, EFS access point and the
+VPC of the file system. The deployment state keeps their ARNs, IDs and
+digests, together with a hash of the configuration each was derived from,
+so the next run can trust them for a while (or verify them with a single
+cheap call) instead.
+
+State lives in a local JSON file (by default in the jvdeploy cache
+directory) or, to share it between machines such as CI runners, in an S3
+object. Records older than the TTL or derived from a different
+configuration are ignored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from jvdeploy.cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+# Seconds a record is trusted without checking AWS
+DEFAULT_STATE_TTL = 24 * 60 * 60
+
+
+class DeploymentStateError(Exception):
+    """Exception raised when deployment state cannot be read or written."""
+
+    pass
+
+
+def config_hash(value: Any) -> str:
+    """Hash the configuration a resource was derived from.
+
+    Args:
+        value: JSON-serializable configuration
+
+    Returns:
+        Short hex digest
+    """
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def _parse_s3_uri(uri: str) -> Any:
+    if not uri.startswith("s3://") or "/" not in uri[len("s3://") :]:
+        raise DeploymentStateError(f"Invalid S3 URI for deployment state: {uri}")
+    bucket, key = uri[len("s3://") :].split("/", 1)
+    return bucket, key
+
+
+class DeploymentState:
+    """Records of the resources of one deployment, stored in a file or S3 object.
+
+    The whole store is read on first use and written by save(), so a
+    deploy makes at most one read and one write. Several deployments
+    (account, region and function) can share a store.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        s3_uri: Optional[str] = None,
+        ttl: float = DEFAULT_STATE_TTL,
+        s3_client: Optional[Callable[[], Any]] = None,
+    ):
+        """Initialize deployment state.
+
+        Args:
+            path: Local state file (default: lambda-state.json in the cache directory)
+            s3_uri: S3 object to keep the state in instead (s3://bucket/key)
+            ttl: Seconds records are trusted
+            s3_client: Function returning a boto3 S3 client (required with s3_uri)
+        """
+        self.path = path or cache_dir() / "lambda-state.json"
+        self.s3_uri = s3_uri
+        self.ttl = ttl
+        self._s3_client = s3_client
+        self._data: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], s3_client: Optional[Callable[[], Any]] = None
+    ) -> "DeploymentState":
+        """Create the state store configured under lambda.state.
+
+        Args:
+            config: Lambda deployment configuration
+            s3_client: Function returning a boto3 S3 client
+
+        Returns:
+            DeploymentState
+        """
+        state_config = config.get("state") or {}
+        path = state_config.get("path")
+        if path and not os.path.isabs(path):
+            path = os.path.join(config.get("app_root", "."), path)
+        return cls(
+            path=Path(path).expanduser() if path else None,
+            s3_uri=state_config.get("s3_uri"),
+            ttl=float(state_config.get("ttl", DEFAULT_STATE_TTL)),
+            s3_client=s3_client,
+        )
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is not None:
+            return self._data
+
+        raw = None
+        try:
+            if self.s3_uri:
+                bucket, key = _parse_s3_uri(self.s3_uri)
+                client = self._s3_client() if self._s3_client else None
+                if client is None:
+                    raise DeploymentStateError("An S3 client is required for S3 deployment state")
+                try:
+                    raw = client.get_object(Bucket=bucket, Key=key)["Body"].read()
+                except client.exceptions.NoSuchKey:
+                    raw = None
+            elif self.path.exists():
+                raw = self.path.read_bytes()
+        except DeploymentStateError:
+            raise
+        except Exception as e:
+            logger.warning(f"Could not read deployment state, rediscovering resources: {e}")
+
+        data: Dict[str, Any] = {}
+        if raw:
+            try:
+                data = json.loads(raw)
+            except ValueError as e:
+                logger.warning(f"Ignoring corrupt deployment state: {e}")
+        if data.get("version") != STATE_VERSION:
+            data = {"version": STATE_VERSION, "deployments": {}}
+        self._data = data
+        return data
+
+    def get(self, deployment: str, resource: str, config: Any = None) -> Optional[Dict[str, Any]]:
+        """Get a resource record if it is recent and matches the configuration.
+
+        Args:
+            deployment: Deployment key (see LambdaDeployer._state_key)
+            resource: Resource name (e.g. 'iam_role')
+            config: Configuration the record must have been derived from
+
+        Returns:
+            Recorded values, or None
+        """
+        with self._lock:
+            entry = self._load()["deployments"].get(deployment, {}).get(resource)
+        if not isinstance(entry, dict):
+            return None
+        if time.time() - entry.get("recorded_at", 0) > self.ttl:
+            return None
+        if config is not None and entry.get("config_hash") != config_hash(config):
+            return None
+        return dict(entry.get("value") or {})
+
+    def put(
+        self, deployment: str, resource: str, value: Dict[str, Any], config: Any = None
+    ) -> None:
+        """Record a resource.
+
+        Args:
+            deployment: Deployment key
+            resource: Resource name
+            value: Values to remember (ARNs, IDs, digests)
+            config: Configuration the resource was derived from
+        """
+        with self._lock:
+            resources = self._load()["deployments"].setdefault(deployment, {})
+            resources[resource] = {
+                "value": value,
+                "config_hash": config_hash(config) if config is not None else None,
+                "recorded_at": time.time(),
+            }
+            self._dirty = True
+
+    def forget(self, deployment: str, resource: Optional[str] = None) -> None:
+        """Drop one record, or every record of a deployment.
+
+        Args:
+            deployment: Deployment key
+            resource: Resource name (default: all resources)
+        """
+        with self._lock:
+            deployments = self._load()["deployments"]
+            if resource is None:
+                removed = deployments.pop(deployment, None) is not None
+            else:
+                removed = deployments.get(deployment, {}).pop(resource, None) is not None
+            self._dirty = self._dirty or removed
+
+    def save(self) -> None:
+        """Write the state if it changed. Failures are logged, not raised."""
+        with self._lock:
+            if not self._dirty or self._data is None:
+                return
+            body = json.dumps(self._data, indent=2, sort_keys=True).encode("utf-8")
+            try:
+                if self.s3_uri:
+                    bucket, key = _parse_s3_uri(self.s3_uri)
+                    client = self._s3_client() if self._s3_client else None
+                    if client is None:
+                        raise DeploymentStateError(
+                            "An S3 client is required for S3 deployment state"
+                        )
+                    client.put_object(
+                        Bucket=bucket,
+                        Key=key,
+                        Body=body,
+                        ContentType="application/json",
+                        ServerSideEncryption="AES256",
+                    )
+                else:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=".tmp-")
+                    try:
+                        with os.fdopen(fd, "wb") as f:
+                            f.write(body)
+                        os.replace(tmp_path, self.path)
+                    except BaseException:
+                        os.unlink(tmp_path)
+                        raise
+                self._dirty = False
+                logger.debug(f"Saved deployment state to {self.s3_uri or self.path}")
+            except Exception as e:
+                logger.warning(f"Could not save deployment state: {e}")
@@ -0,0 +1,196 @@
+"""Polling and retrying with jittered exponential backoff.
+
+AWS resources become usable some time after the call that creates them: an
+IAM role can be assumed by Lambda only once it has propagated, an EFS access
+point must become available and a function must finish updating. Instead of
+sleeping for a fixed time, these helpers check early and back off
+exponentially up to a deadline, with jitter so concurrent waits do not poll
+in lockstep.
+
+Every wait is recorded (what was waited for, how long and how many
+attempts it took) so the real propagation latency is visible.
+"""
+
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_INITIAL_DELAY = 0.5
+DEFAULT_MAX_DELAY = 10.0
+BACKOFF_FACTOR = 2.0
+
+# Each delay is shortened by up to this fraction at random
+JITTER = 0.5
+
+
+class WaitTimeoutError(Exception):
+    """Exception raised when a condition is not met before the deadline."""
+
+    pass
+
+
+def backoff_delays(
+    initial: float = DEFAULT_INITIAL_DELAY,
+    maximum: float = DEFAULT_MAX_DELAY,
+    factor: float = BACKOFF_FACTOR,
+) -> Iterator[float]:
+    """Generate jittered, exponentially growing delays.
+
+    Args:
+        initial: First delay in seconds (before jitter)
+        maximum: Largest delay in seconds
+        factor: Growth per attempt
+
+    Yields:
+        Seconds to sleep before the next attempt
+    """
+    delay = initial
+    while True:
+        yield delay * random.uniform(1 - JITTER, 1)
+        delay = min(delay * factor, maximum)
+
+
+def _record(
+    stats: Optional[List[Dict[str, Any]]],
+    description: str,
+    start: float,
+    attempts: int,
+    success: bool,
+) -> None:
+    seconds = time.monotonic() - start
+    if stats is not None:
+        stats.append(
+            {"name": description, "seconds": seconds, "attempts": attempts, "success": success}
+        )
+    if success and attempts > 1:
+        logger.info(f"✓ {description} after {seconds:.1f}s ({attempts} attempts)")
+    else:
+        logger.debug(f"{description}: {seconds:.1f}s, {attempts} attempt(s), success={success}")
+
+
+def _poll(
+    attempt: Callable[[], Tuple[bool, Any]],
+    description: str,
+    timeout: float,
+    initial_delay: float,
+    max_delay: float,
+    stats: Optional[List[Dict[str, Any]]],
+) -> Any:
+    start = time.monotonic()
+    deadline = start + timeout
+    delays = backoff_delays(initial_delay, max_delay)
+    attempts = 0
+
+    while True:
+        attempts += 1
+        try:
+            done, value = attempt()
+        except Exception:
+            _record(stats, description, start, attempts, False)
+            raise
+        if done:
+            _record(stats, description, start, attempts, True)
+            return value
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _record(stats, description, start, attempts, False)
+            raise WaitTimeoutError(f"Timed out after {timeout:.0f}s waiting for {description}")
+        time.sleep(min(next(delays), remaining))
+
+
+def wait_until(
+    check: Callable[[], Any],
+    description: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    initial_delay: float = DEFAULT_INITIAL_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    stats: Optional[List[Dict[str, Any]]] = None,
+) -> Any:
+    """Poll until a check returns a truthy value.
+
+    Args:
+        check: Called on every attempt; exceptions are not caught
+        description: What is waited for (for logs and stats)
+        timeout: Seconds until giving up
+        initial_delay: Seconds before the second attempt
+        max_delay: Longest pause between attempts
+        stats: List to append a record of the wait to
+
+    Returns:
+        The check's first truthy result
+
+    Raises:
+        WaitTimeoutError: If the deadline passes first
+    """
+
+    def attempt() -> Tuple[bool, Any]:
+        value = check()
+        return bool(value), value
+
+    return _poll(attempt, description, timeout, initial_delay, max_delay, stats)
+
+
+def retry(
+    func: Callable[[], Any],
+    retryable: Callable[[Exception], bool],
+    description: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    initial_delay: float = DEFAULT_INITIAL_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    stats: Optional[List[Dict[str, Any]]] = None,
+) -> Any:
+    """Call a function until it stops raising a retryable error.
+
+    Args:
+        func: Function to call
+        retryable: Whether an exception means "not yet" rather than failure
+        description: What is waited for (for logs and stats)
+        timeout: Seconds until giving up
+        initial_delay: Seconds before the second attempt
+        max_delay: Longest pause between attempts
+        stats: List to append a record of the wait to
+
+    Returns:
+        The function's result
+
+    Raises:
+        Exception: A non-retryable error, or the last retryable one once the
+            deadline has passed
+    """
+    errors: List[Exception] = []
+
+    def attempt() -> Tuple[bool, Any]:
+        try:
+            return True, func()
+        except Exception as e:
+            if not retryable(e):
+                raise
+            logger.debug(f"Waiting for {description}: {e}")
+            errors.append(e)
+            return False, None
+
+    try:
+        return _poll(attempt, description, timeout, initial_delay, max_delay, stats)
+    except WaitTimeoutError:
+        raise errors[-1]
+
+
+def format_waits(stats: List[Dict[str, Any]]) -> str:
+    """Format recorded waits for the terminal.
+
+    Args:
+        stats: Records appended by wait_until and retry
+
+    Returns:
+        One line per wait
+    """
+    return "\n".join(
+        f"  {wait['name']}: {wait['seconds']:.1f}s, {wait['attempts']} attempt(s)"
+        + ("" if wait["success"] else " (gave up)")
+        for wait in stats
+    )
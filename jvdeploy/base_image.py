@@ -0,0 +1,193 @@
+"""Base image digest pinning and pull-through cache paths for generated Dockerfiles.
+
+Rewrites ``FROM image:tag`` to ``FROM image:tag@sha256:...`` so every build
+of a generated Dockerfile starts from the same base layers. Resolutions are
+cached on disk; an existing pin is only moved by ``jvdeploy base update``.
+Base images on ``public.ecr.aws`` can also be redirected to an ECR
+pull-through cache in the build's own account and region.
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import Optional, Tuple
+
+from jvdeploy.cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_ECR_REGISTRY = "public.ecr.aws"
+
+# How long a tag-to-digest resolution is reused for newly generated Dockerfiles
+BASE_DIGEST_TTL = 24 * 3600
+
+_FROM_LINE = re.compile(r"^(\s*FROM\s+(?:--\S+\s+)*)(\S+)(.*)$", re.IGNORECASE | re.MULTILINE)
+
+
+class BaseImageError(Exception):
+    """Exception raised when a base image cannot be resolved."""
+
+    pass
+
+
+def find_base_image(dockerfile_content: str) -> Optional[str]:
+    """Get the image reference of the first FROM instruction.
+
+    Args:
+        dockerfile_content: Dockerfile content
+
+    Returns:
+        Image reference as written (possibly with a digest), or None
+    """
+    match = _FROM_LINE.search(dockerfile_content)
+    return match.group(2) if match else None
+
+
+def split_digest(reference: str) -> Tuple[str, Optional[str]]:
+    """Split 'image:tag@sha256:...' into ('image:tag', 'sha256:...')."""
+    name, _, digest = reference.partition("@")
+    return name, digest or None
+
+
+def resolve_base_digest(reference: str, refresh: bool = False) -> str:
+    """Resolve a base image tag to its manifest digest.
+
+    Args:
+        reference: Image reference without digest (e.g., 'public.ecr.aws/org/app:latest')
+        refresh: If True, ignore the cached resolution
+
+    Returns:
+        Manifest digest (sha256:...)
+
+    Raises:
+        BaseImageError: If the registry cannot be queried
+    """
+    from jvdeploy.registry import RegistryClient, RegistryError, parse_reference
+
+    cache = JsonCache("base-images")
+    if not refresh:
+        cached = cache.get(reference)
+        if cached:
+            logger.debug(f"Using cached digest for {reference}: {cached}")
+            return str(cached)
+
+    registry, repository, tag = parse_reference(reference)
+    try:
+        digest = RegistryClient(registry).resolve_digest(repository, tag)
+    except RegistryError as e:
+        raise BaseImageError(f"Cannot resolve base image {reference}: {e}") from e
+
+    cache.set(reference, digest, ttl=BASE_DIGEST_TTL)
+    logger.info(f"Resolved {reference} to {digest}")
+    return digest
+
+
+def pin_base_image(
+    dockerfile_content: str, previous_content: Optional[str] = None, refresh: bool = False
+) -> str:
+    """Pin the first FROM instruction to a digest.
+
+    References that already carry a digest are left alone. If the
+    previously generated Dockerfile pinned the same image, its digest is
+    kept so regenerating does not move the base.
+
+    Args:
+        dockerfile_content: Dockerfile content
+        previous_content: Content of the Dockerfile being replaced (optional)
+        refresh: If True, resolve the tag again instead of reusing a pin or cache
+
+    Returns:
+        Dockerfile content with a pinned FROM line
+
+    Raises:
+        BaseImageError: If the base image cannot be resolved
+    """
+    match = _FROM_LINE.search(dockerfile_content)
+    if not match:
+        return dockerfile_content
+
+    reference, digest = split_digest(match.group(2))
+    if digest and not refresh:
+        return dockerfile_content
+
+    digest = None
+    if previous_content and not refresh:
+        previous_reference, previous_digest = split_digest(find_base_image(previous_content) or "")
+        if previous_reference == reference:
+            digest = previous_digest
+
+    if digest is None:
+        digest = resolve_base_digest(reference, refresh=refresh)
+
+    start, end = match.span(2)
+    return dockerfile_content[:start] + f"{reference}@{digest}" + dockerfile_content[end:]
+
+
+def update_base_pin(
+    dockerfile_path: Path, pull_through_cache: Optional[str] = None
+) -> Tuple[Optional[str], str]:
+    """Move the base image pin of a Dockerfile to the tag's current digest.
+
+    Args:
+        dockerfile_path: Path to the generated Dockerfile
+        pull_through_cache: Pull-through cache path the FROM line uses, if any
+            (the tag is resolved on the upstream registry)
+
+    Returns:
+        Tuple of (previous digest or None, new digest)
+
+    Raises:
+        BaseImageError: If the Dockerfile has no FROM line or the tag cannot be resolved
+    """
+    content = dockerfile_path.read_text()
+    current = find_base_image(content)
+    if current is None:
+        raise BaseImageError(f"No FROM instruction in {dockerfile_path}")
+
+    _, previous_digest = split_digest(current)
+    if pull_through_cache:
+        upstream = from_pull_through_cache(content, pull_through_cache)
+        updated = use_pull_through_cache(pin_base_image(upstream, refresh=True), pull_through_cache)
+    else:
+        updated = pin_base_image(content, refresh=True)
+    _, new_digest = split_digest(find_base_image(updated) or "")
+    if updated != content:
+        dockerfile_path.write_text(updated)
+    return previous_digest, str(new_digest)
+
+
+def _replace_registry_prefix(dockerfile_content: str, old_prefix: str, new_prefix: str) -> str:
+    """Swap the registry prefix of the first FROM reference if it matches."""
+    match = _FROM_LINE.search(dockerfile_content)
+    if not match or not match.group(2).startswith(old_prefix.rstrip("/") + "/"):
+        return dockerfile_content
+
+    reference = new_prefix.rstrip("/") + match.group(2)[len(old_prefix.rstrip("/")) :]
+    start, end = match.span(2)
+    return dockerfile_content[:start] + reference + dockerfile_content[end:]
+
+
+def use_pull_through_cache(
+    dockerfile_content: str, cache_uri: str, upstream: str = PUBLIC_ECR_REGISTRY
+) -> str:
+    """Point a base image on an upstream registry at an ECR pull-through cache.
+
+    Tags and digests are kept: the cache serves identical manifests.
+
+    Args:
+        dockerfile_content: Dockerfile content
+        cache_uri: Pull-through cache path (e.g.,
+            '123456789012.dkr.ecr.us-east-1.amazonaws.com/ecr-public')
+        upstream: Upstream registry the cache rule mirrors
+
+    Returns:
+        Dockerfile content; unchanged if the base image is not on the upstream registry
+    """
+    return _replace_registry_prefix(dockerfile_content, upstream, cache_uri)
+
+
+def from_pull_through_cache(
+    dockerfile_content: str, cache_uri: str, upstream: str = PUBLIC_ECR_REGISTRY
+) -> str:
+    """Undo use_pull_through_cache (see there for arguments)."""
+    return _replace_registry_prefix(dockerfile_content, cache_uri, upstream)
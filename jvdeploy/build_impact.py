@@ -0,0 +1,352 @@
+"""Build impact preview for generated Dockerfiles.
+
+Records a fingerprint of the build context and Dockerfile after every
+successful build, together with how long each step took. Comparing the
+current tree against it predicts which steps Docker's layer cache will
+rebuild and why, without sending the context to Docker. The context is
+fingerprinted with the Merkle hasher, which only re-reads files whose
+metadata changed since the last run.
+"""
+
+import fnmatch
+import hashlib
+import logging
+import re
+import shlex
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from jvdeploy.cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_CACHE = "build-fingerprints"
+
+# Changed files listed per step
+MAX_LISTED_FILES = 10
+
+# Context-relative path to Merkle leaf hash
+ContextFiles = Dict[str, str]
+
+_STEP_HEADER = re.compile(r"^#(\d+) \[[^\]]*\d+/\d+\] (.+)$")
+_STEP_DONE = re.compile(r"^#(\d+) DONE (\d+(?:\.\d+)?)s$")
+
+
+def _normalize(instruction: str) -> str:
+    """Collapse whitespace so Dockerfile text and BuildKit output compare equal."""
+    return " ".join(instruction.split())
+
+
+def parse_dockerfile(content: str) -> List[str]:
+    """Split a Dockerfile into instructions.
+
+    Continuation lines are joined and comments and blank lines dropped.
+
+    Args:
+        content: Dockerfile content
+
+    Returns:
+        Instructions in order, whitespace-normalized
+    """
+    instructions: List[str] = []
+    current = ""
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith("#")):
+            continue
+        if stripped.endswith("\\"):
+            current += stripped[:-1] + " "
+            continue
+        instructions.append(_normalize(current + stripped))
+        current = ""
+    if current.strip():
+        instructions.append(_normalize(current))
+    return instructions
+
+
+def copy_sources(instruction: str) -> Optional[List[str]]:
+    """Get the context sources of a COPY or ADD instruction.
+
+    Args:
+        instruction: Dockerfile instruction
+
+    Returns:
+        Source paths relative to the context, or None if the instruction does
+        not read the build context (other instructions, ``--from`` copies)
+    """
+    keyword, _, rest = instruction.partition(" ")
+    if keyword.upper() not in ("COPY", "ADD"):
+        return None
+
+    try:
+        args = shlex.split(rest)
+    except ValueError:
+        args = rest.split()
+    if any(arg.startswith("--from") for arg in args):
+        return None
+
+    paths = [arg for arg in args if not arg.startswith("--")]
+    sources = []
+    for source in paths[:-1]:
+        while source.startswith("./"):
+            source = source[2:]
+        sources.append(source.strip("/") or ".")
+    return sources
+
+
+def _source_matches(rel_path: str, source: str) -> bool:
+    """Check whether a COPY source (file, directory or glob) includes a context file."""
+    if source == ".":
+        return True
+    parts = rel_path.split("/")
+    for i in range(1, len(parts) + 1):
+        candidate = "/".join(parts[:i])
+        if candidate == source or fnmatch.fnmatchcase(candidate, source):
+            return True
+    return False
+
+
+def scan_context(app_root: Path) -> Dict[str, Any]:
+    """Fingerprint the build context.
+
+    Args:
+        app_root: Build context root
+
+    Returns:
+        Merkle tree of the context (see merkle.hash_context)
+    """
+    from jvdeploy.merkle import hash_context
+
+    return hash_context(app_root)
+
+
+def build_fingerprint(app_root: Path, dockerfile_content: str) -> str:
+    """Get one hash identifying a build's inputs (context and Dockerfile).
+
+    Two builds with the same fingerprint produce the same layers from the
+    same base image, so callers can skip a build or deploy when it is unchanged.
+
+    Args:
+        app_root: Build context root
+        dockerfile_content: Dockerfile that will be built
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(scan_context(app_root)["root"].encode("ascii"))
+    for instruction in parse_dockerfile(dockerfile_content):
+        digest.update(b"\n" + instruction.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def parse_buildkit_timings(output: str) -> Dict[str, float]:
+    """Extract per-step durations from ``docker buildx build --progress=plain`` output.
+
+    Cached steps are skipped; their recorded timing stays valid.
+
+    Args:
+        output: Build output
+
+    Returns:
+        Dictionary mapping normalized instruction to seconds
+    """
+    steps: Dict[str, str] = {}
+    timings: Dict[str, float] = {}
+    for line in output.splitlines():
+        line = line.strip()
+        header = _STEP_HEADER.match(line)
+        if header:
+            steps[header.group(1)] = _normalize(header.group(2))
+            continue
+        done = _STEP_DONE.match(line)
+        if done and done.group(1) in steps:
+            timings[steps[done.group(1)]] = float(done.group(2))
+    return timings
+
+
+def _fingerprint_key(app_root: Path) -> str:
+    return str(Path(app_root).resolve())
+
+
+def record_build(
+    app_root: Path, dockerfile_content: str, timings: Optional[Dict[str, float]] = None
+) -> None:
+    """Record the fingerprint of a successful build.
+
+    Args:
+        app_root: Build context root
+        dockerfile_content: Dockerfile the image was built from
+        timings: Step durations from this build (merged with earlier ones)
+    """
+    cache = JsonCache(FINGERPRINT_CACHE)
+    key = _fingerprint_key(app_root)
+    previous = cache.get(key) or {}
+
+    merged = dict(previous.get("timings") or {})
+    merged.update(timings or {})
+    instructions = parse_dockerfile(dockerfile_content)
+    tree = scan_context(app_root)
+    cache.set(
+        key,
+        {
+            "instructions": instructions,
+            "root": tree["root"],
+            "files": tree["files"],
+            # Forget timings of steps that no longer exist
+            "timings": {k: v for k, v in merged.items() if k in instructions},
+        },
+    )
+
+
+def _changed_files(
+    sources: List[str], old: ContextFiles, new: ContextFiles
+) -> Tuple[List[str], List[str], List[str]]:
+    """Compare the files a COPY reads between two context scans."""
+
+    def selected(files: ContextFiles) -> ContextFiles:
+        return {
+            path: signature
+            for path, signature in files.items()
+            if any(_source_matches(path, source) for source in sources)
+        }
+
+    before, after = selected(old), selected(new)
+    added = sorted(set(after) - set(before))
+    removed = sorted(set(before) - set(after))
+    modified = sorted(p for p in set(before) & set(after) if before[p] != after[p])
+    return added, modified, removed
+
+
+def _instruction_reason(instruction: str, install_commands: Dict[str, str]) -> str:
+    """Describe why a changed instruction changed."""
+    from jvdeploy.image.analyze import attribute_instruction
+
+    action = attribute_instruction(instruction, install_commands)
+    if action and action in install_commands:
+        return f"dependencies of {action} changed (info.yaml)"
+    if instruction.upper().startswith("FROM "):
+        return "base image changed"
+    return "instruction changed"
+
+
+def explain_build(app_root: Path, dockerfile_content: str) -> Dict[str, Any]:
+    """Predict which steps a build will rebuild.
+
+    Args:
+        app_root: Build context root
+        dockerfile_content: Dockerfile that will be built
+
+    Returns:
+        Dictionary with 'recorded' (whether a previous build was found),
+        'steps' (each with 'index', 'instruction', 'rebuild', 'reasons',
+        'changed_files' and recorded 'seconds' or None), 'first_rebuilt'
+        (index or None), 'estimated_seconds' and 'untimed' (rebuilt steps
+        without a recorded timing)
+    """
+    from jvdeploy.dockerfile_generator import (
+        action_install_commands,
+        discover_action_dependencies,
+    )
+
+    app_root = Path(app_root)
+    previous = JsonCache(FINGERPRINT_CACHE).get(_fingerprint_key(app_root))
+    instructions = parse_dockerfile(dockerfile_content)
+    timings: Dict[str, float] = (previous or {}).get("timings") or {}
+    install_commands = action_install_commands(discover_action_dependencies(app_root))
+
+    tree = scan_context(app_root) if previous else {"root": None, "files": {}}
+    files: ContextFiles = tree["files"]
+    context_changed = previous is None or previous.get("root") != tree["root"]
+    old_instructions: List[str] = (previous or {}).get("instructions") or []
+    old_files: ContextFiles = (previous or {}).get("files") or {}
+
+    steps = []
+    first_rebuilt: Optional[int] = None
+    for index, instruction in enumerate(instructions):
+        reasons: List[str] = []
+        changed: List[str] = []
+
+        if previous is None:
+            reasons.append("no previous build recorded")
+        elif index >= len(old_instructions) or old_instructions[index] != instruction:
+            reasons.append(_instruction_reason(instruction, install_commands))
+        else:
+            sources = copy_sources(instruction)
+            if sources is not None and context_changed:
+                added, modified, removed = _changed_files(sources, old_files, files)
+                counts = [
+                    f"{len(paths)} {label}"
+                    for paths, label in (
+                        (added, "added"),
+                        (modified, "modified"),
+                        (removed, "removed"),
+                    )
+                    if paths
+                ]
+                if counts:
+                    reasons.append(f"context files changed ({', '.join(counts)})")
+                    changed = (added + modified + removed)[:MAX_LISTED_FILES]
+
+        if reasons and first_rebuilt is None:
+            first_rebuilt = index
+        elif first_rebuilt is not None and not reasons:
+            reasons.append(f"follows rebuilt step {first_rebuilt}")
+
+        steps.append(
+            {
+                "index": index,
+                "instruction": instruction,
+                "rebuild": first_rebuilt is not None,
+                "reasons": reasons,
+                "changed_files": changed,
+                "seconds": timings.get(instruction),
+            }
+        )
+
+    rebuilt = [step for step in steps if step["rebuild"]]
+    return {
+        "recorded": previous is not None,
+        "steps": steps,
+        "first_rebuilt": first_rebuilt,
+        "estimated_seconds": sum(step["seconds"] or 0.0 for step in rebuilt),
+        "untimed": sum(1 for step in rebuilt if step["seconds"] is None),
+    }
+
+
+def format_explanation(report: Dict[str, Any]) -> str:
+    """Format a build impact preview for the terminal.
+
+    Args:
+        report: Result of explain_build
+
+    Returns:
+        Printable report
+    """
+    lines = []
+    if not report["recorded"]:
+        lines.append("No previous build recorded for this app: every step will run")
+    elif report["first_rebuilt"] is None:
+        lines.append("✓ Nothing changed since the last build: every step is cached")
+        return "\n".join(lines)
+
+    for step in report["steps"]:
+        instruction = step["instruction"]
+        if len(instruction) > 90:
+            instruction = instruction[:87] + "..."
+        seconds = f"{step['seconds']:.1f}s" if step["seconds"] is not None else "?"
+        marker = "REBUILD" if step["rebuild"] else "cached "
+        lines.append(f"  [{marker}] {step['index']:>2} {seconds:>8}  {instruction}")
+        for reason in step["reasons"]:
+            if not reason.startswith("follows"):
+                lines.append(f"               ↳ {reason}")
+        for path in step["changed_files"]:
+            lines.append(f"                   {path}")
+
+    rebuilt = sum(1 for step in report["steps"] if step["rebuild"])
+    estimate = f"~{report['estimated_seconds']:.0f}s"
+    if report["untimed"]:
+        estimate += f" (+{report['untimed']} steps without recorded timings)"
+    lines.append("")
+    lines.append(f"Predicted: {rebuilt} of {len(report['steps'])} steps rebuilt, {estimate}")
+    return "\n".join(lines)
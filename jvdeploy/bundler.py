@@ -6,6 +6,7 @@ by extending a base template and including pip dependencies from action info.yam
 
 import logging
 from pathlib import Path
+from typing import Optional
 
 from jvdeploy.dockerfile_generator import generate_dockerfile
 
@@ -15,13 +16,26 @@ logger = logging.getLogger(__name__)
 class Bundler:
     """Generates Dockerfile for jvagent applications."""
 
-    def __init__(self, app_root: str):
+    def __init__(
+        self,
+        app_root: str,
+        slim: bool = False,
+        pin_base: bool = False,
+        pull_through_cache: Optional[str] = None,
+    ):
         """Initialize the bundler.
 
         Args:
             app_root: Path to the jvagent app root directory
+            slim: If True, slim the virtualenv after each pip install
+            pin_base: If True, pin the base image to a digest
+            pull_through_cache: ECR pull-through cache path to pull a public.ecr.aws
+                base image from (e.g., '<account>.dkr.ecr.<region>.amazonaws.com/ecr-public')
         """
         self.app_root = Path(app_root).resolve()
+        self.slim = slim
+        self.pin_base = pin_base
+        self.pull_through_cache = pull_through_cache
 
     def generate_dockerfile(self) -> bool:
         """Generate Dockerfile in the app directory.
@@ -45,10 +59,26 @@ class Bundler:
                 return False
 
             # Generate Dockerfile
-            dockerfile_content = generate_dockerfile(self.app_root, base_template_path)
+            dockerfile_content = generate_dockerfile(
+                self.app_root, base_template_path, slim=self.slim
+            )
 
-            # Write Dockerfile to app directory
             dockerfile_path = self.app_root / "Dockerfile"
+            previous = dockerfile_path.read_text() if dockerfile_path.exists() else None
+            if self.pin_base:
+                from jvdeploy.base_image import from_pull_through_cache, pin_base_image
+
+                if previous and self.pull_through_cache:
+                    previous = from_pull_through_cache(previous, self.pull_through_cache)
+                dockerfile_content = pin_base_image(dockerfile_content, previous)
+            if self.pull_through_cache:
+                from jvdeploy.base_image import use_pull_through_cache
+
+                dockerfile_content = use_pull_through_cache(
+                    dockerfile_content, self.pull_through_cache
+                )
+
+            # Write Dockerfile to app directory
             dockerfile_path.write_text(dockerfile_content)
 
             logger.info(f"Dockerfile generated successfully: {dockerfile_path}")
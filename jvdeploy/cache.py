@@ -0,0 +1,143 @@
+"""Local on-disk cache for jvdeploy.
+
+Provides small JSON key/value stores with per-entry expiry, kept under the
+user cache directory so repeated deploys can skip slow lookups.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def cache_dir() -> Path:
+    """Get the jvdeploy cache directory.
+
+    Resolution order: $JVDEPLOY_CACHE_DIR, $XDG_CACHE_HOME/jvdeploy, ~/.cache/jvdeploy.
+
+    Returns:
+        Path to the cache directory (not necessarily existing yet)
+    """
+    override = os.environ.get("JVDEPLOY_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg).expanduser() if xdg else Path.home() / ".cache"
+    return base / "jvdeploy"
+
+
+class JsonCache:
+    """A named JSON key/value store with optional expiry per entry.
+
+    Entries are written atomically and the file is only readable by the
+    current user, since some entries (registry tokens) are secrets.
+    """
+
+    def __init__(self, name: str, directory: Optional[Path] = None):
+        """Initialize cache.
+
+        Args:
+            name: Cache name, used as the file name
+            directory: Cache directory (default: cache_dir())
+        """
+        self.path = (directory or cache_dir()) / f"{name}.json"
+        with _locks_guard:
+            self._lock = _locks.setdefault(str(self.path), threading.Lock())
+
+    def _read(self) -> Dict[str, Any]:
+        """Read all entries, treating a missing or corrupt file as empty."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable cache {self.path}: {e}")
+            return {}
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """Atomically replace the cache file."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=".tmp-")
+            try:
+                os.chmod(tmp_path, 0o600)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.debug(f"Could not write cache {self.path}: {e}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value if present and not expired.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            Cached value, or None
+        """
+        entry = self._read().get(key)
+        if not isinstance(entry, dict):
+            return None
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            return None
+
+        return entry.get("value")
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Store a value.
+
+        Args:
+            key: Entry key
+            value: JSON-serializable value
+            ttl: Lifetime in seconds (optional)
+            expires_at: Absolute expiry as a Unix timestamp (optional, overrides ttl)
+        """
+        if expires_at is None and ttl is not None:
+            expires_at = time.time() + ttl
+
+        with self._lock:
+            data = self._read()
+            now = time.time()
+            # Drop expired entries while we are rewriting the file anyway
+            data = {
+                k: v
+                for k, v in data.items()
+                if not (isinstance(v, dict) and (v.get("expires_at") or now + 1) <= now)
+            }
+            data[key] = {"value": value, "expires_at": expires_at, "updated_at": now}
+            self._write(data)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present.
+
+        Args:
+            key: Entry key
+        """
+        with self._lock:
+            data = self._read()
+            if data.pop(key, None) is not None:
+                self._write(data)
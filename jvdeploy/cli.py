@@ -8,9 +8,10 @@ import logging
 import os
 import sys
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 from jvdeploy import Bundler
-from jvdeploy.config import DeployConfig, DeployConfigError
+from jvdeploy.config import LAMBDA_PLATFORMS, DeployConfig, DeployConfigError
 
 # Configure logging
 logging.basicConfig(
@@ -56,6 +57,123 @@ def setup_argparse() -> argparse.ArgumentParser:
         default=os.getcwd(),
         help="Path to jvagent app root directory (default: current directory)",
     )
+    generate_parser.add_argument(
+        "--slim",
+        action="store_true",
+        help="Slim /opt/venv after each pip install (removes tests, strips shared objects)",
+    )
+    generate_parser.add_argument(
+        "--pin-base",
+        action="store_true",
+        help="Pin the base image to a digest (kept across regenerations, see 'base update')",
+    )
+    generate_parser.add_argument(
+        "--pull-through-cache",
+        metavar="URI",
+        help="Pull a public.ecr.aws base image through this ECR pull-through cache "
+        "(e.g., 123456789012.dkr.ecr.us-east-1.amazonaws.com/ecr-public)",
+    )
+
+    # base command
+    base_parser = subparsers.add_parser(
+        "base",
+        help="Manage the base image pin of the generated Dockerfile",
+    )
+    base_subparsers = base_parser.add_subparsers(dest="base_action", help="Base image action")
+    base_update_parser = base_subparsers.add_parser(
+        "update",
+        help="Pin the Dockerfile's base image to the current digest of its tag",
+    )
+    base_update_parser.add_argument(
+        "app_root",
+        nargs="?",
+        default=os.getcwd(),
+        help="Path to jvagent app root directory (default: current directory)",
+    )
+    base_update_parser.add_argument(
+        "--pull-through-cache",
+        metavar="URI",
+        help="ECR pull-through cache the Dockerfile's FROM line uses, if any",
+    )
+
+    # build command
+    build_parser = subparsers.add_parser(
+        "build",
+        help="Build the Docker image locally, or preview which layers a build would rebuild",
+    )
+    build_parser.add_argument(
+        "app_root",
+        nargs="?",
+        default=os.getcwd(),
+        help="Path to jvagent app root directory (default: current directory)",
+    )
+    build_parser.add_argument(
+        "--config",
+        default="deploy.yaml",
+        help="Config file path for image settings (default: deploy.yaml)",
+    )
+    build_parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Predict rebuilt layers, their causes and build time without building",
+    )
+    build_parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="Print a hash of the build inputs (context and Dockerfile) without building",
+    )
+    build_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Build without the Docker layer cache",
+    )
+    build_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output the --explain report as JSON",
+    )
+
+    # slim command
+    slim_parser = subparsers.add_parser(
+        "slim",
+        help="Remove tests and build leftovers from a virtualenv and strip shared objects",
+    )
+    slim_parser.add_argument(
+        "path",
+        nargs="?",
+        default="/opt/venv",
+        help="Virtualenv to slim (default: /opt/venv)",
+    )
+    slim_parser.add_argument(
+        "--keep-tests",
+        action="store_true",
+        help="Keep test suites inside installed packages",
+    )
+    slim_parser.add_argument(
+        "--no-strip",
+        action="store_true",
+        help="Do not strip debug symbols from shared objects",
+    )
+    slim_parser.add_argument(
+        "--remove-bytecode",
+        action="store_true",
+        help="Also remove __pycache__ (slower cold starts on read-only filesystems)",
+    )
+    slim_parser.add_argument(
+        "--remove-records",
+        action="store_true",
+        help="Also remove .dist-info/RECORD files (pip can no longer uninstall packages)",
+    )
+    slim_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be removed without changing anything",
+    )
+    slim_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not print the size report",
+    )
 
     # pip-get-packages command
     pip_get_packages_parser = subparsers.add_parser(
@@ -170,6 +288,19 @@ def setup_argparse() -> argparse.ArgumentParser:
         "--builder",
         help="Docker BuildKit builder to use",
     )
+    lambda_parser.add_argument(
+        "--architecture",
+        choices=["x86_64", "arm64"],
+        help="Override function architecture (builds the image for it and switches the function)",
+    )
+    lambda_parser.add_argument(
+        "--prewarm",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Initialize N execution environments with concurrent requests before traffic "
+        "switches to the new version",
+    )
     lambda_parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -236,6 +367,66 @@ def setup_argparse() -> argparse.ArgumentParser:
         help="Show manifests without applying",
     )
 
+    # Plan / apply commands (desired-state Lambda updates)
+    plan_parser = subparsers.add_parser(
+        "plan",
+        help="Show the changes an apply would make",
+    )
+    plan_subparsers = plan_parser.add_subparsers(dest="platform", help="Deployment platform")
+    apply_parser = subparsers.add_parser(
+        "apply",
+        help="Apply only the changes between deploy.yaml and the live deployment",
+    )
+    apply_subparsers = apply_parser.add_subparsers(dest="platform", help="Deployment platform")
+
+    plan_lambda_parser = plan_subparsers.add_parser(
+        "lambda",
+        help="Diff deploy.yaml against the live Lambda deployment",
+    )
+    apply_lambda_parser = apply_subparsers.add_parser(
+        "lambda",
+        help="Update the Lambda deployment to match deploy.yaml",
+    )
+    for target_parser in (plan_lambda_parser, apply_lambda_parser):
+        target_parser.add_argument(
+            "app_root",
+            nargs="?",
+            default=os.getcwd(),
+            help="Path to jvagent app root directory (default: current directory)",
+        )
+        target_parser.add_argument(
+            "--config",
+            default="deploy.yaml",
+            help="Config file path (default: deploy.yaml)",
+        )
+        target_parser.add_argument(
+            "--region",
+            help="Override AWS region",
+        )
+        target_parser.add_argument(
+            "--function",
+            help="Override Lambda function name",
+        )
+        target_parser.add_argument(
+            "--env",
+            action="append",
+            help="Override environment variables (KEY=VALUE)",
+        )
+        target_parser.add_argument(
+            "--image",
+            help="Image URI the function should run (default: image from deploy.yaml)",
+        )
+    plan_lambda_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output the plan as JSON (environment variable values are masked)",
+    )
+    apply_lambda_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show the plan without applying it",
+    )
+
     # Status command
     status_parser = subparsers.add_parser(
         "status",
@@ -447,6 +638,127 @@ def setup_argparse() -> argparse.ArgumentParser:
         help="Skip confirmation prompt",
     )
 
+    # Image command
+    image_parser = subparsers.add_parser(
+        "image",
+        help="Inspect built images",
+    )
+    image_subparsers = image_parser.add_subparsers(dest="image_action", help="Image action")
+
+    # Image compression
+    image_compression_parser = image_subparsers.add_parser(
+        "compression",
+        help="Compare layer size and compression time for gzip, zstd and estargz",
+    )
+    image_compression_parser.add_argument(
+        "image",
+        help="Local image reference or 'docker save' tarball",
+    )
+    image_compression_parser.add_argument(
+        "--level",
+        action="append",
+        metavar="CODEC=LEVEL",
+        help="Compression level for a codec (repeatable, e.g. --level zstd=9)",
+    )
+    image_compression_parser.add_argument(
+        "--codec",
+        action="append",
+        choices=["gzip", "zstd", "estargz"],
+        help="Codec to measure (repeatable, default: all available)",
+    )
+
+    # Image analyze
+    image_analyze_parser = image_subparsers.add_parser(
+        "analyze",
+        help="Attribute image size to layers, Dockerfile instructions and actions",
+    )
+    image_analyze_parser.add_argument(
+        "image",
+        help="Local image reference or 'docker save' tarball",
+    )
+    image_analyze_parser.add_argument(
+        "--app-root",
+        default=os.getcwd(),
+        help="jvagent app root used to map layers to actions (default: current directory)",
+    )
+    image_analyze_parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Largest directories and files to show per layer (default: 5)",
+    )
+    image_analyze_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output as JSON",
+    )
+
+    # Image diff
+    image_diff_parser = image_subparsers.add_parser(
+        "diff",
+        help="Compare layers and files of two builds",
+    )
+    image_diff_parser.add_argument(
+        "old",
+        help="Previous build: local image, 'docker save' tarball, or registry:<reference>",
+    )
+    image_diff_parser.add_argument(
+        "new",
+        help="New build: local image, 'docker save' tarball, or registry:<reference>",
+    )
+    image_diff_parser.add_argument(
+        "--app-root",
+        default=os.getcwd(),
+        help="jvagent app root used to map layers to actions (default: current directory)",
+    )
+    image_diff_parser.add_argument(
+        "--platform",
+        default="linux/amd64",
+        help="Platform to compare for registry manifest lists (default: linux/amd64)",
+    )
+    image_diff_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Output as JSON",
+    )
+
+    # Image push
+    image_push_parser = image_subparsers.add_parser(
+        "push",
+        help="Push an image through the registry API (parallel, chunked, resumable)",
+    )
+    image_push_parser.add_argument(
+        "image",
+        help="Local image reference or 'docker save' tarball",
+    )
+    image_push_parser.add_argument(
+        "target",
+        help="Target image URI (e.g. 123456789012.dkr.ecr.us-east-1.amazonaws.com/app:1.0)",
+    )
+    image_push_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Layers uploaded at the same time (default: 4)",
+    )
+    image_push_parser.add_argument(
+        "--chunk-mb",
+        type=int,
+        default=16,
+        help="Upload request size in MB (default: 16)",
+    )
+    image_push_parser.add_argument(
+        "--mount-from",
+        action="append",
+        metavar="REPOSITORY",
+        help="Repository on the target registry to mount existing layers from (repeatable)",
+    )
+    image_push_parser.add_argument(
+        "--insecure",
+        action="store_true",
+        help="Use plain HTTP without credentials (local test registries)",
+    )
+
     # Env command
     env_parser = subparsers.add_parser(
         "env",
@@ -567,7 +879,12 @@ def handle_generate(args: argparse.Namespace) -> int:
         return 1
 
     logger.info(f"Initializing bundler for app: {app_root}")
-    bundler = Bundler(app_root=str(app_root))
+    bundler = Bundler(
+        app_root=str(app_root),
+        slim=getattr(args, "slim", False),
+        pin_base=getattr(args, "pin_base", False),
+        pull_through_cache=getattr(args, "pull_through_cache", None),
+    )
 
     success = bundler.generate_dockerfile()
 
@@ -579,6 +896,149 @@ def handle_generate(args: argparse.Namespace) -> int:
     return 0
 
 
+def handle_base(args: argparse.Namespace) -> int:
+    """Handle base command."""
+    from jvdeploy.base_image import BaseImageError, update_base_pin
+
+    if args.base_action != "update":
+        logger.error("Error: Please specify a base action (update)")
+        return 1
+
+    dockerfile_path = Path(args.app_root).expanduser().resolve() / "Dockerfile"
+    if not dockerfile_path.exists():
+        logger.error(f"Error: {dockerfile_path} not found. Run 'jvdeploy generate' first")
+        return 1
+
+    try:
+        previous, digest = update_base_pin(dockerfile_path, args.pull_through_cache)
+    except BaseImageError as e:
+        logger.error(f"Error: {e}")
+        return 1
+
+    if previous == digest:
+        print(f"✓ Base image already pinned to the current digest: {digest}")
+    else:
+        print(f"✓ Base image pin updated: {previous or 'unpinned'} -> {digest}")
+    return 0
+
+
+def _check_base_pin(dockerfile_path: Path) -> None:
+    """Warn when image.build.pin_base is set but an existing Dockerfile's base is not pinned.
+
+    pin_base is applied when a Dockerfile is generated; an existing one is
+    built as it is.
+    """
+    from jvdeploy.base_image import find_base_image, split_digest
+
+    try:
+        reference = find_base_image(dockerfile_path.read_text())
+    except OSError:
+        return
+    if reference and split_digest(reference)[1] is None:
+        logger.warning(
+            f"image.build.pin_base is set, but the Dockerfile's base image {reference} is not "
+            "pinned to a digest; run 'jvdeploy base update' to pin it"
+        )
+
+
+def handle_build(args: argparse.Namespace) -> int:
+    """Handle build command."""
+    import json
+
+    from jvdeploy.docker_builder import DockerBuilder, DockerBuilderError
+
+    app_root = Path(args.app_root).expanduser().resolve()
+    if not app_root.is_dir():
+        logger.error(f"Error: Path '{args.app_root}' does not exist or is not a directory")
+        return 1
+
+    dockerfile_path = app_root / "Dockerfile"
+
+    if args.explain or args.fingerprint:
+        from jvdeploy.build_impact import (
+            build_fingerprint,
+            explain_build,
+            format_explanation,
+        )
+        from jvdeploy.dockerfile_generator import generate_dockerfile
+
+        if dockerfile_path.exists():
+            content = dockerfile_path.read_text()
+        else:
+            content = generate_dockerfile(app_root, Path(__file__).parent / "Dockerfile.base")
+        if args.fingerprint:
+            print(build_fingerprint(app_root, content))
+            return 0
+        report = explain_build(app_root, content)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(f"🔍 Build impact for {app_root}\n")
+            print(format_explanation(report))
+        return 0
+
+    try:
+        config_path = app_root / args.config
+        config = DeployConfig(str(config_path), str(app_root)) if config_path.exists() else None
+        image_config = config.get_image_config() if config else {}
+        build_config = image_config.get("build", {})
+
+        if not dockerfile_path.exists():
+            logger.info("Dockerfile not found, generating...")
+            bundler = Bundler(
+                app_root=str(app_root),
+                slim=bool(build_config.get("slim", False)),
+                pin_base=bool(build_config.get("pin_base", False)),
+            )
+            if not bundler.generate_dockerfile():
+                logger.error("Failed to generate Dockerfile")
+                return 1
+        elif build_config.get("pin_base", False):
+            _check_base_pin(dockerfile_path)
+
+        builder = DockerBuilder(
+            app_root=str(app_root),
+            image_name=image_config.get("name", app_root.name),
+            image_tag=image_config.get("tag", "latest"),
+            platform=config.get_build_platform() if config else "linux/amd64",
+            builder=build_config.get("builder"),
+            backend=build_config.get("backend", "cli"),
+            budget=image_config.get("budget"),
+        )
+        image = builder.build(no_cache=args.no_cache or not build_config.get("cache", True))
+    except (DeployConfigError, DockerBuilderError) as e:
+        logger.error(f"Error: {e}")
+        return 1
+
+    print(f"\n✓ Built {image}")
+    return 0
+
+
+def handle_slim(args: argparse.Namespace) -> int:
+    """Handle slim command."""
+    from jvdeploy.slimmer import SlimmerError, format_report, slim_environment
+
+    try:
+        report = slim_environment(
+            Path(args.path).expanduser(),
+            remove_tests=not args.keep_tests,
+            strip_binaries=not args.no_strip,
+            remove_bytecode=args.remove_bytecode,
+            remove_records=args.remove_records,
+            dry_run=args.dry_run,
+        )
+    except SlimmerError as e:
+        logger.error(f"Error: {e}")
+        return 1
+
+    if not args.quiet:
+        if args.dry_run:
+            print("🔍 DRY RUN MODE - No changes were made\n")
+        print(format_report(report))
+
+    return 0
+
+
 def handle_pip_get_packages(args: argparse.Namespace) -> int:
     """Handle pip-get-packages command."""
     from jvdeploy.dockerfile_generator import discover_core_packages
@@ -723,13 +1183,20 @@ def handle_deploy_lambda(args: argparse.Namespace) -> int:
 
         # Check if Dockerfile exists, generate if missing
         dockerfile_path = app_root / "Dockerfile"
+        build_config = config.get_image_config().get("build", {})
         if not dockerfile_path.exists():
             logger.info("Dockerfile not found, generating...")
-            bundler = Bundler(app_root=str(app_root))
+            bundler = Bundler(
+                app_root=str(app_root),
+                slim=bool(build_config.get("slim", False)),
+                pin_base=bool(build_config.get("pin_base", False)),
+            )
             if not bundler.generate_dockerfile():
                 logger.error("Failed to generate Dockerfile")
                 return 1
             logger.info("✓ Dockerfile generated")
+        elif build_config.get("pin_base", False):
+            _check_base_pin(dockerfile_path)
 
         lambda_config = config.get_lambda_config()
 
@@ -756,6 +1223,12 @@ def handle_deploy_lambda(args: argparse.Namespace) -> int:
                 lambda_config["image"]["build"] = {}
             lambda_config["image"]["build"]["builder"] = args.builder
 
+        configured_architecture = lambda_config.get("function", {}).get("architecture", "x86_64")
+        if args.architecture:
+            lambda_config.setdefault("function", {})["architecture"] = args.architecture
+            build_config = lambda_config["image"].setdefault("build", {})
+            build_config["platform"] = LAMBDA_PLATFORMS[args.architecture]
+
         # Import and create deployer
         try:
             from jvdeploy.aws import LambdaDeployer
@@ -796,6 +1269,7 @@ def handle_deploy_lambda(args: argparse.Namespace) -> int:
             push_image=push_image,
             update_function=update_function,
             create_api=create_api,
+            prewarm=max(args.prewarm, 0),
         )
 
         if results["success"]:
@@ -806,6 +1280,26 @@ def handle_deploy_lambda(args: argparse.Namespace) -> int:
                 print(f"  API URL: {results['api_url']}")
             if results.get("function_url"):
                 print(f"  Function URL: {results['function_url']}")
+            if args.architecture and args.architecture != configured_architecture:
+                print(
+                    f"\n💡 Set 'lambda.function.architecture: {args.architecture}' in "
+                    f"{args.config} to keep it on the next deploy"
+                )
+            if results.get("timings"):
+                from jvdeploy.aws.scheduler import format_timings
+
+                print("\n  Step timings:")
+                print(format_timings(results["timings"]))
+            if results.get("waits"):
+                from jvdeploy.aws.waiters import format_waits
+
+                print("\n  Waited for:")
+                print(format_waits(results["waits"]))
+            if results.get("prewarm"):
+                from jvdeploy.aws.prewarm import format_prewarm
+
+                print("\n  Pre-warmed:")
+                print(format_prewarm(results["prewarm"]))
             return 0
         else:
             print("\n✗ Lambda deployment failed")
@@ -832,6 +1326,117 @@ def handle_deploy_k8s(args: argparse.Namespace) -> int:
     return 1
 
 
+def _load_lambda_plan(
+    args: argparse.Namespace, dry_run: bool = False
+) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    """Load deploy.yaml and plan the Lambda deployment it describes.
+
+    Returns:
+        (deployer, plan) tuple, or None if the configuration is unusable
+    """
+    app_root = Path(args.app_root).expanduser().resolve()
+    config_path = app_root / args.config
+
+    if not config_path.exists():
+        logger.error(f"Configuration file not found: {config_path}")
+        print("\n💡 Tip: Run 'jvdeploy init' to create a deploy.yaml configuration")
+        return None
+
+    config = DeployConfig(str(config_path), str(app_root))
+    lambda_config = config.get_lambda_config()
+    if lambda_config is None:
+        logger.error("Lambda deployment is not enabled in configuration")
+        print("\n💡 Set 'lambda.enabled: true' in deploy.yaml")
+        return None
+
+    if args.region:
+        lambda_config["region"] = args.region
+    if args.function:
+        lambda_config["function"]["name"] = args.function
+    if args.env:
+        config.override_env_vars(args.env)
+    lambda_config["app_root"] = str(app_root)
+    lambda_config["app"] = config.get_app_config()
+
+    from jvdeploy.aws import LambdaDeployer
+
+    deployer = LambdaDeployer(lambda_config, dry_run=dry_run)
+    image_uri = args.image or config.get_ecr_image_uri(
+        lambda_config.get("region"), account_id=deployer.get_account_id()
+    )
+    return deployer, deployer.plan(image_uri)
+
+
+def handle_plan(args: argparse.Namespace) -> int:
+    """Handle plan command."""
+    if args.platform != "lambda":
+        logger.error("Error: Please specify a platform (lambda)")
+        print("Usage: jvdeploy plan lambda [options]")
+        return 1
+
+    try:
+        loaded = _load_lambda_plan(args)
+        if loaded is None:
+            return 1
+        _, plan = loaded
+
+        if args.json:
+            import json
+
+            from jvdeploy.aws.lambda_plan import redact_plan
+
+            print(json.dumps(redact_plan(plan["actions"]), indent=2, default=str))
+        else:
+            from jvdeploy.aws.lambda_plan import format_plan
+
+            print(f"\n📋 Plan for {plan['function_name']} ({plan['image_uri']})\n")
+            print(format_plan(plan["actions"]))
+        return 0
+
+    except DeployConfigError as e:
+        logger.error(f"Configuration error: {e}")
+        return 1
+    except Exception as e:
+        logger.error(f"Failed to plan: {e}")
+        return 1
+
+
+def handle_apply(args: argparse.Namespace) -> int:
+    """Handle apply command."""
+    if args.platform != "lambda":
+        logger.error("Error: Please specify a platform (lambda)")
+        print("Usage: jvdeploy apply lambda [options]")
+        return 1
+
+    try:
+        loaded = _load_lambda_plan(args, dry_run=args.dry_run)
+        if loaded is None:
+            return 1
+        deployer, plan = loaded
+
+        from jvdeploy.aws.lambda_plan import format_plan
+
+        print(f"\n📋 Plan for {plan['function_name']} ({plan['image_uri']})\n")
+        print(format_plan(plan["actions"]))
+        if args.dry_run or not plan["actions"]:
+            return 0
+
+        results = deployer.apply(plan)
+        print(f"\n✓ Applied {results['applied']} change(s)")
+        if results.get("function_url"):
+            print(f"  Function URL: {results['function_url']}")
+        if results.get("api_url"):
+            print(f"  API URL: {results['api_url']}")
+        return 0
+
+    except DeployConfigError as e:
+        logger.error(f"Configuration error: {e}")
+        return 1
+    except Exception as e:
+        logger.error(f"Apply failed: {e}")
+        return 1
+
+
 def handle_status(args: argparse.Namespace) -> int:
     """Handle status command."""
     if not args.platform:
@@ -1093,6 +1698,7 @@ def handle_destroy_lambda(args: argparse.Namespace) -> int:
             if not lambda_config:
                 logger.error("Lambda deployment is not enabled in configuration")
                 return 1
+            lambda_config["app_root"] = str(config_path.parent)
 
             config_function_name = lambda_config.get("function", {}).get("name")
 
@@ -1217,6 +1823,143 @@ def handle_destroy_k8s(args: argparse.Namespace) -> int:
     return 1
 
 
+def handle_image(args: argparse.Namespace) -> int:
+    """Handle image command."""
+    if args.image_action == "compression":
+        return handle_image_compression(args)
+    if args.image_action == "analyze":
+        return handle_image_analyze(args)
+    if args.image_action == "diff":
+        return handle_image_diff(args)
+    if args.image_action == "push":
+        return handle_image_push(args)
+
+    logger.error("Error: Please specify an action (analyze, compression, diff, push)")
+    return 1
+
+
+def handle_image_push(args: argparse.Namespace) -> int:
+    """Handle image push command."""
+    from jvdeploy.docker_builder import (
+        DockerBuilderError,
+        ecr_registry_client,
+        parse_image_uri,
+    )
+    from jvdeploy.image.push import PushError, format_push_report, push_image
+    from jvdeploy.registry import RegistryClient
+
+    registry, repository, tag = parse_image_uri(args.target)
+    if not registry:
+        logger.error(f"Error: {args.target} does not name a registry host")
+        return 1
+
+    try:
+        if args.insecure:
+            client = RegistryClient(registry, insecure=True)
+        else:
+            client = ecr_registry_client(registry)
+
+        print(f"🚀 Pushing {args.image} to {args.target}")
+        report = push_image(
+            args.image,
+            repository,
+            tag,
+            client,
+            concurrency=args.concurrency,
+            chunk_size=args.chunk_mb * 1024 * 1024,
+            mount_from=args.mount_from or (),
+        )
+    except (DockerBuilderError, PushError) as e:
+        logger.error(f"Error: {e}")
+        return 1
+
+    print(format_push_report(report))
+    return 0
+
+
+def handle_image_diff(args: argparse.Namespace) -> int:
+    """Handle image diff command."""
+    import json
+
+    from jvdeploy.image.diff import ImageDiffError, diff_images, format_diff, load_image
+
+    app_root = Path(args.app_root).expanduser().resolve()
+    try:
+        old = load_image(args.old, platform=args.platform)
+        new = load_image(args.new, platform=args.platform)
+    except ImageDiffError as e:
+        logger.error(f"Error: {e}")
+        return 1
+
+    report = diff_images(old, new, app_root=app_root if app_root.is_dir() else None)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"🔍 Comparing {args.old} -> {args.new}\n")
+        print(format_diff(report))
+    return 0
+
+
+def handle_image_analyze(args: argparse.Namespace) -> int:
+    """Handle image analyze command."""
+    import json
+
+    from jvdeploy.image.analyze import analyze_image, format_analysis
+    from jvdeploy.image.tarball import ImageTarballError
+
+    app_root = Path(args.app_root).expanduser().resolve()
+    try:
+        report = analyze_image(
+            args.image, app_root=app_root if app_root.is_dir() else None, top=args.top
+        )
+    except ImageTarballError as e:
+        logger.error(f"Error: {e}")
+        return 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"📦 Image analysis for {args.image}\n")
+        print(format_analysis(report, limit=args.top))
+    return 0
+
+
+def handle_image_compression(args: argparse.Namespace) -> int:
+    """Handle image compression command."""
+    from jvdeploy.image.compression import (
+        DEFAULT_LEVELS,
+        CompressionError,
+        available_codecs,
+        compare_compression,
+        format_compression_report,
+        resolve_compression,
+    )
+    from jvdeploy.image.tarball import ImageTarballError
+
+    levels = {codec: DEFAULT_LEVELS[codec] for codec in (args.codec or available_codecs())}
+    try:
+        for item in args.level or []:
+            codec, _, level = item.partition("=")
+            resolved = resolve_compression(codec, int(level))
+            if resolved:
+                levels[resolved[0]] = resolved[1]
+
+        print(f"📦 Measuring layer compression for {args.image}")
+        print(f"   Codecs: {', '.join(f'{c} (level {lvl})' for c, lvl in levels.items())}\n")
+        report = compare_compression(args.image, levels)
+    except ValueError:
+        logger.error(f"Error: Invalid --level value (expected CODEC=LEVEL): {args.level}")
+        return 1
+    except (CompressionError, ImageTarballError) as e:
+        logger.error(f"Error: {e}")
+        return 1
+
+    print(format_compression_report(report))
+    print("\n💡 Set image.build.compression and image.build.compression_level in deploy.yaml")
+    return 0
+
+
 def handle_env(args: argparse.Namespace) -> int:
     """Handle env command."""
     if not args.platform:
@@ -1382,18 +2125,30 @@ def main() -> None:
         # Dispatch to command handlers
         if args.command == "generate":
             exit_code = handle_generate(args)
+        elif args.command == "build":
+            exit_code = handle_build(args)
+        elif args.command == "base":
+            exit_code = handle_base(args)
+        elif args.command == "slim":
+            exit_code = handle_slim(args)
         elif args.command == "pip-get-packages":
             exit_code = handle_pip_get_packages(args)
         elif args.command == "init":
             exit_code = handle_init(args)
         elif args.command == "deploy":
             exit_code = handle_deploy(args)
+        elif args.command == "plan":
+            exit_code = handle_plan(args)
+        elif args.command == "apply":
+            exit_code = handle_apply(args)
         elif args.command == "status":
             exit_code = handle_status(args)
         elif args.command == "logs":
             exit_code = handle_logs(args)
         elif args.command == "destroy":
             exit_code = handle_destroy(args)
+        elif args.command == "image":
+            exit_code = handle_image(args)
         elif args.command == "env":
             exit_code = handle_env(args)
         else:
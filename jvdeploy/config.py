@@ -13,6 +13,9 @@ import yaml
 
 logger = logging.getLogger(__name__)
 
+# Docker platform of each Lambda instruction set architecture
+LAMBDA_PLATFORMS = {"x86_64": "linux/amd64", "arm64": "linux/arm64"}
+
 
 class DeployConfigError(Exception):
     """Exception raised for configuration errors."""
@@ -80,6 +83,15 @@ class DeployConfig:
         if "image" not in self.config:
             raise DeployConfigError("Configuration missing required 'image' section")
 
+        budget = (self.config["image"] or {}).get("budget")
+        if budget is not None:
+            from jvdeploy.image.budget import BudgetError, validate_budget
+
+            try:
+                validate_budget(budget)
+            except BudgetError as e:
+                raise DeployConfigError(str(e)) from e
+
         # Check that at least one platform is enabled
         lambda_enabled = self.config.get("lambda", {}).get("enabled", False)
         k8s_enabled = self.config.get("kubernetes", {}).get("enabled", False)
@@ -89,6 +101,31 @@ class DeployConfig:
                 "At least one deployment platform (lambda or kubernetes) must be enabled"
             )
 
+        if lambda_enabled:
+            function_config = self.config["lambda"].get("function") or {}
+            architecture = function_config.get("architecture", "x86_64")
+            if architecture not in LAMBDA_PLATFORMS:
+                raise DeployConfigError(
+                    f"'lambda.function.architecture' must be one of "
+                    f"{', '.join(LAMBDA_PLATFORMS)}, got '{architecture}'"
+                )
+
+            provisioned = self.config["lambda"].get("provisioned_concurrency") or 0
+            count = provisioned.get("count", 0) if isinstance(provisioned, dict) else provisioned
+            if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+                raise DeployConfigError(
+                    f"'lambda.provisioned_concurrency' count must be a non-negative integer, "
+                    f"got '{count}'"
+                )
+
+            warmer = self.config["lambda"].get("warmer") or {}
+            concurrency = warmer.get("concurrency", 1)
+            if isinstance(concurrency, bool) or not isinstance(concurrency, int) or concurrency < 0:
+                raise DeployConfigError(
+                    f"'lambda.warmer.concurrency' must be a non-negative integer, "
+                    f"got '{concurrency}'"
+                )
+
         logger.debug("Configuration validation passed")
 
     def _interpolate_env_vars(self) -> None:
@@ -199,6 +236,21 @@ class DeployConfig:
         """
         return dict(self.config.get("image", {}))
 
+    def get_build_platform(self) -> str:
+        """Get the platform to build the image for.
+
+        Returns:
+            image.build.platform if set, else the platform of
+            lambda.function.architecture when Lambda is enabled, else
+            'linux/amd64'
+        """
+        platform = (self.get_image_config().get("build") or {}).get("platform")
+        if platform:
+            return str(platform)
+        lambda_config = self.get_lambda_config() or {}
+        architecture = (lambda_config.get("function") or {}).get("architecture", "x86_64")
+        return LAMBDA_PLATFORMS.get(architecture, "linux/amd64")
+
     def get_lambda_config(self) -> Optional[Dict[str, Any]]:
         """Get Lambda deployment configuration.
 
@@ -3,14 +3,24 @@
 Handles building Docker images and pushing them to ECR.
 """
 
-import base64
+import json
 import logging
+import re
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("cli", "engine")
+
+# 'docker' runs docker push; 'registry' pushes through the registry API
+PUSH_CLIENTS = ("docker", "registry")
+
+_ECR_HOST = re.compile(r"^\d+\.dkr\.ecr\.([a-z0-9-]+)\.amazonaws\.com")
+
 
 class DockerBuilderError(Exception):
     """Exception raised for Docker build errors."""
@@ -18,6 +28,64 @@ class DockerBuilderError(Exception):
     pass
 
 
+def parse_image_uri(image_uri: str) -> Tuple[str, str, str]:
+    """Split an image URI into registry, repository and tag.
+
+    Args:
+        image_uri: Image URI (e.g., '123.dkr.ecr.us-east-1.amazonaws.com/app:1.0')
+
+    Returns:
+        Tuple of (registry, repository, tag). Tag defaults to 'latest'.
+    """
+    name = image_uri.split("@", 1)[0]
+    registry = ""
+    if "/" in name:
+        first, rest = name.split("/", 1)
+        if "." in first or ":" in first or first == "localhost":
+            registry, name = first, rest
+
+    tag = "latest"
+    if ":" in name:
+        name, tag = name.rsplit(":", 1)
+
+    return registry, name, tag
+
+
+def ecr_registry_client(registry: str, region: Optional[str] = None) -> Any:
+    """Create a registry API client authenticated with ECR credentials.
+
+    Args:
+        registry: ECR registry host
+        region: AWS region (default: taken from the registry host)
+
+    Returns:
+        RegistryClient for the registry
+
+    Raises:
+        DockerBuilderError: If the registry is not ECR or no token can be obtained
+    """
+    from jvdeploy.registry import RegistryClient
+
+    if region is None:
+        match = _ECR_HOST.match(registry)
+        if not match:
+            raise DockerBuilderError(f"{registry} is not an ECR registry")
+        region = match.group(1)
+
+    try:
+        from jvdeploy.aws.credentials import get_ecr_authorization
+
+        auth = get_ecr_authorization(region)
+    except ImportError:
+        raise DockerBuilderError(
+            "boto3 is required for ECR authentication. Install with: pip install boto3"
+        )
+    except Exception as e:
+        raise DockerBuilderError(f"ECR authentication failed: {e}") from e
+
+    return RegistryClient(registry, username=auth["username"], password=auth["password"])
+
+
 class DockerBuilder:
     """Build and push Docker images for jvagent applications."""
 
@@ -28,6 +96,18 @@ class DockerBuilder:
         image_tag: str = "latest",
         platform: str = "linux/amd64",
         builder: Optional[str] = None,
+        backend: str = "cli",
+        platforms: Optional[List[str]] = None,
+        manifest_list: bool = False,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        lambda_target: bool = False,
+        budget: Optional[Dict[str, Any]] = None,
+        code_only_updates: bool = False,
+        push_client: str = "docker",
+        push_concurrency: Optional[int] = None,
+        push_chunk_mb: Optional[int] = None,
+        ecr_client: Optional[Any] = None,
     ):
         """Initialize Docker builder.
 
@@ -37,24 +117,119 @@ class DockerBuilder:
             image_tag: Image tag (default: latest)
             platform: Target platform (default: linux/amd64)
             builder: Docker BuildKit builder to use (optional)
+            backend: 'cli' to run the docker CLI, 'engine' to use the Engine API socket
+            platforms: Build several platforms concurrently (the first is the primary
+                platform, which the plain image tag points at)
+            manifest_list: If True, publish the plain tag as a multi-platform manifest
+                list instead of the primary platform image
+            compression: Layer compression for pushed images (gzip, zstd or estargz);
+                None keeps Docker's default gzip push
+            compression_level: Compression level (default: codec default)
+            lambda_target: If True, only use layer compression AWS Lambda can pull
+            budget: Image size budget checked after every build ('max_size_mb',
+                'max_layers', 'max_layer_mb', 'mode': fail or warn)
+            code_only_updates: If True, ECR pushes that only change application code
+                add one layer to the last pushed image through the registry API
+                instead of running a Docker build (single-platform builds only)
+            push_client: 'docker' (docker push) or 'registry' (built-in client: parallel
+                chunked uploads, cross-repository blob mounts, resumable uploads)
+            push_concurrency: Layers uploaded at the same time by the registry client
+            push_chunk_mb: Largest upload request of the registry client in MB
+            ecr_client: boto3 ECR client of the deploying credentials, used to look up
+                images in its region (default: a client from the default session)
         """
         self.app_root = Path(app_root)
         self.image_name = image_name
         self.image_tag = image_tag
-        self.platform = platform
+        self.platforms = list(platforms) if platforms else [platform]
+        self.platform = self.platforms[0]
         self.builder = builder
+        self.backend = backend
+        self.manifest_list = manifest_list
+        self.code_only_updates = code_only_updates
+        self.push_client = push_client
+        self.push_concurrency = push_concurrency
+        self.push_chunk_mb = push_chunk_mb
+        self.ecr_client = ecr_client
+        self.platform_timings: Dict[str, float] = {}
+
+        self._docker_available: Optional[bool] = None
+        self._engine: Any = None
+        self._registry_auth: Dict[str, str] = {}
+        self._login_region: Optional[str] = None
 
         if not self.app_root.exists():
             raise DockerBuilderError(f"App root directory not found: {app_root}")
 
+        if backend not in BACKENDS:
+            raise DockerBuilderError(
+                f"Unknown Docker backend '{backend}' (expected one of: {', '.join(BACKENDS)})"
+            )
+
+        if push_client not in PUSH_CLIENTS:
+            raise DockerBuilderError(
+                f"Unknown push client '{push_client}' "
+                f"(expected one of: {', '.join(PUSH_CLIENTS)})"
+            )
+
+        if backend == "engine" and builder:
+            logger.warning(f"BuildKit builder '{builder}' is ignored by the engine backend")
+
+        from jvdeploy.image.compression import CompressionError, resolve_compression
+
+        try:
+            self.compression = resolve_compression(compression, compression_level, lambda_target)
+        except CompressionError as e:
+            raise DockerBuilderError(str(e)) from e
+
+        if self.compression and backend == "engine":
+            logger.warning("Layer compression is ignored by the engine backend (pushes use gzip)")
+            self.compression = None
+
+        from jvdeploy.image.budget import BudgetError, validate_budget
+
+        try:
+            self.budget = validate_budget(budget) if budget else None
+        except BudgetError as e:
+            raise DockerBuilderError(str(e)) from e
+
         logger.info(f"Initialized Docker builder for {self.app_root}")
 
+    @property
+    def engine(self):
+        """Lazy-load Docker Engine API client."""
+        if self._engine is None:
+            from jvdeploy.docker_engine import DockerEngineClient
+
+            self._engine = DockerEngineClient()
+        return self._engine
+
+    @staticmethod
+    def _log_progress(message: Dict[str, Any]) -> None:
+        """Log a JSON progress message from the Docker Engine API."""
+        if "stream" in message:
+            text = str(message["stream"]).rstrip()
+            if text:
+                logger.info(text)
+        elif "status" in message:
+            layer = f"{message['id']}: " if "id" in message else ""
+            logger.debug(f"{layer}{message['status']} {message.get('progress', '')}".rstrip())
+
     def check_docker(self) -> bool:
         """Check if Docker is installed and running.
 
+        The result is cached for the lifetime of the builder.
+
         Returns:
             True if Docker is available, False otherwise
         """
+        if self._docker_available is not None:
+            return self._docker_available
+
+        if self.backend == "engine":
+            self._docker_available = bool(self.engine.ping())
+            return self._docker_available
+
         try:
             result = subprocess.run(
                 ["docker", "version"],
@@ -62,23 +237,50 @@ class DockerBuilder:
                 text=True,
                 timeout=10,
             )
-            return result.returncode == 0
+            self._docker_available = result.returncode == 0
         except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+            self._docker_available = False
+        return self._docker_available
+
+    @staticmethod
+    def platform_suffix(platform: str) -> str:
+        """Get the tag suffix for a platform (e.g., 'linux/arm64' -> 'arm64').
+
+        Args:
+            platform: Platform string (os/arch[/variant])
+
+        Returns:
+            Tag-safe platform suffix
+        """
+        return "-".join(platform.split("/")[1:]) or platform
 
-    def build(self, dockerfile_path: Optional[str] = None, no_cache: bool = False) -> str:
+    def build(
+        self,
+        dockerfile_path: Optional[str] = None,
+        no_cache: bool = False,
+        platform: Optional[str] = None,
+        image_tag: Optional[str] = None,
+        push_uris: Optional[List[str]] = None,
+    ) -> str:
         """Build Docker image.
 
         Args:
             dockerfile_path: Path to Dockerfile (default: {app_root}/Dockerfile)
             no_cache: If True, build without using cache
+            platform: Platform to build (default: primary platform)
+            image_tag: Tag for the built image (default: configured tag)
+            push_uris: Push straight from BuildKit to these URIs with the configured
+                layer compression instead of loading the image into Docker
 
         Returns:
-            Full image name with tag
+            Full image name with tag (the first push URI when pushing)
 
         Raises:
             DockerBuilderError: If build fails
         """
+        platform = platform or self.platform
+        image_tag = image_tag or self.image_tag
+
         if not self.check_docker():
             raise DockerBuilderError(
                 "Docker is not installed or not running. "
@@ -98,13 +300,16 @@ class DockerBuilder:
                 f"Tip: Run 'jvdeploy generate' to create a Dockerfile first"
             )
 
-        full_image_name = f"{self.image_name}:{self.image_tag}"
+        full_image_name = f"{self.image_name}:{image_tag}"
 
         logger.info(f"Building Docker image: {full_image_name}")
-        logger.info(f"  Platform: {self.platform}")
+        logger.info(f"  Platform: {platform}")
         logger.info(f"  Context: {self.app_root}")
         logger.info(f"  Dockerfile: {dockerfile_path_obj}")
 
+        if self.backend == "engine":
+            return self._build_engine(dockerfile_path_obj, full_image_name, platform, no_cache)
+
         # Build Docker command
         # Use buildx with --load flag to create standard Docker image
         # --load saves the image to Docker daemon in standard format (not manifest list)
@@ -114,15 +319,30 @@ class DockerBuilder:
             "buildx",
             "build",
             "--platform",
-            self.platform,
+            platform,
             "--provenance=false",
-            "--load",  # Load image into Docker daemon (creates standard image, not manifest)
-            "-t",
-            full_image_name,
-            "-f",
-            str(dockerfile_path_obj),
+            # Plain progress lists per-step durations (see build_impact)
+            "--progress=plain",
         ]
 
+        if push_uris and self.compression:
+            # docker push always re-compresses with gzip, so BuildKit pushes directly
+            from jvdeploy.image.compression import buildx_output
+
+            codec, level = self.compression
+            cmd.extend(["--output", buildx_output(push_uris, codec, level)])
+            full_image_name = push_uris[0]
+        else:
+            cmd.extend(
+                [
+                    "--load",  # Load image into Docker daemon (standard image, not manifest)
+                    "-t",
+                    full_image_name,
+                ]
+            )
+
+        cmd.extend(["-f", str(dockerfile_path_obj)])
+
         if self.builder:
             cmd.extend(["--builder", self.builder])
 
@@ -151,14 +371,310 @@ class DockerBuilder:
                     f"Error: {result.stderr}"
                 )
 
-            logger.info(f"✓ Successfully built image: {full_image_name}")
-            return full_image_name
+            if push_uris and self.compression:
+                logger.info(
+                    f"✓ Successfully built and pushed {self.compression[0]} image: "
+                    f"{', '.join(push_uris)}"
+                )
+            else:
+                logger.info(f"✓ Successfully built image: {full_image_name}")
+
+            self._record_build(dockerfile_path_obj, f"{result.stderr}\n{result.stdout}")
 
         except subprocess.TimeoutExpired:
             raise DockerBuilderError("Docker build timed out after 10 minutes")
         except Exception as e:
             raise DockerBuilderError(f"Docker build failed: {e}") from e
 
+        if push_uris and self.compression:
+            self.check_pushed_budget(push_uris[0], platform)
+        else:
+            self.check_budget(full_image_name)
+        return full_image_name
+
+    def get_image_layers(self, image: str) -> Tuple[List[Tuple[int, str]], int]:
+        """Get per-layer sizes of a local image from its history.
+
+        Args:
+            image: Local image name with tag
+
+        Returns:
+            Tuple of ((size in bytes, created_by) for each history entry that
+            added data, bottom first; number of filesystem layers)
+
+        Raises:
+            DockerBuilderError: If the image cannot be inspected
+        """
+        if self.backend == "engine":
+            from jvdeploy.docker_engine import DockerEngineError
+
+            try:
+                history = self.engine.image_history(image)
+                layer_count = len(
+                    (self.engine.inspect_image(image).get("RootFS") or {}).get("Layers") or []
+                )
+            except DockerEngineError as e:
+                raise DockerBuilderError(f"Cannot inspect image {image}: {e}") from e
+            entries = [(int(h.get("Size") or 0), str(h.get("CreatedBy") or "")) for h in history]
+        else:
+            history_cmd = [
+                "docker",
+                "image",
+                "history",
+                "--no-trunc",
+                "--human=false",
+                "--format",
+                "{{.Size}}\t{{.CreatedBy}}",
+                image,
+            ]
+            inspect_cmd = [
+                "docker",
+                "image",
+                "inspect",
+                "--format",
+                "{{len .RootFS.Layers}}",
+                image,
+            ]
+            try:
+                history_result = subprocess.run(
+                    history_cmd, capture_output=True, text=True, timeout=60
+                )
+                inspect_result = subprocess.run(
+                    inspect_cmd, capture_output=True, text=True, timeout=30
+                )
+            except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+                raise DockerBuilderError(f"Cannot inspect image {image}: {e}") from e
+            if history_result.returncode != 0 or inspect_result.returncode != 0:
+                raise DockerBuilderError(
+                    f"Cannot inspect image {image}: "
+                    f"{history_result.stderr or inspect_result.stderr}"
+                )
+
+            entries = []
+            for line in history_result.stdout.splitlines():
+                size, _, created_by = line.partition("\t")
+                try:
+                    entries.append((int(size.strip() or 0), created_by))
+                except ValueError:
+                    continue
+            layer_count = int(inspect_result.stdout.strip() or 0)
+
+        # History is newest first; metadata-only steps add no data
+        layers = [(size, created_by) for size, created_by in reversed(entries) if size > 0]
+        return layers, layer_count
+
+    def check_budget(self, image: str) -> None:
+        """Check a built image against the configured size budget.
+
+        Args:
+            image: Local image name with tag
+
+        Raises:
+            DockerBuilderError: If the budget is exceeded and mode is 'fail'
+        """
+        if not self.budget:
+            return
+
+        layers, layer_count = self.get_image_layers(image)
+        self._enforce_budget(layers, layer_count)
+
+    def check_pushed_budget(self, image_uri: str, platform: str) -> None:
+        """Check an image BuildKit pushed straight to the registry against the budget.
+
+        No local image exists, so the pushed manifest is read instead; its
+        layer sizes are compressed sizes.
+
+        Args:
+            image_uri: Pushed image URI
+            platform: Platform of the image
+
+        Raises:
+            DockerBuilderError: If the budget is exceeded, or the pushed image
+                cannot be read, and mode is 'fail'
+        """
+        if not self.budget:
+            return
+
+        from jvdeploy.image.assemble import AssembleError, resolve_image_manifest
+        from jvdeploy.registry import RegistryError
+
+        registry, repository, tag = parse_image_uri(image_uri)
+        try:
+            client = self.registry_client(registry)
+            _, manifest, _ = resolve_image_manifest(client, repository, tag, platform)
+            config = json.loads(client.get_blob(repository, manifest["config"]["digest"]))
+        except (AssembleError, RegistryError, DockerBuilderError, KeyError, ValueError) as e:
+            message = f"Cannot read pushed image {image_uri} to check the budget: {e}"
+            if self.budget["mode"] == "warn":
+                logger.warning(message)
+                return
+            raise DockerBuilderError(message) from e
+
+        history = [h for h in config.get("history") or [] if not h.get("empty_layer")]
+        layers = [
+            (
+                int(layer.get("size") or 0),
+                str(history[index].get("created_by") or "") if index < len(history) else "",
+            )
+            for index, layer in enumerate(manifest.get("layers") or [])
+        ]
+        self._enforce_budget(layers, len(layers), compressed=True)
+
+    def _enforce_budget(
+        self, layers: List[Tuple[int, str]], layer_count: int, compressed: bool = False
+    ) -> None:
+        """Log or raise the budget violations of an image's layers."""
+        from jvdeploy.image.budget import check_budget
+
+        budget = self.budget or {}
+        violations, contributors = check_budget(
+            layers, budget, app_root=self.app_root, layer_count=layer_count
+        )
+        sizes = " compressed" if compressed else ""
+        if not violations:
+            total = sum(size for size, _ in layers) / (1024 * 1024)
+            logger.info(f"✓ Image within budget ({total:.1f} MB{sizes}, {layer_count} layers)")
+            return
+
+        message = "\n".join(
+            [f"Image budget exceeded{' (compressed sizes)' if compressed else ''}:"]
+            + [f"  {violation}" for violation in violations]
+            + ["Largest contributors:"]
+            + contributors
+        )
+        if budget.get("mode") == "warn":
+            logger.warning(message)
+            return
+        raise DockerBuilderError(message)
+
+    def _build_engine(
+        self, dockerfile_path: Path, full_image_name: str, platform: str, no_cache: bool
+    ) -> str:
+        """Build through the Docker Engine API, streaming progress to the log."""
+        from jvdeploy.docker_engine import DockerEngineError
+
+        try:
+            self.engine.build(
+                context_dir=self.app_root,
+                dockerfile=dockerfile_path,
+                tag=full_image_name,
+                platform=platform,
+                no_cache=no_cache,
+                on_progress=self._log_progress,
+            )
+        except DockerEngineError as e:
+            raise DockerBuilderError(f"Docker build failed: {e}") from e
+
+        logger.info(f"✓ Successfully built image: {full_image_name}")
+        self._record_build(dockerfile_path)
+        self.check_budget(full_image_name)
+        return full_image_name
+
+    def _record_build(self, dockerfile_path: Path, output: str = "") -> None:
+        """Record the build fingerprint and step timings for 'jvdeploy build --explain'."""
+        from jvdeploy.build_impact import parse_buildkit_timings, record_build
+
+        try:
+            record_build(self.app_root, dockerfile_path.read_text(), parse_buildkit_timings(output))
+        except OSError as e:
+            logger.debug(f"Could not record build fingerprint: {e}")
+
+    def build_platforms(
+        self,
+        dockerfile_path: Optional[str] = None,
+        no_cache: bool = False,
+        push_base_uri: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """Build all configured platforms concurrently.
+
+        Every platform is built through the same builder, so BuildKit shares
+        its cache (base layers, build context, platform-independent steps)
+        between them. Each platform gets its own '<tag>-<arch>' tag and its
+        wall-clock build time is recorded in ``platform_timings``.
+
+        Args:
+            dockerfile_path: Path to Dockerfile (default: {app_root}/Dockerfile)
+            no_cache: If True, build without using cache
+            push_base_uri: Push each platform from BuildKit with the configured layer
+                compression to '<repository>:<tag>-<arch>'; the primary platform is
+                also pushed to this URI unless ``manifest_list`` is set
+
+        Returns:
+            Dictionary mapping platform to built image name
+
+        Raises:
+            DockerBuilderError: If any platform fails to build
+        """
+        if not self.check_docker():
+            raise DockerBuilderError(
+                "Docker is not installed or not running. "
+                "Please install Docker and ensure the daemon is running."
+            )
+
+        def build_one(platform: str) -> str:
+            start = time.monotonic()
+            image_tag = f"{self.image_tag}-{self.platform_suffix(platform)}"
+            push_uris = None
+            if push_base_uri:
+                push_uris = [f"{push_base_uri.split('@', 1)[0].rsplit(':', 1)[0]}:{image_tag}"]
+                if platform == self.platform and not self.manifest_list:
+                    push_uris.append(push_base_uri)
+            try:
+                return self.build(
+                    dockerfile_path=dockerfile_path,
+                    no_cache=no_cache,
+                    platform=platform,
+                    image_tag=image_tag,
+                    push_uris=push_uris,
+                )
+            finally:
+                self.platform_timings[platform] = time.monotonic() - start
+
+        logger.info(f"Building {len(self.platforms)} platforms: {', '.join(self.platforms)}")
+        with ThreadPoolExecutor(max_workers=len(self.platforms)) as pool:
+            futures = {platform: pool.submit(build_one, platform) for platform in self.platforms}
+            errors = []
+            images = {}
+            for platform, future in futures.items():
+                try:
+                    images[platform] = future.result()
+                except DockerBuilderError as e:
+                    errors.append(f"{platform}: {e}")
+
+        logger.info("Per-platform build times:")
+        for platform in self.platforms:
+            logger.info(f"  {platform}: {self.platform_timings.get(platform, 0.0):.1f}s")
+
+        if errors:
+            raise DockerBuilderError("Multi-platform build failed:\n" + "\n".join(errors))
+
+        return images
+
+    def create_manifest_list(self, target_uri: str, source_uris: List[str]) -> None:
+        """Publish a multi-platform manifest list from already pushed images.
+
+        Args:
+            target_uri: Image URI for the manifest list
+            source_uris: Pushed per-platform image URIs
+
+        Raises:
+            DockerBuilderError: If the manifest list cannot be created
+        """
+        logger.info(f"Creating manifest list {target_uri} from {len(source_uris)} images")
+        cmd = ["docker", "buildx", "imagetools", "create", "-t", target_uri, *source_uris]
+        if self.builder:
+            cmd.extend(["--builder", self.builder])
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            raise DockerBuilderError(f"Manifest list creation failed: {e}") from e
+
+        if result.returncode != 0:
+            raise DockerBuilderError(f"Manifest list creation failed: {result.stderr}")
+
+        logger.info(f"✓ Created manifest list: {target_uri}")
+
     def tag(self, source_tag: str, target_tag: str) -> None:
         """Tag an existing image with a new tag.
 
@@ -171,6 +687,19 @@ class DockerBuilder:
         """
         logger.info(f"Tagging image: {source_tag} -> {target_tag}")
 
+        if self.backend == "engine":
+            from jvdeploy.docker_engine import DockerEngineError
+
+            registry, repository, tag = parse_image_uri(target_tag)
+            try:
+                self.engine.tag(
+                    source_tag, f"{registry}/{repository}" if registry else repository, tag
+                )
+            except DockerEngineError as e:
+                raise DockerBuilderError(f"Docker tag failed: {e}") from e
+            logger.info(f"✓ Successfully tagged image: {target_tag}")
+            return
+
         cmd = ["docker", "tag", source_tag, target_tag]
 
         try:
@@ -205,6 +734,26 @@ class DockerBuilder:
 
         logger.info(f"Pushing Docker image: {image_uri}")
 
+        if self.push_client == "registry":
+            self._push_with_registry_client(image_uri)
+            return
+
+        if self.backend == "engine":
+            from jvdeploy.docker_engine import DockerEngineError
+
+            registry, repository, tag = parse_image_uri(image_uri)
+            try:
+                self.engine.push(
+                    f"{registry}/{repository}" if registry else repository,
+                    tag,
+                    auth=self._registry_auth.get(registry),
+                    on_progress=self._log_progress,
+                )
+            except DockerEngineError as e:
+                raise DockerBuilderError(f"Docker push failed: {e}") from e
+            logger.info(f"✓ Successfully pushed image: {image_uri}")
+            return
+
         cmd = ["docker", "push", image_uri]
 
         try:
@@ -216,6 +765,15 @@ class DockerBuilder:
                 timeout=1800,  # 30 minute timeout for push
             )
 
+            if result.returncode != 0 and self._is_auth_error(result.stderr) and self._login_region:
+                # The cached login may have been revoked (e.g. docker logout); log in again
+                from jvdeploy.aws.credentials import forget_docker_login
+
+                logger.info("Push was denied, refreshing ECR login and retrying...")
+                forget_docker_login(parse_image_uri(image_uri)[0])
+                self.ecr_login(self._login_region, force=True)
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=1800)
+
             if result.returncode != 0:
                 logger.error("Docker push failed:")
                 logger.error(f"STDOUT: {result.stdout}")
@@ -231,6 +789,137 @@ class DockerBuilder:
         except Exception as e:
             raise DockerBuilderError(f"Docker push failed: {e}") from e
 
+    def _push_with_registry_client(self, image_uri: str) -> None:
+        """Push a local image through the registry API instead of docker push."""
+        from jvdeploy.image.push import (
+            DEFAULT_CONCURRENCY,
+            PushError,
+            format_push_report,
+            push_image,
+        )
+
+        registry, repository, tag = parse_image_uri(image_uri)
+        client = self.registry_client(registry)
+        try:
+            report = push_image(
+                image_uri,
+                repository,
+                tag,
+                client,
+                concurrency=self.push_concurrency or DEFAULT_CONCURRENCY,
+                chunk_size=self.push_chunk_mb * 1024 * 1024 if self.push_chunk_mb else None,
+            )
+        except PushError as e:
+            raise DockerBuilderError(f"Push failed: {e}") from e
+        logger.info(format_push_report(report))
+
+    @staticmethod
+    def _is_auth_error(stderr: str) -> bool:
+        """Check whether docker output indicates missing or expired credentials."""
+        text = (stderr or "").lower()
+        return any(
+            marker in text
+            for marker in ("no basic auth credentials", "authorization token has expired", "denied")
+        )
+
+    def get_repo_digests(self, image: str) -> List[str]:
+        """Get the registry digests recorded for a local image.
+
+        Docker records a repo digest for every registry the image was pushed
+        to or pulled from, so an unchanged rebuild keeps its digests.
+
+        Args:
+            image: Local image name with tag
+
+        Returns:
+            List of 'repository@sha256:...' strings (empty if unknown)
+        """
+        if self.backend == "engine":
+            try:
+                return list(self.engine.inspect_image(image).get("RepoDigests") or [])
+            except Exception:
+                return []
+
+        cmd = ["docker", "image", "inspect", "--format", "{{json .RepoDigests}}", image]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            return []
+
+        if result.returncode != 0:
+            return []
+
+        try:
+            return list(json.loads(result.stdout.strip() or "[]") or [])
+        except ValueError:
+            return []
+
+    def find_image_in_ecr(self, ecr_uri: str, region: str) -> Optional[str]:
+        """Check whether ECR already holds the local image.
+
+        Compares the local image's repo digests against ECR ``describe_images``.
+        If the digest exists under a different tag, the target tag is added
+        with ``put_image`` so no layers need to be uploaded.
+
+        Args:
+            ecr_uri: Full ECR image URI
+            region: AWS region
+
+        Returns:
+            Image digest if ECR already holds the image under the target tag,
+            None otherwise
+        """
+        _, repository, tag = parse_image_uri(ecr_uri)
+        repo_prefix = ecr_uri.split("@", 1)[0].rsplit(":", 1)[0] + "@"
+        digests = [
+            d.split("@", 1)[1] for d in self.get_repo_digests(ecr_uri) if d.startswith(repo_prefix)
+        ]
+        if not digests:
+            return None
+
+        try:
+            if self.ecr_client is not None and self.ecr_client.meta.region_name == region:
+                ecr_client = self.ecr_client
+            else:
+                import boto3
+
+                ecr_client = boto3.client("ecr", region_name=region)
+            response = ecr_client.describe_images(
+                repositoryName=repository,
+                imageIds=[{"imageDigest": d} for d in digests],
+            )
+        except ImportError:
+            raise DockerBuilderError(
+                "boto3 is required for AWS operations. Install with: pip install boto3"
+            )
+        except Exception as e:
+            logger.debug(f"Could not look up image digest in ECR: {e}")
+            return None
+
+        for detail in response.get("imageDetails", []):
+            digest = str(detail["imageDigest"])
+            if tag in detail.get("imageTags", []):
+                return digest
+
+            # Same content under another tag: retag in ECR instead of pushing
+            try:
+                images = ecr_client.batch_get_image(
+                    repositoryName=repository, imageIds=[{"imageDigest": digest}]
+                )["images"]
+                ecr_client.put_image(
+                    repositoryName=repository,
+                    imageManifest=images[0]["imageManifest"],
+                    imageTag=tag,
+                    imageDigest=digest,
+                )
+                logger.info(f"✓ Tagged existing ECR image {digest} as '{tag}'")
+                return digest
+            except Exception as e:
+                logger.debug(f"Could not retag ECR image {digest}: {e}")
+
+        return None
+
     def get_aws_account_id(self, region: str) -> str:
         """Get AWS account ID from current credentials.
 
@@ -244,13 +933,11 @@ class DockerBuilder:
             DockerBuilderError: If unable to get account ID
         """
         try:
-            import boto3
+            from jvdeploy.aws.credentials import get_account_id
 
-            sts_client = boto3.client("sts", region_name=region)
-            response = sts_client.get_caller_identity()
-            account_id = response["Account"]
+            account_id = get_account_id(region)
             logger.debug(f"Got AWS account ID: {account_id}")
-            return str(account_id)
+            return account_id
 
         except ImportError:
             raise DockerBuilderError(
@@ -259,12 +946,17 @@ class DockerBuilder:
         except Exception as e:
             raise DockerBuilderError(f"Failed to get AWS account ID: {e}") from e
 
-    def ecr_login(self, region: str, account_id: Optional[str] = None) -> None:
+    def ecr_login(self, region: str, account_id: Optional[str] = None, force: bool = False) -> None:
         """Authenticate Docker with ECR.
 
+        ECR tokens are cached on disk until shortly before they expire, and
+        ``docker login`` is skipped when the cached token was already used
+        to log in to the registry.
+
         Args:
             region: AWS region
             account_id: AWS account ID (optional, will be auto-detected if not provided)
+            force: If True, request a new token and log in again
 
         Raises:
             DockerBuilderError: If authentication fails
@@ -274,21 +966,32 @@ class DockerBuilder:
             account_id = self.get_aws_account_id(region)
 
         logger.info(f"Authenticating with ECR in {region}")
+        self._login_region = region
 
         try:
-            import boto3
+            from jvdeploy.aws.credentials import (
+                docker_login_is_current,
+                get_ecr_authorization,
+                record_docker_login,
+            )
+
+            # Get ECR login token (cached while valid)
+            auth = get_ecr_authorization(region, use_cache=not force)
+            username, password = auth["username"], auth["password"]
+            endpoint = auth["endpoint"]
+            registry = endpoint.split("://", 1)[-1].rstrip("/")
 
-            ecr_client = boto3.client("ecr", region_name=region)
+            if self.backend == "engine":
+                # The Engine API takes credentials per push, no login step needed
+                from jvdeploy.docker_engine import registry_auth_header
 
-            # Get ECR login token
-            response = ecr_client.get_authorization_token()
-            auth_data = response["authorizationData"][0]
-            token = auth_data["authorizationToken"]
-            endpoint = auth_data["proxyEndpoint"]
+                self._registry_auth[registry] = registry_auth_header(username, password, endpoint)
+                logger.info("✓ Successfully authenticated with ECR")
+                return
 
-            # Decode token (it's base64 encoded "AWS:password")
-            decoded = base64.b64decode(token).decode("utf-8")
-            username, password = decoded.split(":", 1)
+            if not force and docker_login_is_current(registry, auth):
+                logger.info("✓ Reusing existing ECR login (token still valid)")
+                return
 
             # Docker login
             cmd = [
@@ -311,6 +1014,7 @@ class DockerBuilder:
             if result.returncode != 0:
                 raise DockerBuilderError(f"Docker login to ECR failed: {result.stderr}")
 
+            record_docker_login(registry, auth)
             logger.info("✓ Successfully authenticated with ECR")
 
         except ImportError:
@@ -320,6 +1024,100 @@ class DockerBuilder:
         except Exception as e:
             raise DockerBuilderError(f"ECR authentication failed: {e}") from e
 
+    def registry_client(self, registry: str, region: Optional[str] = None) -> Any:
+        """Create a registry API client for ECR (see ecr_registry_client)."""
+        return ecr_registry_client(registry, region)
+
+    def _dockerfile_content(self, dockerfile_path: Optional[str]) -> str:
+        path = Path(dockerfile_path) if dockerfile_path else self.app_root / "Dockerfile"
+        try:
+            return path.read_text()
+        except OSError as e:
+            raise DockerBuilderError(f"Cannot read Dockerfile {path}: {e}") from e
+
+    def push_code_update(
+        self,
+        ecr_uri: str,
+        region: str,
+        dockerfile_path: Optional[str] = None,
+        tree: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
+        """Push a code-only change without a Docker build.
+
+        Adds the context files changed since the last pushed image as one
+        layer on top of it, uploading only that layer, the image config and
+        the manifest. Falls back (returns None) whenever a full build is
+        needed or the registry rejects the update.
+
+        Args:
+            ecr_uri: Full ECR image URI to publish
+            region: AWS region
+            dockerfile_path: Path to Dockerfile (default: {app_root}/Dockerfile)
+            tree: Merkle tree of the build context (computed if omitted)
+
+        Returns:
+            Manifest digest of the pushed image, or None if a full build is needed
+        """
+        from jvdeploy.image.assemble import (
+            AssembleError,
+            get_pushed_image,
+            plan_code_update,
+            push_code_layer,
+            record_pushed_image,
+        )
+        from jvdeploy.merkle import hash_context
+        from jvdeploy.registry import RegistryError
+
+        registry, repository, tag = parse_image_uri(ecr_uri)
+        content = self._dockerfile_content(dockerfile_path)
+        tree = tree or hash_context(self.app_root)
+        previous = get_pushed_image(f"{registry}/{repository}")
+        plan = plan_code_update(previous, content, tree, self.platform)
+        if not plan["eligible"]:
+            logger.info(f"Code-only update not possible ({plan['reason']}), running a full build")
+            return None
+        assert previous is not None
+
+        logger.info(f"Pushing code-only update to {ecr_uri}: {plan['reason']}")
+        try:
+            client = self.registry_client(registry, region)
+            digest = push_code_layer(
+                client, repository, previous["digest"], tag, self.app_root, plan
+            )
+        except (AssembleError, RegistryError, DockerBuilderError) as e:
+            logger.warning(f"Code-only update failed ({e}), running a full build")
+            return None
+
+        code_layers = int(previous.get("code_layers", 0))
+        if digest != previous["digest"]:
+            code_layers += 1
+        record_pushed_image(
+            f"{registry}/{repository}", digest, self.platform, content, tree, code_layers
+        )
+        logger.info(f"✓ Pushed code-only update {digest}")
+        return digest
+
+    def _record_push(
+        self, ecr_uri: str, region: str, dockerfile_path: Optional[str], tree: Dict[str, Any]
+    ) -> None:
+        """Record a fully built and pushed image as the base of later code-only updates."""
+        from jvdeploy.image.assemble import (
+            AssembleError,
+            record_pushed_image,
+            resolve_image_manifest,
+        )
+        from jvdeploy.registry import RegistryError
+
+        registry, repository, tag = parse_image_uri(ecr_uri)
+        try:
+            client = self.registry_client(registry, region)
+            _, _, digest = resolve_image_manifest(client, repository, tag, self.platform)
+            content = self._dockerfile_content(dockerfile_path)
+        except (AssembleError, RegistryError, DockerBuilderError) as e:
+            logger.warning(f"Could not record pushed image for code-only updates: {e}")
+            return
+        record_pushed_image(f"{registry}/{repository}", digest, self.platform, content, tree)
+
     def build_and_push_to_ecr(
         self,
         ecr_uri: str,
@@ -327,6 +1125,7 @@ class DockerBuilder:
         account_id: Optional[str] = None,
         dockerfile_path: Optional[str] = None,
         no_cache: bool = False,
+        skip_existing: bool = True,
     ) -> str:
         """Build Docker image and push to ECR (convenience method).
 
@@ -336,6 +1135,7 @@ class DockerBuilder:
             account_id: AWS account ID (optional, will be auto-detected if not provided)
             dockerfile_path: Path to Dockerfile (optional)
             no_cache: If True, build without cache
+            skip_existing: If True, skip login and push when ECR already holds the image
 
         Returns:
             Full ECR image URI
@@ -348,6 +1148,30 @@ class DockerBuilder:
             account_id = self.get_aws_account_id(region)
         logger.info("=== Starting Docker build and push to ECR ===")
 
+        if len(self.platforms) > 1:
+            return self._build_and_push_platforms(
+                ecr_uri, region, account_id, dockerfile_path, no_cache, skip_existing
+            )
+
+        tree = None
+        if self.code_only_updates and not no_cache:
+            from jvdeploy.merkle import hash_context
+
+            # Hashed before the build, so files edited during it are shipped next time
+            tree = hash_context(self.app_root)
+            if self.push_code_update(ecr_uri, region, dockerfile_path, tree):
+                logger.info("=== Successfully pushed code-only update to ECR ===")
+                return ecr_uri
+
+        if self.compression:
+            # BuildKit pushes the compressed layers itself and skips blobs ECR already has
+            self.ecr_login(region=region, account_id=account_id)
+            self.build(dockerfile_path=dockerfile_path, no_cache=no_cache, push_uris=[ecr_uri])
+            if tree:
+                self._record_push(ecr_uri, region, dockerfile_path, tree)
+            logger.info("=== Successfully built and pushed to ECR ===")
+            return ecr_uri
+
         # Step 1: Build the image locally
         local_image = self.build(dockerfile_path=dockerfile_path, no_cache=no_cache)
 
@@ -355,11 +1179,82 @@ class DockerBuilder:
         logger.info(f"Tagging image for ECR: {ecr_uri}")
         self.tag(local_image, ecr_uri)
 
+        if skip_existing:
+            digest = self.find_image_in_ecr(ecr_uri, region)
+            if digest:
+                logger.info(f"✓ ECR already holds {digest}, skipping push")
+                if tree:
+                    self._record_push(ecr_uri, region, dockerfile_path, tree)
+                return ecr_uri
+
         # Step 3: Authenticate with ECR
         self.ecr_login(region=region, account_id=account_id)
 
         # Step 4: Push to ECR
         self.push(ecr_uri)
+        if tree:
+            self._record_push(ecr_uri, region, dockerfile_path, tree)
+
+        logger.info("=== Successfully built and pushed to ECR ===")
+        return ecr_uri
+
+    def _build_and_push_platforms(
+        self,
+        ecr_uri: str,
+        region: str,
+        account_id: str,
+        dockerfile_path: Optional[str],
+        no_cache: bool,
+        skip_existing: bool,
+    ) -> str:
+        """Build all platforms concurrently and push per-platform tags to ECR.
+
+        The plain tag points at the primary platform image (Lambda needs a
+        single-platform image), or at a manifest list when ``manifest_list``
+        is set.
+        """
+        base_uri = ecr_uri.split("@", 1)[0].rsplit(":", 1)[0]
+
+        if self.compression:
+            self.ecr_login(region=region, account_id=account_id)
+            self.build_platforms(
+                dockerfile_path=dockerfile_path, no_cache=no_cache, push_base_uri=ecr_uri
+            )
+            if self.manifest_list:
+                self.create_manifest_list(
+                    ecr_uri,
+                    [
+                        f"{base_uri}:{self.image_tag}-{self.platform_suffix(p)}"
+                        for p in self.platforms
+                    ],
+                )
+            logger.info("=== Successfully built and pushed to ECR ===")
+            return ecr_uri
+
+        images = self.build_platforms(dockerfile_path=dockerfile_path, no_cache=no_cache)
+
+        logged_in = False
+        pushed = []
+        for platform in self.platforms:
+            targets = [f"{base_uri}:{self.image_tag}-{self.platform_suffix(platform)}"]
+            if platform == self.platform and not self.manifest_list:
+                targets.append(ecr_uri)
+
+            for target in targets:
+                self.tag(images[platform], target)
+                if skip_existing and self.find_image_in_ecr(target, region):
+                    logger.info(f"✓ ECR already holds {target}, skipping push")
+                    continue
+                if not logged_in:
+                    self.ecr_login(region=region, account_id=account_id)
+                    logged_in = True
+                self.push(target)
+            pushed.append(targets[0])
+
+        if self.manifest_list:
+            if not logged_in:
+                self.ecr_login(region=region, account_id=account_id)
+            self.create_manifest_list(ecr_uri, pushed)
 
         logger.info("=== Successfully built and pushed to ECR ===")
         return ecr_uri
@@ -375,6 +1270,14 @@ def build_and_push(
     platform: str = "linux/amd64",
     no_cache: bool = False,
     builder: Optional[str] = None,
+    backend: str = "cli",
+    platforms: Optional[List[str]] = None,
+    manifest_list: bool = False,
+    compression: Optional[str] = None,
+    compression_level: Optional[int] = None,
+    budget: Optional[Dict[str, Any]] = None,
+    code_only_updates: bool = False,
+    push_client: str = "docker",
 ) -> str:
     """Build and push Docker image to ECR (convenience function).
 
@@ -388,6 +1291,14 @@ def build_and_push(
         platform: Target platform (default: linux/amd64)
         no_cache: If True, build without cache
         builder: Docker BuildKit builder to use (optional)
+        backend: 'cli' or 'engine' (default: cli)
+        platforms: Platforms to build concurrently (optional, overrides platform)
+        manifest_list: If True, publish the tag as a multi-platform manifest list
+        compression: Layer compression (gzip, zstd or estargz, optional)
+        compression_level: Compression level (optional)
+        budget: Image size budget (optional, see DockerBuilder)
+        code_only_updates: Push code-only changes without a Docker build
+        push_client: 'docker' or 'registry' (see DockerBuilder)
 
     Returns:
         Full ECR image URI
@@ -401,6 +1312,14 @@ def build_and_push(
         image_tag=image_tag,
         platform=platform,
         builder=builder,
+        backend=backend,
+        platforms=platforms,
+        manifest_list=manifest_list,
+        compression=compression,
+        compression_level=compression_level,
+        budget=budget,
+        code_only_updates=code_only_updates,
+        push_client=push_client,
     )
 
     return builder_obj.build_and_push_to_ecr(
@@ -0,0 +1,387 @@
+"""Docker Engine API client for jvdeploy.
+
+Talks to the Docker daemon over its unix socket with a persistent HTTP/1.1
+connection, instead of forking the docker CLI for every operation.
+"""
+
+import base64
+import http.client
+import json
+import logging
+import os
+import socket
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional
+from urllib.parse import quote, urlencode
+
+from jvdeploy.dockerignore import DockerIgnore, iter_context_files
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+API_VERSION = "v1.41"
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class DockerEngineError(Exception):
+    """Exception raised for Docker Engine API errors."""
+
+    pass
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        """Connect to the unix socket instead of a TCP host."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def default_socket_path() -> str:
+    """Resolve the Docker socket path from DOCKER_HOST or the default location.
+
+    Returns:
+        Path to the Docker daemon unix socket
+    """
+    docker_host = os.environ.get("DOCKER_HOST", "")
+    if docker_host.startswith("unix://"):
+        return docker_host[len("unix://") :]
+    return DEFAULT_SOCKET
+
+
+def registry_auth_header(username: str, password: str, server: str) -> str:
+    """Encode registry credentials for the X-Registry-Auth header.
+
+    Args:
+        username: Registry username
+        password: Registry password or token
+        server: Registry server address
+
+    Returns:
+        URL-safe base64 encoded JSON credentials
+    """
+    payload = json.dumps({"username": username, "password": password, "serveraddress": server})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def make_build_context(context_dir: Path, dockerfile: Path) -> IO[bytes]:
+    """Pack a build context into a tar archive, honoring .dockerignore.
+
+    Args:
+        context_dir: Build context root
+        dockerfile: Path to the Dockerfile
+
+    Returns:
+        Seekable file object positioned at the start of the archive
+    """
+    archive = tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024)
+    ignore = DockerIgnore.from_dir(context_dir)
+
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        for rel_path, entry in iter_context_files(context_dir, ignore):
+            tar.add(entry.path, arcname=rel_path, recursive=False)
+
+        # The daemon always needs the Dockerfile, even if it is ignored or
+        # lives outside the context
+        try:
+            dockerfile_rel = dockerfile.resolve().relative_to(context_dir.resolve()).as_posix()
+        except ValueError:
+            dockerfile_rel = None
+        if dockerfile_rel is None or ignore.is_ignored(dockerfile_rel):
+            tar.add(str(dockerfile), arcname=".jvdeploy.Dockerfile", recursive=False)
+
+    archive.seek(0)
+    return archive
+
+
+class DockerEngineClient:
+    """Minimal Docker Engine API client over a unix socket."""
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        api_version: str = API_VERSION,
+        timeout: float = 1800,
+    ):
+        """Initialize Engine API client.
+
+        Args:
+            socket_path: Path to the Docker socket (default: DOCKER_HOST or /var/run/docker.sock)
+            api_version: Engine API version prefix
+            timeout: Socket timeout in seconds for a single read or write
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.api_version = api_version
+        self.timeout = timeout
+        # One persistent connection per thread; HTTPConnection is not thread-safe
+        self._local = threading.local()
+
+    def _connection(self) -> _UnixHTTPConnection:
+        """Get this thread's persistent connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _UnixHTTPConnection(self.socket_path, self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> http.client.HTTPResponse:
+        """Send a request and return the (unread) response.
+
+        Callers must read the response to completion before the next request
+        so the connection can be reused.
+        """
+        url = f"/{self.api_version}{path}"
+        if params:
+            url += "?" + urlencode({k: v for k, v in params.items() if v is not None})
+
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                if hasattr(body, "seek"):
+                    body.seek(0)
+                conn.request(method, url, body=body, headers=headers or {})
+                return conn.getresponse()
+            except (ConnectionError, http.client.HTTPException) as e:
+                # The daemon may have closed an idle keep-alive connection
+                self.close()
+                if attempt:
+                    raise DockerEngineError(f"Docker Engine request failed: {e}") from e
+            except OSError as e:
+                self.close()
+                raise DockerEngineError(
+                    f"Cannot connect to Docker Engine at {self.socket_path}: {e}"
+                ) from e
+
+        raise DockerEngineError("Docker Engine request failed")
+
+    @staticmethod
+    def _raise_for_status(response: http.client.HTTPResponse, data: bytes) -> None:
+        """Raise DockerEngineError for error responses."""
+        if response.status < 400:
+            return
+        message = data.decode("utf-8", errors="replace")
+        try:
+            message = json.loads(message).get("message", message)
+        except (ValueError, AttributeError):
+            pass
+        raise DockerEngineError(f"Docker Engine API error {response.status}: {message.strip()}")
+
+    def _call(self, method: str, path: str, **kwargs: Any) -> Any:
+        """Send a request and decode the JSON (or empty) response."""
+        response = self._request(method, path, **kwargs)
+        data = response.read()
+        self._raise_for_status(response, data)
+        if not data:
+            return None
+        if "json" in response.getheader("Content-Type", ""):
+            return json.loads(data)
+        return data.decode("utf-8", errors="replace")
+
+    def _stream(
+        self,
+        method: str,
+        path: str,
+        on_progress: Optional[ProgressCallback] = None,
+        **kwargs: Any,
+    ) -> List[Dict[str, Any]]:
+        """Send a request whose response is a stream of JSON progress messages.
+
+        Returns:
+            All 'aux' messages emitted by the daemon
+        """
+        response = self._request(method, path, **kwargs)
+        if response.status >= 400:
+            self._raise_for_status(response, response.read())
+
+        aux: List[Dict[str, Any]] = []
+        error: Optional[str] = None
+        buffer = b""
+
+        while True:
+            chunk = response.read1(65536) if hasattr(response, "read1") else response.read(65536)
+            if not chunk:
+                break
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.debug(f"Unparseable progress line: {line!r}")
+                    continue
+
+                if on_progress:
+                    on_progress(message)
+                if "aux" in message:
+                    aux.append(message["aux"])
+                if "error" in message or "errorDetail" in message:
+                    detail = message.get("errorDetail") or {}
+                    error = message.get("error") or detail.get("message", "unknown error")
+
+        if error:
+            raise DockerEngineError(error)
+        return aux
+
+    def ping(self) -> bool:
+        """Check that the daemon is reachable.
+
+        Returns:
+            True if the daemon answered the ping
+        """
+        try:
+            return self._call("GET", "/_ping") == "OK"
+        except DockerEngineError:
+            return False
+
+    def version(self) -> Dict[str, Any]:
+        """Get daemon version information."""
+        return dict(self._call("GET", "/version"))
+
+    def inspect_image(self, name: str) -> Dict[str, Any]:
+        """Get low-level information about an image.
+
+        Args:
+            name: Image name or ID
+
+        Returns:
+            Image inspect data
+        """
+        return dict(self._call("GET", f"/images/{quote(name, safe='')}/json"))
+
+    def image_history(self, name: str) -> List[Dict[str, Any]]:
+        """Get the history of an image.
+
+        Args:
+            name: Image name or ID
+
+        Returns:
+            History entries, newest first (each with 'CreatedBy' and 'Size')
+        """
+        return list(self._call("GET", f"/images/{quote(name, safe='')}/history"))
+
+    def build(
+        self,
+        context_dir: Path,
+        dockerfile: Path,
+        tag: str,
+        platform: Optional[str] = None,
+        no_cache: bool = False,
+        build_args: Optional[Dict[str, str]] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Optional[str]:
+        """Build an image from a context directory.
+
+        Args:
+            context_dir: Build context root
+            dockerfile: Path to the Dockerfile
+            tag: Name and tag for the resulting image
+            platform: Target platform (e.g., linux/amd64)
+            no_cache: If True, do not use the build cache
+            build_args: Build-time variables
+            on_progress: Callback invoked with each JSON progress message
+
+        Returns:
+            Image ID reported by the daemon, if any
+        """
+        context = make_build_context(context_dir, dockerfile)
+        try:
+            dockerfile_rel = dockerfile.resolve().relative_to(context_dir.resolve()).as_posix()
+            if DockerIgnore.from_dir(context_dir).is_ignored(dockerfile_rel):
+                dockerfile_rel = ".jvdeploy.Dockerfile"
+        except ValueError:
+            dockerfile_rel = ".jvdeploy.Dockerfile"
+
+        params: Dict[str, Any] = {
+            "t": tag,
+            "dockerfile": dockerfile_rel,
+            "platform": platform,
+            "nocache": "1" if no_cache else None,
+            "buildargs": json.dumps(build_args) if build_args else None,
+        }
+        headers = {"Content-Type": "application/x-tar"}
+
+        try:
+            context.seek(0, os.SEEK_END)
+            headers["Content-Length"] = str(context.tell())
+            aux = self._stream(
+                "POST", "/build", on_progress, params=params, body=context, headers=headers
+            )
+        finally:
+            context.close()
+
+        for message in aux:
+            if "ID" in message:
+                return str(message["ID"])
+        return None
+
+    def tag(self, source: str, repository: str, tag: str) -> None:
+        """Tag an image.
+
+        Args:
+            source: Source image name or ID
+            repository: Target repository
+            tag: Target tag
+        """
+        self._call(
+            "POST",
+            f"/images/{quote(source, safe='')}/tag",
+            params={"repo": repository, "tag": tag},
+        )
+
+    def push(
+        self,
+        repository: str,
+        tag: str,
+        auth: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Optional[str]:
+        """Push an image to its registry.
+
+        Args:
+            repository: Repository including registry host
+            tag: Tag to push
+            auth: X-Registry-Auth header value (see registry_auth_header)
+            on_progress: Callback invoked with each JSON progress message
+
+        Returns:
+            Pushed manifest digest, if reported
+        """
+        headers = {"X-Registry-Auth": auth or base64.urlsafe_b64encode(b"{}").decode("ascii")}
+        aux = self._stream(
+            "POST",
+            f"/images/{quote(repository, safe='')}/push",
+            on_progress,
+            params={"tag": tag},
+            headers=headers,
+        )
+        for message in aux:
+            if "Digest" in message:
+                return str(message["Digest"])
+        return None
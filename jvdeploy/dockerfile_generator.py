@@ -12,6 +12,9 @@ import yaml
 
 logger = logging.getLogger(__name__)
 
+# Virtualenv the generated pip installs target
+SLIM_VENV_PATH = "/opt/venv"
+
 
 def discover_action_dependencies(app_root: Path) -> Dict[str, List[str]]:
     """Discover pip dependencies from all actions in the app.
@@ -108,23 +111,20 @@ def discover_action_dependencies(app_root: Path) -> Dict[str, List[str]]:
     return dependencies
 
 
-def generate_dockerfile_run_commands(dependencies: Dict[str, List[str]]) -> str:
-    """Generate RUN commands for pip dependencies.
+def action_install_commands(dependencies: Dict[str, List[str]]) -> Dict[str, str]:
+    """Build the pip install command for each action.
 
-    Creates separate RUN commands per action for better Docker layer caching.
-    Handles duplicate dependencies by deduplicating within each action's command.
+    Deduplicates dependencies within each action (by package name, keeping
+    the first occurrence).
 
     Args:
         dependencies: Dictionary mapping action names to pip dependency lists
 
     Returns:
-        String containing RUN commands for Dockerfile
+        Dictionary mapping action names to their install command (without RUN),
+        in action name order; actions without dependencies are omitted
     """
-    if not dependencies:
-        return ""
-
-    commands = []
-    commands.append("# Action-specific pip dependencies")
+    commands: Dict[str, str] = {}
 
     for action_name, deps in sorted(dependencies.items()):
         # Deduplicate dependencies for this action (preserve order)
@@ -138,13 +138,76 @@ def generate_dockerfile_run_commands(dependencies: Dict[str, List[str]]) -> str:
                 unique_deps.append(dep)
 
         if unique_deps:
-            commands.append(f"# Dependencies for {action_name}")
-            commands.append(f"RUN /opt/venv/bin/pip install --no-cache-dir {' '.join(unique_deps)}")
+            commands[action_name] = (
+                f"/opt/venv/bin/pip install --no-cache-dir {' '.join(unique_deps)}"
+            )
+
+    return commands
+
+
+def generate_dockerfile_run_commands(dependencies: Dict[str, List[str]]) -> str:
+    """Generate RUN commands for pip dependencies.
+
+    Creates separate RUN commands per action for better Docker layer caching.
+    Handles duplicate dependencies by deduplicating within each action's command.
+
+    Args:
+        dependencies: Dictionary mapping action names to pip dependency lists
+
+    Returns:
+        String containing RUN commands for Dockerfile
+    """
+    if not dependencies:
+        return ""
+
+    commands = []
+    commands.append("# Action-specific pip dependencies")
+
+    for action_name, command in action_install_commands(dependencies).items():
+        commands.append(f"# Dependencies for {action_name}")
+        commands.append(f"RUN {command}")
 
     return "\n".join(commands)
 
 
-def generate_dockerfile(app_root: Path, base_template_path: Path) -> str:
+def add_slim_pass(dockerfile_content: str, venv_path: str = SLIM_VENV_PATH) -> str:
+    """Chain a slimming pass onto every pip install RUN instruction.
+
+    The pass runs in the same instruction as the install, so removed files
+    never end up in an image layer.
+
+    Args:
+        dockerfile_content: Dockerfile content
+        venv_path: Virtualenv to slim inside the image
+
+    Returns:
+        Dockerfile content with ``&& jvdeploy slim`` appended to pip installs
+    """
+    lines = dockerfile_content.split("\n")
+    in_run = False
+    is_pip_install = False
+
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not in_run:
+            in_run = stripped.upper().startswith("RUN ")
+            is_pip_install = False
+        if not in_run:
+            continue
+
+        is_pip_install = is_pip_install or "pip install" in stripped
+        if stripped.endswith("\\"):
+            continue
+
+        # Last line of the RUN instruction
+        if is_pip_install:
+            lines[i] = f"{line.rstrip()} && jvdeploy slim {venv_path}"
+        in_run = False
+
+    return "\n".join(lines)
+
+
+def generate_dockerfile(app_root: Path, base_template_path: Path, slim: bool = False) -> str:
     """Generate Dockerfile for jvagent app.
 
     Loads the base Dockerfile template and extends it with action-specific
@@ -153,6 +216,7 @@ def generate_dockerfile(app_root: Path, base_template_path: Path) -> str:
     Args:
         app_root: Path to the jvagent app root directory
         base_template_path: Path to the base Dockerfile template
+        slim: If True, slim the virtualenv after each pip install (see add_slim_pass)
 
     Returns:
         Complete Dockerfile content as string
@@ -189,6 +253,9 @@ def generate_dockerfile(app_root: Path, base_template_path: Path) -> str:
         if placeholder in dockerfile_content:
             dockerfile_content = dockerfile_content.replace(placeholder, "")
 
+    if slim:
+        dockerfile_content = add_slim_pass(dockerfile_content)
+
     return dockerfile_content
 
 
@@ -0,0 +1,175 @@
+""".dockerignore handling for jvdeploy.
+
+Implements Docker's build-context exclusion rules so that tools which read
+the context directly (the Engine API backend, context hashing) see the same
+files the Docker daemon would.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Iterator, List, Pattern, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _translate(pattern: str) -> Pattern[str]:
+    """Translate a .dockerignore glob into a compiled regular expression.
+
+    Args:
+        pattern: Cleaned glob pattern (no leading '!' or '/')
+
+    Returns:
+        Compiled regex matching whole relative paths
+    """
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "*":
+            if pattern[i : i + 2] == "**":
+                # '**/' matches zero or more directories, a trailing '**' anything
+                if pattern[i : i + 3] == "**/":
+                    regex += "(?:.*/)?"
+                    i += 3
+                else:
+                    regex += ".*"
+                    i += 2
+                continue
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("^") or body.startswith("!"):
+                    body = "^" + body[1:]
+                regex += f"[{body}]"
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+    return re.compile(f"^{regex}$")
+
+
+class DockerIgnore:
+    """Match relative paths against .dockerignore patterns."""
+
+    def __init__(self, patterns: List[str]):
+        """Initialize matcher.
+
+        Args:
+            patterns: Raw .dockerignore lines (comments and blanks are skipped)
+        """
+        self.rules: List[Tuple[Pattern[str], bool]] = []
+
+        for line in patterns:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            exclusion = line.startswith("!")
+            if exclusion:
+                line = line[1:].strip()
+
+            cleaned = os.path.normpath(line).replace(os.sep, "/").lstrip("/")
+            if cleaned in ("", "."):
+                continue
+
+            self.rules.append((_translate(cleaned), exclusion))
+
+        self.has_exclusions = any(exclusion for _, exclusion in self.rules)
+
+    @classmethod
+    def from_dir(cls, context_dir: Union[str, Path]) -> "DockerIgnore":
+        """Load .dockerignore from a build context directory.
+
+        Args:
+            context_dir: Build context root
+
+        Returns:
+            DockerIgnore instance (matches nothing if the file is missing)
+        """
+        ignore_file = Path(context_dir) / ".dockerignore"
+        if not ignore_file.exists():
+            return cls([])
+
+        try:
+            return cls(ignore_file.read_text(encoding="utf-8").splitlines())
+        except Exception as e:
+            logger.warning(f"Error reading {ignore_file}: {e}")
+            return cls([])
+
+    def is_ignored(self, rel_path: str) -> bool:
+        """Check whether a context-relative path is excluded.
+
+        A pattern matches a path if it matches the path itself or any of its
+        parent directories. The last matching pattern wins.
+
+        Args:
+            rel_path: Path relative to the context root, using '/' separators
+
+        Returns:
+            True if the path is excluded from the build context
+        """
+        if not self.rules:
+            return False
+
+        parts = rel_path.strip("/").split("/")
+        prefixes = ["/".join(parts[: i + 1]) for i in range(len(parts))]
+
+        ignored = False
+        for regex, exclusion in self.rules:
+            if any(regex.match(prefix) for prefix in prefixes):
+                ignored = not exclusion
+        return ignored
+
+
+def iter_context_files(
+    context_dir: Union[str, Path], ignore: "DockerIgnore"
+) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Walk a build context, yielding files that are not ignored.
+
+    Directories are pruned as soon as they are ignored, unless exception
+    patterns could re-include something beneath them. Entries are yielded in
+    sorted order so output is deterministic.
+
+    Args:
+        context_dir: Build context root
+        ignore: Matcher for the context's .dockerignore
+
+    Yields:
+        Tuples of (relative path, os.DirEntry) for files and symlinks
+    """
+    stack = [""]
+    root = str(context_dir)
+
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            logger.warning(f"Cannot read directory {rel_dir or root}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            ignored = ignore.is_ignored(rel_path)
+
+            if entry.is_dir(follow_symlinks=False):
+                if ignored and not ignore.has_exclusions:
+                    continue
+                subdirs.append(rel_path)
+            elif not ignored:
+                yield rel_path, entry
+
+        stack.extend(reversed(subdirs))
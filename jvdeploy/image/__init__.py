@@ -0,0 +1,10 @@
+"""Image inspection modules for jvdeploy.
+
+Provides streaming analysis of built images: layer compression, size
+attribution and comparisons between builds.
+"""
+
+from jvdeploy.image.compression import CompressionError, compare_compression
+from jvdeploy.image.tarball import ImageTarballError, read_image
+
+__all__ = ["CompressionError", "ImageTarballError", "compare_compression", "read_image"]
@@ -0,0 +1,240 @@
+"""Layer size attribution for jvagent images.
+
+Walks every layer of a saved image in a single streaming pass and
+attributes its size to the Dockerfile instruction that created it and, for
+generated pip installs, to the action whose dependencies it installs.
+Memory use is bounded by the number of reported entries, not the image size.
+"""
+
+import heapq
+import logging
+import re
+import tarfile
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directory totals tracked per layer before the smallest are folded together
+MAX_TRACKED_DIRS = 4096
+OTHER_DIRS = "(other)"
+
+WHITEOUT_PREFIX = ".wh."
+
+_BUILD_ARGS_PREFIX = re.compile(r"^\|\d+ (?:\S+=\S* )*")
+
+
+def instruction_from_history(created_by: Optional[str]) -> str:
+    """Turn an image history 'created_by' entry into a Dockerfile instruction.
+
+    Args:
+        created_by: History entry (classic builder or BuildKit format)
+
+    Returns:
+        Instruction text (e.g., 'COPY . /var/task/' or 'RUN pip install ...')
+    """
+    text = (created_by or "").strip()
+    if text.endswith("# buildkit"):
+        text = text[: -len("# buildkit")].rstrip()
+
+    nop = "/bin/sh -c #(nop) "
+    if text.startswith(nop):
+        return text[len(nop) :].strip()
+
+    if text.startswith("RUN "):
+        text = text[len("RUN ") :]
+    text = _BUILD_ARGS_PREFIX.sub("", text)
+    if text.startswith("/bin/sh -c "):
+        return "RUN " + text[len("/bin/sh -c ") :].strip()
+    return text
+
+
+def attribute_instruction(instruction: str, install_commands: Dict[str, str]) -> Optional[str]:
+    """Find which action a RUN instruction installs dependencies for.
+
+    Args:
+        instruction: Instruction text (see instruction_from_history)
+        install_commands: Action name to install command (see
+            dockerfile_generator.action_install_commands)
+
+    Returns:
+        Action name, a label for other generated steps, or None
+    """
+    if not instruction.startswith("RUN "):
+        return None
+
+    command = instruction[len("RUN ") :].strip()
+    for action_name, install_command in install_commands.items():
+        if command == install_command or command.startswith(install_command + " &&"):
+            return action_name
+
+    if "jvdeploy pip-get-packages" in command:
+        return "jvagent core actions"
+    return None
+
+
+def _directory_key(path: str, depth: int) -> str:
+    """Map a file path to the directory its size is reported under.
+
+    Paths inside ``site-packages`` are grouped by package; others by their
+    first ``depth`` directories.
+    """
+    parts = path.strip("/").split("/")[:-1]
+    if "site-packages" in parts:
+        index = parts.index("site-packages")
+        return "/".join(parts[: index + 2])
+    return "/".join(parts[:depth]) or "."
+
+
+def _fold_smallest(sizes: Dict[str, int], keep: int) -> None:
+    """Fold all but the largest ``keep`` directories into one bucket, in place."""
+    largest = set(heapq.nlargest(keep, sizes, key=sizes.__getitem__))
+    other = 0
+    for key in list(sizes):
+        if key not in largest and key != OTHER_DIRS:
+            other += sizes.pop(key)
+    sizes[OTHER_DIRS] = sizes.get(OTHER_DIRS, 0) + other
+
+
+def summarize_layer(stream: IO[bytes], top: int = 10, depth: int = 3) -> Dict[str, Any]:
+    """Summarize one layer's contents without reading file data into memory.
+
+    Args:
+        stream: Uncompressed layer tar
+        top: Number of largest files and directories to keep
+        depth: Directory depth for paths outside site-packages
+
+    Returns:
+        Dictionary with 'size' (file bytes), 'files', 'deleted' (whiteouts),
+        'directories' and 'largest_files' (lists of (path, size), largest first)
+    """
+    directories: Dict[str, int] = {}
+    largest: List[Tuple[int, str]] = []
+    size = files = deleted = 0
+
+    with tarfile.open(fileobj=stream, mode="r|") as tar:
+        for member in tar:
+            name = member.name
+            if name.rsplit("/", 1)[-1].startswith(WHITEOUT_PREFIX):
+                deleted += 1
+                continue
+            if not member.isfile():
+                continue
+
+            files += 1
+            size += member.size
+            key = _directory_key(name, depth)
+            directories[key] = directories.get(key, 0) + member.size
+            if len(directories) > MAX_TRACKED_DIRS:
+                _fold_smallest(directories, MAX_TRACKED_DIRS // 2)
+
+            if len(largest) < top:
+                heapq.heappush(largest, (member.size, name))
+            elif member.size > largest[0][0]:
+                heapq.heapreplace(largest, (member.size, name))
+
+    top_dirs = heapq.nlargest(top, directories.items(), key=lambda item: item[1])
+    return {
+        "size": size,
+        "files": files,
+        "deleted": deleted,
+        "directories": top_dirs,
+        "largest_files": [(name, file_size) for file_size, name in sorted(largest, reverse=True)],
+    }
+
+
+def _empty_summary() -> Dict[str, Any]:
+    """Summary for a layer whose contents were not found in the tarball."""
+    return {"size": 0, "files": 0, "deleted": 0, "directories": [], "largest_files": []}
+
+
+def analyze_image(
+    source: str, app_root: Optional[Path] = None, top: int = 10, depth: int = 3
+) -> Dict[str, Any]:
+    """Attribute an image's size to layers, instructions and actions.
+
+    Args:
+        source: ``docker save`` tarball path or local image reference
+        app_root: jvagent app root, used to map pip install layers to actions
+        top: Number of largest files and directories to report per layer
+        depth: Directory depth for paths outside site-packages
+
+    Returns:
+        Dictionary with 'layers' (each with 'index', 'diff_id', 'instruction',
+        'action' and the layer summary), 'actions' (action name to bytes,
+        largest first) and 'size' (total file bytes)
+    """
+    from jvdeploy.dockerfile_generator import (
+        action_install_commands,
+        discover_action_dependencies,
+    )
+    from jvdeploy.image.tarball import read_image
+
+    install_commands: Dict[str, str] = {}
+    if app_root is not None:
+        install_commands = action_install_commands(discover_action_dependencies(Path(app_root)))
+
+    image = read_image(source, lambda _name, layer: summarize_layer(layer, top, depth))
+
+    layers = []
+    actions: Dict[str, int] = {}
+    for index, layer in enumerate(image["layers"]):
+        summary = layer["result"] or _empty_summary()
+        instruction = instruction_from_history(layer["created_by"])
+        action = attribute_instruction(instruction, install_commands)
+        if action:
+            actions[action] = actions.get(action, 0) + summary["size"]
+        layers.append(
+            {
+                "index": index,
+                "diff_id": layer["diff_id"],
+                "instruction": instruction,
+                "action": action,
+                **summary,
+            }
+        )
+
+    return {
+        "repo_tags": image["repo_tags"],
+        "layers": layers,
+        "actions": sorted(actions.items(), key=lambda item: -item[1]),
+        "size": sum(layer["size"] for layer in layers),
+    }
+
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def format_analysis(report: Dict[str, Any], limit: int = 5) -> str:
+    """Format an image analysis for the terminal.
+
+    Args:
+        report: Result of analyze_image
+        limit: Directories and files to list per layer
+
+    Returns:
+        Printable report, largest layers first
+    """
+    lines = [f"Total: {_mb(report['size'])} in {len(report['layers'])} layers", ""]
+
+    if report["actions"]:
+        lines.append("By action:")
+        for action, size in report["actions"]:
+            lines.append(f"  {_mb(size):>10}  {action}")
+        lines.append("")
+
+    for layer in sorted(report["layers"], key=lambda item: -item["size"]):
+        instruction = layer["instruction"]
+        if len(instruction) > 100:
+            instruction = instruction[:97] + "..."
+        owner = f" [{layer['action']}]" if layer["action"] else ""
+        lines.append(f"Layer {layer['index']}: {_mb(layer['size'])}, {layer['files']} files{owner}")
+        lines.append(f"  {instruction}")
+        for path, size in layer["directories"][:limit]:
+            lines.append(f"    {_mb(size):>10}  {path}/")
+        for path, size in layer["largest_files"][:limit]:
+            lines.append(f"    {_mb(size):>10}  {path}")
+        lines.append("")
+
+    return "\n".join(lines).rstrip()
@@ -0,0 +1,435 @@
+"""Daemonless image assembly for code-only updates.
+
+When only application code changed since the last pushed image, the new
+image is that image plus one layer holding the changed files. The layer is
+built here as a deterministic tarball (sorted entries, fixed timestamps and
+ownership, gzip without a timestamp), so the same change always produces the
+same digest. Only that layer, the updated image config and the new manifest
+are uploaded through the registry API; no Docker daemon is involved.
+
+Files removed since the last image are deleted with whiteout entries. A
+change to anything the generated Dockerfile's RUN steps read (dependency
+manifests, the Dockerfile itself) needs a full build.
+"""
+
+import copy
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import posixpath
+import stat
+import tarfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from jvdeploy.cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+PUSHED_IMAGES_CACHE = "pushed-images"
+
+# Modification time of every entry in a code layer
+LAYER_MTIME = 1
+LAYER_CREATED = "1970-01-01T00:00:01Z"
+
+# Stacked code layers before a full build compacts them again
+MAX_CODE_LAYERS = 10
+
+# Files the generated Dockerfile's RUN steps read; changing one needs a full build
+DEPENDENCY_FILES = (
+    "info.yaml",
+    "requirements.txt",
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "Dockerfile",
+    ".dockerignore",
+)
+
+OCI_MANIFEST = "application/vnd.oci.image.manifest.v1+json"
+DOCKER_MANIFEST = "application/vnd.docker.distribution.manifest.v2+json"
+INDEX_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+)
+LAYER_TYPES = {
+    OCI_MANIFEST: "application/vnd.oci.image.layer.v1.tar+gzip",
+    DOCKER_MANIFEST: "application/vnd.docker.image.rootfs.diff.tar.gzip",
+}
+
+
+class AssembleError(Exception):
+    """Exception raised when an image cannot be assembled."""
+
+    pass
+
+
+def _sha256(data: bytes) -> str:
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+def _context_copy_destination(instructions: List[str]) -> Optional[str]:
+    """Get the destination of the single ``COPY . <dir>`` that reads the context.
+
+    The copy must be in the final build stage (a context copy in an earlier
+    stage reaches the image only through that stage's RUN steps) and carry
+    no flags, since a code layer is always written as root with the files'
+    own modes.
+    """
+    from jvdeploy.build_impact import copy_sources
+
+    destinations = []
+    earlier_stage_reads_context = False
+    for instruction in instructions:
+        if instruction.upper().startswith("FROM "):
+            earlier_stage_reads_context = earlier_stage_reads_context or bool(destinations)
+            destinations = []
+            continue
+        sources = copy_sources(instruction)
+        if sources is None:
+            continue
+        if sources != ["."] or instruction.upper().startswith("ADD "):
+            return None
+        if any(arg.startswith("--") for arg in instruction.split()[1:]):
+            return None
+        destinations.append(instruction.split()[-1])
+
+    if earlier_stage_reads_context:
+        return None
+    if len(destinations) != 1 or not destinations[0].startswith("/"):
+        return None
+    return posixpath.normpath(destinations[0])
+
+
+def plan_code_update(
+    previous: Optional[Dict[str, Any]],
+    dockerfile_content: str,
+    tree: Dict[str, Any],
+    platform: str,
+) -> Dict[str, Any]:
+    """Decide whether a code-only update can replace a full build.
+
+    Args:
+        previous: Record of the last pushed image (see record_pushed_image), or None
+        dockerfile_content: Dockerfile that would be built
+        tree: Current Merkle tree of the build context (merkle.hash_context)
+        platform: Target platform
+
+    Returns:
+        Dictionary with 'eligible', 'reason' (why not, or a summary),
+        'destination' (image directory the context is copied to), 'changed'
+        (added or modified context paths) and 'removed'
+    """
+    from jvdeploy.build_impact import parse_dockerfile
+    from jvdeploy.merkle import diff_trees
+
+    plan: Dict[str, Any] = {
+        "eligible": False,
+        "reason": "",
+        "destination": None,
+        "changed": [],
+        "removed": [],
+    }
+    instructions = parse_dockerfile(dockerfile_content)
+
+    if not previous:
+        plan["reason"] = "no previous image recorded"
+    elif previous.get("platform") != platform:
+        plan["reason"] = f"previous image was built for {previous.get('platform')}"
+    elif previous.get("instructions") != instructions:
+        plan["reason"] = "Dockerfile changed"
+    elif int(previous.get("code_layers", 0)) >= MAX_CODE_LAYERS:
+        plan["reason"] = f"{MAX_CODE_LAYERS} code layers stacked, compacting"
+    else:
+        plan["destination"] = _context_copy_destination(instructions)
+        if plan["destination"] is None:
+            plan["reason"] = (
+                "Dockerfile does not copy the whole context to one directory "
+                "of the final stage without flags"
+            )
+            return plan
+
+        diff = diff_trees(previous, tree)
+        plan["changed"] = diff["added"] + diff["modified"]
+        plan["removed"] = diff["removed"]
+        dependencies = [
+            path
+            for path in plan["changed"] + plan["removed"]
+            if posixpath.basename(path) in DEPENDENCY_FILES
+        ]
+        if dependencies:
+            plan["reason"] = f"dependency files changed ({', '.join(dependencies[:3])})"
+        else:
+            plan["eligible"] = True
+            plan["reason"] = f"{len(plan['changed'])} changed, {len(plan['removed'])} removed files"
+
+    return plan
+
+
+def _tar_info(name: str, kind: bytes, mode: int, size: int = 0) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(name)
+    info.type = kind
+    info.mode = mode
+    info.size = size
+    info.mtime = LAYER_MTIME
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def build_layer(
+    app_root: Path, changed: List[str], removed: List[str], destination: str
+) -> Dict[str, Any]:
+    """Build a deterministic gzip layer of context files.
+
+    Args:
+        app_root: Build context root
+        changed: Context-relative paths to add (files or symlinks)
+        removed: Context-relative paths to delete (written as whiteouts)
+        destination: Absolute image directory the context is copied to
+
+    Returns:
+        Dictionary with 'data' (compressed layer), 'digest' (of the compressed
+        layer), 'diff_id' (of the uncompressed tar) and 'size'
+
+    Raises:
+        AssembleError: If a changed file cannot be read
+    """
+    prefix = destination.strip("/")
+    entries: Dict[str, Tuple[tarfile.TarInfo, Optional[bytes]]] = {}
+
+    def image_path(rel_path: str) -> str:
+        return f"{prefix}/{rel_path}" if prefix else rel_path
+
+    def add_parents(rel_path: str) -> None:
+        parent = posixpath.dirname(rel_path)
+        while parent and parent not in entries:
+            entries[parent] = (_tar_info(image_path(parent), tarfile.DIRTYPE, 0o755), None)
+            parent = posixpath.dirname(parent)
+
+    for rel_path in changed:
+        path = Path(app_root) / rel_path
+        try:
+            st = path.lstat()
+            if stat.S_ISLNK(st.st_mode):
+                info = _tar_info(image_path(rel_path), tarfile.SYMTYPE, stat.S_IMODE(st.st_mode))
+                info.linkname = os.readlink(path)
+                data = None
+            else:
+                data = path.read_bytes()
+                info = _tar_info(
+                    image_path(rel_path), tarfile.REGTYPE, stat.S_IMODE(st.st_mode), len(data)
+                )
+        except OSError as e:
+            raise AssembleError(f"Cannot read {rel_path}: {e}") from e
+        entries[rel_path] = (info, data)
+        add_parents(rel_path)
+
+    for rel_path in removed:
+        directory, name = posixpath.split(rel_path)
+        whiteout = posixpath.join(directory, f".wh.{name}")
+        entries[whiteout] = (_tar_info(image_path(whiteout), tarfile.REGTYPE, 0o644), b"")
+        add_parents(rel_path)
+
+    raw = io.BytesIO()
+    with tarfile.open(fileobj=raw, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for key in sorted(entries):
+            info, data = entries[key]
+            tar.addfile(info, io.BytesIO(data) if data is not None else None)
+    tar_bytes = raw.getvalue()
+
+    compressed = io.BytesIO()
+    with gzip.GzipFile(fileobj=compressed, mode="wb", mtime=0) as gz:
+        gz.write(tar_bytes)
+    data = compressed.getvalue()
+
+    return {
+        "data": data,
+        "digest": _sha256(data),
+        "diff_id": _sha256(tar_bytes),
+        "size": len(data),
+    }
+
+
+def append_layer(
+    manifest: Dict[str, Any],
+    config: Dict[str, Any],
+    layer: Dict[str, Any],
+    created_by: str,
+) -> Tuple[Dict[str, Any], bytes]:
+    """Add a layer on top of an image.
+
+    Args:
+        manifest: Image manifest (OCI or Docker v2 schema 2)
+        config: Image config
+        layer: Result of build_layer
+        created_by: History entry describing the layer
+
+    Returns:
+        Tuple of (new manifest, serialized new config); the manifest's config
+        descriptor already points at the new config
+
+    Raises:
+        AssembleError: If the manifest type is not supported
+    """
+    media_type = manifest.get("mediaType") or OCI_MANIFEST
+    if media_type not in LAYER_TYPES:
+        raise AssembleError(f"Unsupported manifest type: {media_type}")
+
+    config = copy.deepcopy(config)
+    config.setdefault("rootfs", {"type": "layers", "diff_ids": []})["diff_ids"].append(
+        layer["diff_id"]
+    )
+    config.setdefault("history", []).append(
+        {"created": LAYER_CREATED, "created_by": created_by, "comment": "jvdeploy"}
+    )
+    config_bytes = json.dumps(config, separators=(",", ":")).encode("utf-8")
+
+    manifest = copy.deepcopy(manifest)
+    manifest["config"] = dict(
+        manifest["config"], digest=_sha256(config_bytes), size=len(config_bytes)
+    )
+    manifest["layers"].append(
+        {
+            "mediaType": LAYER_TYPES[media_type],
+            "size": layer["size"],
+            "digest": layer["digest"],
+        }
+    )
+    return manifest, config_bytes
+
+
+def _fetch_manifest(client: Any, repository: str, reference: str) -> Tuple[bytes, Dict[str, Any]]:
+    """Get a manifest's raw bytes and parsed content."""
+    from jvdeploy.registry import MANIFEST_TYPES
+
+    _, _, raw = client.request(
+        "GET",
+        f"/v2/{repository}/manifests/{reference}",
+        scope=f"repository:{repository}:pull",
+        headers={"Accept": ", ".join(MANIFEST_TYPES)},
+    )
+    try:
+        return raw, json.loads(raw)
+    except ValueError as e:
+        raise AssembleError(f"Invalid manifest for {repository}@{reference}") from e
+
+
+def resolve_image_manifest(
+    client: Any, repository: str, reference: str, platform: str
+) -> Tuple[bytes, Dict[str, Any], str]:
+    """Get the single-platform manifest of an image, following an index.
+
+    Args:
+        client: RegistryClient for the image's registry
+        repository: Repository name
+        reference: Tag or digest
+        platform: Platform to pick from an index (e.g., 'linux/amd64')
+
+    Returns:
+        Tuple of (raw manifest, manifest, digest)
+
+    Raises:
+        AssembleError: If an index has no manifest for the platform
+    """
+    raw, manifest = _fetch_manifest(client, repository, reference)
+    if manifest.get("mediaType") in INDEX_TYPES or "manifests" in manifest:
+        os_name, _, architecture = platform.partition("/")
+        for entry in manifest.get("manifests", []):
+            entry_platform = entry.get("platform") or {}
+            if (entry_platform.get("os"), entry_platform.get("architecture")) == (
+                os_name,
+                architecture,
+            ):
+                raw, manifest = _fetch_manifest(client, repository, entry["digest"])
+                break
+        else:
+            raise AssembleError(f"{repository}@{reference} has no {platform} image")
+    return raw, manifest, _sha256(raw)
+
+
+def push_code_layer(
+    client: Any,
+    repository: str,
+    base_digest: str,
+    tag: str,
+    app_root: Path,
+    plan: Dict[str, Any],
+) -> str:
+    """Push an image that adds one code layer to an existing image.
+
+    Args:
+        client: RegistryClient with push access to the repository
+        repository: Repository name
+        base_digest: Manifest digest of the image to extend
+        tag: Tag to publish the new image under
+        app_root: Build context root
+        plan: Eligible result of plan_code_update
+
+    Returns:
+        Manifest digest of the new image
+
+    Raises:
+        AssembleError: If the image cannot be assembled
+        RegistryError: If a registry request fails
+    """
+    raw, manifest = _fetch_manifest(client, repository, base_digest)
+    media_type = manifest.get("mediaType") or OCI_MANIFEST
+    if "layers" not in manifest:
+        raise AssembleError(f"{repository}@{base_digest} is not a single-platform image")
+
+    if not plan["changed"] and not plan["removed"]:
+        logger.info(f"No code changes, tagging {base_digest} as {tag}")
+        return str(client.put_manifest(repository, tag, raw, media_type))
+
+    config = json.loads(client.get_blob(repository, manifest["config"]["digest"]))
+    layer = build_layer(app_root, plan["changed"], plan["removed"], plan["destination"])
+    created_by = f"jvdeploy code update: {plan['reason']}"
+    new_manifest, config_bytes = append_layer(manifest, config, layer, created_by)
+
+    if client.upload_blob(repository, layer["data"], layer["digest"]) == "uploaded":
+        logger.info(f"Uploaded code layer {layer['digest'][:19]} ({layer['size']:,} bytes)")
+    client.upload_blob(repository, config_bytes, new_manifest["config"]["digest"])
+    body = json.dumps(new_manifest, separators=(",", ":")).encode("utf-8")
+    return str(client.put_manifest(repository, tag, body, media_type))
+
+
+def record_pushed_image(
+    repository_uri: str,
+    digest: str,
+    platform: str,
+    dockerfile_content: str,
+    tree: Dict[str, Any],
+    code_layers: int = 0,
+) -> None:
+    """Remember what a pushed image contains, for the next code-only update.
+
+    Args:
+        repository_uri: Registry host and repository
+        digest: Manifest digest of the single-platform image
+        platform: Platform the image was built for
+        dockerfile_content: Dockerfile the image was built from
+        tree: Merkle tree of the context the image was built from
+        code_layers: Code layers stacked on the last full build
+    """
+    from jvdeploy.build_impact import parse_dockerfile
+
+    JsonCache(PUSHED_IMAGES_CACHE).set(
+        repository_uri,
+        {
+            "digest": digest,
+            "platform": platform,
+            "instructions": parse_dockerfile(dockerfile_content),
+            "directories": tree["directories"],
+            "files": tree["files"],
+            "code_layers": code_layers,
+        },
+    )
+
+
+def get_pushed_image(repository_uri: str) -> Optional[Dict[str, Any]]:
+    """Get the record of the last image pushed to a repository (or None)."""
+    return JsonCache(PUSHED_IMAGES_CACHE).get(repository_uri)
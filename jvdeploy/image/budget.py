@@ -0,0 +1,120 @@
+"""Image size budgets for jvagent images.
+
+Checks a built image against ``image.budget`` limits (total size, layer
+count, largest layer) and names the actions behind the largest layers, so
+a new dependency that blows up cold-start time is caught at build time.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUDGET_LIMITS = ("max_size_mb", "max_layers", "max_layer_mb")
+BUDGET_MODES = ("fail", "warn")
+
+MB = 1024 * 1024
+
+
+class BudgetError(Exception):
+    """Exception raised for invalid budget configuration."""
+
+    pass
+
+
+def validate_budget(budget: Any) -> Dict[str, Any]:
+    """Validate an ``image.budget`` section.
+
+    Args:
+        budget: Budget configuration from deploy.yaml
+
+    Returns:
+        Normalized budget with numeric limits and 'mode'
+
+    Raises:
+        BudgetError: If a limit is not a positive number or the mode is unknown
+    """
+    if not isinstance(budget, dict):
+        raise BudgetError("'image.budget' must be a dictionary")
+
+    normalized: Dict[str, Any] = {"mode": budget.get("mode", "fail")}
+    if normalized["mode"] not in BUDGET_MODES:
+        raise BudgetError(
+            f"'image.budget.mode' must be one of: {', '.join(BUDGET_MODES)} "
+            f"(got '{normalized['mode']}')"
+        )
+
+    for key in BUDGET_LIMITS:
+        value = budget.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise BudgetError(f"'image.budget.{key}' must be a positive number")
+        normalized[key] = value
+
+    return normalized
+
+
+def check_budget(
+    layers: List[Tuple[int, str]],
+    budget: Dict[str, Any],
+    app_root: Optional[Path] = None,
+    layer_count: Optional[int] = None,
+    top: int = 5,
+) -> Tuple[List[str], List[str]]:
+    """Check image layers against a budget.
+
+    Args:
+        layers: (size in bytes, history 'created_by') per layer, bottom first
+        budget: Validated budget (see validate_budget)
+        app_root: jvagent app root, used to attribute layers to actions
+        layer_count: Number of filesystem layers (default: len(layers))
+        top: Number of largest contributors to list
+
+    Returns:
+        Tuple of (violation messages, largest contributor lines); both are
+        empty if the image is within budget
+    """
+    from jvdeploy.image.analyze import attribute_instruction, instruction_from_history
+
+    install_commands: Dict[str, str] = {}
+    if app_root is not None:
+        from jvdeploy.dockerfile_generator import (
+            action_install_commands,
+            discover_action_dependencies,
+        )
+
+        install_commands = action_install_commands(discover_action_dependencies(app_root))
+
+    total = sum(size for size, _ in layers)
+    violations: List[str] = []
+
+    if "max_size_mb" in budget and total > budget["max_size_mb"] * MB:
+        violations.append(
+            f"Image size {total / MB:.1f} MB exceeds budget of {budget['max_size_mb']} MB"
+        )
+    count = len(layers) if layer_count is None else layer_count
+    if "max_layers" in budget and count > budget["max_layers"]:
+        violations.append(f"Image has {count} layers, budget is {budget['max_layers']}")
+    if "max_layer_mb" in budget:
+        for index, (size, _) in enumerate(layers):
+            if size > budget["max_layer_mb"] * MB:
+                violations.append(
+                    f"Layer {index} is {size / MB:.1f} MB, budget is {budget['max_layer_mb']} MB"
+                )
+
+    if not violations:
+        return [], []
+
+    ranked = sorted(enumerate(layers), key=lambda item: -item[1][0])[:top]
+    contributors = []
+    for index, (size, created_by) in ranked:
+        instruction = instruction_from_history(created_by)
+        action = attribute_instruction(instruction, install_commands)
+        label = f"action {action}" if action else instruction
+        if len(label) > 90:
+            label = label[:87] + "..."
+        contributors.append(f"  {size / MB:>9.1f} MB  layer {index}: {label}")
+
+    return violations, contributors
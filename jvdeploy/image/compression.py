@@ -0,0 +1,287 @@
+"""Layer compression settings and comparison for jvagent images.
+
+Maps ``image.build.compression`` to BuildKit output options and measures how
+each supported codec would do on an existing image, so the trade-off
+between pushed size and (de)compression time can be chosen per project.
+"""
+
+import json
+import logging
+import tarfile
+import time
+import zlib
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CODECS = ("gzip", "zstd", "estargz")
+
+# BuildKit defaults when no level is configured
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3, "estargz": 6}
+LEVEL_RANGES = {"gzip": (0, 9), "zstd": (1, 22), "estargz": (0, 9)}
+
+# Codecs AWS Lambda can pull: layers must be gzip compatible (estargz is)
+LAMBDA_CODECS = ("gzip", "estargz")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class CompressionError(Exception):
+    """Exception raised for invalid compression settings."""
+
+    pass
+
+
+def resolve_compression(
+    compression: Optional[str], level: Optional[int] = None, lambda_target: bool = False
+) -> Optional[Tuple[str, int]]:
+    """Validate compression settings.
+
+    Args:
+        compression: Codec name (gzip, zstd or estargz), or None for Docker's default
+        level: Compression level (default: codec default)
+        lambda_target: If True, fall back to gzip for codecs Lambda cannot pull
+
+    Returns:
+        Tuple of (codec, level), or None if no compression was configured
+
+    Raises:
+        CompressionError: If the codec or level is invalid
+    """
+    if not compression:
+        return None
+
+    codec = compression.lower()
+    if codec not in CODECS:
+        raise CompressionError(
+            f"Unknown compression '{compression}' (expected one of: {', '.join(CODECS)})"
+        )
+
+    if lambda_target and codec not in LAMBDA_CODECS:
+        logger.warning(f"AWS Lambda cannot pull {codec} layers, using gzip for this image")
+        codec, level = "gzip", None
+
+    if level is None:
+        level = DEFAULT_LEVELS[codec]
+
+    low, high = LEVEL_RANGES[codec]
+    if not low <= int(level) <= high:
+        raise CompressionError(f"{codec} compression level must be between {low} and {high}")
+
+    return codec, int(level)
+
+
+def buildx_output(image_uris: List[str], codec: str, level: int) -> str:
+    """Build the buildx ``--output`` value that pushes with the given compression.
+
+    Args:
+        image_uris: Image URIs to push
+        codec: Codec name
+        level: Compression level
+
+    Returns:
+        Value for ``docker buildx build --output``
+    """
+    names = ",".join(image_uris)
+    options = [
+        "type=image",
+        f'"name={names}"' if len(image_uris) > 1 else f"name={names}",
+        "push=true",
+        f"compression={codec}",
+        f"compression-level={level}",
+        # Re-compress layers pulled from the base image too
+        "force-compression=true",
+    ]
+    if codec != "gzip":
+        options.append("oci-mediatypes=true")
+    return ",".join(options)
+
+
+class _Codec:
+    """Streaming compressor that records output size and time spent."""
+
+    def __init__(self, name: str, level: int):
+        self.name = name
+        self.level = level
+        self.size = 0
+        self.seconds = 0.0
+        self._toc: Any = None
+        self._compressor = self._new_compressor()
+        if name == "estargz":
+            self._toc = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def _new_compressor(self) -> Any:
+        if self.name == "zstd":
+            import zstandard
+
+            return zstandard.ZstdCompressor(level=self.level).compressobj()
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def start_entry(self, name: str, size: int) -> None:
+        """Begin a tar entry (estargz compresses every entry as its own gzip member)."""
+        if self.name != "estargz":
+            return
+        start = time.perf_counter()
+        self.size += len(self._compressor.flush())
+        self._compressor = self._new_compressor()
+        toc_entry = json.dumps({"name": name, "size": size, "offset": self.size})
+        self.size += len(self._toc.compress(toc_entry.encode("utf-8")))
+        self.seconds += time.perf_counter() - start
+
+    def feed(self, data: bytes) -> None:
+        start = time.perf_counter()
+        self.size += len(self._compressor.compress(data))
+        self.seconds += time.perf_counter() - start
+
+    def finish(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        self.size += len(self._compressor.flush())
+        if self._toc is not None:
+            self.size += len(self._toc.flush())
+        self.seconds += time.perf_counter() - start
+        return {"size": self.size, "seconds": self.seconds}
+
+
+def available_codecs() -> List[str]:
+    """List codecs that can be measured in this environment.
+
+    Returns:
+        Codec names (zstd requires the optional zstandard package)
+    """
+    try:
+        import zstandard  # noqa: F401
+
+        return list(CODECS)
+    except ImportError:
+        return [codec for codec in CODECS if codec != "zstd"]
+
+
+def measure_layer(stream: IO[bytes], levels: Dict[str, int]) -> Dict[str, Any]:
+    """Compress one uncompressed layer with every codec in a single pass.
+
+    The layer tar is re-serialized entry by entry so estargz can be modeled
+    as one gzip member per file plus a table of contents.
+
+    Args:
+        stream: Uncompressed layer tar
+        levels: Mapping of codec name to level
+
+    Returns:
+        Dictionary with 'size' (uncompressed bytes) and 'codecs', mapping each
+        codec to its compressed 'size' and 'seconds'
+    """
+    codecs = [_Codec(name, level) for name, level in levels.items()]
+    uncompressed = 0
+
+    def feed(data: bytes) -> None:
+        nonlocal uncompressed
+        uncompressed += len(data)
+        for codec in codecs:
+            codec.feed(data)
+
+    with tarfile.open(fileobj=stream, mode="r|") as tar:
+        for member in tar:
+            for codec in codecs:
+                codec.start_entry(member.name, member.size)
+            feed(member.tobuf(tar.format, tar.encoding, tar.errors))
+            if not member.isfile():
+                continue
+
+            data_file = tar.extractfile(member)
+            if data_file is None:
+                continue
+            while True:
+                chunk = data_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                feed(chunk)
+            padding = -member.size % tarfile.BLOCKSIZE
+            if padding:
+                feed(b"\0" * padding)
+
+    feed(b"\0" * (2 * tarfile.BLOCKSIZE))
+    return {"size": uncompressed, "codecs": {codec.name: codec.finish() for codec in codecs}}
+
+
+def compare_compression(source: str, levels: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Measure every codec on every layer of an image.
+
+    Args:
+        source: ``docker save`` tarball path or local image reference
+        levels: Mapping of codec name to level (default: every available codec
+            at its default level)
+
+    Returns:
+        Dictionary with 'layers' (per-layer measurements with 'diff_id' and
+        'created_by') and 'totals' (per-codec size and seconds, plus
+        uncompressed 'size')
+
+    Raises:
+        CompressionError: If a requested codec is unknown or unavailable
+    """
+    from jvdeploy.image.tarball import read_image
+
+    if levels is None:
+        levels = {codec: DEFAULT_LEVELS[codec] for codec in available_codecs()}
+    for codec in levels:
+        if codec not in available_codecs():
+            raise CompressionError(
+                f"Cannot measure {codec}"
+                + (" (install zstandard)" if codec == "zstd" else " (unknown codec)")
+            )
+
+    image = read_image(source, lambda _name, layer: measure_layer(layer, levels))
+
+    totals: Dict[str, Any] = {"size": 0, "codecs": {c: {"size": 0, "seconds": 0.0} for c in levels}}
+    layers = []
+    for layer in image["layers"]:
+        result = layer["result"] or {"size": 0, "codecs": {}}
+        totals["size"] += result["size"]
+        for codec, numbers in result["codecs"].items():
+            totals["codecs"][codec]["size"] += numbers["size"]
+            totals["codecs"][codec]["seconds"] += numbers["seconds"]
+        layers.append(
+            {
+                "diff_id": layer["diff_id"],
+                "created_by": layer["created_by"],
+                "size": result["size"],
+                "codecs": result["codecs"],
+            }
+        )
+
+    return {"layers": layers, "totals": totals}
+
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f}"
+
+
+def format_compression_report(report: Dict[str, Any]) -> str:
+    """Format a compression comparison as a table.
+
+    Args:
+        report: Result of compare_compression
+
+    Returns:
+        Printable report, one row per layer plus totals
+    """
+    codecs = list(report["totals"]["codecs"])
+    header = f"{'Layer':<14} {'Raw MB':>9}" + "".join(
+        f" {codec + ' MB':>11} {codec + ' s':>10}" for codec in codecs
+    )
+    lines = [header]
+
+    for layer in report["layers"]:
+        digest = (layer["diff_id"] or "").split(":")[-1][:12] or "?"
+        row = f"{digest:<14} {_mb(layer['size']):>9}"
+        for codec in codecs:
+            numbers = layer["codecs"].get(codec, {"size": 0, "seconds": 0.0})
+            row += f" {_mb(numbers['size']):>11} {numbers['seconds']:>10.2f}"
+        lines.append(row)
+
+    totals = report["totals"]
+    row = f"{'Total':<14} {_mb(totals['size']):>9}"
+    for codec in codecs:
+        row += f" {_mb(totals['codecs'][codec]['size']):>11} {totals['codecs'][codec]['seconds']:>10.2f}"
+    lines.append(row)
+    return "\n".join(lines)
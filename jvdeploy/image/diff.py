@@ -0,0 +1,368 @@
+"""Layer and file comparison between two builds of an image.
+
+Compares images by layer ``diff_id`` (uncompressed layer digest), so a saved
+tarball can be compared with an image that only exists in a registry. For
+saved images every file is hashed while streaming, which also shows which
+files changed inside rebuilt layers.
+"""
+
+import hashlib
+import json
+import logging
+import subprocess
+import tarfile
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_PREFIX = "registry:"
+
+WHITEOUT_PREFIX = ".wh."
+OPAQUE_WHITEOUT = ".wh..wh..opq"
+
+CHUNK_SIZE = 1024 * 1024
+
+# File entry: (size, content digest)
+FileEntry = Tuple[int, bytes]
+
+
+class ImageDiffError(Exception):
+    """Exception raised when an image cannot be loaded for comparison."""
+
+    pass
+
+
+def hash_layer_files(stream: IO[bytes]) -> Dict[str, Any]:
+    """Hash every regular file in a layer.
+
+    Args:
+        stream: Uncompressed layer tar
+
+    Returns:
+        Dictionary with 'files' (path to (size, digest)) and 'whiteouts'
+        (paths deleted by this layer; directories end with '/')
+    """
+    files: Dict[str, FileEntry] = {}
+    whiteouts: List[str] = []
+
+    with tarfile.open(fileobj=stream, mode="r|") as tar:
+        for member in tar:
+            path = member.name[2:] if member.name.startswith("./") else member.name
+            directory, _, name = path.rpartition("/")
+            if name == OPAQUE_WHITEOUT:
+                whiteouts.append(f"{directory}/" if directory else "/")
+                continue
+            if name.startswith(WHITEOUT_PREFIX):
+                removed = name[len(WHITEOUT_PREFIX) :]
+                whiteouts.append(f"{directory}/{removed}" if directory else removed)
+                continue
+            if member.issym() or member.islnk():
+                files[path] = (
+                    0,
+                    hashlib.blake2b(member.linkname.encode(), digest_size=16).digest(),
+                )
+                continue
+            if not member.isfile():
+                continue
+
+            digest = hashlib.blake2b(digest_size=16)
+            data = tar.extractfile(member)
+            if data is not None:
+                while True:
+                    chunk = data.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+            files[path] = (member.size, digest.digest())
+
+    return {"files": files, "whiteouts": whiteouts}
+
+
+def merge_layers(layers: List[Dict[str, Any]]) -> Dict[str, FileEntry]:
+    """Apply layers in order to get the image's final file tree.
+
+    Args:
+        layers: Results of hash_layer_files, bottom layer first
+
+    Returns:
+        Dictionary mapping path to (size, digest) for files in the final image
+    """
+    tree: Dict[str, FileEntry] = {}
+    for layer in layers:
+        for removed in layer["whiteouts"]:
+            if removed.endswith("/"):
+                prefix = "" if removed == "/" else removed
+                for path in [p for p in tree if p.startswith(prefix)]:
+                    del tree[path]
+            else:
+                tree.pop(removed, None)
+                for path in [p for p in tree if p.startswith(removed + "/")]:
+                    del tree[path]
+        tree.update(layer["files"])
+    return tree
+
+
+def _run_imagetools(reference: str, *extra: str) -> str:
+    """Run ``docker buildx imagetools inspect`` and return its output."""
+    cmd = ["docker", "buildx", "imagetools", "inspect", reference, *extra]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+        raise ImageDiffError(f"Cannot inspect {reference}: {e}") from e
+    if result.returncode != 0:
+        raise ImageDiffError(f"Cannot inspect {reference}: {result.stderr.strip()}")
+    return result.stdout
+
+
+def load_registry_image(reference: str, platform: str = "linux/amd64") -> Dict[str, Any]:
+    """Load layer information for an image from its registry manifest.
+
+    Only manifests and the image config are fetched, no layer blobs, so
+    file-level changes are not available for registry images.
+
+    Args:
+        reference: Image reference in the registry
+        platform: Platform to pick from a multi-platform manifest list
+
+    Returns:
+        Image summary (see load_image)
+
+    Raises:
+        ImageDiffError: If the manifest cannot be read
+    """
+    manifest = json.loads(_run_imagetools(reference, "--raw"))
+    if "manifests" in manifest:
+        os_name, _, arch = platform.partition("/")
+        for entry in manifest["manifests"]:
+            entry_platform = entry.get("platform") or {}
+            if entry_platform.get("os") == os_name and entry_platform.get("architecture") == arch:
+                repository = reference.split("@", 1)[0].rsplit(":", 1)[0]
+                return load_registry_image(f"{repository}@{entry['digest']}", platform)
+        raise ImageDiffError(f"{reference} has no {platform} image")
+
+    config = json.loads(_run_imagetools(reference, "--format", "{{json .Image}}"))
+    if "rootfs" not in config and config:
+        # Older buildx keys the config by platform even for single images
+        config = config.get(platform) or next(iter(config.values()))
+
+    diff_ids = (config.get("rootfs") or {}).get("diff_ids") or []
+    history = [h for h in config.get("history") or [] if not h.get("empty_layer")]
+    layers = []
+    for index, layer in enumerate(manifest.get("layers") or []):
+        layers.append(
+            {
+                "diff_id": diff_ids[index] if index < len(diff_ids) else layer.get("digest"),
+                "size": int(layer.get("size", 0)),
+                "created_by": history[index].get("created_by", "") if index < len(history) else "",
+                "files": None,
+            }
+        )
+    return {"source": reference, "compressed": True, "layers": layers}
+
+
+def load_saved_image(source: str) -> Dict[str, Any]:
+    """Load layers and per-file hashes from a saved or local image.
+
+    Args:
+        source: ``docker save`` tarball path or local image reference
+
+    Returns:
+        Image summary (see load_image)
+    """
+    from jvdeploy.image.tarball import read_image
+
+    image = read_image(source, lambda _name, layer: hash_layer_files(layer))
+    layers = []
+    for layer in image["layers"]:
+        layers.append(
+            {
+                "diff_id": layer["diff_id"],
+                "size": layer["archive_size"],
+                "created_by": layer["created_by"],
+                "files": layer["result"] or {"files": {}, "whiteouts": []},
+            }
+        )
+    return {"source": source, "compressed": False, "layers": layers}
+
+
+def load_image(source: str, platform: str = "linux/amd64") -> Dict[str, Any]:
+    """Load an image for comparison.
+
+    Args:
+        source: Tarball path, local image reference, or ``registry:<reference>``
+            to read only the registry manifest
+        platform: Platform to pick from a registry manifest list
+
+    Returns:
+        Dictionary with 'source', 'compressed' (whether layer sizes are
+        compressed registry sizes) and 'layers' (each with 'diff_id', 'size',
+        'created_by' and 'files', None for registry images)
+
+    Raises:
+        ImageDiffError: If the image cannot be loaded
+    """
+    from jvdeploy.image.tarball import ImageTarballError
+
+    if source.startswith(REGISTRY_PREFIX):
+        return load_registry_image(source[len(REGISTRY_PREFIX) :], platform)
+    try:
+        return load_saved_image(source)
+    except ImageTarballError as e:
+        raise ImageDiffError(str(e)) from e
+
+
+def diff_images(
+    old: Dict[str, Any], new: Dict[str, Any], app_root: Optional[Path] = None
+) -> Dict[str, Any]:
+    """Compare two loaded images.
+
+    Args:
+        old: Image summary of the previous build (see load_image)
+        new: Image summary of the new build
+        app_root: jvagent app root, used to map changed layers to actions
+
+    Returns:
+        Dictionary with:
+        - 'new_layers': layers of the new image that the old one lacks
+          ('index', 'diff_id', 'size', 'instruction', 'action')
+        - 'new_bytes': total size of those layers (what a push or pull transfers)
+        - 'removed_layers': number of old layers no longer used
+        - 'diverged_at': first layer index where the builds differ (None if equal)
+        - 'cache_bust': True if the instruction at that index is unchanged,
+          meaning the same step produced different content
+        - 'changed_actions': actions whose dependency layers changed
+        - 'files': 'added', 'removed', 'modified' path lists, or None when a
+          registry image was involved
+    """
+    from jvdeploy.dockerfile_generator import (
+        action_install_commands,
+        discover_action_dependencies,
+    )
+    from jvdeploy.image.analyze import attribute_instruction, instruction_from_history
+
+    install_commands: Dict[str, str] = {}
+    if app_root is not None:
+        install_commands = action_install_commands(discover_action_dependencies(Path(app_root)))
+
+    old_ids = {layer["diff_id"] for layer in old["layers"]}
+    new_ids = {layer["diff_id"] for layer in new["layers"]}
+
+    new_layers = []
+    changed_actions: List[str] = []
+    for index, layer in enumerate(new["layers"]):
+        if layer["diff_id"] in old_ids:
+            continue
+        instruction = instruction_from_history(layer["created_by"])
+        action = attribute_instruction(instruction, install_commands)
+        if action and action not in changed_actions:
+            changed_actions.append(action)
+        new_layers.append(
+            {
+                "index": index,
+                "diff_id": layer["diff_id"],
+                "size": layer["size"],
+                "instruction": instruction,
+                "action": action,
+            }
+        )
+
+    diverged_at = None
+    cache_bust = False
+    for index in range(max(len(old["layers"]), len(new["layers"]))):
+        old_layer = old["layers"][index] if index < len(old["layers"]) else None
+        new_layer = new["layers"][index] if index < len(new["layers"]) else None
+        if old_layer and new_layer and old_layer["diff_id"] == new_layer["diff_id"]:
+            continue
+        diverged_at = index
+        cache_bust = bool(
+            old_layer
+            and new_layer
+            and instruction_from_history(old_layer["created_by"])
+            == instruction_from_history(new_layer["created_by"])
+        )
+        break
+
+    files = None
+    if all(layer["files"] is not None for layer in old["layers"] + new["layers"]):
+        old_tree = merge_layers([layer["files"] for layer in old["layers"]])
+        new_tree = merge_layers([layer["files"] for layer in new["layers"]])
+        files = {
+            "added": sorted(set(new_tree) - set(old_tree)),
+            "removed": sorted(set(old_tree) - set(new_tree)),
+            "modified": sorted(
+                path for path in set(old_tree) & set(new_tree) if old_tree[path] != new_tree[path]
+            ),
+            "added_bytes": sum(new_tree[p][0] for p in set(new_tree) - set(old_tree)),
+        }
+
+    return {
+        "new_layers": new_layers,
+        "new_bytes": sum(layer["size"] for layer in new_layers),
+        "compressed": new["compressed"],
+        "removed_layers": len(old_ids - new_ids),
+        "diverged_at": diverged_at,
+        "cache_bust": cache_bust,
+        "changed_actions": changed_actions,
+        "files": files,
+    }
+
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def format_diff(report: Dict[str, Any], limit: int = 20) -> str:
+    """Format an image diff for the terminal.
+
+    Args:
+        report: Result of diff_images
+        limit: Maximum number of changed files to list per category
+
+    Returns:
+        Printable report
+    """
+    kind = "compressed" if report["compressed"] else "uncompressed"
+    lines = [
+        f"New layers: {len(report['new_layers'])} ({_mb(report['new_bytes'])} {kind} to push/pull)",
+        f"Unused old layers: {report['removed_layers']}",
+    ]
+
+    if report["diverged_at"] is None:
+        lines.append("Images are identical")
+        return "\n".join(lines)
+
+    lines.append(f"Builds diverge at layer {report['diverged_at']}")
+    if report["cache_bust"]:
+        lines.append(
+            "⚠️  Same instruction produced different content there (cache bust or "
+            "non-reproducible step)"
+        )
+
+    lines.append("")
+    for layer in report["new_layers"]:
+        owner = f" [{layer['action']}]" if layer["action"] else ""
+        instruction = layer["instruction"]
+        if len(instruction) > 100:
+            instruction = instruction[:97] + "..."
+        lines.append(f"  Layer {layer['index']}: {_mb(layer['size'])}{owner}")
+        lines.append(f"    {instruction}")
+
+    if report["changed_actions"]:
+        lines.append("")
+        lines.append(f"Changed action layers: {', '.join(report['changed_actions'])}")
+
+    files = report["files"]
+    if files is not None:
+        lines.append("")
+        lines.append(
+            f"Files: {len(files['added'])} added ({_mb(files['added_bytes'])}), "
+            f"{len(files['modified'])} modified, {len(files['removed'])} removed"
+        )
+        for label in ("added", "modified", "removed"):
+            for path in files[label][:limit]:
+                lines.append(f"  {label[0].upper()} {path}")
+            if len(files[label]) > limit:
+                lines.append(f"  ... {len(files[label]) - limit} more {label}")
+
+    return "\n".join(lines)
@@ -0,0 +1,291 @@
+"""Image push through the registry API.
+
+Pushes a ``docker save`` tarball (or a local image, streamed with
+``docker save``) without ``docker push``. Layers are compressed and
+uploaded concurrently, each as a chunked, resumable upload. Blobs already
+pushed to another repository of the same registry are mounted from it
+instead of uploaded again; the shared jvagent base layers are then sent to
+a registry only once.
+
+Uncompressed layers are gzipped deterministically, so the same layer
+always gets the same digest and can be found in sibling repositories.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from jvdeploy.cache import JsonCache
+from jvdeploy.image.tarball import GZIP_MAGIC, ZSTD_MAGIC, ImageTarballError, open_image
+
+logger = logging.getLogger(__name__)
+
+BLOB_INDEX_CACHE = "registry-blobs"
+
+DEFAULT_CONCURRENCY = 4
+
+# Repositories remembered per blob as mount sources
+MAX_MOUNT_SOURCES = 5
+
+GZIP_LEVEL = 6
+COPY_CHUNK_SIZE = 1024 * 1024
+
+DOCKER_MANIFEST = "application/vnd.docker.distribution.manifest.v2+json"
+DOCKER_CONFIG = "application/vnd.docker.container.image.v1+json"
+DOCKER_LAYER = "application/vnd.docker.image.rootfs.diff.tar.gzip"
+OCI_MANIFEST = "application/vnd.oci.image.manifest.v1+json"
+OCI_CONFIG = "application/vnd.oci.image.config.v1+json"
+OCI_LAYER_GZIP = "application/vnd.oci.image.layer.v1.tar+gzip"
+OCI_LAYER_ZSTD = "application/vnd.oci.image.layer.v1.tar+zstd"
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class PushError(Exception):
+    """Exception raised when an image cannot be pushed."""
+
+    pass
+
+
+def _spool_image(source: str, workdir: str) -> Dict[str, Any]:
+    """Copy the members of a ``docker save`` tarball to files for random access."""
+    paths: Dict[str, str] = {}
+    with open_image(source) as stream:
+        try:
+            with tarfile.open(fileobj=stream, mode="r|") as tar:
+                for member in tar:
+                    blob = tar.extractfile(member) if member.isfile() else None
+                    if blob is None:
+                        continue
+                    path = os.path.join(workdir, _SAFE_NAME.sub("_", member.name))
+                    with open(path, "wb") as out:
+                        shutil.copyfileobj(blob, out, COPY_CHUNK_SIZE)
+                    paths[member.name] = path
+        except tarfile.TarError as e:
+            raise ImageTarballError(f"Invalid image tarball: {e}") from e
+
+    if "manifest.json" not in paths:
+        raise ImageTarballError("Image tarball has no manifest.json")
+    with open(paths["manifest.json"], "rb") as f:
+        entry = json.load(f)[0]
+
+    config_path = paths.get(entry.get("Config", ""))
+    if config_path is None:
+        raise ImageTarballError("Image tarball has no image config")
+    layers = []
+    for name in entry.get("Layers") or []:
+        if name not in paths:
+            raise ImageTarballError(f"Image tarball is missing layer {name}")
+        layers.append(paths[name])
+
+    with open(config_path, "rb") as f:
+        config = f.read()
+    return {"config": config, "layers": layers}
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return "sha256:" + digest.hexdigest()
+
+
+def prepare_layer(path: str) -> Dict[str, Any]:
+    """Get a layer blob ready for upload, gzipping it if it is an uncompressed tar.
+
+    Args:
+        path: Layer file from a ``docker save`` tarball
+
+    Returns:
+        Dictionary with 'path' (blob to upload), 'digest', 'size' and
+        'compression' ('gzip' or 'zstd')
+    """
+    with open(path, "rb") as f:
+        head = f.read(4)
+
+    if head.startswith(GZIP_MAGIC) or head == ZSTD_MAGIC:
+        blob = path
+        compression = "gzip" if head.startswith(GZIP_MAGIC) else "zstd"
+    else:
+        blob = path + ".gz"
+        with open(path, "rb") as raw, open(blob, "wb") as out:
+            with gzip.GzipFile(
+                filename="", fileobj=out, mode="wb", compresslevel=GZIP_LEVEL, mtime=0
+            ) as gz:
+                shutil.copyfileobj(raw, gz, COPY_CHUNK_SIZE)
+        compression = "gzip"
+
+    return {
+        "path": blob,
+        "digest": _hash_file(blob),
+        "size": os.path.getsize(blob),
+        "compression": compression,
+    }
+
+
+def build_manifest(config: bytes, layers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build an image manifest for prepared layers.
+
+    Docker's schema 2 is used unless a layer is zstd compressed, which only
+    the OCI format can describe.
+
+    Args:
+        config: Serialized image config
+        layers: Results of prepare_layer in image order
+
+    Returns:
+        Manifest
+    """
+    oci = any(layer["compression"] == "zstd" for layer in layers)
+    return {
+        "schemaVersion": 2,
+        "mediaType": OCI_MANIFEST if oci else DOCKER_MANIFEST,
+        "config": {
+            "mediaType": OCI_CONFIG if oci else DOCKER_CONFIG,
+            "size": len(config),
+            "digest": "sha256:" + hashlib.sha256(config).hexdigest(),
+        },
+        "layers": [
+            {
+                "mediaType": (
+                    (OCI_LAYER_ZSTD if layer["compression"] == "zstd" else OCI_LAYER_GZIP)
+                    if oci
+                    else DOCKER_LAYER
+                ),
+                "size": layer["size"],
+                "digest": layer["digest"],
+            }
+            for layer in layers
+        ],
+    }
+
+
+def mount_sources(registry: str, digest: str) -> List[str]:
+    """Get repositories of a registry a blob was pushed to before (most recent first)."""
+    return list(JsonCache(BLOB_INDEX_CACHE).get(f"{registry}/{digest}") or [])
+
+
+def record_blobs(registry: str, repository: str, digests: Sequence[str]) -> None:
+    """Remember that a repository holds blobs, as mount sources for other repositories."""
+    index = JsonCache(BLOB_INDEX_CACHE)
+    for digest in digests:
+        key = f"{registry}/{digest}"
+        repositories = [repository] + [r for r in index.get(key) or [] if r != repository]
+        index.set(key, repositories[:MAX_MOUNT_SOURCES])
+
+
+def push_image(
+    source: str,
+    repository: str,
+    tag: str,
+    client: Any,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    chunk_size: Optional[int] = None,
+    mount_from: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """Push an image to a registry.
+
+    Args:
+        source: ``docker save`` tarball or local image reference
+        repository: Target repository
+        tag: Target tag
+        client: RegistryClient for the target registry
+        concurrency: Layers compressed and uploaded at the same time
+        chunk_size: Largest upload request body (default: the client's default)
+        mount_from: Extra repositories to try mounting blobs from (e.g. the
+            pull-through cache repository of the base image)
+
+    Returns:
+        Dictionary with 'digest' (manifest digest), 'blobs' (each with
+        'digest', 'size' and 'status': uploaded, mounted or exists),
+        'uploaded_bytes' and 'seconds'
+
+    Raises:
+        PushError: If the image cannot be read or a registry request fails
+    """
+    from jvdeploy.registry import DEFAULT_CHUNK_SIZE, RegistryError
+
+    start = time.time()
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+
+    def upload(path_or_data: Any, digest: str) -> str:
+        sources = list(mount_from) + mount_sources(client.registry, digest)
+        return str(
+            client.upload_blob(
+                repository, path_or_data, digest, chunk_size=chunk_size, mount_from=sources
+            )
+        )
+
+    with tempfile.TemporaryDirectory(prefix="jvdeploy-push-") as workdir:
+        try:
+            image = _spool_image(source, workdir)
+        except ImageTarballError as e:
+            raise PushError(str(e)) from e
+
+        def prepare_and_upload(path: str) -> Dict[str, Any]:
+            layer = prepare_layer(path)
+            layer["status"] = upload(layer["path"], layer["digest"])
+            logger.info(f"  {layer['digest'][:19]} {layer['size']:>14,} bytes {layer['status']}")
+            return layer
+
+        try:
+            # An image can list the same layer twice (e.g. identical empty layers)
+            unique = list(dict.fromkeys(image["layers"]))
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                prepared = dict(zip(unique, pool.map(prepare_and_upload, unique)))
+            layers = [prepared[path] for path in image["layers"]]
+            manifest = build_manifest(image["config"], layers)
+            config_status = upload(image["config"], manifest["config"]["digest"])
+            body = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+            digest = client.put_manifest(repository, tag, body, manifest["mediaType"])
+        except (RegistryError, OSError) as e:
+            raise PushError(f"Push to {client.registry}/{repository}:{tag} failed: {e}") from e
+
+    blobs = [
+        {"digest": layer["digest"], "size": layer["size"], "status": layer["status"]}
+        for layer in prepared.values()
+    ]
+    blobs.append(
+        {
+            "digest": manifest["config"]["digest"],
+            "size": manifest["config"]["size"],
+            "status": config_status,
+        }
+    )
+    record_blobs(client.registry, repository, [blob["digest"] for blob in blobs])
+
+    return {
+        "digest": digest,
+        "blobs": blobs,
+        "uploaded_bytes": sum(b["size"] for b in blobs if b["status"] == "uploaded"),
+        "seconds": time.time() - start,
+    }
+
+
+def format_push_report(report: Dict[str, Any]) -> str:
+    """Format a push result for the terminal.
+
+    Args:
+        report: Result of push_image
+
+    Returns:
+        Printable summary
+    """
+    counts = {status: 0 for status in ("uploaded", "mounted", "exists")}
+    for blob in report["blobs"]:
+        counts[blob["status"]] += 1
+    return (
+        f"✓ Pushed {report['digest']} in {report['seconds']:.1f}s: "
+        f"{counts['uploaded']} uploaded ({report['uploaded_bytes'] / 1024 / 1024:.1f} MB), "
+        f"{counts['mounted']} mounted, {counts['exists']} already present"
+    )
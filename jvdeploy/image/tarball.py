@@ -0,0 +1,205 @@
+"""Streaming reader for ``docker save`` image tarballs.
+
+Reads the tarball strictly front to back, so it works on a pipe from
+``docker save`` and never extracts layers to disk. Each layer is handed to a
+visitor as a decompressed stream; only small JSON documents (manifest,
+image config) are kept in memory.
+"""
+
+import gzip
+import json
+import logging
+import os
+import subprocess
+import tarfile
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# JSON documents (manifests, configs) larger than this are not kept
+MAX_DOCUMENT_SIZE = 16 * 1024 * 1024
+
+LayerVisitor = Callable[[str, IO[bytes]], Any]
+
+
+class ImageTarballError(Exception):
+    """Exception raised for unreadable image tarballs."""
+
+    pass
+
+
+@contextmanager
+def open_image(source: str) -> Iterator[IO[bytes]]:
+    """Open an image for streaming.
+
+    Args:
+        source: Path to a ``docker save`` tarball (optionally gzipped), or a
+            local image reference to stream with ``docker save``
+
+    Yields:
+        Binary stream of the uncompressed tarball
+
+    Raises:
+        ImageTarballError: If the image cannot be read
+    """
+    if os.path.isfile(source):
+        with open(source, "rb") as f:
+            if f.read(2) == GZIP_MAGIC:
+                f.seek(0)
+                with gzip.GzipFile(fileobj=f) as gz:
+                    yield gz
+            else:
+                f.seek(0)
+                yield f
+        return
+
+    try:
+        process = subprocess.Popen(
+            ["docker", "save", source], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except FileNotFoundError as e:
+        raise ImageTarballError("Docker is not installed") from e
+
+    assert process.stdout is not None
+    completed = False
+    try:
+        yield process.stdout
+        completed = True
+    finally:
+        if not completed:
+            process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read().decode("utf-8", errors="replace") if process.stderr else ""
+        returncode = process.wait()
+        if completed and returncode != 0:
+            raise ImageTarballError(f"docker save {source} failed: {stderr.strip()}")
+
+
+def decompress_layer(stream: IO[bytes]) -> IO[bytes]:
+    """Wrap a layer blob in a decompressor matching its magic bytes.
+
+    Args:
+        stream: Layer blob supporting ``peek`` (tar, gzip or zstd)
+
+    Returns:
+        Stream of the uncompressed layer tar
+
+    Raises:
+        ImageTarballError: If the layer is zstd compressed and zstandard is missing
+    """
+    head = stream.peek(4)[:4]  # type: ignore[attr-defined]
+    if head.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=stream)  # type: ignore[return-value]
+    if head == ZSTD_MAGIC:
+        try:
+            import zstandard
+        except ImportError:
+            raise ImageTarballError(
+                "zstandard is required to read zstd layers. Install with: pip install zstandard"
+            )
+        return zstandard.ZstdDecompressor().stream_reader(stream)  # type: ignore[no-any-return]
+    return stream
+
+
+def _classify(stream: IO[bytes], name: str) -> str:
+    """Decide whether a tarball member is a layer, a JSON document or neither."""
+    head = stream.peek(512)[:512]  # type: ignore[attr-defined]
+    if name.endswith("layer.tar") or head[:2] == GZIP_MAGIC or head[:4] == ZSTD_MAGIC:
+        return "layer"
+    if head[257:262] == b"ustar" or (len(head) == 512 and not head.strip(b"\0")):
+        return "layer"
+    if head.lstrip()[:1] in (b"{", b"["):
+        return "document"
+    return "other"
+
+
+def scan_image(stream: IO[bytes], visit_layer: LayerVisitor) -> Dict[str, Any]:
+    """Scan a ``docker save`` tarball, visiting every layer in a single pass.
+
+    Supports both the legacy layout (``<id>/layer.tar``) and the OCI layout
+    written by newer Docker releases (``blobs/sha256/<digest>``).
+
+    Args:
+        stream: Uncompressed tarball stream (see open_image)
+        visit_layer: Called with (member name, uncompressed layer stream) for
+            each layer; its return value is stored as the layer's 'result'
+
+    Returns:
+        Dictionary with 'repo_tags', 'config' (image config) and 'layers', a
+        list in image order of dictionaries with 'path', 'diff_id',
+        'archive_size' (bytes in the tarball), 'created_by' and 'result'
+
+    Raises:
+        ImageTarballError: If the tarball has no readable manifest
+    """
+    documents: Dict[str, Any] = {}
+    results: Dict[str, Any] = {}
+    sizes: Dict[str, int] = {}
+
+    try:
+        with tarfile.open(fileobj=stream, mode="r|") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                blob = tar.extractfile(member)
+                if blob is None:
+                    continue
+
+                kind = _classify(blob, member.name)
+                if kind == "layer":
+                    logger.debug(f"Reading layer {member.name} ({member.size} bytes)")
+                    sizes[member.name] = member.size
+                    results[member.name] = visit_layer(member.name, decompress_layer(blob))
+                elif kind == "document" and member.size <= MAX_DOCUMENT_SIZE:
+                    try:
+                        documents[member.name] = json.loads(blob.read())
+                    except ValueError:
+                        logger.debug(f"Ignoring non-JSON member {member.name}")
+    except tarfile.TarError as e:
+        raise ImageTarballError(f"Invalid image tarball: {e}") from e
+
+    manifest = documents.get("manifest.json")
+    if not isinstance(manifest, list) or not manifest:
+        raise ImageTarballError("Image tarball has no manifest.json")
+
+    entry = manifest[0]
+    config = documents.get(entry.get("Config", ""), {})
+    layer_paths: List[str] = list(entry.get("Layers") or [])
+    diff_ids: List[str] = list((config.get("rootfs") or {}).get("diff_ids") or [])
+    history = [h for h in config.get("history") or [] if not h.get("empty_layer")]
+
+    layers = []
+    for index, path in enumerate(layer_paths):
+        layers.append(
+            {
+                "path": path,
+                "diff_id": diff_ids[index] if index < len(diff_ids) else None,
+                "archive_size": sizes.get(path, 0),
+                "created_by": history[index].get("created_by", "") if index < len(history) else "",
+                "result": results.get(path),
+            }
+        )
+
+    return {
+        "repo_tags": list(entry.get("RepoTags") or []),
+        "config": config,
+        "layers": layers,
+    }
+
+
+def read_image(source: str, visit_layer: LayerVisitor) -> Dict[str, Any]:
+    """Open and scan an image in one call.
+
+    Args:
+        source: Tarball path or local image reference (see open_image)
+        visit_layer: Layer visitor (see scan_image)
+
+    Returns:
+        Scan result (see scan_image)
+    """
+    with open_image(source) as stream:
+        return scan_image(stream, visit_layer)
@@ -0,0 +1,223 @@
+"""Merkle-tree content hashing of a build context.
+
+Hashes every file the Docker daemon would receive (``.dockerignore`` is
+honored) and combines them into one hash per directory, so two trees can
+be compared by their root hash and differences located by walking down
+only the directories whose hashes differ.
+
+File digests are cached with the file's size, mode and modification time.
+A later run re-reads only files whose metadata changed, and a directory
+whose files all kept their metadata reuses its cached hash. Directory
+modification times alone are not trusted, since editing a file in place
+does not change them. Changed files are hashed on a thread pool.
+"""
+
+import hashlib
+import logging
+import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from jvdeploy.cache import JsonCache
+from jvdeploy.dockerignore import DockerIgnore, iter_context_files
+
+logger = logging.getLogger(__name__)
+
+MERKLE_CACHE = "merkle"
+
+CHUNK_SIZE = 1024 * 1024
+
+# Files modified this recently may change again within the same mtime tick,
+# so their digests are not cached
+RACY_WINDOW_NS = 2 * 10**9
+
+# File metadata: (size, mtime_ns, mode)
+FileStat = Tuple[int, int, int]
+
+
+def _hash_file(path: str, is_link: bool) -> str:
+    """Hash one file's contents (a symlink's target for links)."""
+    digest = hashlib.blake2b(digest_size=20)
+    if is_link:
+        digest.update(os.readlink(path).encode("utf-8", errors="surrogateescape"))
+        return digest.hexdigest()
+
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _leaf_hash(content_digest: str, mode: int) -> str:
+    """Combine content and permission bits (COPY preserves them) into a leaf hash."""
+    kind = "l" if stat.S_ISLNK(mode) else "f"
+    return hashlib.blake2b(
+        f"{kind}:{stat.S_IMODE(mode):o}:{content_digest}".encode("ascii"), digest_size=20
+    ).hexdigest()
+
+
+def _directory_hash(children: List[Tuple[str, str, str]]) -> str:
+    """Hash a directory from its sorted (name, kind, hash) children."""
+    digest = hashlib.blake2b(digest_size=20)
+    for name, kind, child_hash in sorted(children):
+        digest.update(f"{kind}\0{name}\0{child_hash}\n".encode("utf-8", errors="surrogateescape"))
+    return digest.hexdigest()
+
+
+def _parent(rel_path: str) -> str:
+    return rel_path.rpartition("/")[0]
+
+
+def hash_context(
+    app_root: Path, workers: Optional[int] = None, use_cache: bool = True
+) -> Dict[str, Any]:
+    """Compute the Merkle tree of a build context.
+
+    Args:
+        app_root: Build context root
+        workers: Threads used to hash changed files (default: based on CPU count)
+        use_cache: If False, hash every file and do not update the cache
+
+    Returns:
+        Dictionary with 'root' (hash of the whole context), 'directories'
+        (context-relative directory, '' for the root, to hash), 'files'
+        (context-relative path to leaf hash), 'hashed' and 'reused' (number
+        of files read vs. served from the cache)
+    """
+    app_root = Path(app_root).resolve()
+    cache = JsonCache(MERKLE_CACHE)
+    key = str(app_root)
+    cached: Dict[str, Any] = (cache.get(key) or {}) if use_cache else {}
+    cached_files: Dict[str, List[Any]] = cached.get("files") or {}
+    cached_dirs: Dict[str, str] = cached.get("directories") or {}
+
+    stats: Dict[str, FileStat] = {}
+    for rel_path, entry in iter_context_files(app_root, DockerIgnore.from_dir(app_root)):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError as e:
+            logger.debug(f"Skipping unreadable {rel_path}: {e}")
+            continue
+        stats[rel_path] = (st.st_size, st.st_mtime_ns, st.st_mode)
+
+    leaves: Dict[str, str] = {}
+    to_hash: List[str] = []
+    for rel_path, (size, mtime_ns, mode) in stats.items():
+        entry = cached_files.get(rel_path)
+        if entry and entry[:3] == [size, mtime_ns, mode]:
+            leaves[rel_path] = entry[3]
+        else:
+            to_hash.append(rel_path)
+
+    def hash_one(rel_path: str) -> Tuple[str, Optional[str]]:
+        mode = stats[rel_path][2]
+        try:
+            content = _hash_file(str(app_root / rel_path), stat.S_ISLNK(mode))
+        except OSError as e:
+            logger.debug(f"Skipping unreadable {rel_path}: {e}")
+            return rel_path, None
+        return rel_path, _leaf_hash(content, mode)
+
+    if to_hash:
+        max_workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for rel_path, leaf in pool.map(hash_one, to_hash):
+                if leaf is None:
+                    stats.pop(rel_path)
+                else:
+                    leaves[rel_path] = leaf
+
+    # Group files by directory; every ancestor directory gets an entry
+    files_in: Dict[str, List[Tuple[str, str, str]]] = {"": []}
+    for rel_path in stats:
+        directory, _, name = rel_path.rpartition("/")
+        files_in.setdefault(directory, []).append((name, "f", leaves[rel_path]))
+        while directory:
+            directory = _parent(directory)
+            files_in.setdefault(directory, [])
+    subdirs: Dict[str, List[str]] = {}
+    for directory in files_in:
+        if directory:
+            subdirs.setdefault(_parent(directory), []).append(directory)
+
+    # A directory is dirty if any file below it was added, removed or changed
+    dirty = set()
+    for rel_path in set(to_hash) | (set(cached_files) - set(stats)):
+        directory = rel_path
+        while directory:
+            directory = _parent(directory)
+            dirty.add(directory)
+
+    directories: Dict[str, str] = {}
+    for directory in sorted(files_in, key=lambda d: d.count("/") + 1 if d else 0, reverse=True):
+        previous = cached_dirs.get(directory)
+        if directory not in dirty and previous:
+            directories[directory] = str(previous)
+            continue
+        entries = list(files_in[directory])
+        for subdir in subdirs.get(directory, []):
+            entries.append((subdir.rpartition("/")[2], "d", directories[subdir]))
+        directories[directory] = _directory_hash(entries)
+
+    if use_cache:
+        now = time.time_ns()
+        cache.set(
+            key,
+            {
+                "files": {
+                    path: [size, mtime_ns, mode, leaves[path]]
+                    for path, (size, mtime_ns, mode) in stats.items()
+                    if now - mtime_ns > RACY_WINDOW_NS
+                },
+                "directories": directories,
+            },
+        )
+
+    logger.debug(
+        f"Hashed {len(to_hash)} files, reused {len(stats) - len(to_hash)} "
+        f"({len(directories)} directories) under {app_root}"
+    )
+    return {
+        "root": directories[""],
+        "directories": directories,
+        "files": {path: leaves[path] for path in stats},
+        "hashed": len(to_hash),
+        "reused": len(stats) - len(to_hash),
+    }
+
+
+def diff_trees(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Compare two Merkle trees.
+
+    Files are only compared inside directories whose hashes differ, so
+    unchanged subtrees cost one lookup each.
+
+    Args:
+        old: Result of hash_context (only 'directories' and 'files' are used)
+        new: Result of hash_context
+
+    Returns:
+        Dictionary with sorted 'added', 'modified' and 'removed' file paths
+    """
+    result: Dict[str, List[str]] = {"added": [], "modified": [], "removed": []}
+    if old["directories"].get("") == new["directories"].get(""):
+        return result
+
+    old_dirs, new_dirs = old["directories"], new["directories"]
+    differing = {d for d in set(old_dirs) | set(new_dirs) if old_dirs.get(d) != new_dirs.get(d)}
+    for files, label in ((new["files"], "added"), (old["files"], "removed")):
+        other = old["files"] if label == "added" else new["files"]
+        for path in files:
+            if _parent(path) in differing and path not in other:
+                result[label].append(path)
+    for path, leaf in new["files"].items():
+        if _parent(path) in differing and path in old["files"] and old["files"][path] != leaf:
+            result["modified"].append(path)
+
+    return {label: sorted(paths) for label, paths in result.items()}
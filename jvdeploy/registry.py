@@ -0,0 +1,487 @@
+"""Minimal OCI distribution (registry v2) client.
+
+Talks to image registries over HTTPS without a Docker daemon. Handles the
+anonymous or basic-auth bearer token flow used by Docker Hub, public and
+private ECR, and most other registries. Blob uploads are chunked and
+resumable and can mount blobs from other repositories of the same registry.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+from urllib.parse import urlencode, urljoin
+
+from jvdeploy.cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+DOCKER_HUB_REGISTRY = "registry-1.docker.io"
+
+MANIFEST_TYPES = (
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+)
+
+# Largest request body of a chunked blob upload
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Tries per blob upload (the first one plus resumes after interruptions)
+UPLOAD_ATTEMPTS = 3
+
+# Upload locations of unfinished blob uploads, for resuming in a later run
+UPLOADS_CACHE = "registry-uploads"
+UPLOAD_SESSION_TTL = 24 * 3600
+
+# Blob content or a path to it
+BlobSource = Union[bytes, str, "os.PathLike[str]"]
+
+_CHALLENGE_PARAM = re.compile(r'(\w+)="([^"]*)"')
+
+
+class RegistryError(Exception):
+    """Exception raised for registry API errors."""
+
+    pass
+
+
+def parse_reference(reference: str) -> Tuple[str, str, str]:
+    """Split an image reference into registry host, repository and tag or digest.
+
+    Args:
+        reference: Image reference (e.g., 'public.ecr.aws/org/app:latest' or
+            'python:3.12'); Docker Hub names get the 'library/' prefix
+
+    Returns:
+        Tuple of (registry, repository, reference), where reference is the
+        digest if one is given, else the tag (default 'latest')
+    """
+    name, _, digest = reference.partition("@")
+    registry = DOCKER_HUB_REGISTRY
+    if "/" in name:
+        first, rest = name.split("/", 1)
+        if "." in first or ":" in first or first == "localhost":
+            registry, name = first, rest
+
+    tag = "latest"
+    last = name.rsplit("/", 1)[-1]
+    if ":" in last:
+        name, tag = name.rsplit(":", 1)
+
+    if registry == DOCKER_HUB_REGISTRY and "/" not in name:
+        name = f"library/{name}"
+
+    return registry, name, digest or tag
+
+
+def _range_end(headers: Dict[str, str], default: int) -> int:
+    """Get the next upload offset from a 'Range: 0-<last byte>' response header."""
+    value = headers.get("range", "")
+    start, _, end = value.partition("-")
+    if start.strip() == "0" and end.strip().isdigit():
+        return int(end) + 1
+    return default
+
+
+@contextmanager
+def _blob_reader(source: BlobSource) -> Iterator[Tuple[int, Callable[[int, int], bytes]]]:
+    """Yield (size, read(offset, length)) for in-memory or on-disk blob content."""
+    if isinstance(source, bytes):
+        data = source
+        yield len(data), lambda offset, length: data[offset : offset + length]
+        return
+
+    with open(source, "rb") as f:
+
+        def read(offset: int, length: int) -> bytes:
+            f.seek(offset)
+            return f.read(length)
+
+        yield os.fstat(f.fileno()).st_size, read
+
+
+def _parse_challenge(header: str) -> Tuple[str, Dict[str, str]]:
+    """Parse a WWW-Authenticate header into (scheme, parameters)."""
+    scheme, _, params = header.strip().partition(" ")
+    return scheme.lower(), dict(_CHALLENGE_PARAM.findall(params))
+
+
+class RegistryClient:
+    """Client for a single registry host."""
+
+    def __init__(
+        self,
+        registry: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        timeout: float = 60,
+        insecure: bool = False,
+    ):
+        """Initialize registry client.
+
+        Args:
+            registry: Registry host (e.g., 'public.ecr.aws')
+            username: Registry username (optional, anonymous if omitted)
+            password: Registry password or token (optional)
+            timeout: Request timeout in seconds
+            insecure: If True, use plain HTTP (local test registries)
+        """
+        self.registry = registry
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.base_url = f"{'http' if insecure else 'https'}://{registry}"
+        # Authorization header per token scope
+        self._authorization: Dict[str, str] = {}
+
+    def _basic_auth(self) -> Optional[str]:
+        if self.username is None or self.password is None:
+            return None
+        credentials = f"{self.username}:{self.password}".encode("utf-8")
+        return "Basic " + base64.b64encode(credentials).decode("ascii")
+
+    def _fetch_token(self, challenge: Dict[str, str], scope: str) -> str:
+        """Exchange credentials for a bearer token at the challenge realm."""
+        realm = challenge.get("realm")
+        if not realm:
+            raise RegistryError(f"{self.registry} sent a bearer challenge without a realm")
+
+        query = {"scope": challenge.get("scope") or scope}
+        if challenge.get("service"):
+            query["service"] = challenge["service"]
+        request = urllib.request.Request(f"{realm}?{urlencode(query)}")
+        basic = self._basic_auth()
+        if basic:
+            request.add_unredirected_header("Authorization", basic)
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = json.loads(response.read())
+        except (urllib.error.URLError, ValueError) as e:
+            raise RegistryError(f"Cannot get a token from {realm}: {e}") from e
+
+        token = body.get("token") or body.get("access_token")
+        if not token:
+            raise RegistryError(f"{realm} returned no token")
+        return f"Bearer {token}"
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        scope: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[bytes] = None,
+        expected: Tuple[int, ...] = (200,),
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Send an authenticated request to the registry.
+
+        Args:
+            method: HTTP method
+            path: Path below the registry (e.g., '/v2/org/app/manifests/latest'),
+                or an absolute URL (upload locations)
+            scope: Token scope (e.g., 'repository:org/app:pull')
+            headers: Extra request headers
+            body: Request body
+            expected: Status codes treated as success
+
+        Returns:
+            Tuple of (status, lower-cased response headers, response body)
+
+        Raises:
+            RegistryError: If the request fails or returns an unexpected status
+        """
+        url = path if path.startswith(("http://", "https://")) else self.base_url + path
+
+        for attempt in range(2):
+            request = urllib.request.Request(url, data=body, method=method)
+            for key, value in (headers or {}).items():
+                request.add_header(key, value)
+            authorization = self._authorization.get(scope)
+            if authorization:
+                # Not forwarded on redirects: blob downloads redirect to
+                # presigned storage URLs that reject a second credential
+                request.add_unredirected_header("Authorization", authorization)
+
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    status = response.status
+                    response_headers = {k.lower(): v for k, v in response.headers.items()}
+                    data = response.read()
+            except urllib.error.HTTPError as e:
+                status = e.code
+                response_headers = {k.lower(): v for k, v in (e.headers or {}).items()}
+                data = e.read() if e.fp else b""
+            except urllib.error.URLError as e:
+                raise RegistryError(f"Cannot reach {self.registry}: {e.reason}") from e
+
+            if status == 401 and attempt == 0 and "www-authenticate" in response_headers:
+                scheme, challenge = _parse_challenge(response_headers["www-authenticate"])
+                if scheme == "bearer":
+                    self._authorization[scope] = self._fetch_token(challenge, scope)
+                    continue
+                basic = self._basic_auth()
+                if scheme == "basic" and basic:
+                    self._authorization[scope] = basic
+                    continue
+
+            if status not in expected:
+                message = data.decode("utf-8", errors="replace").strip()
+                raise RegistryError(
+                    f"{method} {url} failed with HTTP {status}"
+                    + (f": {message}" if message else "")
+                )
+            return status, response_headers, data
+
+        raise RegistryError(f"Authentication to {self.registry} failed")
+
+    def resolve_digest(self, repository: str, reference: str) -> str:
+        """Resolve a tag to the digest of its manifest (or manifest list).
+
+        Args:
+            repository: Repository name
+            reference: Tag or digest
+
+        Returns:
+            Manifest digest (sha256:...)
+
+        Raises:
+            RegistryError: If the tag does not exist or the registry sent no digest
+        """
+        _, headers, _ = self.request(
+            "HEAD",
+            f"/v2/{repository}/manifests/{reference}",
+            scope=f"repository:{repository}:pull",
+            headers={"Accept": ", ".join(MANIFEST_TYPES)},
+        )
+        digest = headers.get("docker-content-digest")
+        if not digest:
+            raise RegistryError(f"{self.registry}/{repository}:{reference} returned no digest")
+        return digest
+
+    def get_manifest(self, repository: str, reference: str) -> Tuple[Dict[str, Any], str, str]:
+        """Get a manifest.
+
+        Args:
+            repository: Repository name
+            reference: Tag or digest
+
+        Returns:
+            Tuple of (manifest, media type, digest)
+        """
+        _, headers, data = self.request(
+            "GET",
+            f"/v2/{repository}/manifests/{reference}",
+            scope=f"repository:{repository}:pull",
+            headers={"Accept": ", ".join(MANIFEST_TYPES)},
+        )
+        try:
+            manifest = json.loads(data)
+        except ValueError as e:
+            raise RegistryError(f"Invalid manifest for {repository}:{reference}") from e
+        media_type = manifest.get("mediaType") or headers.get("content-type", "")
+        return manifest, media_type, headers.get("docker-content-digest", "")
+
+    def blob_exists(self, repository: str, digest: str) -> bool:
+        """Check whether a repository has a blob.
+
+        Args:
+            repository: Repository name
+            digest: Blob digest (sha256:...)
+
+        Returns:
+            True if the blob exists
+        """
+        status, _, _ = self.request(
+            "HEAD",
+            f"/v2/{repository}/blobs/{digest}",
+            scope=f"repository:{repository}:pull",
+            expected=(200, 404),
+        )
+        return status == 200
+
+    def get_blob(self, repository: str, digest: str) -> bytes:
+        """Download a blob and verify its digest.
+
+        Args:
+            repository: Repository name
+            digest: Blob digest (sha256:...)
+
+        Returns:
+            Blob content
+
+        Raises:
+            RegistryError: If the download fails or the content does not match
+        """
+        _, _, data = self.request(
+            "GET", f"/v2/{repository}/blobs/{digest}", scope=f"repository:{repository}:pull"
+        )
+        if "sha256:" + hashlib.sha256(data).hexdigest() != digest:
+            raise RegistryError(f"Blob {digest} from {repository} does not match its digest")
+        return data
+
+    def upload_blob(
+        self,
+        repository: str,
+        source: BlobSource,
+        digest: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mount_from: Sequence[str] = (),
+    ) -> str:
+        """Upload a blob unless the repository already has it.
+
+        Blobs larger than ``chunk_size`` are sent as a chunked upload. An
+        interrupted chunk is retried from the offset the registry reports,
+        and the upload location is kept on disk so a later call (e.g. after
+        the process was killed) continues where the last one stopped.
+
+        Args:
+            repository: Repository name
+            source: Blob content, or path to a file holding it
+            digest: Blob digest (sha256:...)
+            chunk_size: Largest request body
+            mount_from: Repositories on the same registry that may hold the
+                blob; it is mounted from the first one that does instead of uploaded
+
+        Returns:
+            'exists', 'mounted' or 'uploaded'
+
+        Raises:
+            RegistryError: If the upload fails
+        """
+        scope = f"repository:{repository}:pull,push"
+        if self.blob_exists(repository, digest):
+            return "exists"
+
+        location = None
+        for from_repository in mount_from:
+            if from_repository == repository:
+                continue
+            query = urlencode({"mount": digest, "from": from_repository})
+            status, headers, _ = self.request(
+                "POST",
+                f"/v2/{repository}/blobs/uploads/?{query}",
+                scope=f"{scope} repository:{from_repository}:pull",
+                expected=(201, 202),
+            )
+            if status == 201:
+                logger.debug(f"Mounted {digest} from {from_repository}")
+                return "mounted"
+            # The registry opened a regular upload instead
+            location = self._upload_location(headers)
+
+        sessions = JsonCache(UPLOADS_CACHE)
+        session_key = f"{self.registry}/{repository}@{digest}"
+        offset = 0
+        if location is None:
+            saved = sessions.get(session_key)
+            resumed = self._upload_offset(saved, scope) if saved else None
+            if resumed is not None:
+                logger.info(f"Resuming upload of {digest[:19]} at {resumed:,} bytes")
+                location, offset = saved, resumed
+        if location is None:
+            _, headers, _ = self.request(
+                "POST", f"/v2/{repository}/blobs/uploads/", scope=scope, expected=(202,)
+            )
+            location = self._upload_location(headers)
+        sessions.set(session_key, location, ttl=UPLOAD_SESSION_TTL)
+
+        with _blob_reader(source) as (size, read):
+            attempt = 1
+            while True:
+                try:
+                    if offset == 0 and size <= chunk_size:
+                        self._finish_upload(location, digest, scope, read(0, size))
+                        break
+                    while offset < size:
+                        chunk = read(offset, min(chunk_size, size - offset))
+                        _, headers, _ = self.request(
+                            "PATCH",
+                            location,
+                            scope=scope,
+                            headers={
+                                "Content-Type": "application/octet-stream",
+                                "Content-Range": f"{offset}-{offset + len(chunk) - 1}",
+                            },
+                            body=chunk,
+                            expected=(202,),
+                        )
+                        location = self._upload_location(headers)
+                        offset = _range_end(headers, offset + len(chunk))
+                        sessions.set(session_key, location, ttl=UPLOAD_SESSION_TTL)
+                    self._finish_upload(location, digest, scope, b"")
+                    break
+                except RegistryError as e:
+                    resumed = self._upload_offset(location, scope)
+                    if attempt >= UPLOAD_ATTEMPTS or resumed is None:
+                        raise
+                    attempt += 1
+                    logger.info(
+                        f"Upload of {digest[:19]} interrupted at {offset:,} bytes ({e}), "
+                        f"resuming at {resumed:,}"
+                    )
+                    offset = resumed
+
+        sessions.delete(session_key)
+        return "uploaded"
+
+    def _upload_location(self, headers: Dict[str, str]) -> str:
+        """Get the absolute upload URL from an upload response."""
+        location = headers.get("location")
+        if not location:
+            raise RegistryError(f"{self.registry} returned no upload location")
+        return urljoin(self.base_url + "/", location)
+
+    def _upload_offset(self, location: str, scope: str) -> Optional[int]:
+        """Ask the registry how many bytes of an upload it has (None if the upload is gone)."""
+        try:
+            _, headers, _ = self.request("GET", location, scope=scope, expected=(204,))
+        except RegistryError as e:
+            logger.debug(f"Upload {location} cannot be resumed: {e}")
+            return None
+        return _range_end(headers, 0)
+
+    def _finish_upload(self, location: str, digest: str, scope: str, body: bytes) -> None:
+        separator = "&" if "?" in location else "?"
+        self.request(
+            "PUT",
+            f"{location}{separator}{urlencode({'digest': digest})}",
+            scope=scope,
+            headers={"Content-Type": "application/octet-stream"},
+            body=body,
+            expected=(201,),
+        )
+
+    def put_manifest(
+        self, repository: str, reference: str, manifest: bytes, media_type: str
+    ) -> str:
+        """Upload a manifest.
+
+        Args:
+            repository: Repository name
+            reference: Tag (or digest) to store it under
+            manifest: Serialized manifest, uploaded byte for byte
+            media_type: Manifest media type
+
+        Returns:
+            Manifest digest
+        """
+        _, headers, _ = self.request(
+            "PUT",
+            f"/v2/{repository}/manifests/{reference}",
+            scope=f"repository:{repository}:pull,push",
+            headers={"Content-Type": media_type},
+            body=manifest,
+            expected=(200, 201),
+        )
+        return headers.get("docker-content-digest") or (
+            "sha256:" + hashlib.sha256(manifest).hexdigest()
+        )
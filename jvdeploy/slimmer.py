@@ -0,0 +1,335 @@
+"""Virtualenv slimming pass for jvagent images.
+
+Removes files that are never used at runtime from a Python environment
+(test suites, build leftovers) and strips debug symbols from shared
+objects. Meant to run in the same ``RUN`` instruction as ``pip install`` so
+the removed files never reach an image layer.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Test suite directories shipped inside installed packages
+TEST_DIR_NAMES = {"tests", "test"}
+
+# Directories pip, setuptools or test runners sometimes leave behind
+LEFTOVER_DIR_NAMES = {".pytest_cache", ".mypy_cache", "pip-wheel-metadata"}
+LEFTOVER_DIR_PREFIXES = ("pip-build-", "pip-req-build-", "pip-install-", "pip-unpack-")
+LEFTOVER_FILE_SUFFIXES = (".whl",)
+
+# Shared objects are stripped in batches to avoid one process per file
+STRIP_BATCH_SIZE = 100
+
+
+class SlimmerError(Exception):
+    """Exception raised for slimming errors."""
+
+    pass
+
+
+def _walk_files(root: Path) -> Iterator[Tuple[Tuple[str, ...], os.DirEntry]]:
+    """Walk a tree without following symlinks.
+
+    Yields:
+        Tuples of (relative path parts, os.DirEntry) for files and symlinks
+    """
+    stack: List[Tuple[str, ...]] = [()]
+    while stack:
+        rel_parts = stack.pop()
+        try:
+            with os.scandir(os.path.join(str(root), *rel_parts)) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.debug(f"Cannot read directory {'/'.join(rel_parts) or root}: {e}")
+            continue
+
+        for entry in entries:
+            parts = rel_parts + (entry.name,)
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(parts)
+            else:
+                yield parts, entry
+
+
+def _group_key(parts: Tuple[str, ...]) -> str:
+    """Map a relative path to the directory it is reported under.
+
+    Files inside ``site-packages`` are grouped by top-level package, everything
+    else by its first path component.
+    """
+    if "site-packages" in parts[:-1]:
+        index = parts.index("site-packages")
+        return "/".join(parts[: index + 2]) if len(parts) > index + 2 else "/".join(parts)
+    return parts[0] if len(parts) > 1 else "."
+
+
+def directory_sizes(root: Path) -> Dict[str, int]:
+    """Measure the apparent size of each reported directory under a tree.
+
+    Args:
+        root: Environment root (e.g., /opt/venv)
+
+    Returns:
+        Dictionary mapping directory (relative to root) to size in bytes
+    """
+    sizes: Dict[str, int] = {}
+    for parts, entry in _walk_files(root):
+        try:
+            size = entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+        key = _group_key(parts)
+        sizes[key] = sizes.get(key, 0) + size
+    return sizes
+
+
+def _is_test_dir(parts: Tuple[str, ...]) -> bool:
+    """Check whether a directory is a test suite nested inside an installed package."""
+    if parts[-1] not in TEST_DIR_NAMES or "site-packages" not in parts:
+        return False
+    # Only remove tests inside a package, never a top-level module named 'tests'
+    return len(parts) - parts.index("site-packages") > 2
+
+
+def _is_leftover_dir(name: str) -> bool:
+    """Check whether a directory is a build or tool leftover."""
+    return name in LEFTOVER_DIR_NAMES or name.startswith(LEFTOVER_DIR_PREFIXES)
+
+
+def find_removable(
+    root: Path,
+    remove_tests: bool = True,
+    remove_bytecode: bool = False,
+    remove_records: bool = False,
+) -> List[Path]:
+    """Find files and directories that can be removed from an environment.
+
+    Args:
+        root: Environment root (e.g., /opt/venv)
+        remove_tests: Remove test suites inside installed packages
+        remove_bytecode: Remove ``__pycache__`` directories
+        remove_records: Remove ``.dist-info/RECORD`` files (pip can no longer
+            uninstall or upgrade those packages afterwards)
+
+    Returns:
+        Paths to remove, directories before their would-be contents
+    """
+    removable: List[Path] = []
+    stack: List[Tuple[str, ...]] = [()]
+
+    while stack:
+        rel_parts = stack.pop()
+        try:
+            with os.scandir(os.path.join(str(root), *rel_parts)) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            logger.debug(f"Cannot read directory {'/'.join(rel_parts) or root}: {e}")
+            continue
+
+        for entry in entries:
+            parts = rel_parts + (entry.name,)
+            if entry.is_dir(follow_symlinks=False):
+                if (
+                    (remove_tests and _is_test_dir(parts))
+                    or (remove_bytecode and entry.name == "__pycache__")
+                    or _is_leftover_dir(entry.name)
+                ):
+                    removable.append(Path(entry.path))
+                else:
+                    stack.append(parts)
+            elif entry.name.endswith(LEFTOVER_FILE_SUFFIXES):
+                removable.append(Path(entry.path))
+            elif (
+                remove_records
+                and entry.name == "RECORD"
+                and len(parts) > 1
+                and parts[-2].endswith(".dist-info")
+            ):
+                removable.append(Path(entry.path))
+
+    return removable
+
+
+def find_shared_objects(root: Path) -> List[Path]:
+    """Find ELF shared objects under an environment.
+
+    Args:
+        root: Environment root
+
+    Returns:
+        Paths to regular ``.so`` files (symlinks are skipped)
+    """
+    shared_objects = []
+    for _, entry in _walk_files(root):
+        name = entry.name
+        if (name.endswith(".so") or ".so." in name) and entry.is_file(follow_symlinks=False):
+            shared_objects.append(Path(entry.path))
+    return sorted(shared_objects)
+
+
+def strip_shared_objects(paths: List[Path], strip_cmd: Optional[str] = None) -> int:
+    """Strip debug symbols from shared objects.
+
+    Args:
+        paths: Shared objects to strip
+        strip_cmd: strip executable (default: ``strip`` from PATH)
+
+    Returns:
+        Number of files stripped
+    """
+    strip_cmd = strip_cmd or shutil.which("strip")
+    if not strip_cmd:
+        logger.warning("'strip' not found (install binutils); skipping shared object stripping")
+        return 0
+
+    stripped = 0
+    for start in range(0, len(paths), STRIP_BATCH_SIZE):
+        batch = [str(p) for p in paths[start : start + STRIP_BATCH_SIZE]]
+        result = subprocess.run(
+            [strip_cmd, "--strip-unneeded", *batch], capture_output=True, text=True
+        )
+        if result.returncode == 0:
+            stripped += len(batch)
+            continue
+
+        # One unstrippable file fails the whole batch; retry individually
+        for path in batch:
+            single = subprocess.run(
+                [strip_cmd, "--strip-unneeded", path], capture_output=True, text=True
+            )
+            if single.returncode == 0:
+                stripped += 1
+            else:
+                logger.debug(f"Could not strip {path}: {single.stderr.strip()}")
+
+    return stripped
+
+
+def slim_environment(
+    root: Path,
+    remove_tests: bool = True,
+    strip_binaries: bool = True,
+    remove_bytecode: bool = False,
+    remove_records: bool = False,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Slim a Python environment in place.
+
+    Bytecode is kept by default: Lambda images are read-only at runtime, so
+    removing ``__pycache__`` makes every cold start recompile from source.
+
+    Args:
+        root: Environment root (e.g., /opt/venv)
+        remove_tests: Remove test suites inside installed packages
+        strip_binaries: Strip debug symbols from shared objects
+        remove_bytecode: Remove ``__pycache__`` directories
+        remove_records: Remove ``.dist-info/RECORD`` files
+        dry_run: Report what would be removed without changing anything
+
+    Returns:
+        Dictionary with 'before' and 'after' per-directory sizes, 'removed'
+        (number of paths removed) and 'stripped' (number of shared objects)
+
+    Raises:
+        SlimmerError: If root is not a directory
+    """
+    root = Path(root)
+    if not root.is_dir():
+        raise SlimmerError(f"Not a directory: {root}")
+
+    before = directory_sizes(root)
+    removable = find_removable(
+        root,
+        remove_tests=remove_tests,
+        remove_bytecode=remove_bytecode,
+        remove_records=remove_records,
+    )
+
+    if dry_run:
+        after = dict(before)
+        for path in removable:
+            base = path.relative_to(root).parts
+            if path.is_dir() and not path.is_symlink():
+                files = [
+                    (base + parts, entry.stat(follow_symlinks=False).st_size)
+                    for parts, entry in _walk_files(path)
+                ]
+            else:
+                files = [(base, path.lstat().st_size)]
+            for parts, size in files:
+                key = _group_key(parts)
+                after[key] = after.get(key, 0) - size
+        return {"before": before, "after": after, "removed": len(removable), "stripped": 0}
+
+    for path in removable:
+        logger.debug(f"Removing {path}")
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    stripped = strip_shared_objects(find_shared_objects(root)) if strip_binaries else 0
+
+    return {
+        "before": before,
+        "after": directory_sizes(root),
+        "removed": len(removable),
+        "stripped": stripped,
+    }
+
+
+def _format_size(size: int) -> str:
+    """Format a byte count for the report."""
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def format_report(report: Dict[str, Any], limit: int = 20) -> str:
+    """Format a before/after size report.
+
+    Args:
+        report: Result of slim_environment
+        limit: Maximum number of directories to list (largest savings first)
+
+    Returns:
+        Report as a printable table
+    """
+    before: Dict[str, int] = report["before"]
+    after: Dict[str, int] = report["after"]
+
+    rows = []
+    for key in set(before) | set(after):
+        old, new = before.get(key, 0), after.get(key, 0)
+        rows.append((old - new, key, old, new))
+    rows.sort(key=lambda row: (-row[0], row[1]))
+
+    width = max([len("Directory")] + [len(row[1]) for row in rows[:limit]])
+    lines = [f"{'Directory':<{width}}  {'Before':>10}  {'After':>10}  {'Saved':>10}"]
+    for saved, key, old, new in rows[:limit]:
+        if saved <= 0:
+            break
+        lines.append(
+            f"{key:<{width}}  {_format_size(old):>10}  {_format_size(new):>10}  "
+            f"{_format_size(saved):>10}"
+        )
+
+    total_before, total_after = sum(before.values()), sum(after.values())
+    lines.append(
+        f"{'Total':<{width}}  {_format_size(total_before):>10}  {_format_size(total_after):>10}  "
+        f"{_format_size(total_before - total_after):>10}"
+    )
+    lines.append(f"Removed {report['removed']} paths, stripped {report['stripped']} shared objects")
+    return "\n".join(lines)
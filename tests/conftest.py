@@ -1,12 +1,39 @@
 """Shared pytest fixtures for jvdeploy tests."""
 
+import gzip
+import hashlib
+import io
+import json
+import re
+import tarfile
 import tempfile
+import threading
+import uuid
 from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep jvdeploy's on-disk cache inside the test's temporary directory."""
+    cache = tmp_path / "jvdeploy-cache"
+    monkeypatch.setenv("JVDEPLOY_CACHE_DIR", str(cache))
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_docker_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point docker's client config at an empty directory inside the test's temporary directory."""
+    config_dir = tmp_path / "docker-config"
+    config_dir.mkdir()
+    monkeypatch.setenv("DOCKER_CONFIG", str(config_dir))
+    return config_dir
+
+
 @pytest.fixture
 def temp_dir() -> Generator[Path, None, None]:
     """Create a temporary directory for test files."""
@@ -131,3 +158,266 @@ def mock_base_template(temp_dir: Path, base_template_content: str) -> Path:
     template_path = temp_dir / "Dockerfile.base"
     template_path.write_text(base_template_content)
     return template_path
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Provide dummy AWS credentials so stubbed boto3 clients never hit real AWS."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+
+
+def _tar_bytes(files: dict) -> bytes:
+    """Build an uncompressed tar archive from a {path: bytes} mapping."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for path, data in files.items():
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def saved_image(tmp_path: Path):
+    """Factory writing a fake 'docker save' tarball.
+
+    Call with a list of (created_by, {path: bytes}) layers. ``layout`` is
+    'legacy' (<id>/layer.tar) or 'oci' (blobs/sha256/<digest>, gzip layers).
+    """
+
+    def make(layers: list, name: str = "image.tar", layout: str = "legacy") -> Path:
+        members = []
+        layer_paths = []
+        diff_ids = []
+        for created_by, files in layers:
+            layer = _tar_bytes(files)
+            digest = hashlib.sha256(layer).hexdigest()
+            diff_ids.append(f"sha256:{digest}")
+            if layout == "oci":
+                blob = gzip.compress(layer, mtime=0)
+                path = f"blobs/sha256/{hashlib.sha256(blob).hexdigest()}"
+                members.append((path, blob))
+            else:
+                path = f"{digest}/layer.tar"
+                members.append((path, layer))
+            layer_paths.append(path)
+
+        config = {
+            "architecture": "amd64",
+            "os": "linux",
+            "rootfs": {"type": "layers", "diff_ids": diff_ids},
+            "history": [{"created_by": '/bin/sh -c #(nop)  CMD ["app"]', "empty_layer": True}]
+            + [{"created_by": created_by} for created_by, _ in layers],
+        }
+        config_bytes = json.dumps(config).encode("utf-8")
+        config_digest = hashlib.sha256(config_bytes).hexdigest()
+        config_path = (
+            f"blobs/sha256/{config_digest}" if layout == "oci" else f"{config_digest}.json"
+        )
+        members.append((config_path, config_bytes))
+
+        manifest = [{"Config": config_path, "RepoTags": ["app:test"], "Layers": layer_paths}]
+        members.append(("manifest.json", json.dumps(manifest).encode("utf-8")))
+
+        path = tmp_path / name
+        with tarfile.open(path, mode="w") as tar:
+            for member_name, data in members:
+                info = tarfile.TarInfo(member_name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return path
+
+    return make
+
+
+class LocalRegistry:
+    """In-process stand-in for an OCI distribution registry (no auth)."""
+
+    def __init__(self):
+        self.blobs: dict = {}  # repository -> {digest: bytes}
+        self.manifests: dict = {}  # repository -> {tag or digest: (bytes, media type)}
+        self.uploads: dict = {}  # upload id -> bytearray
+        self.requests: list = []  # (method, path)
+        self.fail_patches = 0  # reject this many upload chunks with HTTP 500
+        self.host = ""
+
+    def push_image(self, repository: str, tag: str, layers: list, media_type: str) -> str:
+        """Store an image of {path: bytes} layers and return its manifest digest."""
+        layer_type = (
+            "application/vnd.oci.image.layer.v1.tar+gzip"
+            if "oci" in media_type
+            else "application/vnd.docker.image.rootfs.diff.tar.gzip"
+        )
+        blobs = self.blobs.setdefault(repository, {})
+        descriptors, diff_ids = [], []
+        for files in layers:
+            layer = _tar_bytes(files)
+            blob = gzip.compress(layer, mtime=0)
+            digest = "sha256:" + hashlib.sha256(blob).hexdigest()
+            blobs[digest] = blob
+            diff_ids.append("sha256:" + hashlib.sha256(layer).hexdigest())
+            descriptors.append({"mediaType": layer_type, "size": len(blob), "digest": digest})
+
+        config = json.dumps(
+            {
+                "architecture": "amd64",
+                "os": "linux",
+                "rootfs": {"type": "layers", "diff_ids": diff_ids},
+                "history": [{"created_by": f"layer {i}"} for i in range(len(layers))],
+            }
+        ).encode("utf-8")
+        config_digest = "sha256:" + hashlib.sha256(config).hexdigest()
+        blobs[config_digest] = config
+        manifest = {
+            "schemaVersion": 2,
+            "mediaType": media_type,
+            "config": {
+                "mediaType": (
+                    "application/vnd.oci.image.config.v1+json"
+                    if "oci" in media_type
+                    else "application/vnd.docker.container.image.v1+json"
+                ),
+                "size": len(config),
+                "digest": config_digest,
+            },
+            "layers": descriptors,
+        }
+        body = json.dumps(manifest).encode("utf-8")
+        digest = "sha256:" + hashlib.sha256(body).hexdigest()
+        stored = self.manifests.setdefault(repository, {})
+        stored[tag] = stored[digest] = (body, media_type)
+        return digest
+
+    def image_files(self, repository: str, reference: str) -> dict:
+        """Apply an image's layers (with whiteouts) and return {path: bytes}."""
+        body, _ = self.manifests[repository][reference]
+        files: dict = {}
+        for descriptor in json.loads(body)["layers"]:
+            blob = self.blobs[repository][descriptor["digest"]]
+            with tarfile.open(fileobj=io.BytesIO(gzip.decompress(blob))) as tar:
+                for member in tar.getmembers():
+                    directory, _, name = member.name.rpartition("/")
+                    if name.startswith(".wh."):
+                        files.pop(f"{directory}/{name[4:]}", None)
+                    elif member.isfile():
+                        files[member.name] = tar.extractfile(member).read()
+        return files
+
+
+_REGISTRY_PATH = re.compile(r"^/v2/(?P<name>.+)/(?P<kind>blobs|manifests)/(?P<rest>.*)$")
+
+
+def _registry_handler(registry: LocalRegistry):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, headers=None, body=b"", head=False):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def _dispatch(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            registry.requests.append((self.command, url.path))
+            if url.path == "/v2/":
+                return self._reply(200)
+            match = _REGISTRY_PATH.match(url.path)
+            if not match:
+                return self._reply(404)
+            name, kind, rest = match.group("name", "kind", "rest")
+            blobs = registry.blobs.setdefault(name, {})
+
+            if kind == "manifests":
+                manifests = registry.manifests.setdefault(name, {})
+                if self.command == "PUT":
+                    body = self._body()
+                    digest = "sha256:" + hashlib.sha256(body).hexdigest()
+                    media_type = self.headers.get("Content-Type")
+                    for descriptor in [json.loads(body)["config"]] + json.loads(body)["layers"]:
+                        if descriptor["digest"] not in blobs:
+                            return self._reply(400, body=b"blob unknown")
+                    manifests[rest] = manifests[digest] = (body, media_type)
+                    return self._reply(201, {"Docker-Content-Digest": digest})
+                if rest not in manifests:
+                    return self._reply(404, head=self.command == "HEAD")
+                body, media_type = manifests[rest]
+                headers = {
+                    "Content-Type": media_type,
+                    "Docker-Content-Digest": "sha256:" + hashlib.sha256(body).hexdigest(),
+                }
+                return self._reply(200, headers, body, head=self.command == "HEAD")
+
+            if rest.startswith("uploads/"):
+                upload_id = rest[len("uploads/") :]
+                if self.command == "POST":
+                    source = registry.blobs.get(query.get("from", [""])[0], {})
+                    if query.get("mount", [""])[0] in source:
+                        blobs[query["mount"][0]] = source[query["mount"][0]]
+                        return self._reply(201, {"Docker-Content-Digest": query["mount"][0]})
+                    upload_id = uuid.uuid4().hex
+                    registry.uploads[upload_id] = bytearray()
+                    location = f"/v2/{name}/blobs/uploads/{upload_id}"
+                    return self._reply(202, {"Location": location, "Range": "0-0"})
+                if upload_id not in registry.uploads:
+                    return self._reply(404)
+                data = registry.uploads[upload_id]
+                location = f"/v2/{name}/blobs/uploads/{upload_id}"
+                if self.command == "GET":
+                    headers = {"Location": location}
+                    if data:
+                        headers["Range"] = f"0-{len(data) - 1}"
+                    return self._reply(204, headers)
+                if self.command == "PATCH":
+                    body = self._body()
+                    if registry.fail_patches:
+                        registry.fail_patches -= 1
+                        return self._reply(500, body=b"interrupted")
+                    start = int(self.headers.get("Content-Range", "0-0").split("-")[0])
+                    if start != len(data):
+                        return self._reply(416)
+                    data.extend(body)
+                    return self._reply(202, {"Location": location, "Range": f"0-{len(data) - 1}"})
+                if self.command == "PUT":
+                    data.extend(self._body())
+                    digest = query["digest"][0]
+                    if "sha256:" + hashlib.sha256(data).hexdigest() != digest:
+                        return self._reply(400, body=b"digest invalid")
+                    blobs[digest] = bytes(registry.uploads.pop(upload_id))
+                    return self._reply(201, {"Docker-Content-Digest": digest})
+                return self._reply(405)
+
+            if rest not in blobs:
+                return self._reply(404, head=self.command == "HEAD")
+            headers = {"Docker-Content-Digest": rest}
+            return self._reply(200, headers, blobs[rest], head=self.command == "HEAD")
+
+        do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = _dispatch
+
+    return Handler
+
+
+@pytest.fixture
+def local_registry() -> Generator[LocalRegistry, None, None]:
+    """Serve a LocalRegistry over plain HTTP on a free localhost port."""
+    registry = LocalRegistry()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _registry_handler(registry))
+    registry.host = f"127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield registry
+    finally:
+        server.shutdown()
+        server.server_close()
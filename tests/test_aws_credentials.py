@@ -0,0 +1,213 @@
+"""Tests for cached AWS identity and ECR authorization."""
+
+import base64
+import datetime
+import json
+import subprocess
+from unittest.mock import Mock, patch
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from jvdeploy.aws import credentials
+from jvdeploy.docker_builder import DockerBuilder
+
+ENDPOINT = "https://123456789012.dkr.ecr.us-east-1.amazonaws.com"
+_ARN = "arn:aws:iam::123456789012:user/deployer"
+
+
+class StubbedSession:
+    """boto3 Session stand-in that hands out stubbed clients."""
+
+    def __init__(self):
+        self._session = boto3.Session()
+        self.profile_name = None
+        self.clients = {}
+        self.stubs = {}
+        for name in ("sts", "ecr"):
+            client = self._session.client(name, region_name="us-east-1")
+            self.clients[name] = client
+            self.stubs[name] = Stubber(client)
+            self.stubs[name].activate()
+
+    def get_credentials(self):
+        return self._session.get_credentials()
+
+    def client(self, name, region_name=None):
+        return self.clients[name]
+
+
+@pytest.fixture
+def session(aws_credentials):
+    """Create a session whose STS and ECR clients are stubbed."""
+    return StubbedSession()
+
+
+def _token_response(password="secret"):
+    token = base64.b64encode(f"AWS:{password}".encode()).decode()
+    expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=12)
+    return {
+        "authorizationData": [
+            {"authorizationToken": token, "proxyEndpoint": ENDPOINT, "expiresAt": expires}
+        ]
+    }
+
+
+def test_account_id_is_cached(session):
+    """Test that STS is called once across repeated lookups."""
+    session.stubs["sts"].add_response(
+        "get_caller_identity", {"Account": "123456789012", "Arn": _ARN, "UserId": "AIDAEXAMPLE"}
+    )
+
+    assert credentials.get_account_id("us-east-1", session=session) == "123456789012"
+    assert credentials.get_account_id("us-east-1", session=session) == "123456789012"
+
+    session.stubs["sts"].assert_no_pending_responses()
+
+
+def test_account_id_scoped_to_credentials(session, monkeypatch):
+    """Test that different credentials do not share cached identities."""
+    session.stubs["sts"].add_response(
+        "get_caller_identity", {"Account": "111111111111", "Arn": _ARN, "UserId": "AIDAEXAMPLE"}
+    )
+    credentials.get_account_id("us-east-1", session=session)
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "other-key")
+    other = StubbedSession()
+    other.stubs["sts"].add_response(
+        "get_caller_identity", {"Account": "222222222222", "Arn": _ARN, "UserId": "AIDAEXAMPLE"}
+    )
+
+    assert credentials.get_account_id("us-east-1", session=other) == "222222222222"
+
+
+def test_ecr_token_is_cached_until_expiry(session):
+    """Test that ECR tokens are reused and refreshed on demand."""
+    session.stubs["ecr"].add_response("get_authorization_token", _token_response("one"))
+    session.stubs["ecr"].add_response("get_authorization_token", _token_response("two"))
+
+    first = credentials.get_ecr_authorization("us-east-1", session=session)
+    second = credentials.get_ecr_authorization("us-east-1", session=session)
+    forced = credentials.get_ecr_authorization("us-east-1", session=session, use_cache=False)
+
+    assert first == second
+    assert first["username"] == "AWS"
+    assert first["password"] == "one"
+    assert forced["password"] == "two"
+
+
+AUTH = {
+    "username": "AWS",
+    "password": "secret",
+    "endpoint": ENDPOINT,
+    "expires_at": 4102444800.0,
+}
+
+
+def _docker_login(config_dir):
+    """Make a subprocess.run stand-in whose 'docker login' updates docker's config."""
+
+    def run(cmd, **kwargs):
+        auths = {cmd[-1]: {}}
+        (config_dir / "config.json").write_text(json.dumps({"auths": auths}))
+        return subprocess.CompletedProcess(args=cmd, returncode=0, stdout="", stderr="")
+
+    return run
+
+
+def test_ecr_login_skips_docker_login_when_current(temp_dir, isolated_docker_config):
+    """Test that docker login runs once while the cached token is valid."""
+    builder = DockerBuilder(app_root=str(temp_dir), image_name="my-app")
+
+    with patch("jvdeploy.aws.credentials.get_ecr_authorization", return_value=AUTH), patch(
+        "subprocess.run", side_effect=_docker_login(isolated_docker_config)
+    ) as run:
+        builder.ecr_login("us-east-1", account_id="123456789012")
+        builder.ecr_login("us-east-1", account_id="123456789012")
+
+    assert run.call_count == 1
+    assert run.call_args.args[0][:2] == ["docker", "login"]
+
+
+def test_ecr_login_again_after_docker_logout(temp_dir, isolated_docker_config, monkeypatch):
+    """Test that a recorded login is not trusted once docker no longer holds credentials."""
+    builder = DockerBuilder(app_root=str(temp_dir), image_name="my-app")
+
+    with patch("jvdeploy.aws.credentials.get_ecr_authorization", return_value=AUTH), patch(
+        "subprocess.run", side_effect=_docker_login(isolated_docker_config)
+    ) as run:
+        builder.ecr_login("us-east-1", account_id="123456789012")
+        # docker logout
+        (isolated_docker_config / "config.json").write_text(json.dumps({"auths": {}}))
+        builder.ecr_login("us-east-1", account_id="123456789012")
+        # Another DOCKER_CONFIG
+        other = temp_dir / "other-docker-config"
+        other.mkdir()
+        monkeypatch.setenv("DOCKER_CONFIG", str(other))
+        builder.ecr_login("us-east-1", account_id="123456789012")
+
+    assert run.call_count == 3
+
+
+def test_docker_has_credentials(isolated_docker_config):
+    """Test that auths entries (with or without scheme) and credHelpers count as credentials."""
+    registry = "123456789012.dkr.ecr.us-east-1.amazonaws.com"
+    config = isolated_docker_config / "config.json"
+    assert not credentials.docker_has_credentials(registry)
+
+    config.write_text(json.dumps({"auths": {ENDPOINT: {}}, "credsStore": "desktop"}))
+    assert credentials.docker_has_credentials(registry)
+
+    config.write_text(json.dumps({"auths": {}, "credHelpers": {registry: "ecr-login"}}))
+    assert credentials.docker_has_credentials(registry)
+
+    config.write_text("not json")
+    assert not credentials.docker_has_credentials(registry)
+
+
+def test_push_relogs_in_when_denied(temp_dir):
+    """Test that a denied push refreshes the login and retries once."""
+    builder = DockerBuilder(app_root=str(temp_dir), image_name="my-app")
+    builder._docker_available = True
+    builder._login_region = "us-east-1"
+    denied = subprocess.CompletedProcess([], 1, "", "no basic auth credentials")
+    ok = subprocess.CompletedProcess([], 0, "", "")
+    uri = "123456789012.dkr.ecr.us-east-1.amazonaws.com/my-app:1.0.0"
+
+    with patch("subprocess.run", side_effect=[denied, ok]), patch.object(
+        builder, "ecr_login"
+    ) as login:
+        builder.push(uri)
+
+    login.assert_called_once_with("us-east-1", force=True)
+
+
+def test_deployer_get_account_id_uses_cache(aws_credentials):
+    """Test that LambdaDeployer resolves the account through the shared cache."""
+    from jvdeploy.aws.lambda_deployer import LambdaDeployer
+
+    deployer = LambdaDeployer({"region": "us-east-1"})
+    with patch("jvdeploy.aws.credentials.get_account_id", Mock(return_value="1")) as lookup:
+        assert deployer.get_account_id() == "1"
+        assert deployer.get_account_id() == "1"
+
+    lookup.assert_called_once()
+    assert lookup.call_args.kwargs["session"] is deployer._session
+
+
+def test_deployer_get_account_id_calls_its_sts_client(aws_credentials):
+    """Test that a cache miss goes to the deployer's own STS client."""
+    from jvdeploy.aws.lambda_deployer import LambdaDeployer
+
+    deployer = LambdaDeployer({"region": "us-east-1"})
+    deployer._sts_client = boto3.client("sts", region_name="us-east-1")
+    stub = Stubber(deployer.sts_client)
+    stub.add_response(
+        "get_caller_identity", {"Account": "123456789012", "Arn": _ARN, "UserId": "AIDA"}
+    )
+
+    with stub:
+        assert deployer.get_account_id() == "123456789012"
+
+    stub.assert_no_pending_responses()
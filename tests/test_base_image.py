@@ -0,0 +1,103 @@
+"""Tests for base image pinning."""
+
+from unittest.mock import patch
+
+import pytest
+
+from jvdeploy.base_image import (
+    BaseImageError,
+    find_base_image,
+    pin_base_image,
+    update_base_pin,
+)
+from jvdeploy.bundler import Bundler
+from jvdeploy.cache import JsonCache
+from jvdeploy.registry import RegistryError
+
+BASE = "public.ecr.aws/s1x1t0a3/jvagent:latest"
+OLD = "sha256:" + "1" * 64
+NEW = "sha256:" + "2" * 64
+DOCKERFILE = f"FROM {BASE}\n\nWORKDIR /var/task\n"
+
+
+def test_find_base_image_skips_flags():
+    """Test that FROM flags and stage names are not part of the reference."""
+    content = "# syntax\nFROM --platform=linux/amd64 python:3.12 AS build\nFROM scratch\n"
+    assert find_base_image(content) == "python:3.12"
+
+
+def test_pin_base_image_resolves_once():
+    """Test that the tag is resolved once and then served from the cache."""
+    with patch("jvdeploy.registry.RegistryClient.resolve_digest", return_value=OLD) as resolve:
+        assert pin_base_image(DOCKERFILE) == f"FROM {BASE}@{OLD}\n\nWORKDIR /var/task\n"
+        assert pin_base_image(DOCKERFILE) == f"FROM {BASE}@{OLD}\n\nWORKDIR /var/task\n"
+
+    resolve.assert_called_once_with("s1x1t0a3/jvagent", "latest")
+
+
+def test_pin_base_image_keeps_previous_pin():
+    """Test that regenerating keeps the pin of the replaced Dockerfile."""
+    previous = f"FROM {BASE}@{OLD}\n"
+    with patch("jvdeploy.registry.RegistryClient.resolve_digest", return_value=NEW) as resolve:
+        assert pin_base_image(DOCKERFILE, previous).startswith(f"FROM {BASE}@{OLD}\n")
+    resolve.assert_not_called()
+
+
+def test_update_base_pin(temp_dir):
+    """Test that update moves an existing pin past the cache."""
+    dockerfile = temp_dir / "Dockerfile"
+    dockerfile.write_text(f"FROM {BASE}@{OLD}\n")
+
+    with patch("jvdeploy.registry.RegistryClient.resolve_digest", return_value=NEW):
+        assert update_base_pin(dockerfile) == (OLD, NEW)
+
+    assert dockerfile.read_text() == f"FROM {BASE}@{NEW}\n"
+
+
+def test_pin_base_image_error():
+    """Test that registry failures surface as BaseImageError."""
+    with patch(
+        "jvdeploy.registry.RegistryClient.resolve_digest", side_effect=RegistryError("offline")
+    ):
+        with pytest.raises(BaseImageError, match="offline"):
+            pin_base_image(DOCKERFILE)
+
+
+def test_bundler_pins_base_image(mock_jvagent_app):
+    """Test that the bundler writes a pinned FROM line when asked to."""
+    with patch("jvdeploy.registry.RegistryClient.resolve_digest", return_value=OLD):
+        assert Bundler(str(mock_jvagent_app), pin_base=True).generate_dockerfile()
+
+    assert f"FROM {BASE}@{OLD}" in (mock_jvagent_app / "Dockerfile").read_text()
+
+
+def test_bundler_uses_pull_through_cache_and_keeps_pin(mock_jvagent_app):
+    """Test that a pinned base is redirected to the cache and the pin survives regeneration."""
+    cache_uri = "123456789012.dkr.ecr.us-east-1.amazonaws.com/ecr-public"
+    bundler = Bundler(str(mock_jvagent_app), pin_base=True, pull_through_cache=cache_uri)
+
+    with patch("jvdeploy.registry.RegistryClient.resolve_digest", return_value=OLD):
+        assert bundler.generate_dockerfile()
+    JsonCache("base-images").delete(BASE)
+    with patch("jvdeploy.registry.RegistryClient.resolve_digest", return_value=NEW) as resolve:
+        assert bundler.generate_dockerfile()
+
+    resolve.assert_not_called()
+    expected = f"FROM {cache_uri}/s1x1t0a3/jvagent:latest@{OLD}"
+    assert expected in (mock_jvagent_app / "Dockerfile").read_text()
+
+
+def test_unpinned_existing_dockerfile_is_reported(temp_dir, caplog):
+    """Test that pin_base on an existing Dockerfile only warns about a missing pin."""
+    from jvdeploy.cli import _check_base_pin
+
+    dockerfile = temp_dir / "Dockerfile"
+    dockerfile.write_text(DOCKERFILE)
+    _check_base_pin(dockerfile)
+    assert "not pinned to a digest" in caplog.text
+    assert dockerfile.read_text() == DOCKERFILE
+
+    caplog.clear()
+    dockerfile.write_text(f"FROM {BASE}@{OLD}\n")
+    _check_base_pin(dockerfile)
+    assert "not pinned" not in caplog.text
@@ -0,0 +1,139 @@
+"""Tests for build impact preview."""
+
+import os
+
+from jvdeploy.build_impact import (
+    build_fingerprint,
+    copy_sources,
+    explain_build,
+    format_explanation,
+    parse_buildkit_timings,
+    parse_dockerfile,
+    record_build,
+)
+from jvdeploy.dockerfile_generator import generate_dockerfile
+
+BUILD_OUTPUT = """#1 [internal] load build definition from Dockerfile
+#1 DONE 0.0s
+#5 [1/4] FROM public.ecr.aws/s1x1t0a3/jvagent:latest
+#5 DONE 0.1s
+#7 [2/4] WORKDIR /var/task
+#7 CACHED
+#8 [3/4] COPY . /var/task/
+#8 DONE 0.4s
+#9 [4/4] RUN pip install --no-cache-dir   jvdeploy
+#9 12.1 Successfully installed jvdeploy
+#9 DONE 42.5s
+"""
+
+
+def _dockerfile(app_root, base_template):
+    return generate_dockerfile(app_root, base_template)
+
+
+def _touch(path, content):
+    stat = path.stat()
+    path.write_text(content)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_parse_dockerfile_joins_continuations():
+    """Test that continuation lines form one instruction and comments are dropped."""
+    content = "# comment\nFROM python:3.12\n\nRUN pip install \\\n    a b\nCOPY . /app/\n"
+    assert parse_dockerfile(content) == ["FROM python:3.12", "RUN pip install a b", "COPY . /app/"]
+
+
+def test_copy_sources():
+    """Test extracting context sources from COPY and ADD."""
+    assert copy_sources("COPY --chown=1000 ./src requirements.txt /app/") == [
+        "src",
+        "requirements.txt",
+    ]
+    assert copy_sources("COPY --from=build /out /app") is None
+    assert copy_sources("RUN true") is None
+
+
+def test_parse_buildkit_timings():
+    """Test that finished steps are timed and cached steps skipped."""
+    assert parse_buildkit_timings(BUILD_OUTPUT) == {
+        "FROM public.ecr.aws/s1x1t0a3/jvagent:latest": 0.1,
+        "COPY . /var/task/": 0.4,
+        "RUN pip install --no-cache-dir jvdeploy": 42.5,
+    }
+
+
+def test_explain_without_recorded_build(mock_jvagent_app, mock_base_template):
+    """Test that every step is predicted when nothing was recorded."""
+    report = explain_build(mock_jvagent_app, _dockerfile(mock_jvagent_app, mock_base_template))
+
+    assert not report["recorded"]
+    assert all(step["rebuild"] for step in report["steps"])
+    assert "every step will run" in format_explanation(report)
+
+
+def test_explain_nothing_changed(mock_jvagent_app, mock_base_template):
+    """Test that an unchanged tree is fully cached."""
+    content = _dockerfile(mock_jvagent_app, mock_base_template)
+    record_build(mock_jvagent_app, content, parse_buildkit_timings(BUILD_OUTPUT))
+
+    report = explain_build(mock_jvagent_app, content)
+
+    assert report["first_rebuilt"] is None
+    assert report["estimated_seconds"] == 0
+    assert "every step is cached" in format_explanation(report)
+
+
+def test_explain_source_change(mock_jvagent_app, mock_base_template):
+    """Test that a changed source file rebuilds the COPY step and everything after it."""
+    content = _dockerfile(mock_jvagent_app, mock_base_template)
+    timings = {instruction: 10.0 for instruction in parse_dockerfile(content)}
+    record_build(mock_jvagent_app, content, timings)
+
+    _touch(mock_jvagent_app / "app.yaml", "name: test_app\nversion: 0.2.0\n")
+    (mock_jvagent_app / "new_module.py").write_text("x = 1\n")
+    report = explain_build(mock_jvagent_app, content)
+
+    copy_step = next(s for s in report["steps"] if s["instruction"].startswith("COPY"))
+    assert report["first_rebuilt"] == copy_step["index"]
+    assert copy_step["reasons"] == ["context files changed (1 added, 1 modified)"]
+    assert copy_step["changed_files"] == ["new_module.py", "app.yaml"]
+    assert not report["steps"][0]["rebuild"]
+    assert report["steps"][-1]["reasons"] == [f"follows rebuilt step {copy_step['index']}"]
+    rebuilt = [s for s in report["steps"] if s["rebuild"]]
+    assert report["estimated_seconds"] == 10.0 * len(rebuilt)
+
+
+def test_explain_dependency_change(mock_jvagent_app, mock_base_template):
+    """Test that an action's dependency change is attributed to its info.yaml."""
+    record_build(mock_jvagent_app, _dockerfile(mock_jvagent_app, mock_base_template))
+
+    info = mock_jvagent_app / "agents/myorg/agent1/actions/myorg/action1/info.yaml"
+    _touch(info, info.read_text().replace("httpx>=0.24.0", "httpx>=0.27.0"))
+    report = explain_build(mock_jvagent_app, _dockerfile(mock_jvagent_app, mock_base_template))
+
+    reasons = [reason for step in report["steps"] for reason in step["reasons"]]
+    assert "dependencies of myorg/action1 changed (info.yaml)" in reasons
+    copy_step = next(s for s in report["steps"] if s["instruction"].startswith("COPY"))
+    assert copy_step["changed_files"] == ["agents/myorg/agent1/actions/myorg/action1/info.yaml"]
+
+
+def test_explain_ignores_touched_but_unchanged_files(mock_jvagent_app, mock_base_template):
+    """Test that a new modification time alone does not predict a rebuild."""
+    content = _dockerfile(mock_jvagent_app, mock_base_template)
+    record_build(mock_jvagent_app, content)
+
+    app_yaml = mock_jvagent_app / "app.yaml"
+    _touch(app_yaml, app_yaml.read_text())
+
+    assert explain_build(mock_jvagent_app, content)["first_rebuilt"] is None
+
+
+def test_build_fingerprint(mock_jvagent_app, mock_base_template):
+    """Test that the fingerprint follows context and Dockerfile changes."""
+    content = _dockerfile(mock_jvagent_app, mock_base_template)
+    fingerprint = build_fingerprint(mock_jvagent_app, content)
+
+    assert build_fingerprint(mock_jvagent_app, content) == fingerprint
+    assert build_fingerprint(mock_jvagent_app, content + "RUN true\n") != fingerprint
+    (mock_jvagent_app / "app.yaml").write_text("name: test_app\nversion: 0.3.0\n")
+    assert build_fingerprint(mock_jvagent_app, content) != fingerprint
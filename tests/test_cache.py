@@ -0,0 +1,55 @@
+"""Tests for the on-disk cache module."""
+
+import os
+import stat
+import time
+
+from jvdeploy.cache import JsonCache, cache_dir
+
+
+def test_cache_dir_override(isolated_cache_dir):
+    """Test that JVDEPLOY_CACHE_DIR controls the cache location."""
+    assert cache_dir() == isolated_cache_dir
+
+
+def test_set_get_delete():
+    """Test storing, reading and deleting values."""
+    cache = JsonCache("test")
+    cache.set("key", {"a": 1})
+
+    assert cache.get("key") == {"a": 1}
+    assert JsonCache("test").get("key") == {"a": 1}
+
+    cache.delete("key")
+    assert cache.get("key") is None
+
+
+def test_expiry():
+    """Test that expired entries are not returned and are pruned on write."""
+    cache = JsonCache("test")
+    cache.set("old", "value", expires_at=time.time() - 1)
+    cache.set("fresh", "value", ttl=60)
+
+    assert cache.get("old") is None
+    assert cache.get("fresh") == "value"
+    assert "old" not in cache._read()
+
+
+def test_file_is_private():
+    """Test that cache files are readable only by the owner."""
+    cache = JsonCache("secrets")
+    cache.set("token", "hunter2")
+
+    mode = stat.S_IMODE(os.stat(cache.path).st_mode)
+    assert mode == 0o600
+
+
+def test_corrupt_file_is_ignored():
+    """Test that a corrupt cache file behaves like an empty cache."""
+    cache = JsonCache("broken")
+    cache.path.parent.mkdir(parents=True, exist_ok=True)
+    cache.path.write_text("{not json")
+
+    assert cache.get("anything") is None
+    cache.set("anything", 1)
+    assert cache.get("anything") == 1
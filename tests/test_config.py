@@ -320,3 +320,45 @@ def test_to_dict() -> None:
         assert isinstance(full_config, dict)
         assert full_config["version"] == "1.0"
         assert full_config["app"]["name"] == "test-app"
+
+
+def test_build_platform_follows_lambda_architecture() -> None:
+    """Test that the build platform defaults to the Lambda function's architecture."""
+    config_dict = {
+        "app": {"name": "test-app"},
+        "image": {"name": "test-app"},
+        "lambda": {"enabled": True, "function": {"name": "fn", "architecture": "arm64"}},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config = DeployConfig(create_test_config(config_dict, temp_dir))
+        assert config.get_build_platform() == "linux/arm64"
+
+        config_dict["image"]["build"] = {"platform": "linux/amd64"}
+        config = DeployConfig(create_test_config(config_dict, temp_dir))
+        assert config.get_build_platform() == "linux/amd64"
+
+        config_dict["lambda"]["function"]["architecture"] = "aarch64"
+        with pytest.raises(DeployConfigError, match="architecture' must be one of x86_64, arm64"):
+            DeployConfig(create_test_config(config_dict, temp_dir))
+
+
+def test_warm_capacity_must_be_a_count() -> None:
+    """Test that provisioned concurrency and the warmer's concurrency are counts."""
+    config_dict = {
+        "app": {"name": "test-app"},
+        "image": {"name": "test-app"},
+        "lambda": {"enabled": True, "provisioned_concurrency": {"count": 3}},
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        DeployConfig(create_test_config(config_dict, temp_dir))
+
+        config_dict["lambda"]["provisioned_concurrency"] = -1
+        with pytest.raises(DeployConfigError, match="must be a non-negative integer"):
+            DeployConfig(create_test_config(config_dict, temp_dir))
+
+        config_dict["lambda"]["provisioned_concurrency"] = 0
+        config_dict["lambda"]["warmer"] = {"enabled": True, "concurrency": "3"}
+        with pytest.raises(DeployConfigError, match="warmer.concurrency' must be"):
+            DeployConfig(create_test_config(config_dict, temp_dir))
@@ -0,0 +1,209 @@
+"""Tests for docker_builder module."""
+
+import subprocess
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from jvdeploy.docker_builder import DockerBuilder, parse_image_uri
+
+ECR_URI = "123456789012.dkr.ecr.us-east-1.amazonaws.com/my-app:1.0.0"
+DIGEST = "sha256:" + "a" * 64
+
+
+def test_parse_image_uri():
+    """Test splitting image URIs into registry, repository and tag."""
+    assert parse_image_uri(ECR_URI) == (
+        "123456789012.dkr.ecr.us-east-1.amazonaws.com",
+        "my-app",
+        "1.0.0",
+    )
+    assert parse_image_uri("localhost:5000/org/app") == ("localhost:5000", "org/app", "latest")
+    assert parse_image_uri("my-app:dev") == ("", "my-app", "dev")
+    assert parse_image_uri(f"public.ecr.aws/x/app:latest@{DIGEST}") == (
+        "public.ecr.aws",
+        "x/app",
+        "latest",
+    )
+
+
+@pytest.fixture
+def builder(temp_dir):
+    """Create a DockerBuilder for a temporary app root."""
+    return DockerBuilder(app_root=str(temp_dir), image_name="my-app", image_tag="1.0.0")
+
+
+def _inspect_result(stdout: str) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args=[], returncode=0, stdout=stdout, stderr="")
+
+
+def test_find_image_in_ecr_same_tag(builder, aws_credentials):
+    """Test that an image already in ECR under the target tag is detected."""
+    repo_digests = f'["{ECR_URI.rsplit(":", 1)[0]}@{DIGEST}"]'
+    ecr_client = Mock()
+    ecr_client.describe_images.return_value = {
+        "imageDetails": [{"imageDigest": DIGEST, "imageTags": ["1.0.0"]}]
+    }
+
+    with patch("subprocess.run", return_value=_inspect_result(repo_digests)), patch(
+        "boto3.client", return_value=ecr_client
+    ):
+        assert builder.find_image_in_ecr(ECR_URI, "us-east-1") == DIGEST
+
+    ecr_client.describe_images.assert_called_once_with(
+        repositoryName="my-app", imageIds=[{"imageDigest": DIGEST}]
+    )
+    ecr_client.put_image.assert_not_called()
+
+
+def test_find_image_in_ecr_retags_other_tag(builder, aws_credentials):
+    """Test that a digest present under another tag is retagged instead of pushed."""
+    repo_digests = f'["{ECR_URI.rsplit(":", 1)[0]}@{DIGEST}"]'
+    ecr_client = Mock()
+    ecr_client.describe_images.return_value = {
+        "imageDetails": [{"imageDigest": DIGEST, "imageTags": ["0.9.0"]}]
+    }
+    ecr_client.batch_get_image.return_value = {"images": [{"imageManifest": "{}"}]}
+
+    with patch("subprocess.run", return_value=_inspect_result(repo_digests)), patch(
+        "boto3.client", return_value=ecr_client
+    ):
+        assert builder.find_image_in_ecr(ECR_URI, "us-east-1") == DIGEST
+
+    ecr_client.put_image.assert_called_once_with(
+        repositoryName="my-app", imageManifest="{}", imageTag="1.0.0", imageDigest=DIGEST
+    )
+
+
+def test_find_image_in_ecr_uses_given_client(temp_dir):
+    """Test that the deployer's ECR client is used in its region instead of a default one."""
+    ecr_client = Mock()
+    ecr_client.meta.region_name = "us-east-1"
+    ecr_client.describe_images.return_value = {
+        "imageDetails": [{"imageDigest": DIGEST, "imageTags": ["1.0.0"]}]
+    }
+    builder = DockerBuilder(
+        app_root=str(temp_dir), image_name="my-app", image_tag="1.0.0", ecr_client=ecr_client
+    )
+    repo_digests = f'["{ECR_URI.rsplit(":", 1)[0]}@{DIGEST}"]'
+
+    with patch("subprocess.run", return_value=_inspect_result(repo_digests)), patch(
+        "boto3.client"
+    ) as default_client:
+        assert builder.find_image_in_ecr(ECR_URI, "us-east-1") == DIGEST
+
+    default_client.assert_not_called()
+    ecr_client.describe_images.assert_called_once()
+
+
+def test_find_image_in_ecr_never_pushed(builder):
+    """Test that an image without repo digests for the ECR repository is not found."""
+    with patch("subprocess.run", return_value=_inspect_result('["docker.io/my-app@sha256:b"]')):
+        assert builder.find_image_in_ecr(ECR_URI, "us-east-1") is None
+
+
+def test_build_and_push_skips_push_when_present(builder):
+    """Test that login and push are skipped when ECR already holds the image."""
+    with patch.object(builder, "build", return_value="my-app:1.0.0"), patch.object(
+        builder, "tag"
+    ), patch.object(builder, "find_image_in_ecr", return_value=DIGEST), patch.object(
+        builder, "ecr_login"
+    ) as login, patch.object(
+        builder, "push"
+    ) as push:
+        result = builder.build_and_push_to_ecr(ECR_URI, "us-east-1", account_id="123456789012")
+
+    assert result == ECR_URI
+    login.assert_not_called()
+    push.assert_not_called()
+
+
+def test_platform_suffix():
+    """Test tag suffixes derived from platform strings."""
+    assert DockerBuilder.platform_suffix("linux/amd64") == "amd64"
+    assert DockerBuilder.platform_suffix("linux/arm/v7") == "arm-v7"
+
+
+def test_build_platforms_runs_concurrently(temp_dir):
+    """Test that platforms build in parallel with per-platform tags and timings."""
+    builder = DockerBuilder(
+        app_root=str(temp_dir),
+        image_name="my-app",
+        image_tag="1.0.0",
+        platforms=["linux/amd64", "linux/arm64"],
+    )
+    builder._docker_available = True
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_build(
+        dockerfile_path=None, no_cache=False, platform=None, image_tag=None, push_uris=None
+    ):
+        # Both builds must be in flight at the same time to pass the barrier
+        barrier.wait()
+        return f"my-app:{image_tag}"
+
+    with patch.object(builder, "build", side_effect=fake_build):
+        images = builder.build_platforms()
+
+    assert images == {"linux/amd64": "my-app:1.0.0-amd64", "linux/arm64": "my-app:1.0.0-arm64"}
+    assert set(builder.platform_timings) == {"linux/amd64", "linux/arm64"}
+
+
+def test_build_and_push_platforms_tags_primary(temp_dir):
+    """Test per-platform pushes, with the plain tag on the primary platform."""
+    builder = DockerBuilder(
+        app_root=str(temp_dir),
+        image_name="my-app",
+        image_tag="1.0.0",
+        platforms=["linux/arm64", "linux/amd64"],
+    )
+    images = {"linux/arm64": "my-app:1.0.0-arm64", "linux/amd64": "my-app:1.0.0-amd64"}
+    base = ECR_URI.rsplit(":", 1)[0]
+
+    with patch.object(builder, "build_platforms", return_value=images), patch.object(
+        builder, "tag"
+    ) as tag, patch.object(builder, "find_image_in_ecr", return_value=None), patch.object(
+        builder, "ecr_login"
+    ) as login, patch.object(
+        builder, "push"
+    ) as push, patch.object(
+        builder, "create_manifest_list"
+    ) as manifest:
+        builder.build_and_push_to_ecr(ECR_URI, "us-east-1", account_id="123456789012")
+
+    assert [c.args[1] for c in tag.call_args_list] == [
+        f"{base}:1.0.0-arm64",
+        ECR_URI,
+        f"{base}:1.0.0-amd64",
+    ]
+    assert push.call_count == 3
+    login.assert_called_once()
+    manifest.assert_not_called()
+
+
+def test_build_and_push_platforms_manifest_list(temp_dir):
+    """Test that manifest_list publishes the plain tag as a manifest list."""
+    builder = DockerBuilder(
+        app_root=str(temp_dir),
+        image_name="my-app",
+        image_tag="1.0.0",
+        platforms=["linux/amd64", "linux/arm64"],
+        manifest_list=True,
+    )
+    images = {"linux/amd64": "my-app:1.0.0-amd64", "linux/arm64": "my-app:1.0.0-arm64"}
+    base = ECR_URI.rsplit(":", 1)[0]
+
+    with patch.object(builder, "build_platforms", return_value=images), patch.object(
+        builder, "tag"
+    ), patch.object(builder, "find_image_in_ecr", return_value=None), patch.object(
+        builder, "ecr_login"
+    ), patch.object(
+        builder, "push"
+    ) as push, patch.object(
+        builder, "create_manifest_list"
+    ) as manifest:
+        builder.build_and_push_to_ecr(ECR_URI, "us-east-1", account_id="123456789012")
+
+    assert push.call_count == 2
+    manifest.assert_called_once_with(ECR_URI, [f"{base}:1.0.0-amd64", f"{base}:1.0.0-arm64"])
@@ -0,0 +1,219 @@
+"""Tests for the Docker Engine API client, run against a fake unix socket server."""
+
+import base64
+import io
+import json
+import socketserver
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from jvdeploy.docker_builder import DockerBuilder
+from jvdeploy.docker_engine import (
+    DockerEngineClient,
+    DockerEngineError,
+    registry_auth_header,
+)
+
+
+class FakeDockerHandler(BaseHTTPRequestHandler):
+    """Answer a small subset of the Docker Engine API."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, messages):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for message in messages:
+            line = json.dumps(message).encode("utf-8") + b"\r\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path, dict(self.headers), b""))
+        if self.path == "/v1.41/_ping":
+            body = b"OK"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path.startswith("/v1.41/images/") and self.path.endswith("/json"):
+            self._send_json({"Id": "sha256:abc", "RepoDigests": ["repo/app@sha256:def"]})
+        else:
+            self._send_json({"message": "page not found"}, status=404)
+
+    def do_POST(self):
+        body = self._read_body()
+        self.server.requests.append(("POST", self.path, dict(self.headers), body))
+        if self.path.startswith("/v1.41/build"):
+            names = tarfile.open(fileobj=io.BytesIO(body)).getnames()
+            if "Dockerfile" not in names:
+                self._send_stream([{"error": "missing Dockerfile", "errorDetail": {}}])
+                return
+            self._send_stream(
+                [
+                    {"stream": "Step 1/2 : FROM scratch\n"},
+                    {"stream": "Step 2/2 : COPY . /\n"},
+                    {"aux": {"ID": "sha256:abc"}},
+                    {"stream": "Successfully built abc\n"},
+                ]
+            )
+        elif "/tag?" in self.path:
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif "/push?" in self.path:
+            if "X-Registry-Auth" not in self.headers:
+                self._send_json({"message": "no auth"}, status=401)
+                return
+            self._send_stream(
+                [
+                    {"status": "Pushing", "id": "layer1", "progressDetail": {"current": 1}},
+                    {"status": "Pushed", "id": "layer1"},
+                    {"aux": {"Tag": "1.0.0", "Digest": "sha256:def", "Size": 123}},
+                ]
+            )
+        else:
+            self._send_json({"message": "page not found"}, status=404)
+
+
+@pytest.fixture
+def fake_docker(tmp_path):
+    """Run a fake Docker daemon on a unix socket in a temporary directory."""
+    socket_path = str(tmp_path / "docker.sock")
+    server = socketserver.ThreadingUnixStreamServer(socket_path, FakeDockerHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, socket_path
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def build_context(temp_dir):
+    """Create a small build context with a .dockerignore."""
+    (temp_dir / "Dockerfile").write_text("FROM scratch\nCOPY . /\n")
+    (temp_dir / "app.py").write_text("print('hi')\n")
+    (temp_dir / ".dockerignore").write_text("*.log\n")
+    (temp_dir / "debug.log").write_text("noise\n")
+    return temp_dir
+
+
+def test_ping_and_inspect_reuse_one_connection(fake_docker):
+    """Test that consecutive requests share one persistent connection."""
+    server, socket_path = fake_docker
+    client = DockerEngineClient(socket_path=socket_path)
+
+    assert client.ping() is True
+    assert client.inspect_image("repo/app:1.0.0")["Id"] == "sha256:abc"
+    assert client.ping() is True
+
+    assert server.connections == 1
+
+
+def test_ping_without_daemon(tmp_path):
+    """Test that ping reports False when no daemon is listening."""
+    client = DockerEngineClient(socket_path=str(tmp_path / "missing.sock"))
+    assert client.ping() is False
+
+
+def test_build_streams_progress_and_honors_dockerignore(fake_docker, build_context):
+    """Test building sends a filtered tar context and streams JSON progress."""
+    server, socket_path = fake_docker
+    client = DockerEngineClient(socket_path=socket_path)
+    messages = []
+
+    image_id = client.build(
+        build_context,
+        build_context / "Dockerfile",
+        tag="my-app:1.0.0",
+        platform="linux/arm64",
+        on_progress=messages.append,
+    )
+
+    assert image_id == "sha256:abc"
+    assert [m["stream"] for m in messages if "stream" in m][0] == "Step 1/2 : FROM scratch\n"
+
+    method, path, _, body = server.requests[-1]
+    assert "platform=linux%2Farm64" in path
+    assert "t=my-app%3A1.0.0" in path
+    names = tarfile.open(fileobj=io.BytesIO(body)).getnames()
+    assert "app.py" in names
+    assert "debug.log" not in names
+
+
+def test_build_error_raises(fake_docker, build_context):
+    """Test that an error message in the build stream raises."""
+    _, socket_path = fake_docker
+    (build_context / "Dockerfile").rename(build_context / "Other.dockerfile")
+    client = DockerEngineClient(socket_path=socket_path)
+
+    with pytest.raises(DockerEngineError, match="missing Dockerfile"):
+        client.build(build_context, build_context / "Other.dockerfile", tag="my-app:1")
+
+
+def test_push_sends_registry_auth(fake_docker):
+    """Test pushing forwards credentials and returns the pushed digest."""
+    server, socket_path = fake_docker
+    client = DockerEngineClient(socket_path=socket_path)
+    auth = registry_auth_header("AWS", "secret", "https://123.dkr.ecr.us-east-1.amazonaws.com")
+
+    digest = client.push("123.dkr.ecr.us-east-1.amazonaws.com/my-app", "1.0.0", auth=auth)
+
+    assert digest == "sha256:def"
+    headers = server.requests[-1][2]
+    decoded = json.loads(base64.urlsafe_b64decode(headers["X-Registry-Auth"]))
+    assert decoded["username"] == "AWS"
+    assert decoded["password"] == "secret"
+
+
+def test_docker_builder_engine_backend(fake_docker, build_context, monkeypatch):
+    """Test DockerBuilder runs build, tag and push through the engine without the CLI."""
+    server, socket_path = fake_docker
+    monkeypatch.setenv("DOCKER_HOST", f"unix://{socket_path}")
+    monkeypatch.setattr("subprocess.run", pytest.fail)
+
+    builder = DockerBuilder(
+        app_root=str(build_context), image_name="my-app", image_tag="1.0.0", backend="engine"
+    )
+    uri = "123.dkr.ecr.us-east-1.amazonaws.com/my-app:1.0.0"
+    builder._registry_auth["123.dkr.ecr.us-east-1.amazonaws.com"] = "e30="
+
+    assert builder.build() == "my-app:1.0.0"
+    builder.tag("my-app:1.0.0", uri)
+    builder.push(uri)
+    assert builder.get_repo_digests(uri) == ["repo/app@sha256:def"]
+
+    paths = [path for _, path, _, _ in server.requests]
+    assert paths.count("/v1.41/_ping") == 1
+    assert any(
+        "/tag?repo=123.dkr.ecr.us-east-1.amazonaws.com%2Fmy-app&tag=1.0.0" in p for p in paths
+    )
+    assert server.connections == 1
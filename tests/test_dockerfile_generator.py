@@ -3,6 +3,7 @@
 import pytest
 
 from jvdeploy.dockerfile_generator import (
+    add_slim_pass,
     discover_action_dependencies,
     discover_core_packages,
     generate_dockerfile,
@@ -386,3 +387,25 @@ def test_generate_dockerfile_whitespace_handling(temp_dir, mock_base_template):
     # Empty string should be filtered out
     # Now has 2 RUN commands: pip-get-packages and action dependencies
     assert dockerfile_content.count("RUN") == 2
+
+
+def test_generate_dockerfile_slim(mock_jvagent_app, mock_base_template):
+    """Test that slim chains the slimming pass onto every pip install."""
+    dockerfile_content = generate_dockerfile(mock_jvagent_app, mock_base_template, slim=True)
+
+    assert (
+        "RUN /opt/venv/bin/pip install --no-cache-dir numpy>=1.24.0 && jvdeploy slim /opt/venv"
+        in dockerfile_content
+    )
+    for line in dockerfile_content.splitlines():
+        if "pip install" in line:
+            assert line.endswith("&& jvdeploy slim /opt/venv")
+
+
+def test_add_slim_pass_multiline_run():
+    """Test that the slimming pass is appended to the last line of a RUN."""
+    content = "FROM base\nRUN pip install \\\n    requests\nRUN echo done\n"
+
+    assert add_slim_pass(content) == (
+        "FROM base\nRUN pip install \\\n    requests && jvdeploy slim /opt/venv\n" "RUN echo done\n"
+    )
@@ -0,0 +1,40 @@
+"""Tests for dockerignore module."""
+
+from jvdeploy.dockerignore import DockerIgnore, iter_context_files
+
+
+def test_basic_patterns():
+    """Test simple globs, directories and comments."""
+    ignore = DockerIgnore(["# comment", "*.log", "build/", "/secrets.txt"])
+
+    assert ignore.is_ignored("debug.log")
+    assert not ignore.is_ignored("logs/debug.log")
+    assert ignore.is_ignored("build/output.bin")
+    assert ignore.is_ignored("secrets.txt")
+    assert not ignore.is_ignored("app.py")
+
+
+def test_double_star_and_exceptions():
+    """Test '**' matching and '!' exceptions, where the last match wins."""
+    ignore = DockerIgnore(["**/__pycache__", "**/*.md", "!README.md"])
+
+    assert ignore.is_ignored("agents/a/__pycache__/x.pyc")
+    assert ignore.is_ignored("__pycache__/x.pyc")
+    assert ignore.is_ignored("docs/guide.md")
+    assert not ignore.is_ignored("README.md")
+
+
+def test_iter_context_files(temp_dir):
+    """Test walking a context prunes ignored directories and sorts output."""
+    (temp_dir / ".dockerignore").write_text(".git\n**/*.pyc\n")
+    (temp_dir / ".git").mkdir()
+    (temp_dir / ".git" / "HEAD").write_text("ref\n")
+    (temp_dir / "pkg").mkdir()
+    (temp_dir / "pkg" / "b.py").write_text("")
+    (temp_dir / "pkg" / "a.py").write_text("")
+    (temp_dir / "pkg" / "a.pyc").write_text("")
+    (temp_dir / "app.yaml").write_text("")
+
+    files = [path for path, _ in iter_context_files(temp_dir, DockerIgnore.from_dir(temp_dir))]
+
+    assert files == [".dockerignore", "app.yaml", "pkg/a.py", "pkg/b.py"]
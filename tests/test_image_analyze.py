@@ -0,0 +1,96 @@
+"""Tests for image analyze module."""
+
+from jvdeploy.image.analyze import (
+    analyze_image,
+    attribute_instruction,
+    format_analysis,
+    instruction_from_history,
+)
+
+INSTALL_ACTION1 = "/opt/venv/bin/pip install --no-cache-dir openai>=1.0.0 httpx>=0.24.0"
+SITE = "opt/venv/lib/python3.12/site-packages"
+
+
+def test_instruction_from_history():
+    """Test history entries from the classic builder and BuildKit."""
+    assert instruction_from_history("/bin/sh -c #(nop) COPY dir:abc in /var/task/ ") == (
+        "COPY dir:abc in /var/task/"
+    )
+    assert instruction_from_history("/bin/sh -c pip install requests") == (
+        "RUN pip install requests"
+    )
+    assert instruction_from_history("RUN /bin/sh -c pip install requests # buildkit") == (
+        "RUN pip install requests"
+    )
+    assert instruction_from_history("|1 PYTHON_VERSION=3.12 /bin/sh -c make") == "RUN make"
+    assert instruction_from_history("COPY . /var/task/ # buildkit") == "COPY . /var/task/"
+
+
+def test_attribute_instruction():
+    """Test mapping RUN instructions back to actions."""
+    commands = {
+        "myorg/action1": INSTALL_ACTION1,
+        "myorg/action2": "/opt/venv/bin/pip install --no-cache-dir openai>=1.0.0",
+    }
+
+    assert attribute_instruction(f"RUN {INSTALL_ACTION1}", commands) == "myorg/action1"
+    assert (
+        attribute_instruction(f"RUN {INSTALL_ACTION1} && jvdeploy slim /opt/venv", commands)
+        == "myorg/action1"
+    )
+    assert (
+        attribute_instruction(
+            "RUN pip install --no-cache-dir $(jvdeploy pip-get-packages --jvagent-path x)",
+            commands,
+        )
+        == "jvagent core actions"
+    )
+    assert attribute_instruction("COPY . /var/task/", commands) is None
+
+
+def test_analyze_image(saved_image, mock_jvagent_app):
+    """Test size attribution to layers, actions, directories and files."""
+    path = saved_image(
+        [
+            ("COPY . /var/task/ # buildkit", {"var/task/app.yaml": b"x" * 100}),
+            (
+                f"RUN /bin/sh -c {INSTALL_ACTION1} # buildkit",
+                {
+                    f"{SITE}/openai/__init__.py": b"x" * 3000,
+                    f"{SITE}/openai/types/chat.py": b"x" * 2000,
+                    f"{SITE}/httpx/__init__.py": b"x" * 1000,
+                    f"{SITE}/.wh.old": b"",
+                },
+            ),
+        ]
+    )
+
+    report = analyze_image(str(path), app_root=mock_jvagent_app, top=2)
+
+    copy_layer, install_layer = report["layers"]
+    assert copy_layer["instruction"] == "COPY . /var/task/"
+    assert copy_layer["action"] is None
+    assert install_layer["action"] == "myorg/action1"
+    assert install_layer["size"] == 6000
+    assert install_layer["files"] == 3
+    assert install_layer["deleted"] == 1
+    assert install_layer["directories"] == [(f"{SITE}/openai", 5000), (f"{SITE}/httpx", 1000)]
+    assert install_layer["largest_files"][0] == (f"{SITE}/openai/__init__.py", 3000)
+    assert report["actions"] == [("myorg/action1", 6000)]
+    assert report["size"] == 6100
+
+    text = format_analysis(report)
+    assert "[myorg/action1]" in text
+    assert text.index("Layer 1") < text.index("Layer 0")
+
+
+def test_analyze_image_folds_directories(saved_image, monkeypatch):
+    """Test that directory tracking stays bounded for huge layers."""
+    monkeypatch.setattr("jvdeploy.image.analyze.MAX_TRACKED_DIRS", 4)
+    files = {f"data/d{i}/f.bin": b"x" * (i + 1) for i in range(20)}
+
+    report = analyze_image(str(saved_image([("RUN /bin/sh -c make", files)])), top=3)
+
+    layer = report["layers"][0]
+    assert layer["size"] == sum(range(1, 21))
+    assert len(layer["directories"]) == 3
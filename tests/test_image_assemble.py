@@ -0,0 +1,222 @@
+"""Tests for daemonless code-only image updates."""
+
+import gzip
+import io
+import os
+import tarfile
+from unittest.mock import patch
+
+import pytest
+
+from jvdeploy.docker_builder import DockerBuilder
+from jvdeploy.image.assemble import (
+    MAX_CODE_LAYERS,
+    AssembleError,
+    append_layer,
+    build_layer,
+    get_pushed_image,
+    plan_code_update,
+    record_pushed_image,
+)
+from jvdeploy.merkle import hash_context
+from jvdeploy.registry import RegistryClient
+
+DOCKERFILE = "FROM base\nWORKDIR /var/task\nCOPY . /var/task/\nRUN pip install x\n"
+DOCKER_MANIFEST = "application/vnd.docker.distribution.manifest.v2+json"
+
+
+@pytest.fixture
+def context(tmp_path):
+    root = tmp_path / "context"
+    (root / "pkg").mkdir(parents=True)
+    (root / "app.py").write_text("print('v1')\n")
+    (root / "pkg" / "util.py").write_text("X = 1\n")
+    (root / "old.py").write_text("gone\n")
+    (root / "Dockerfile").write_text(DOCKERFILE)
+    return root
+
+
+def _members(layer):
+    with tarfile.open(fileobj=io.BytesIO(gzip.decompress(layer["data"]))) as tar:
+        return tar.getmembers()
+
+
+def test_build_layer_is_deterministic(context):
+    """Test that entries are sorted with fixed metadata and timestamps do not matter."""
+    first = build_layer(context, ["pkg/util.py", "app.py"], ["old.py"], "/var/task")
+    os.utime(context / "app.py", ns=(0, 10**18))
+    second = build_layer(context, ["app.py", "pkg/util.py"], ["old.py"], "/var/task")
+
+    assert first["digest"] == second["digest"]
+    assert first["diff_id"] != first["digest"]
+    members = _members(first)
+    assert [m.name for m in members] == [
+        "var/task/.wh.old.py",
+        "var/task/app.py",
+        "var/task/pkg",
+        "var/task/pkg/util.py",
+    ]
+    assert {(m.mtime, m.uid, m.gid) for m in members} == {(1, 0, 0)}
+    assert members[2].isdir()
+
+
+def test_build_layer_missing_file(context):
+    """Test that unreadable files raise AssembleError."""
+    with pytest.raises(AssembleError, match="missing.py"):
+        build_layer(context, ["missing.py"], [], "/var/task")
+
+
+def test_append_layer_updates_config_and_manifest(context):
+    """Test that the layer is added to diff_ids, history and the manifest."""
+    layer = build_layer(context, ["app.py"], [], "/var/task")
+    manifest = {
+        "mediaType": DOCKER_MANIFEST,
+        "config": {"mediaType": "c", "digest": "sha256:old", "size": 1},
+        "layers": [],
+    }
+    config = {"rootfs": {"type": "layers", "diff_ids": ["sha256:base"]}, "history": []}
+
+    new_manifest, config_bytes = append_layer(manifest, config, layer, "code")
+
+    assert new_manifest["layers"][-1]["digest"] == layer["digest"]
+    assert new_manifest["layers"][-1]["mediaType"].endswith("diff.tar.gzip")
+    assert new_manifest["config"]["size"] == len(config_bytes)
+    assert b'"diff_ids":["sha256:base","' + layer["diff_id"].encode() in config_bytes
+    assert manifest["layers"] == []
+
+    with pytest.raises(AssembleError, match="Unsupported"):
+        append_layer(dict(manifest, mediaType="application/x"), config, layer, "code")
+
+
+def test_plan_code_update(context):
+    """Test eligibility against the recorded image."""
+    record_pushed_image("r/app", "sha256:a", "linux/amd64", DOCKERFILE, hash_context(context))
+    previous = get_pushed_image("r/app")
+
+    (context / "app.py").write_text("print('v2')\n")
+    (context / "old.py").unlink()
+    plan = plan_code_update(previous, DOCKERFILE, hash_context(context), "linux/amd64")
+    assert plan["eligible"]
+    assert (plan["changed"], plan["removed"], plan["destination"]) == (
+        ["app.py"],
+        ["old.py"],
+        "/var/task",
+    )
+
+    assert not plan_code_update(None, DOCKERFILE, hash_context(context), "linux/amd64")["eligible"]
+    changed_dockerfile = plan_code_update(
+        previous, DOCKERFILE + "RUN true\n", hash_context(context), "linux/amd64"
+    )
+    assert changed_dockerfile["reason"] == "Dockerfile changed"
+    assert "linux/amd64" in plan_code_update(previous, DOCKERFILE, {}, "linux/arm64")["reason"]
+    stacked = dict(previous, code_layers=MAX_CODE_LAYERS)
+    assert "compacting" in plan_code_update(stacked, DOCKERFILE, {}, "linux/amd64")["reason"]
+
+    (context / "requirements.txt").write_text("x\n")
+    plan = plan_code_update(previous, DOCKERFILE, hash_context(context), "linux/amd64")
+    assert not plan["eligible"]
+    assert plan["reason"] == "dependency files changed (requirements.txt)"
+
+
+def test_plan_code_update_needs_final_stage_copy_without_flags(context):
+    """Test that multi-stage and --chown/--chmod context copies need a full build."""
+    multi_stage = (
+        "FROM python AS b\nCOPY . /build\nRUN make\n"
+        "FROM base\nCOPY --from=b /build/out /var/task\n"
+    )
+    final_stage = "FROM python AS b\nRUN make\nFROM base\nCOPY . /var/task\n"
+    chown = "FROM base\nCOPY --chown=1000:1000 . /app\n"
+    chmod = "FROM base\nCOPY --chmod=755 . /app\n"
+    tree = hash_context(context)
+
+    def plan(dockerfile):
+        record_pushed_image("r/app", "sha256:a", "linux/amd64", dockerfile, tree)
+        (context / "app.py").write_text("print('changed')\n")
+        return plan_code_update(
+            get_pushed_image("r/app"), dockerfile, hash_context(context), "linux/amd64"
+        )
+
+    for dockerfile in (multi_stage, chown, chmod):
+        result = plan(dockerfile)
+        assert not result["eligible"]
+        assert result["destination"] is None
+    assert plan(final_stage)["destination"] == "/var/task"
+
+
+def _builder(context, local_registry):
+    builder = DockerBuilder(str(context), "app", code_only_updates=True)
+    client = RegistryClient(local_registry.host, insecure=True)
+    return builder, patch.object(DockerBuilder, "registry_client", return_value=client)
+
+
+def test_push_code_update_against_local_registry(context, local_registry):
+    """Test that only the code layer, config and manifest are uploaded."""
+    base = local_registry.push_image(
+        "app",
+        "1",
+        [
+            {"var/lang/bin/python": b"python"},
+            {
+                "var/task/app.py": b"print('v1')\n",
+                "var/task/pkg/util.py": b"X = 1\n",
+                "var/task/old.py": b"gone\n",
+            },
+        ],
+        DOCKER_MANIFEST,
+    )
+    record_pushed_image(
+        f"{local_registry.host}/app", base, "linux/amd64", DOCKERFILE, hash_context(context)
+    )
+    (context / "app.py").write_text("print('v2')\n")
+    (context / "old.py").unlink()
+    (context / "pkg" / "new.py").write_text("Y = 2\n")
+
+    builder, client_patch = _builder(context, local_registry)
+    with client_patch, patch("subprocess.run", side_effect=AssertionError("docker used")):
+        digest = builder.push_code_update(f"{local_registry.host}/app:2", "us-east-1")
+
+    assert digest
+    files = local_registry.image_files("app", "2")
+    assert files["var/task/app.py"] == b"print('v2')\n"
+    assert files["var/task/pkg/new.py"] == b"Y = 2\n"
+    assert files["var/lang/bin/python"] == b"python"
+    assert "var/task/old.py" not in files
+    uploads = [path for method, path in local_registry.requests if method == "PUT"]
+    assert len([p for p in uploads if "/blobs/uploads/" in p]) == 2
+    assert get_pushed_image(f"{local_registry.host}/app")["code_layers"] == 1
+
+    # The next update stacks on the image that was just pushed
+    (context / "app.py").write_text("print('v3')\n")
+    with client_patch:
+        builder.push_code_update(f"{local_registry.host}/app:3", "us-east-1")
+    assert local_registry.image_files("app", "3")["var/task/pkg/new.py"] == b"Y = 2\n"
+    assert get_pushed_image(f"{local_registry.host}/app")["code_layers"] == 2
+
+
+def test_push_code_update_falls_back(context, local_registry):
+    """Test that a missing record or a missing base image means a full build."""
+    uri = f"{local_registry.host}/app:2"
+    builder, client_patch = _builder(context, local_registry)
+    with client_patch:
+        assert builder.push_code_update(uri, "us-east-1") is None
+
+        tree = hash_context(context)
+        record_pushed_image(
+            f"{local_registry.host}/app", "sha256:" + "0" * 64, "linux/amd64", DOCKERFILE, tree
+        )
+        (context / "app.py").write_text("print('v2')\n")
+        # The recorded image is not in the registry
+        assert builder.push_code_update(uri, "us-east-1") is None
+
+
+def test_build_and_push_to_ecr_uses_code_update(context):
+    """Test that an eligible change skips the Docker build and push."""
+    builder = DockerBuilder(str(context), "app", code_only_updates=True)
+    uri = "123456789012.dkr.ecr.us-east-1.amazonaws.com/app:2"
+    with patch.object(
+        builder, "push_code_update", return_value="sha256:new"
+    ) as update, patch.object(builder, "build") as build:
+        assert builder.build_and_push_to_ecr(uri, "us-east-1", account_id="123456789012") == uri
+
+    build.assert_not_called()
+    assert update.call_args[0][:2] == (uri, "us-east-1")
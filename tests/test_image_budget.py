@@ -0,0 +1,181 @@
+"""Tests for image budget checks."""
+
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from jvdeploy.config import DeployConfig, DeployConfigError
+from jvdeploy.docker_builder import DockerBuilder, DockerBuilderError
+from jvdeploy.image.budget import MB, BudgetError, check_budget, validate_budget
+from jvdeploy.registry import RegistryClient
+
+PIP_OPENAI = "/opt/venv/bin/pip install --no-cache-dir openai>=1.0.0 httpx>=0.24.0"
+
+
+def test_validate_budget_defaults_to_fail():
+    """Test that limits are kept and the mode defaults to fail."""
+    assert validate_budget({"max_size_mb": 500, "max_layers": 30}) == {
+        "mode": "fail",
+        "max_size_mb": 500,
+        "max_layers": 30,
+    }
+
+
+@pytest.mark.parametrize(
+    "budget",
+    [
+        "500",
+        {"max_size_mb": 0},
+        {"max_layers": "many"},
+        {"max_layer_mb": True},
+        {"mode": "ignore"},
+    ],
+)
+def test_validate_budget_rejects_invalid(budget):
+    """Test that invalid budgets are rejected."""
+    with pytest.raises(BudgetError):
+        validate_budget(budget)
+
+
+def test_check_budget_within_limits():
+    """Test that an image within budget reports nothing."""
+    layers = [(50 * MB, "ADD rootfs.tar.xz / # buildkit")]
+    budget = validate_budget({"max_size_mb": 100, "max_layers": 5, "max_layer_mb": 60})
+
+    assert check_budget(layers, budget) == ([], [])
+
+
+def test_check_budget_attributes_largest_layers(mock_jvagent_app):
+    """Test that violations name the action behind the largest layer."""
+    layers = [
+        (40 * MB, "ADD rootfs.tar.xz / # buildkit"),
+        (300 * MB, f"RUN /bin/sh -c {PIP_OPENAI} # buildkit"),
+        (1 * MB, "COPY . /var/task/ # buildkit"),
+    ]
+    budget = validate_budget({"max_size_mb": 200, "max_layers": 2, "max_layer_mb": 100})
+
+    violations, contributors = check_budget(layers, budget, app_root=mock_jvagent_app)
+
+    assert violations == [
+        "Image size 341.0 MB exceeds budget of 200 MB",
+        "Image has 3 layers, budget is 2",
+        "Layer 1 is 300.0 MB, budget is 100 MB",
+    ]
+    assert "action myorg/action1" in contributors[0]
+    assert "ADD rootfs.tar.xz /" in contributors[1]
+
+
+def _history_run(history: str, layer_count: int):
+    def run(cmd, **kwargs):
+        if cmd[:3] == ["docker", "image", "history"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout=history, stderr="")
+        if cmd[:3] == ["docker", "image", "inspect"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout=f"{layer_count}\n", stderr="")
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    return run
+
+
+HISTORY = (
+    '0\tCMD ["app.handler"]\n'
+    f"{300 * MB}\tRUN /bin/sh -c {PIP_OPENAI} # buildkit\n"
+    f"{40 * MB}\tADD rootfs.tar.xz / # buildkit\n"
+)
+
+
+def _builder(app_root, mode):
+    (app_root / "Dockerfile").write_text("FROM python:3.12\n")
+    return DockerBuilder(
+        app_root=str(app_root),
+        image_name="my-app",
+        image_tag="1.0.0",
+        budget={"max_size_mb": 200, "mode": mode},
+    )
+
+
+def test_build_fails_over_budget(mock_jvagent_app):
+    """Test that a build over budget fails with the largest contributors."""
+    builder = _builder(mock_jvagent_app, "fail")
+
+    with patch("subprocess.run", side_effect=_history_run(HISTORY, 2)):
+        with pytest.raises(DockerBuilderError) as exc_info:
+            builder.build()
+
+    message = str(exc_info.value)
+    assert "Image size 340.0 MB exceeds budget of 200 MB" in message
+    assert "action myorg/action1" in message
+
+
+def test_build_warns_over_budget(mock_jvagent_app, caplog):
+    """Test that warn mode logs the violations and keeps the image."""
+    builder = _builder(mock_jvagent_app, "warn")
+
+    with patch("subprocess.run", side_effect=_history_run(HISTORY, 2)):
+        assert builder.build() == "my-app:1.0.0"
+
+    assert "Image budget exceeded" in caplog.text
+
+
+def test_get_image_layers_skips_metadata_steps(mock_jvagent_app):
+    """Test that history is returned bottom first without empty entries."""
+    builder = _builder(mock_jvagent_app, "fail")
+
+    with patch("subprocess.run", side_effect=_history_run(HISTORY, 2)):
+        layers, layer_count = builder.get_image_layers("my-app:1.0.0")
+
+    assert [size for size, _ in layers] == [40 * MB, 300 * MB]
+    assert layer_count == 2
+
+
+def test_config_rejects_invalid_budget(temp_dir):
+    """Test that deploy.yaml budgets are validated on load."""
+    config_path = temp_dir / "deploy.yaml"
+    config_path.write_text(
+        "version: '1.0'\n"
+        "app:\n  name: my-app\n  version: 1.0.0\n"
+        "image:\n  name: my-app\n  budget:\n    max_size_mb: -1\n"
+    )
+
+    with pytest.raises(DeployConfigError, match="max_size_mb"):
+        DeployConfig(config_path)
+
+
+def _pushed_builder(app_root, mode, local_registry):
+    builder = DockerBuilder(
+        app_root=str(app_root),
+        image_name="my-app",
+        budget={"max_layer_mb": 1, "mode": mode},
+    )
+    client = RegistryClient(local_registry.host, insecure=True)
+    return builder, patch.object(DockerBuilder, "registry_client", return_value=client)
+
+
+def test_pushed_image_budget_uses_manifest_sizes(mock_jvagent_app, local_registry, caplog):
+    """Test that images BuildKit pushed itself are checked against their manifest."""
+    local_registry.push_image(
+        "my-app",
+        "1.0.0",
+        [{"big.bin": os.urandom(2 * MB)}, {"app.py": b"print()"}],
+        "application/vnd.oci.image.manifest.v1+json",
+    )
+    uri = f"{local_registry.host}/my-app:1.0.0"
+
+    builder, client = _pushed_builder(mock_jvagent_app, "fail", local_registry)
+    with client, pytest.raises(DockerBuilderError) as exc_info:
+        builder.check_pushed_budget(uri, "linux/amd64")
+    assert "(compressed sizes)" in str(exc_info.value)
+    assert "layer 0: layer 0" in str(exc_info.value)
+
+    builder, client = _pushed_builder(mock_jvagent_app, "warn", local_registry)
+    with client:
+        builder.check_pushed_budget(uri, "linux/amd64")
+    assert "Image budget exceeded" in caplog.text
+
+
+def test_unreadable_pushed_image_fails_a_fail_budget(mock_jvagent_app, local_registry):
+    """Test that a fail-mode budget is never skipped when the pushed image cannot be read."""
+    builder, client = _pushed_builder(mock_jvagent_app, "fail", local_registry)
+    with client, pytest.raises(DockerBuilderError, match="Cannot read pushed image"):
+        builder.check_pushed_budget(f"{local_registry.host}/my-app:missing", "linux/amd64")
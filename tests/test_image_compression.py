@@ -0,0 +1,102 @@
+"""Tests for image compression module."""
+
+import os
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from jvdeploy.docker_builder import DockerBuilder, DockerBuilderError
+from jvdeploy.image.compression import (
+    CompressionError,
+    buildx_output,
+    compare_compression,
+    format_compression_report,
+    resolve_compression,
+)
+
+LAYERS = [
+    ("RUN /bin/sh -c pip install numpy", {"opt/venv/numpy/core.py": b"import os\n" * 20000}),
+    ("RUN /bin/sh -c pip install blob", {"opt/venv/blob.bin": os.urandom(50000)}),
+]
+
+
+def test_resolve_compression():
+    """Test codec validation and default levels."""
+    assert resolve_compression(None) is None
+    assert resolve_compression("zstd") == ("zstd", 3)
+    assert resolve_compression("GZIP", 9) == ("gzip", 9)
+
+    with pytest.raises(CompressionError):
+        resolve_compression("brotli")
+    with pytest.raises(CompressionError):
+        resolve_compression("gzip", 12)
+
+
+def test_resolve_compression_lambda_falls_back_to_gzip():
+    """Test that Lambda images never use zstd layers."""
+    assert resolve_compression("zstd", 19, lambda_target=True) == ("gzip", 6)
+    assert resolve_compression("estargz", 4, lambda_target=True) == ("estargz", 4)
+
+
+def test_buildx_output():
+    """Test the buildx --output value for single and multiple names."""
+    assert buildx_output(["repo:1"], "gzip", 6) == (
+        "type=image,name=repo:1,push=true,compression=gzip,compression-level=6,"
+        "force-compression=true"
+    )
+    assert buildx_output(["repo:1", "repo:2"], "zstd", 3) == (
+        'type=image,"name=repo:1,repo:2",push=true,compression=zstd,compression-level=3,'
+        "force-compression=true,oci-mediatypes=true"
+    )
+
+
+def test_compare_compression(saved_image):
+    """Test per-layer measurement of every codec."""
+    report = compare_compression(str(saved_image(LAYERS)), {"gzip": 6, "estargz": 6})
+
+    text_layer, random_layer = report["layers"]
+    assert text_layer["codecs"]["gzip"]["size"] < text_layer["size"] / 10
+    assert random_layer["codecs"]["gzip"]["size"] > 50000
+    # estargz pays for per-file gzip members and its table of contents
+    assert text_layer["codecs"]["estargz"]["size"] > text_layer["codecs"]["gzip"]["size"]
+    assert report["totals"]["size"] == text_layer["size"] + random_layer["size"]
+
+    text = format_compression_report(report)
+    assert "gzip MB" in text and "estargz s" in text
+    assert text.splitlines()[-1].startswith("Total")
+
+
+def test_compare_compression_zstd(saved_image):
+    """Test zstd measurement when zstandard is installed."""
+    pytest.importorskip("zstandard")
+
+    report = compare_compression(str(saved_image(LAYERS)), {"zstd": 3})
+
+    assert report["layers"][0]["codecs"]["zstd"]["size"] > 0
+
+
+def test_builder_pushes_from_buildkit_with_compression(temp_dir):
+    """Test that compressed builds push straight from buildx."""
+    (temp_dir / "Dockerfile").write_text("FROM scratch\n")
+    builder = DockerBuilder(str(temp_dir), "my-app", "1.0.0", compression="zstd")
+    builder._docker_available = True
+    uri = "123456789012.dkr.ecr.us-east-1.amazonaws.com/my-app:1.0.0"
+
+    ok = subprocess.CompletedProcess(args=[], returncode=0, stdout="", stderr="")
+    with patch("subprocess.run", return_value=ok) as run:
+        assert builder.build(push_uris=[uri]) == uri
+
+    cmd = run.call_args.args[0]
+    assert "--load" not in cmd
+    output = cmd[cmd.index("--output") + 1]
+    assert f"name={uri}" in output and "compression=zstd" in output
+
+
+def test_builder_lambda_target_and_invalid_compression(temp_dir):
+    """Test that Lambda builders fall back to gzip and invalid codecs fail early."""
+    builder = DockerBuilder(str(temp_dir), "my-app", compression="zstd", lambda_target=True)
+    assert builder.compression == ("gzip", 6)
+
+    with pytest.raises(DockerBuilderError, match="Unknown compression"):
+        DockerBuilder(str(temp_dir), "my-app", compression="lz4")
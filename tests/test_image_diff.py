@@ -0,0 +1,100 @@
+"""Tests for image diff module."""
+
+import json
+import subprocess
+from unittest.mock import patch
+
+from jvdeploy.image.diff import diff_images, format_diff, load_image, merge_layers
+
+INSTALL_ACTION1 = "/opt/venv/bin/pip install --no-cache-dir openai>=1.0.0 httpx>=0.24.0"
+BASE = ("/bin/sh -c #(nop) ADD file:base in / ", {"etc/os-release": b"ID=test\n"})
+COPY_V1 = ("COPY . /var/task/ # buildkit", {"var/task/app.yaml": b"version: 1\n"})
+COPY_V2 = ("COPY . /var/task/ # buildkit", {"var/task/app.yaml": b"version: 2\n"})
+INSTALL = (
+    f"RUN /bin/sh -c {INSTALL_ACTION1} # buildkit",
+    {"opt/venv/openai.py": b"x" * 4000},
+)
+
+
+def test_diff_identical_prefix_and_changed_layer(saved_image, mock_jvagent_app):
+    """Test new bytes, divergence point and file changes between builds."""
+    old = load_image(str(saved_image([BASE, COPY_V1, INSTALL], name="old.tar")))
+    new = load_image(str(saved_image([BASE, COPY_V2, INSTALL], name="new.tar")))
+
+    report = diff_images(old, new, app_root=mock_jvagent_app)
+
+    assert [layer["index"] for layer in report["new_layers"]] == [1]
+    assert report["new_bytes"] == new["layers"][1]["size"]
+    assert report["diverged_at"] == 1
+    assert report["cache_bust"] is True
+    assert report["changed_actions"] == []
+    assert report["files"]["modified"] == ["var/task/app.yaml"]
+    assert report["files"]["added"] == []
+
+    text = format_diff(report)
+    assert "Builds diverge at layer 1" in text
+    assert "M var/task/app.yaml" in text
+
+
+def test_diff_reports_changed_action_layers(saved_image, mock_jvagent_app):
+    """Test that a changed dependency layer is attributed to its action."""
+    changed = (INSTALL[0], {"opt/venv/openai.py": b"y" * 5000, "opt/venv/new.py": b"z"})
+    old = load_image(str(saved_image([BASE, INSTALL], name="old.tar")))
+    new = load_image(str(saved_image([BASE, changed], name="new.tar")))
+
+    report = diff_images(old, new, app_root=mock_jvagent_app)
+
+    assert report["changed_actions"] == ["myorg/action1"]
+    assert report["files"]["added"] == ["opt/venv/new.py"]
+    assert report["removed_layers"] == 1
+
+
+def test_diff_identical_images(saved_image):
+    """Test that identical builds report nothing to push."""
+    old = load_image(str(saved_image([BASE, COPY_V1], name="old.tar")))
+    new = load_image(str(saved_image([BASE, COPY_V1], name="new.tar")))
+
+    report = diff_images(old, new)
+
+    assert report["new_bytes"] == 0
+    assert report["diverged_at"] is None
+    assert "Images are identical" in format_diff(report)
+
+
+def test_merge_layers_whiteouts():
+    """Test file and opaque directory whiteouts."""
+    digest = b"d"
+    tree = merge_layers(
+        [
+            {
+                "files": {"a/x": (1, digest), "a/y": (1, digest), "b/z": (1, digest)},
+                "whiteouts": [],
+            },
+            {"files": {"a/new": (2, digest)}, "whiteouts": ["a/", "b"]},
+        ]
+    )
+
+    assert tree == {"a/new": (2, digest)}
+
+
+def test_load_registry_image():
+    """Test reading layer digests and sizes from a registry manifest."""
+    manifest = {
+        "layers": [{"digest": "sha256:c1", "size": 300}, {"digest": "sha256:c2", "size": 7}]
+    }
+    config = {
+        "rootfs": {"diff_ids": ["sha256:u1", "sha256:u2"]},
+        "history": [{"created_by": "ADD base"}, {"created_by": "COPY . /var/task/ # buildkit"}],
+    }
+    outputs = [json.dumps(manifest), json.dumps(config)]
+
+    def fake_run(cmd, **kwargs):
+        return subprocess.CompletedProcess(cmd, 0, outputs.pop(0), "")
+
+    with patch("subprocess.run", side_effect=fake_run):
+        image = load_image("registry:123.dkr.ecr.us-east-1.amazonaws.com/app:1")
+
+    assert image["compressed"] is True
+    assert [layer["diff_id"] for layer in image["layers"]] == ["sha256:u1", "sha256:u2"]
+    assert image["layers"][0]["size"] == 300
+    assert image["layers"][1]["files"] is None
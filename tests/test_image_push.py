@@ -0,0 +1,139 @@
+"""Tests for pushing images through the registry API."""
+
+import hashlib
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from jvdeploy.cache import JsonCache
+from jvdeploy.cli import main
+from jvdeploy.docker_builder import DockerBuilder, DockerBuilderError
+from jvdeploy.image.push import format_push_report, push_image
+from jvdeploy.registry import UPLOADS_CACHE, RegistryClient, RegistryError
+
+LAYERS = [
+    ("ADD rootfs /", {"var/lang/bin/python": b"python" * 1000}),
+    ("COPY . /var/task/", {"var/task/app.py": b"print('hi')\n"}),
+]
+
+
+def _blob(size=10_000):
+    data = bytes(range(256)) * (size // 256)
+    return data, "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+def _client(local_registry):
+    return RegistryClient(local_registry.host, insecure=True)
+
+
+def test_chunked_upload_resumes_after_interruption(local_registry):
+    """Test that a failed chunk is resent from the offset the registry reports."""
+    data, digest = _blob()
+    local_registry.fail_patches = 1
+
+    status = _client(local_registry).upload_blob("app", data, digest, chunk_size=4096)
+
+    assert status == "uploaded"
+    assert local_registry.blobs["app"][digest] == data
+    patches = [m for m, _ in local_registry.requests if m == "PATCH"]
+    assert len(patches) == 4  # three chunks plus the rejected one
+    assert JsonCache(UPLOADS_CACHE).get(f"{local_registry.host}/app@{digest}") is None
+
+
+def test_upload_resumes_in_a_later_run(local_registry):
+    """Test that an abandoned upload continues from its saved location."""
+    data, digest = _blob()
+    local_registry.fail_patches = 3
+    client = _client(local_registry)
+    with pytest.raises(RegistryError, match="HTTP 500"):
+        client.upload_blob("app", data, digest, chunk_size=4096)
+
+    # The upload session outlives the failed call
+    assert JsonCache(UPLOADS_CACHE).get(f"{local_registry.host}/app@{digest}")
+    local_registry.requests.clear()
+    assert _client(local_registry).upload_blob("app", data, digest, chunk_size=4096) == "uploaded"
+
+    assert local_registry.blobs["app"][digest] == data
+    assert ("POST", "/v2/app/blobs/uploads/") not in local_registry.requests
+    assert [m for m, _ in local_registry.requests].count("PATCH") == 3
+
+
+def test_push_image_from_tarball(saved_image, local_registry):
+    """Test pushing a docker save tarball and reading the image back."""
+    tarball = saved_image(LAYERS)
+
+    report = push_image(str(tarball), "org/app", "1", _client(local_registry), chunk_size=1024)
+
+    files = local_registry.image_files("org/app", "1")
+    assert files["var/task/app.py"] == b"print('hi')\n"
+    assert [b["status"] for b in report["blobs"]] == ["uploaded"] * 3
+    manifest = json.loads(local_registry.manifests["org/app"]["1"][0])
+    assert manifest["mediaType"] == "application/vnd.docker.distribution.manifest.v2+json"
+    assert (
+        report["digest"]
+        == "sha256:" + hashlib.sha256(local_registry.manifests["org/app"]["1"][0]).hexdigest()
+    )
+    assert "3 uploaded" in format_push_report(report)
+
+
+def test_push_image_mounts_layers_from_sibling_repository(saved_image, local_registry):
+    """Test that a second repository mounts blobs instead of uploading them."""
+    tarball = saved_image(LAYERS, layout="oci")
+    push_image(str(tarball), "agents/one", "1", _client(local_registry))
+    local_registry.requests.clear()
+
+    report = push_image(str(tarball), "agents/two", "1", _client(local_registry))
+
+    assert [b["status"] for b in report["blobs"]] == ["mounted"] * 3
+    assert report["uploaded_bytes"] == 0
+    assert not [
+        path
+        for method, path in local_registry.requests
+        if method in ("PATCH", "PUT") and "/blobs/" in path
+    ]
+    assert local_registry.image_files("agents/two", "1") == local_registry.image_files(
+        "agents/one", "1"
+    )
+
+
+def test_push_is_deterministic(saved_image, local_registry):
+    """Test that pushing the same tarball twice gives the same digest."""
+    tarball = saved_image(LAYERS)
+    first = push_image(str(tarball), "app", "1", _client(local_registry))
+    second = push_image(str(tarball), "app", "2", _client(local_registry))
+
+    assert first["digest"] == second["digest"]
+    assert {b["status"] for b in second["blobs"]} == {"exists"}
+
+
+def test_docker_builder_uses_registry_push_client(saved_image, local_registry, temp_dir):
+    """Test that push_client='registry' replaces docker push."""
+    builder = DockerBuilder(str(temp_dir), "app", push_client="registry", push_chunk_mb=1)
+    tarball = saved_image(LAYERS)
+    with patch.object(builder, "check_docker", return_value=True), patch.object(
+        builder, "registry_client", return_value=_client(local_registry)
+    ), patch("jvdeploy.image.push.open_image", side_effect=lambda _: open(tarball, "rb")):
+        builder.push(f"{local_registry.host}/app:1")
+
+    assert "1" in local_registry.manifests["app"]
+
+    with pytest.raises(DockerBuilderError, match="Unknown push client"):
+        DockerBuilder(str(temp_dir), "app", push_client="skopeo")
+
+
+def test_cli_image_push(saved_image, local_registry, monkeypatch, capsys):
+    """Test 'jvdeploy image push' against a plain-HTTP registry."""
+    tarball = saved_image(LAYERS)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["jvdeploy", "image", "push", str(tarball), f"{local_registry.host}/app:1", "--insecure"],
+    )
+
+    with pytest.raises(SystemExit) as exc_info:
+        main()
+
+    assert exc_info.value.code == 0
+    assert "3 uploaded" in capsys.readouterr().out
@@ -0,0 +1,54 @@
+"""Tests for image tarball module."""
+
+import gzip
+import tarfile
+
+import pytest
+
+from jvdeploy.image.tarball import ImageTarballError, read_image
+
+LAYERS = [
+    ("/bin/sh -c #(nop) COPY dir:abc in /var/task", {"var/task/app.yaml": b"name: app\n"}),
+    ("RUN /bin/sh -c pip install requests # buildkit", {"opt/venv/requests.py": b"x" * 5000}),
+]
+
+
+def _file_names(_name, layer):
+    with tarfile.open(fileobj=layer, mode="r|") as tar:
+        return [member.name for member in tar]
+
+
+@pytest.mark.parametrize("layout", ["legacy", "oci"])
+def test_read_image_layouts(saved_image, layout):
+    """Test that layers are visited and ordered for both save layouts."""
+    image = read_image(str(saved_image(LAYERS, layout=layout)), _file_names)
+
+    assert image["repo_tags"] == ["app:test"]
+    assert [layer["result"] for layer in image["layers"]] == [
+        ["var/task/app.yaml"],
+        ["opt/venv/requests.py"],
+    ]
+    assert image["layers"][1]["created_by"].startswith("RUN /bin/sh -c pip install")
+    assert image["layers"][0]["diff_id"].startswith("sha256:")
+    assert image["layers"][1]["archive_size"] > 0
+
+
+def test_read_gzipped_tarball(saved_image, tmp_path):
+    """Test reading a gzipped 'docker save' tarball."""
+    path = saved_image(LAYERS)
+    gz_path = tmp_path / "image.tar.gz"
+    gz_path.write_bytes(gzip.compress(path.read_bytes()))
+
+    image = read_image(str(gz_path), _file_names)
+
+    assert len(image["layers"]) == 2
+
+
+def test_read_image_without_manifest(tmp_path):
+    """Test that a tarball without manifest.json is rejected."""
+    path = tmp_path / "empty.tar"
+    with tarfile.open(path, mode="w"):
+        pass
+
+    with pytest.raises(ImageTarballError, match="manifest.json"):
+        read_image(str(path), _file_names)
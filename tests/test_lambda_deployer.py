@@ -0,0 +1,938 @@
+"""Tests for the AWS Lambda deployer."""
+
+import io
+import json
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import boto3
+import pytest
+from botocore.stub import ANY, Stubber
+
+from jvdeploy.aws.lambda_deployer import LambdaDeployer, LambdaDeployerError
+
+ECR_URI = "123456789012.dkr.ecr.us-east-1.amazonaws.com/my-app:1.0.0"
+DIGEST = "sha256:" + "a" * 64
+ROLE_ARN = "arn:aws:iam::123456789012:role/my-app-lambda-role"
+FUNCTION_ARN = "arn:aws:lambda:us-east-1:123456789012:function:my-app"
+
+_CONFIG = {"Timeout": 300, "MemorySize": 1024, "EphemeralStorage": {"Size": 512}}
+_UPDATED = {"FunctionName": "my-app", "State": "Active", "LastUpdateStatus": "Successful"}
+
+
+@pytest.fixture
+def deployer(aws_credentials):
+    """Create a LambdaDeployer with real (stubbable) boto3 clients."""
+    config = {
+        "region": "us-east-1",
+        "account_id": "123456789012",
+        "function": {"name": "my-app"},
+        "ecr": {"repository_name": "my-app"},
+    }
+    deployer = LambdaDeployer(config)
+    deployer._ecr_client = boto3.client("ecr", region_name="us-east-1")
+    deployer._lambda_client = boto3.client("lambda", region_name="us-east-1")
+    return deployer
+
+
+def _get_function_response(code_sha: str) -> dict:
+    return {
+        "Configuration": {
+            "FunctionName": "my-app",
+            "FunctionArn": FUNCTION_ARN,
+            "CodeSha256": code_sha,
+            "State": "Active",
+            "LastUpdateStatus": "Successful",
+        },
+        "Code": {"ImageUri": ECR_URI, "RepositoryType": "ECR"},
+    }
+
+
+def test_deploy_function_skips_code_update_for_same_digest(deployer):
+    """Test that update_function_code is skipped when the digest is unchanged."""
+    ecr_stub = Stubber(deployer.ecr_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    lambda_stub.add_response(
+        "get_function", _get_function_response("a" * 64), {"FunctionName": "my-app"}
+    )
+    ecr_stub.add_response(
+        "describe_images",
+        {"imageDetails": [{"imageDigest": DIGEST, "imageTags": ["1.0.0"]}]},
+        {"repositoryName": "my-app", "imageIds": [{"imageTag": "1.0.0"}]},
+    )
+    lambda_stub.add_response("update_function_configuration", {}, None)
+    lambda_stub.add_response("get_function_configuration", _UPDATED, None)
+
+    with ecr_stub, lambda_stub:
+        arn = deployer._deploy_lambda_function(ECR_URI, ROLE_ARN, {"name": "my-app"})
+
+    assert arn == FUNCTION_ARN
+    lambda_stub.assert_no_pending_responses()
+
+
+def test_deploy_function_updates_code_for_new_digest(deployer):
+    """Test that update_function_code runs when the digest differs."""
+    ecr_stub = Stubber(deployer.ecr_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    lambda_stub.add_response("get_function", _get_function_response("b" * 64), None)
+    ecr_stub.add_response(
+        "describe_images", {"imageDetails": [{"imageDigest": DIGEST, "imageTags": ["1.0.0"]}]}
+    )
+    lambda_stub.add_response(
+        "update_function_code", {}, {"FunctionName": "my-app", "ImageUri": ECR_URI}
+    )
+    lambda_stub.add_response("get_function_configuration", _UPDATED, None)
+    lambda_stub.add_response(
+        "update_function_configuration", {}, {"FunctionName": "my-app", "Role": ANY, **_CONFIG}
+    )
+    lambda_stub.add_response("get_function_configuration", _UPDATED, None)
+
+    with ecr_stub, lambda_stub:
+        deployer._deploy_lambda_function(ECR_URI, ROLE_ARN, {"name": "my-app"})
+
+    lambda_stub.assert_no_pending_responses()
+
+
+def test_deploy_function_without_changes_makes_no_updates(deployer):
+    """Test that an unchanged function gets neither code nor configuration updates."""
+    ecr_stub = Stubber(deployer.ecr_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    current = _get_function_response("a" * 64)
+    current["Configuration"].update(_CONFIG, Role=ROLE_ARN)
+    lambda_stub.add_response("get_function", current, {"FunctionName": "my-app"})
+    ecr_stub.add_response(
+        "describe_images", {"imageDetails": [{"imageDigest": DIGEST, "imageTags": ["1.0.0"]}]}
+    )
+
+    with ecr_stub, lambda_stub:
+        arn = deployer._deploy_lambda_function(ECR_URI, ROLE_ARN, {"name": "my-app"})
+
+    assert arn == FUNCTION_ARN
+    lambda_stub.assert_no_pending_responses()
+
+
+def test_deployed_function_is_trusted_from_deployment_state(deployer):
+    """Test that a function deployed from the same digest and configuration is not described."""
+    ecr_stub = Stubber(deployer.ecr_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    current = _get_function_response("a" * 64)
+    current["Configuration"].update(_CONFIG, Role=ROLE_ARN)
+    lambda_stub.add_response("get_function", current, {"FunctionName": "my-app"})
+    images = {"imageDetails": [{"imageDigest": DIGEST, "imageTags": ["1.0.0"]}]}
+    ecr_stub.add_response("describe_images", images)
+    ecr_stub.add_response("describe_images", images)
+
+    with ecr_stub, lambda_stub:
+        deployer._deploy_lambda_function(ECR_URI, ROLE_ARN, {"name": "my-app"})
+        # Second deploy: only the image digest is resolved
+        arn = deployer._deploy_lambda_function(ECR_URI, ROLE_ARN, {"name": "my-app"})
+
+    assert arn == FUNCTION_ARN
+    ecr_stub.assert_no_pending_responses()
+    lambda_stub.assert_no_pending_responses()
+
+
+def test_recorded_ecr_repository_is_not_described_again(deployer):
+    """Test that the ECR repository is looked up once and then read from the state file."""
+    ecr_stub = Stubber(deployer.ecr_client)
+    ecr_stub.add_response(
+        "describe_repositories",
+        {
+            "repositories": [
+                {
+                    "repositoryName": "my-app",
+                    "repositoryUri": "123456789012.dkr.ecr.us-east-1.amazonaws.com/my-app",
+                    "repositoryArn": "arn:aws:ecr:us-east-1:123456789012:repository/my-app",
+                }
+            ]
+        },
+        {"repositoryNames": ["my-app"]},
+    )
+
+    with ecr_stub:
+        first = deployer._ensure_ecr_repository("my-app")
+    deployer.state.save()
+
+    later = LambdaDeployer(deployer.config)
+    later._ecr_client = deployer.ecr_client
+    with Stubber(later.ecr_client):
+        assert later._ensure_ecr_repository("my-app") == first
+
+
+def test_recorded_http_api_is_verified_then_rediscovered(deployer):
+    """Test that a recorded API is checked with get_api and looked up again once it is gone."""
+    deployer._apigatewayv2_client = boto3.client("apigatewayv2", region_name="us-east-1")
+    api = {"ProtocolType": "HTTP", "RouteSelectionExpression": "$request.method $request.path"}
+    key = deployer._state_key()
+    deployer.state.put(key, "http_api", {"ApiId": "old123"}, "my-app-api")
+    stub = Stubber(deployer.apigatewayv2_client)
+    stub.add_response(
+        "get_api", {**api, "ApiId": "old123", "Name": "my-app-api"}, {"ApiId": "old123"}
+    )
+    stub.add_client_error("get_api", "NotFoundException", expected_params={"ApiId": "old123"})
+    stub.add_response("get_apis", {"Items": [{**api, "ApiId": "new456", "Name": "my-app-api"}]})
+
+    with stub:
+        assert deployer._find_http_api("my-app-api")["ApiId"] == "old123"
+        assert deployer._find_http_api("my-app-api")["ApiId"] == "new456"
+
+    stub.assert_no_pending_responses()
+    assert deployer.state.get(key, "http_api", "my-app-api") == {"ApiId": "new456"}
+
+
+def _http_api(api_id: str, name: str, **tags) -> dict:
+    return {
+        "ApiId": api_id,
+        "Name": name,
+        "ProtocolType": "HTTP",
+        "RouteSelectionExpression": "$request.method $request.path",
+        "Tags": tags,
+    }
+
+
+def test_http_api_lookup_reads_every_page_once(deployer):
+    """Test that APIs beyond the first page are found and the index is reused."""
+    deployer._apigatewayv2_client = boto3.client("apigatewayv2", region_name="us-east-1")
+    stub = Stubber(deployer.apigatewayv2_client)
+    stub.add_response(
+        "get_apis",
+        {"Items": [_http_api(f"api{i}", f"other-{i}") for i in range(3)], "NextToken": "page2"},
+        {},
+    )
+    stub.add_response(
+        "get_apis",
+        {
+            "Items": [
+                _http_api("dup111", "my-app-api"),
+                _http_api("own222", "my-app-api", JvDeployFunction="my-app"),
+            ]
+        },
+        {"NextToken": "page2"},
+    )
+
+    with stub:
+        # Of two APIs with the same name, the one tagged for the function wins
+        assert deployer._find_http_api("my-app-api")["ApiId"] == "own222"
+        assert deployer._find_http_api("other-2", "other")["ApiId"] == "api2"
+        assert deployer._find_http_api("missing-api", "other") is None
+
+    stub.assert_no_pending_responses()
+
+
+def test_created_http_api_is_tagged_and_indexed(deployer):
+    """Test that a new API is tagged with its function and found without listing again."""
+    deployer.config["app"] = {"name": "my-app"}
+    deployer._apigatewayv2_client = boto3.client("apigatewayv2", region_name="us-east-1")
+    stub = Stubber(deployer.apigatewayv2_client)
+    stub.add_response("get_apis", {"Items": []})
+    stub.add_response(
+        "create_api",
+        {"ApiId": "new789", "Name": "my-app-api"},
+        {
+            "Name": "my-app-api",
+            "ProtocolType": "HTTP",
+            "Target": FUNCTION_ARN,
+            "Tags": {"JvAgentApp": "my-app", "JvDeployFunction": "my-app"},
+        },
+    )
+
+    with stub, patch.object(deployer, "_add_api_gateway_permission"):
+        url = deployer._deploy_http_api("my-app", {})
+        deployer.state.forget(deployer._state_key(), "http_api")
+        assert deployer._find_http_api("my-app-api")["ApiId"] == "new789"
+
+    assert url == "https://new789.execute-api.us-east-1.amazonaws.com"
+    stub.assert_no_pending_responses()
+
+
+def test_build_platforms_follow_function_architecture(deployer):
+    """Test that the image is built for the function's architecture."""
+    deployer.config["function"]["architecture"] = "arm64"
+
+    assert deployer._build_platforms({}) == ["linux/arm64"]
+    assert deployer._build_platforms({"platforms": ["linux/amd64", "linux/arm64"]}) == [
+        "linux/arm64",
+        "linux/amd64",
+    ]
+    with pytest.raises(LambdaDeployerError, match="set image.build.platform to linux/arm64"):
+        deployer._build_platforms({"platform": "linux/amd64"})
+
+
+def test_deploy_function_switches_to_arm64(deployer):
+    """Test that an architecture change updates the code with the new architecture."""
+    deployer.config["function"]["architecture"] = "arm64"
+    ecr_stub = Stubber(deployer.ecr_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    current = _get_function_response("a" * 64)
+    current["Configuration"].update(_CONFIG, Role=ROLE_ARN, Architectures=["x86_64"])
+    lambda_stub.add_response("get_function", current)
+    ecr_stub.add_response(
+        "describe_images", {"imageDetails": [{"imageDigest": DIGEST, "imageTags": ["1.0.0"]}]}
+    )
+    index = {
+        "schemaVersion": 2,
+        "mediaType": "application/vnd.oci.image.index.v1+json",
+        "manifests": [
+            {"digest": DIGEST, "size": 1, "platform": {"architecture": "arm64", "os": "linux"}}
+        ],
+    }
+    ecr_stub.add_response(
+        "batch_get_image",
+        {"images": [{"imageManifest": json.dumps(index)}]},
+        {
+            "repositoryName": "my-app",
+            "imageIds": [{"imageTag": "1.0.0"}],
+            "acceptedMediaTypes": ANY,
+        },
+    )
+    lambda_stub.add_response(
+        "update_function_code",
+        {},
+        {"FunctionName": "my-app", "ImageUri": ECR_URI, "Architectures": ["arm64"]},
+    )
+    lambda_stub.add_response("get_function_configuration", _UPDATED)
+
+    with ecr_stub, lambda_stub:
+        deployer._deploy_lambda_function(ECR_URI, ROLE_ARN, {"name": "my-app"})
+
+    ecr_stub.assert_no_pending_responses()
+    lambda_stub.assert_no_pending_responses()
+
+
+def test_image_architecture_mismatch_is_detected(deployer, monkeypatch):
+    """Test that an amd64 image is not deployed to an arm64 function."""
+    config_blob = io.BytesIO(json.dumps({"architecture": "amd64", "os": "linux"}).encode())
+    monkeypatch.setattr(
+        "jvdeploy.aws.lambda_deployer.urllib.request.urlopen", lambda url, timeout: config_blob
+    )
+    manifest = {"schemaVersion": 2, "config": {"digest": "sha256:" + "c" * 64}, "layers": []}
+    ecr_stub = Stubber(deployer.ecr_client)
+    ecr_stub.add_response("batch_get_image", {"images": [{"imageManifest": json.dumps(manifest)}]})
+    ecr_stub.add_response(
+        "get_download_url_for_layer",
+        {"downloadUrl": "https://example.com/config"},
+        {"repositoryName": "my-app", "layerDigest": "sha256:" + "c" * 64},
+    )
+
+    with ecr_stub, pytest.raises(LambdaDeployerError, match="built for x86_64.*runs on arm64"):
+        deployer._check_image_architecture(ECR_URI, ["arm64"])
+
+
+CACHE_URI = "123456789012.dkr.ecr.us-east-1.amazonaws.com/ecr-public"
+
+
+def test_pull_through_cache_rule_created(deployer):
+    """Test that a missing pull-through cache rule is created."""
+    ecr_stub = Stubber(deployer.ecr_client)
+    ecr_stub.add_client_error(
+        "describe_pull_through_cache_rules",
+        service_error_code="PullThroughCacheRuleNotFoundException",
+        expected_params={"ecrRepositoryPrefixes": ["ecr-public"]},
+    )
+    ecr_stub.add_response(
+        "create_pull_through_cache_rule",
+        {"ecrRepositoryPrefix": "ecr-public", "upstreamRegistryUrl": "public.ecr.aws"},
+        {"ecrRepositoryPrefix": "ecr-public", "upstreamRegistryUrl": "public.ecr.aws"},
+    )
+
+    with ecr_stub:
+        assert deployer._ensure_pull_through_cache_rule("ecr-public") == CACHE_URI
+
+    ecr_stub.assert_no_pending_responses()
+
+
+def test_pull_through_cache_rule_reused(deployer):
+    """Test that an existing rule is reused and one for another upstream is rejected."""
+    ecr_stub = Stubber(deployer.ecr_client)
+    ecr_stub.add_response(
+        "describe_pull_through_cache_rules",
+        {
+            "pullThroughCacheRules": [
+                {"ecrRepositoryPrefix": "ecr-public", "upstreamRegistryUrl": "public.ecr.aws"}
+            ]
+        },
+    )
+    ecr_stub.add_response(
+        "describe_pull_through_cache_rules",
+        {
+            "pullThroughCacheRules": [
+                {"ecrRepositoryPrefix": "ecr-public", "upstreamRegistryUrl": "quay.io"}
+            ]
+        },
+    )
+
+    with ecr_stub:
+        assert deployer._ensure_pull_through_cache_rule("ecr-public") == CACHE_URI
+        with pytest.raises(LambdaDeployerError, match="quay.io"):
+            deployer._ensure_pull_through_cache_rule("ecr-public")
+
+
+def test_use_pull_through_cache_builds_from_a_copy(deployer, temp_dir):
+    """Test that the base image is redirected to the cache in a copy of the Dockerfile."""
+    dockerfile = temp_dir / "Dockerfile"
+    original = f"FROM public.ecr.aws/s1x1t0a3/jvagent:latest@{DIGEST}\nRUN true\n"
+    dockerfile.write_text(original)
+    build_dir = temp_dir / "build"
+    build_dir.mkdir()
+
+    copy = deployer._use_pull_through_cache(temp_dir, CACHE_URI, build_dir)
+
+    assert (
+        Path(copy).read_text() == f"FROM {CACHE_URI}/s1x1t0a3/jvagent:latest@{DIGEST}\nRUN true\n"
+    )
+    assert dockerfile.read_text() == original
+
+
+def test_deploy_leaves_dockerfile_untouched(deployer, temp_dir):
+    """Test that building through the pull-through cache never rewrites the app's Dockerfile."""
+    dockerfile = temp_dir / "Dockerfile"
+    original = "FROM public.ecr.aws/s1x1t0a3/jvagent:latest\nRUN true\n"
+    dockerfile.write_text(original)
+    deployer.config["app_root"] = str(temp_dir)
+    built = {}
+
+    def build_and_push(**kwargs):
+        built["dockerfile"] = Path(kwargs["dockerfile_path"]).read_text()
+
+    with patch("jvdeploy.docker_builder.DockerBuilder.ecr_login"), patch(
+        "jvdeploy.docker_builder.DockerBuilder.build_and_push_to_ecr", side_effect=build_and_push
+    ):
+        deployer._build_and_push_image(ECR_URI, CACHE_URI)
+
+    assert built["dockerfile"].startswith(f"FROM {CACHE_URI}/s1x1t0a3/jvagent:latest")
+    assert dockerfile.read_text() == original
+    assert sorted(p.name for p in temp_dir.iterdir()) == ["Dockerfile"]
+
+
+def test_lambda_image_tag_is_never_a_manifest_list(deployer, temp_dir):
+    """Test that image.build.manifest_list does not turn the function's tag into an index."""
+    deployer.config["app_root"] = str(temp_dir)
+    deployer.config["image"] = {
+        "build": {"platforms": ["linux/amd64", "linux/arm64"], "manifest_list": True}
+    }
+
+    with patch("jvdeploy.docker_builder.DockerBuilder") as builder:
+        deployer._build_and_push_image(ECR_URI, None)
+
+    kwargs = builder.call_args.kwargs
+    assert kwargs["manifest_list"] is False
+    assert kwargs["platforms"] == ["linux/amd64", "linux/arm64"]
+
+
+def _deploy_config():
+    return {
+        "region": "us-east-1",
+        "account_id": "123456789012",
+        "function": {"name": "my-app"},
+        "ecr": {"repository_name": "my-app"},
+        "iam": {"role_name": "my-app-lambda-role"},
+        "api_gateway": {"enabled": True},
+    }
+
+
+def test_deploy_overlaps_iam_with_image_build(aws_credentials):
+    """Test that the IAM role is set up while the image builds and results are kept."""
+    deployer = LambdaDeployer(_deploy_config())
+    both_running = threading.Barrier(2, timeout=5)
+    order = []
+
+    def step(name, result=None, barrier=None):
+        def run(*args, **kwargs):
+            if barrier:
+                barrier.wait()
+            order.append(name)
+            return result
+
+        return run
+
+    with patch.object(
+        deployer, "_ensure_ecr_repository", step("ecr", {"repositoryName": "my-app"})
+    ), patch.object(
+        deployer, "_build_and_push_image", step("build", None, both_running)
+    ), patch.object(
+        deployer, "_ensure_iam_role", step("iam", ROLE_ARN, both_running)
+    ), patch.object(
+        deployer, "_deploy_lambda_function", step("function", FUNCTION_ARN)
+    ), patch.object(
+        deployer, "_ensure_sqlite_permissions", step("sqlite")
+    ), patch.object(
+        deployer, "_ensure_warmer", step("warmer", [])
+    ), patch.object(
+        deployer, "_deploy_api_gateway", step("api", "https://api")
+    ):
+        results = deployer.deploy(ECR_URI)
+
+    assert results["success"]
+    assert results["iam_role_arn"] == ROLE_ARN
+    assert results["function_arn"] == FUNCTION_ARN
+    assert results["api_url"] == "https://api"
+    assert order.index("function") > max(order.index("build"), order.index("iam"))
+    assert set(results["timings"]) == {
+        "account",
+        "ecr",
+        "build",
+        "iam",
+        "function",
+        "sqlite",
+        "warmer",
+        "api",
+    }
+
+
+def test_deploy_failure_keeps_error_semantics(aws_credentials):
+    """Test that a failing step raises LambdaDeployerError and skips dependent steps."""
+    deployer = LambdaDeployer(_deploy_config())
+    deployer.state.put(deployer._state_key(), "function", {"arn": FUNCTION_ARN})
+
+    with patch.object(deployer, "_ensure_ecr_repository", return_value={}), patch.object(
+        deployer, "_build_and_push_image"
+    ), patch.object(
+        deployer, "_ensure_iam_role", side_effect=RuntimeError("AccessDenied")
+    ), patch.object(
+        deployer, "_deploy_lambda_function"
+    ) as deploy_function:
+        with pytest.raises(LambdaDeployerError, match="Deployment failed: AccessDenied"):
+            deployer.deploy(ECR_URI)
+
+    deploy_function.assert_not_called()
+    # Records are dropped so the next deploy rediscovers every resource
+    assert deployer.state.get(deployer._state_key(), "function") is None
+
+
+def test_create_function_retries_until_role_can_be_assumed(deployer, monkeypatch):
+    """Test that a new role's propagation delay is retried instead of slept through."""
+    monkeypatch.setattr("jvdeploy.aws.waiters.time.sleep", lambda seconds: None)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    lambda_stub.add_client_error("get_function", service_error_code="ResourceNotFoundException")
+    lambda_stub.add_client_error(
+        "create_function",
+        service_error_code="InvalidParameterValueException",
+        service_message="The role defined for the function cannot be assumed by Lambda.",
+    )
+    lambda_stub.add_response("create_function", {"FunctionArn": FUNCTION_ARN})
+    lambda_stub.add_response("get_function_configuration", {**_UPDATED, "State": "Pending"})
+    lambda_stub.add_response("get_function_configuration", _UPDATED)
+
+    with lambda_stub:
+        arn = deployer._deploy_lambda_function(ECR_URI, ROLE_ARN, {"name": "my-app"})
+
+    assert arn == FUNCTION_ARN
+    lambda_stub.assert_no_pending_responses()
+    assert [(w["name"], w["attempts"]) for w in deployer.waits] == [
+        ("IAM role to be assumable by Lambda", 2),
+        ("function to become active", 2),
+    ]
+
+
+def test_wait_for_function_reports_failed_update(deployer):
+    """Test that a failed update raises with Lambda's reason."""
+    lambda_stub = Stubber(deployer.lambda_client)
+    lambda_stub.add_response(
+        "get_function_configuration",
+        {**_UPDATED, "LastUpdateStatus": "Failed", "LastUpdateStatusReason": "Image not found"},
+    )
+
+    with lambda_stub, pytest.raises(LambdaDeployerError, match="Image not found"):
+        deployer._wait_for_function("my-app", "function update")
+
+
+ACCESS_POINT_ARN = (
+    "arn:aws:elasticfilesystem:us-east-1:123456789012:access-point/fsap-0123456789abcdef0"
+)
+
+
+@pytest.fixture
+def sqlite_deployer(deployer):
+    """Deployer with a SQLite database on EFS."""
+    deployer.config.update(
+        environment={"JVSPATIAL_DB_TYPE": "sqlite", "JVSPATIAL_DB_PATH": "/mnt/efs/db/app.db"},
+        efs={"enabled": True, "file_system_id": "fs-1234", "access_point_arn": ACCESS_POINT_ARN},
+        vpc={"enabled": True, "subnet_ids": ["subnet-1"], "security_group_ids": ["sg-1"]},
+    )
+    deployer._efs_client = boto3.client("efs", region_name="us-east-1")
+    return deployer
+
+
+def _access_point(tags: list) -> dict:
+    return {"AccessPoints": [{"AccessPointId": "fsap-0123456789abcdef0", "Tags": tags}]}
+
+
+def test_sqlite_init_runs_once_with_persistent_helper(sqlite_deployer):
+    """Test that the helper is created and invoked once, then the marker skips the step."""
+    deployer = sqlite_deployer
+    efs_stub = Stubber(deployer.efs_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    efs_stub.add_response("describe_access_points", _access_point([]))
+    lambda_stub.add_client_error("get_function", "ResourceNotFoundException")
+    lambda_stub.add_response(
+        "create_function",
+        {"FunctionArn": FUNCTION_ARN + "-sqlite-init"},
+        {
+            "FunctionName": "my-app-sqlite-init",
+            "Role": ROLE_ARN,
+            "Runtime": "python3.12",
+            "Handler": "index.handler",
+            "Description": ANY,
+            "Timeout": 60,
+            "MemorySize": 128,
+            "VpcConfig": {"SubnetIds": ["subnet-1"], "SecurityGroupIds": ["sg-1"]},
+            "FileSystemConfigs": [{"Arn": ACCESS_POINT_ARN, "LocalMountPath": "/mnt/efs"}],
+            "Code": {"ZipFile": ANY},
+        },
+    )
+    lambda_stub.add_response("get_function_configuration", _UPDATED)
+    lambda_stub.add_response(
+        "invoke",
+        {"StatusCode": 200},
+        {
+            "FunctionName": "my-app-sqlite-init",
+            "InvocationType": "RequestResponse",
+            "LogType": "Tail",
+            "Payload": b'{"db_path": "/mnt/efs/db/app.db"}',
+        },
+    )
+    efs_stub.add_response(
+        "tag_resource",
+        {},
+        {
+            "ResourceId": "fsap-0123456789abcdef0",
+            "Tags": [{"Key": "JvDeploySqliteInit", "Value": "/mnt/efs/db/app.db"}],
+        },
+    )
+
+    with efs_stub, lambda_stub:
+        deployer._ensure_sqlite_permissions(ECR_URI, ROLE_ARN, {"name": "my-app"})
+        # Recorded in the deployment state: no AWS calls at all
+        deployer._ensure_sqlite_permissions(ECR_URI, ROLE_ARN, {"name": "my-app"})
+
+    efs_stub.assert_no_pending_responses()
+    lambda_stub.assert_no_pending_responses()
+
+
+def test_sqlite_init_skipped_when_access_point_is_tagged(sqlite_deployer):
+    """Test that the access point tag alone (e.g. on another machine) skips the step."""
+    deployer = sqlite_deployer
+    efs_stub = Stubber(deployer.efs_client)
+    efs_stub.add_response(
+        "describe_access_points",
+        _access_point([{"Key": "JvDeploySqliteInit", "Value": "/mnt/efs/db/app.db"}]),
+        {"AccessPointId": "fsap-0123456789abcdef0"},
+    )
+
+    with efs_stub, Stubber(deployer.lambda_client):
+        deployer._ensure_sqlite_permissions(ECR_URI, ROLE_ARN, {"name": "my-app"})
+
+    efs_stub.assert_no_pending_responses()
+
+
+def test_publish_moves_alias_to_new_version(deployer):
+    """Test that the published version becomes the alias's target."""
+    stub = Stubber(deployer.lambda_client)
+    stub.add_response("publish_version", {"Version": "4"}, {"FunctionName": "my-app"})
+    stub.add_response(
+        "get_alias",
+        {"Name": "live", "FunctionVersion": "3"},
+        {"FunctionName": "my-app", "Name": "live"},
+    )
+    stub.add_response(
+        "update_alias", {}, {"FunctionName": "my-app", "Name": "live", "FunctionVersion": "4"}
+    )
+
+    with stub:
+        assert deployer._publish_alias("my-app", "live")["version"] == "4"
+
+    stub.assert_no_pending_responses()
+
+
+def test_alias_is_the_target_of_url_and_api(deployer):
+    """Test that the Function URL and HTTP API invoke the alias, not $LATEST."""
+    deployer.config["provisioned_concurrency"] = 2
+    deployer._apigatewayv2_client = boto3.client("apigatewayv2", region_name="us-east-1")
+
+    assert deployer._alias_name() == "live"
+    assert deployer._function_url_params("my-app", {})["Qualifier"] == "live"
+    assert deployer._http_api_params("my-app", {})["Target"] == FUNCTION_ARN + ":live"
+
+    stub = Stubber(deployer.apigatewayv2_client)
+    stub.add_response(
+        "get_integrations",
+        {"Items": [{"IntegrationId": "int1", "IntegrationUri": FUNCTION_ARN}]},
+        {"ApiId": "abc123"},
+    )
+    stub.add_response(
+        "update_integration",
+        {},
+        {"ApiId": "abc123", "IntegrationId": "int1", "IntegrationUri": FUNCTION_ARN + ":live"},
+    )
+    with stub:
+        deployer._route_http_api("abc123", deployer._function_target("my-app"))
+
+    stub.assert_no_pending_responses()
+
+
+def test_provisioned_concurrency_with_autoscaling(deployer):
+    """Test that concurrency is provisioned on the alias and scaled by schedule and utilization."""
+    deployer.config["provisioned_concurrency"] = {
+        "autoscaling": {
+            "enabled": True,
+            "min": 2,
+            "max": 10,
+            "schedules": [{"name": "business-hours", "schedule": "cron(0 8 ? * MON-FRI *)"}],
+        }
+    }
+    deployer._autoscaling_client = boto3.client("application-autoscaling", region_name="us-east-1")
+    lambda_stub = Stubber(deployer.lambda_client)
+    scaling_stub = Stubber(deployer.autoscaling_client)
+    alias = {"FunctionName": "my-app", "Qualifier": "live"}
+    target = {
+        "ServiceNamespace": "lambda",
+        "ResourceId": "function:my-app:live",
+        "ScalableDimension": "lambda:function:ProvisionedConcurrency",
+    }
+
+    lambda_stub.add_client_error(
+        "get_provisioned_concurrency_config",
+        "ProvisionedConcurrencyConfigNotFoundException",
+        expected_params=alias,
+    )
+    lambda_stub.add_response(
+        "put_provisioned_concurrency_config",
+        {"Status": "IN_PROGRESS"},
+        {**alias, "ProvisionedConcurrentExecutions": 2},
+    )
+    scaling_stub.add_response(
+        "register_scalable_target", {}, {**target, "MinCapacity": 2, "MaxCapacity": 10}
+    )
+    scaling_stub.add_response(
+        "put_scaling_policy",
+        {"PolicyARN": "arn:policy"},
+        {
+            **target,
+            "PolicyName": "my-app-live-utilization",
+            "PolicyType": "TargetTrackingScaling",
+            "TargetTrackingScalingPolicyConfiguration": {
+                "TargetValue": 0.7,
+                "PredefinedMetricSpecification": {
+                    "PredefinedMetricType": "LambdaProvisionedConcurrencyUtilization"
+                },
+            },
+        },
+    )
+    scaling_stub.add_response(
+        "put_scheduled_action",
+        {},
+        {
+            **target,
+            "ScheduledActionName": "business-hours",
+            "Schedule": "cron(0 8 ? * MON-FRI *)",
+            "ScalableTargetAction": {"MinCapacity": 2, "MaxCapacity": 10},
+        },
+    )
+    scheduled = {
+        **target,
+        "Schedule": "cron(0 20 * * ? *)",
+        "CreationTime": "2024-01-01T00:00:00Z",
+        "ScheduledActionARN": "arn:action",
+    }
+    scaling_stub.add_response(
+        "describe_scheduled_actions",
+        {
+            "ScheduledActions": [
+                {**scheduled, "ScheduledActionName": "business-hours"},
+                {**scheduled, "ScheduledActionName": "evenings"},
+            ]
+        },
+        target,
+    )
+    scaling_stub.add_response(
+        "delete_scheduled_action", {}, {**target, "ScheduledActionName": "evenings"}
+    )
+    lambda_stub.add_response("get_provisioned_concurrency_config", {"Status": "READY"}, alias)
+
+    with lambda_stub, scaling_stub:
+        deployer._configure_provisioned_concurrency("my-app", "live")
+
+    lambda_stub.assert_no_pending_responses()
+    scaling_stub.assert_no_pending_responses()
+    assert deployer.waits[-1]["name"] == "provisioned concurrency"
+
+
+def test_new_version_is_prewarmed_before_the_alias_moves(deployer):
+    """Test that the published version is invoked before traffic switches to it."""
+    stub = Stubber(deployer.lambda_client)
+    stub.add_response("publish_version", {"Version": "5"}, {"FunctionName": "my-app"})
+    for _ in range(2):
+        stub.add_response(
+            "invoke",
+            {"StatusCode": 200},
+            {
+                "FunctionName": "my-app",
+                "Qualifier": "5",
+                "InvocationType": "RequestResponse",
+                "LogType": "Tail",
+                "Payload": ANY,
+            },
+        )
+    stub.add_response("get_alias", {"Name": "live", "FunctionVersion": "4"})
+    stub.add_response(
+        "update_alias", {}, {"FunctionName": "my-app", "Name": "live", "FunctionVersion": "5"}
+    )
+
+    with stub, patch.object(deployer, "_invoke_client", return_value=deployer.lambda_client):
+        published = deployer._publish_alias("my-app", "live", prewarm=2)
+
+    stub.assert_no_pending_responses()
+    assert len(published["prewarm"]) == 2
+
+
+RULE_ARN = "arn:aws:events:us-east-1:123456789012:rule/my-app-warmer"
+
+
+def test_warmer_rule_fans_out_warmup_event(deployer):
+    """Test that the keep-warm rule gets one target per environment and may invoke the alias."""
+    deployer.config.update(
+        warmer={"enabled": True, "rate": "5m", "concurrency": 2}, alias={"enabled": True}
+    )
+    deployer._events_client = boto3.client("events", region_name="us-east-1")
+    events_stub = Stubber(deployer.events_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    events_stub.add_response(
+        "put_rule",
+        {"RuleArn": RULE_ARN},
+        {
+            "Name": "my-app-warmer",
+            "ScheduleExpression": "rate(5 minutes)",
+            "State": "ENABLED",
+            "Description": ANY,
+        },
+    )
+    targets = [
+        {
+            "Id": f"warmup-{index + 1}",
+            "Arn": FUNCTION_ARN + ":live",
+            "Input": json.dumps({"source": "jvdeploy.warmup", "concurrency": 2, "index": index}),
+            "RetryPolicy": {"MaximumRetryAttempts": 0, "MaximumEventAgeInSeconds": 60},
+        }
+        for index in range(2)
+    ]
+    events_stub.add_response(
+        "put_targets", {"FailedEntryCount": 0}, {"Rule": "my-app-warmer", "Targets": targets}
+    )
+    events_stub.add_response(
+        "list_targets_by_rule",
+        {"Targets": targets + [{"Id": "warmup-3", "Arn": FUNCTION_ARN + ":live"}]},
+    )
+    events_stub.add_response("remove_targets", {}, {"Rule": "my-app-warmer", "Ids": ["warmup-3"]})
+    lambda_stub.add_response(
+        "add_permission",
+        {},
+        {
+            "FunctionName": "my-app",
+            "StatementId": "my-app-warmer",
+            "Action": "lambda:InvokeFunction",
+            "Principal": "events.amazonaws.com",
+            "SourceArn": RULE_ARN,
+            "Qualifier": "live",
+        },
+    )
+    # Rules of an earlier, larger fan-out are removed
+    events_stub.add_response(
+        "list_rules",
+        {"Rules": [{"Name": "my-app-warmer"}, {"Name": "my-app-warmer-2"}]},
+        {"NamePrefix": "my-app-warmer"},
+    )
+    events_stub.add_response(
+        "list_targets_by_rule",
+        {"Targets": [{"Id": "warmup-6", "Arn": FUNCTION_ARN + ":live"}]},
+        {"Rule": "my-app-warmer-2"},
+    )
+    events_stub.add_response("remove_targets", {}, {"Rule": "my-app-warmer-2", "Ids": ["warmup-6"]})
+    events_stub.add_response("delete_rule", {}, {"Name": "my-app-warmer-2"})
+    lambda_stub.add_client_error(
+        "remove_permission",
+        "ResourceNotFoundException",
+        expected_params={
+            "FunctionName": "my-app",
+            "StatementId": "my-app-warmer-2",
+            "Qualifier": "live",
+        },
+    )
+
+    with events_stub, lambda_stub:
+        assert deployer._ensure_warmer("my-app") == ["my-app-warmer"]
+
+    events_stub.assert_no_pending_responses()
+    lambda_stub.assert_no_pending_responses()
+
+
+def test_warmer_rules_for_large_fan_out_and_rates(deployer):
+    """Test rule names beyond five targets and the accepted rate formats."""
+    from jvdeploy.aws.lambda_deployer import _warmer_schedule
+
+    assert deployer._warmer_rule_names("my-app", 7) == ["my-app-warmer", "my-app-warmer-2"]
+    assert _warmer_schedule("1h") == "rate(1 hour)"
+    assert _warmer_schedule("10 minutes") == "rate(10 minutes)"
+    assert _warmer_schedule("cron(0/5 8-18 ? * MON-FRI *)").startswith("cron(")
+    with pytest.raises(LambdaDeployerError, match="Invalid lambda.warmer.rate"):
+        _warmer_schedule("often")
+
+
+def test_destroy_removes_warmer_rules(deployer):
+    """Test that destroy deletes keep-warm rules with their targets, even without lambda.warmer."""
+    deployer._events_client = boto3.client("events", region_name="us-east-1")
+    events_stub = Stubber(deployer.events_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    events_stub.add_response("list_rules", {"Rules": [{"Name": "my-app-warmer"}]})
+    events_stub.add_response(
+        "list_targets_by_rule", {"Targets": [{"Id": "warmup-1", "Arn": FUNCTION_ARN}]}
+    )
+    events_stub.add_response("remove_targets", {}, {"Rule": "my-app-warmer", "Ids": ["warmup-1"]})
+    events_stub.add_response("delete_rule", {}, {"Name": "my-app-warmer"})
+    lambda_stub.add_response(
+        "remove_permission", {}, {"FunctionName": "my-app", "StatementId": "my-app-warmer"}
+    )
+    lambda_stub.add_response("delete_function", {}, {"FunctionName": "my-app"})
+    lambda_stub.add_client_error("delete_function", "ResourceNotFoundException")
+
+    with events_stub, lambda_stub:
+        results = deployer.destroy()
+
+    assert results["deleted"] == ["rule:my-app-warmer", "function:my-app"]
+    events_stub.assert_no_pending_responses()
+
+
+def test_warmer_rules_removed_once_config_is_dropped(deployer):
+    """Test that a deploy without lambda.warmer removes the rules an earlier deploy left."""
+    deployer._events_client = boto3.client("events", region_name="us-east-1")
+    events_stub = Stubber(deployer.events_client)
+    lambda_stub = Stubber(deployer.lambda_client)
+
+    events_stub.add_response(
+        "list_rules", {"Rules": [{"Name": "my-app-warmer"}, {"Name": "my-app-warmers"}]}
+    )
+    events_stub.add_response(
+        "list_targets_by_rule", {"Targets": [{"Id": "warmup-1", "Arn": f"{FUNCTION_ARN}:live"}]}
+    )
+    events_stub.add_response("remove_targets", {}, {"Rule": "my-app-warmer", "Ids": ["warmup-1"]})
+    events_stub.add_response("delete_rule", {}, {"Name": "my-app-warmer"})
+    lambda_stub.add_response(
+        "remove_permission",
+        {},
+        {"FunctionName": "my-app", "StatementId": "my-app-warmer", "Qualifier": "live"},
+    )
+
+    with events_stub, lambda_stub:
+        assert deployer._ensure_warmer("my-app") == []
+
+    events_stub.assert_no_pending_responses()
+    lambda_stub.assert_no_pending_responses()
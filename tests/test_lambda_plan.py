@@ -0,0 +1,421 @@
+"""Tests for desired-state planning of Lambda deployments."""
+
+import json
+import sys
+from unittest.mock import patch
+
+import boto3
+import pytest
+import yaml
+from botocore.stub import Stubber
+
+from jvdeploy.aws.lambda_deployer import LambdaDeployer
+from jvdeploy.aws.lambda_plan import (
+    NEW_API_ID,
+    NEW_VERSION,
+    build_plan,
+    diff_function_config,
+    format_plan,
+    redact_plan,
+)
+from jvdeploy.cli import main
+
+ECR_URI = "123456789012.dkr.ecr.us-east-1.amazonaws.com/my-app:1.0.0"
+DIGEST = "sha256:" + "a" * 64
+ROLE_ARN = "arn:aws:iam::123456789012:role/my-app-role"
+FUNCTION_ARN = "arn:aws:lambda:us-east-1:123456789012:function:my-app"
+POLICY_ARN = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
+
+DESIRED_FUNCTION = {
+    "FunctionName": "my-app",
+    "Role": ROLE_ARN,
+    "Code": {"ImageUri": ECR_URI},
+    "PackageType": "Image",
+    "Timeout": 300,
+    "MemorySize": 1024,
+    "EphemeralStorage": {"Size": 512},
+    "Environment": {"Variables": {"A": "1"}},
+}
+
+LIVE_CONFIGURATION = {
+    "FunctionName": "my-app",
+    "FunctionArn": FUNCTION_ARN,
+    "Role": ROLE_ARN,
+    "CodeSha256": "a" * 64,
+    "Timeout": 300,
+    "MemorySize": 1024,
+    "EphemeralStorage": {"Size": 512},
+    "Environment": {"Variables": {"A": "1"}},
+    "VpcConfig": {"SubnetIds": [], "SecurityGroupIds": [], "VpcId": ""},
+    "State": "Active",
+    "LastUpdateStatus": "Successful",
+}
+
+
+def _live(**overrides):
+    live = {
+        "function": {
+            "Configuration": dict(LIVE_CONFIGURATION),
+            "Code": {"ImageUri": ECR_URI, "RepositoryType": "ECR"},
+        },
+        "function_url": None,
+        "statement_ids": [],
+        "api": None,
+        "role": {"arn": ROLE_ARN, "policies": [POLICY_ARN]},
+    }
+    live.update(overrides)
+    return live
+
+
+def _desired(**overrides):
+    desired = {
+        "function": dict(DESIRED_FUNCTION),
+        "image_digest": DIGEST,
+        "role": {"name": "my-app-role", "policies": [POLICY_ARN]},
+        "access_point": None,
+        "function_url": None,
+        "api": None,
+    }
+    desired.update(overrides)
+    return desired
+
+
+def test_plan_is_empty_when_nothing_changed():
+    """Test that a matching deployment needs no calls."""
+    assert build_plan(_desired(), _live()) == []
+    assert "No changes" in format_plan([])
+
+
+def test_plan_sends_only_changed_settings():
+    """Test that only differing settings are sent, without a code update."""
+    desired = _desired(
+        function=dict(DESIRED_FUNCTION, MemorySize=2048, Environment={"Variables": {"B": "2"}})
+    )
+
+    actions = build_plan(desired, _live())
+
+    assert [a["call"] for a in actions] == ["lambda.update_function_configuration"]
+    assert actions[0]["params"] == {
+        "FunctionName": "my-app",
+        "MemorySize": 2048,
+        "Environment": {"Variables": {"B": "2"}},
+    }
+    text = format_plan(actions)
+    assert "MemorySize: 1024 -> 2048" in text
+    assert "- Environment.A" in text and "+ Environment.B" in text
+    assert "'2'" not in text and '"2"' not in text  # values may be secrets
+    assert "0 to add, 1 to change" in text
+
+
+def test_diff_ignores_ordering_and_unset_defaults():
+    """Test that list order and settings AWS reports as empty are not changes."""
+    desired = dict(
+        DESIRED_FUNCTION, VpcConfig={"SubnetIds": ["s-2", "s-1"], "SecurityGroupIds": ["sg"]}
+    )
+    live = dict(
+        LIVE_CONFIGURATION,
+        VpcConfig={"SubnetIds": ["s-1", "s-2"], "SecurityGroupIds": ["sg"], "VpcId": "vpc"},
+    )
+    assert diff_function_config(desired, live) == {}
+
+    # Removing the last environment variable is a change
+    without_env = {k: v for k, v in DESIRED_FUNCTION.items() if k != "Environment"}
+    changes = diff_function_config(without_env, LIVE_CONFIGURATION)
+    assert changes["Environment"]["new"] == {"Variables": {}}
+
+
+def test_plan_updates_code_for_new_digest():
+    """Test that a different digest plans update_function_code."""
+    actions = build_plan(_desired(image_digest="sha256:" + "b" * 64), _live())
+
+    assert [a["call"] for a in actions] == ["lambda.update_function_code"]
+    assert actions[0]["params"] == {"FunctionName": "my-app", "ImageUri": ECR_URI}
+
+
+def test_plan_switches_architecture_with_the_code():
+    """Test that an architecture change is sent with update_function_code, same digest or not."""
+    desired = _desired()
+    desired["function"]["Architectures"] = ["arm64"]
+
+    actions = build_plan(desired, _live())
+
+    assert [a["call"] for a in actions] == ["lambda.update_function_code"]
+    assert actions[0]["params"] == {
+        "FunctionName": "my-app",
+        "ImageUri": ECR_URI,
+        "Architectures": ["arm64"],
+    }
+    assert 'Architectures: ["x86_64"] -> ["arm64"]' in format_plan(actions)
+
+    # Functions created without an architecture run on x86_64
+    desired["function"]["Architectures"] = ["x86_64"]
+    assert build_plan(desired, _live()) == []
+
+
+def test_plan_for_new_deployment():
+    """Test ordering of creates, with the new API's ID filled in later."""
+    url = {"FunctionName": "my-app", "AuthType": "NONE", "InvokeMode": "BUFFERED"}
+    api = {
+        "name": "my-app-api",
+        "params": {"Name": "my-app-api", "ProtocolType": "HTTP", "Target": FUNCTION_ARN},
+        "source_arn_prefix": "arn:aws:execute-api:us-east-1:123456789012",
+    }
+
+    actions = build_plan(
+        _desired(function_url=url, api=api),
+        _live(function=None, role=None),
+    )
+
+    assert [a["call"] for a in actions] == [
+        "iam.create_role",
+        "lambda.create_function",
+        "lambda.create_function_url_config",
+        "lambda.add_permission",
+        "apigatewayv2.create_api",
+        "lambda.add_permission",
+    ]
+    assert actions[0]["policies"] == [POLICY_ARN]
+    assert actions[-1]["params"]["StatementId"] == f"ApiGatewayInvoke-{NEW_API_ID}"
+    assert "6 to add, 0 to change" in format_plan(actions)
+
+
+def test_plan_publishes_version_and_moves_alias():
+    """Test that a changed function is published and the alias moved, with its concurrency."""
+    alias = {"name": "live", "provisioned_concurrency": 5, "autoscaling": False}
+    live_alias = {"Name": "live", "FunctionVersion": "3"}
+    provisioned = {"RequestedProvisionedConcurrentExecutions": 5, "Status": "READY"}
+    live = _live(
+        alias=live_alias,
+        alias_function=dict(LIVE_CONFIGURATION),
+        provisioned_concurrency=provisioned,
+    )
+
+    assert build_plan(_desired(alias=alias), live) == []
+
+    actions = build_plan(_desired(alias=alias, image_digest="sha256:" + "b" * 64), live)
+    assert [a["call"] for a in actions] == [
+        "lambda.update_function_code",
+        "lambda.publish_version",
+        "lambda.update_alias",
+    ]
+    assert actions[-1]["params"]["FunctionVersion"] == NEW_VERSION
+
+    # An alias left behind $LATEST (e.g. by an environment update) is moved too
+    behind = dict(LIVE_CONFIGURATION, Environment={"Variables": {}})
+    actions = build_plan(
+        _desired(alias=dict(alias, provisioned_concurrency=0)),
+        dict(live, alias_function=behind),
+    )
+    assert [a["call"] for a in actions] == [
+        "lambda.publish_version",
+        "lambda.update_alias",
+        "lambda.delete_provisioned_concurrency_config",
+    ]
+    assert "1 to add, 1 to change, 1 to remove" in format_plan(actions)
+
+
+def test_plan_targets_alias_with_url_api_and_permissions():
+    """Test that the Function URL, API integration and permissions use the alias."""
+    alias = {"name": "live", "provisioned_concurrency": 2, "autoscaling": True}
+    url = {"FunctionName": "my-app", "Qualifier": "live", "AuthType": "NONE"}
+    target = FUNCTION_ARN + ":live"
+    api = {
+        "name": "my-app-api",
+        "params": {"Name": "my-app-api", "ProtocolType": "HTTP", "Target": target},
+        "source_arn_prefix": "arn:aws:execute-api:us-east-1:123456789012",
+    }
+    live = _live(
+        alias={"Name": "live", "FunctionVersion": "3"},
+        alias_function=dict(LIVE_CONFIGURATION),
+        # Scaled by autoscaling: the configured count is not enforced
+        provisioned_concurrency={"RequestedProvisionedConcurrentExecutions": 7},
+        api={"ApiId": "abc123", "Name": "my-app-api"},
+        api_integrations=[{"IntegrationId": "int1", "IntegrationUri": FUNCTION_ARN}],
+        statement_ids=["FunctionURLAllowPublicAccess"],
+    )
+
+    actions = build_plan(_desired(alias=alias, function_url=url, api=api), live)
+
+    assert [a["call"] for a in actions] == [
+        "lambda.create_function_url_config",
+        "apigatewayv2.update_integration",
+        "lambda.add_permission",
+    ]
+    assert actions[1]["params"]["IntegrationUri"] == target
+    assert actions[2]["params"]["Qualifier"] == "live"
+
+
+def test_plan_attaches_only_missing_policies():
+    """Test that attached role policies are not attached again."""
+    extra = "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"
+    actions = build_plan(
+        _desired(role={"name": "my-app-role", "policies": [POLICY_ARN, extra]}), _live()
+    )
+
+    assert [(a["call"], a["params"]["PolicyArn"]) for a in actions] == [
+        ("iam.attach_role_policy", extra)
+    ]
+
+
+@pytest.fixture
+def deployer(aws_credentials):
+    """Create a LambdaDeployer with stubbable clients."""
+    config = {
+        "region": "us-east-1",
+        "account_id": "123456789012",
+        "function": {"name": "my-app", "memory": 2048},
+        "environment": {"A": "1"},
+        "iam": {"role_name": "my-app-role", "policies": [POLICY_ARN]},
+        "function_url": {"enabled": True},
+    }
+    deployer = LambdaDeployer(config)
+    for service in ("ecr", "iam", "lambda"):
+        setattr(deployer, f"_{service}_client", boto3.client(service, region_name="us-east-1"))
+    return deployer
+
+
+def test_plan_and_apply_with_live_state(deployer):
+    """Test that live state is read once and only the changed setting is applied."""
+    lambda_stub = Stubber(deployer.lambda_client)
+    iam_stub = Stubber(deployer.iam_client)
+    ecr_stub = Stubber(deployer.ecr_client)
+
+    lambda_stub.add_response(
+        "get_function",
+        {"Configuration": LIVE_CONFIGURATION, "Code": {"ImageUri": ECR_URI}},
+        {"FunctionName": "my-app"},
+    )
+    lambda_stub.add_response(
+        "get_function_url_config",
+        {
+            "FunctionUrl": "https://abc.lambda-url.us-east-1.on.aws/",
+            "FunctionArn": FUNCTION_ARN,
+            "AuthType": "NONE",
+            "InvokeMode": "BUFFERED",
+            "CreationTime": "2024-01-01T00:00:00Z",
+            "LastModifiedTime": "2024-01-01T00:00:00Z",
+        },
+    )
+    policy = {"Statement": [{"Sid": "FunctionURLAllowPublicAccess"}]}
+    lambda_stub.add_response("get_policy", {"Policy": json.dumps(policy)})
+    iam_stub.add_response(
+        "get_role",
+        {
+            "Role": {
+                "Path": "/",
+                "RoleName": "my-app-role",
+                "RoleId": "AROAEXAMPLEID12345678",
+                "Arn": ROLE_ARN,
+                "CreateDate": "2024-01-01T00:00:00Z",
+            }
+        },
+    )
+    iam_stub.add_response(
+        "list_attached_role_policies",
+        {"AttachedPolicies": [{"PolicyName": "basic", "PolicyArn": POLICY_ARN}]},
+    )
+    ecr_stub.add_response("describe_images", {"imageDetails": [{"imageDigest": DIGEST}]})
+
+    with lambda_stub, iam_stub, ecr_stub:
+        plan = deployer.plan(ECR_URI)
+
+    assert [a["call"] for a in plan["actions"]] == ["lambda.update_function_configuration"]
+    assert plan["actions"][0]["params"] == {"FunctionName": "my-app", "MemorySize": 2048}
+
+    lambda_stub.add_response(
+        "update_function_configuration", {}, {"FunctionName": "my-app", "MemorySize": 2048}
+    )
+    lambda_stub.add_response(
+        "get_function_configuration",
+        {"FunctionName": "my-app", "State": "Active", "LastUpdateStatus": "Successful"},
+    )
+    with lambda_stub:
+        results = deployer.apply(plan)
+
+    lambda_stub.assert_no_pending_responses()
+    assert results["applied"] == 1
+    assert results["function_url"] == "https://abc.lambda-url.us-east-1.on.aws/"
+
+
+def test_cli_plan_lambda(temp_dir, monkeypatch, capsys):
+    """Test that 'jvdeploy plan lambda' prints the plan without applying it."""
+    config = {
+        "version": "1.0",
+        "app": {"name": "my-app"},
+        "image": {"name": "my-app"},
+        "lambda": {
+            "enabled": True,
+            "account_id": "123456789012",
+            "function": {"name": "my-app"},
+        },
+    }
+    (temp_dir / "deploy.yaml").write_text(yaml.dump(config))
+    plan = {
+        "function_name": "my-app",
+        "image_uri": ECR_URI,
+        "actions": build_plan(_desired(function=dict(DESIRED_FUNCTION, Timeout=60)), _live()),
+    }
+    monkeypatch.setattr(
+        sys, "argv", ["jvdeploy", "plan", "lambda", str(temp_dir), "--image", ECR_URI]
+    )
+
+    with patch.object(LambdaDeployer, "plan", return_value=plan) as make_plan, patch.object(
+        LambdaDeployer, "apply"
+    ) as apply, pytest.raises(SystemExit) as exc_info:
+        main()
+
+    assert exc_info.value.code == 0
+    make_plan.assert_called_once_with(ECR_URI)
+    apply.assert_not_called()
+    assert "Timeout: 300 -> 60" in capsys.readouterr().out
+
+
+def test_redacted_plan_keeps_names_but_not_values():
+    """Test that environment values are masked in new and changed functions."""
+    secrets = {"A": "s3cret-a", "TOKEN": "s3cret-token"}
+    changed = dict(DESIRED_FUNCTION, Environment={"Variables": secrets})
+    actions = build_plan(_desired(function=changed), _live()) + build_plan(
+        _desired(function=changed), _live(function=None)
+    )
+
+    redacted = redact_plan(actions)
+
+    text = json.dumps(redacted)
+    assert "s3cret" not in text and '"1"' not in text
+    update, create = redacted
+    assert update["params"]["Environment"]["Variables"] == {"A": "***", "TOKEN": "***"}
+    assert update["changes"]["Environment"]["changed"] == ["A"]
+    assert create["params"]["Environment"]["Variables"] == {"A": "***", "TOKEN": "***"}
+    # The plan itself still holds the values apply sends
+    assert actions[0]["params"]["Environment"]["Variables"] == secrets
+
+
+def test_cli_plan_json_redacts_environment(temp_dir, monkeypatch, capsys):
+    """Test that 'jvdeploy plan lambda --json' never prints a variable's value."""
+    config = {
+        "version": "1.0",
+        "app": {"name": "my-app"},
+        "image": {"name": "my-app"},
+        "lambda": {
+            "enabled": True,
+            "account_id": "123456789012",
+            "function": {"name": "my-app"},
+        },
+    }
+    (temp_dir / "deploy.yaml").write_text(yaml.dump(config))
+    function = dict(DESIRED_FUNCTION, Environment={"Variables": {"API_KEY": "s3cret"}})
+    plan = {
+        "function_name": "my-app",
+        "image_uri": ECR_URI,
+        "actions": build_plan(_desired(function=function), _live()),
+    }
+    monkeypatch.setattr(
+        sys, "argv", ["jvdeploy", "plan", "lambda", str(temp_dir), "--image", ECR_URI, "--json"]
+    )
+
+    with patch.object(LambdaDeployer, "plan", return_value=plan), pytest.raises(SystemExit):
+        main()
+
+    out = capsys.readouterr().out
+    assert "s3cret" not in out
+    assert json.loads(out)[0]["params"]["Environment"]["Variables"] == {"API_KEY": "***"}
@@ -0,0 +1,91 @@
+"""Tests for merkle module."""
+
+import os
+from unittest.mock import patch
+
+from jvdeploy.merkle import diff_trees, hash_context
+
+
+def _tree(root):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "a.py").write_text("a = 1\n")
+    (root / "src" / "b.py").write_text("b = 2\n")
+    (root / "docs").mkdir()
+    (root / "docs" / "readme.md").write_text("docs\n")
+    (root / "app.yaml").write_text("name: app\n")
+    # Old enough that digests are cached
+    for path in root.rglob("*"):
+        os.utime(path, ns=(10**18, 10**18))
+
+
+def test_hash_context_is_deterministic_and_content_based(tmp_path):
+    """Test that identical trees hash equal and content changes propagate to the root."""
+    first, second = tmp_path / "one", tmp_path / "two"
+    first.mkdir()
+    second.mkdir()
+    _tree(first)
+    _tree(second)
+
+    one = hash_context(first, use_cache=False)
+    two = hash_context(second, use_cache=False)
+    assert one["root"] == two["root"]
+    assert set(one["directories"]) == {"", "src", "src/pkg", "docs"}
+
+    (second / "src" / "pkg" / "a.py").write_text("a = 2\n")
+    changed = hash_context(second, use_cache=False)
+    assert changed["root"] != one["root"]
+    assert changed["directories"]["docs"] == one["directories"]["docs"]
+    assert changed["directories"]["src/pkg"] != one["directories"]["src/pkg"]
+
+
+def test_hash_context_honors_dockerignore(tmp_path):
+    """Test that ignored files do not affect the hash."""
+    root = tmp_path / "context"
+    _tree(root)
+    (root / ".dockerignore").write_text("docs\n")
+    before = hash_context(root, use_cache=False)
+
+    (root / "docs" / "readme.md").write_text("changed\n")
+
+    assert hash_context(root, use_cache=False)["root"] == before["root"]
+    assert "docs" not in before["directories"]
+
+
+def test_hash_context_reuses_unchanged_files(tmp_path):
+    """Test that only files with changed metadata are read again."""
+    # The isolated cache directory lives in root, so hash a subdirectory
+    root = tmp_path / "context"
+    _tree(root)
+    first = hash_context(root)
+    assert first["hashed"] == 4
+
+    with patch("jvdeploy.merkle._hash_file") as hash_file:
+        second = hash_context(root)
+    hash_file.assert_not_called()
+    assert second["root"] == first["root"]
+    assert second["reused"] == 4
+
+    (root / "src" / "b.py").write_text("b = 3\n")
+    third = hash_context(root, workers=2)
+    assert third["hashed"] == 1
+    assert third["directories"]["docs"] == first["directories"]["docs"]
+    assert third["root"] == hash_context(root, use_cache=False)["root"]
+
+
+def test_diff_trees(tmp_path):
+    """Test locating added, modified and removed files."""
+    root = tmp_path / "context"
+    _tree(root)
+    old = hash_context(root, use_cache=False)
+
+    (root / "src" / "b.py").write_text("b = 3\n")
+    (root / "docs" / "readme.md").unlink()
+    (root / "src" / "pkg" / "c.py").write_text("c = 1\n")
+    new = hash_context(root, use_cache=False)
+
+    assert diff_trees(old, new) == {
+        "added": ["src/pkg/c.py"],
+        "modified": ["src/b.py"],
+        "removed": ["docs/readme.md"],
+    }
+    assert diff_trees(new, new) == {"added": [], "modified": [], "removed": []}
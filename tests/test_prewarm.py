@@ -0,0 +1,110 @@
+"""Tests for pre-warming of execution environments."""
+
+import base64
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+import pytest
+from botocore.stub import ANY, Stubber
+
+from jvdeploy.aws.prewarm import (
+    format_prewarm,
+    http_request,
+    invoke_request,
+    parse_init_duration,
+    warm_up,
+)
+
+
+@pytest.fixture
+def stand_in():
+    """Local HTTP stand-in for a Function URL that records concurrent requests."""
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats["requests"] += 1
+                stats["in_flight"] += 1
+                stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                stats["in_flight"] -= 1
+            self.send_response(404 if self.path == "/missing" else 200)
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", stats
+    server.shutdown()
+    server.server_close()
+
+
+def test_warm_up_bounds_concurrency(stand_in):
+    """Test that every request is sent, never more at once than allowed."""
+    url, stats = stand_in
+
+    results = warm_up(http_request(url + "/"), 6, max_concurrency=3)
+
+    assert len(results) == stats["requests"] == 6
+    assert 1 < stats["max_in_flight"] <= 3
+    assert all(r["status"] == 200 and r["seconds"] > 0 for r in results)
+
+
+def test_http_errors_still_warm(stand_in):
+    """Test that an error status counts as served, and an unreachable URL as failed."""
+    url, _ = stand_in
+
+    served = warm_up(http_request(url + "/missing"), 1)
+    failed = warm_up(http_request("http://127.0.0.1:1/", timeout=1), 1)
+
+    assert served[0]["status"] == 404 and served[0]["error"] is None
+    assert failed[0]["status"] is None and failed[0]["error"]
+    assert "1 failed" in format_prewarm(failed)
+
+
+def _log_tail(text: str) -> str:
+    return base64.b64encode(text.encode()).decode()
+
+
+def test_invocations_report_init_durations(aws_credentials):
+    """Test that the warmup event is sent to the version and cold starts are reported."""
+    client = boto3.client("lambda", region_name="us-east-1")
+    stub = Stubber(client)
+    expected = {
+        "FunctionName": "my-app",
+        "Qualifier": "7",
+        "InvocationType": "RequestResponse",
+        "LogType": "Tail",
+        "Payload": ANY,
+    }
+    cold = "REPORT RequestId: 1\tDuration: 5.1 ms\tInit Duration: 812.34 ms\t"
+    stub.add_response("invoke", {"StatusCode": 200, "LogResult": _log_tail(cold)}, expected)
+    stub.add_response(
+        "invoke",
+        {"StatusCode": 200, "FunctionError": "Unhandled", "LogResult": _log_tail("REPORT")},
+        expected,
+    )
+
+    with stub:
+        results = warm_up(invoke_request(client, "my-app", "7"), 2, max_concurrency=1)
+
+    assert [r["init_ms"] for r in results] == [812.34, None]
+    text = format_prewarm(results)
+    assert "1 cold start(s): init 812-812 ms" in text
+    assert "Errors: Unhandled" in text
+
+
+def test_parse_init_duration_of_warm_or_missing_logs():
+    """Test that warm invocations and missing log tails have no init duration."""
+    assert parse_init_duration(None) is None
+    assert parse_init_duration(_log_tail("REPORT Duration: 1 ms")) is None
+    assert parse_init_duration(_log_tail("Init Duration: 95.5 ms")) == 95.5
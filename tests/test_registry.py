@@ -0,0 +1,157 @@
+"""Tests for registry module."""
+
+import hashlib
+import io
+import json
+import urllib.error
+from email.message import Message
+from unittest.mock import patch
+
+import pytest
+
+from jvdeploy.registry import RegistryClient, RegistryError, parse_reference
+
+DIGEST = "sha256:" + "b" * 64
+
+
+def _headers(values: dict) -> Message:
+    message = Message()
+    for key, value in values.items():
+        message[key] = value
+    return message
+
+
+class FakeResponse:
+    """Minimal urlopen response."""
+
+    def __init__(self, status=200, headers=None, body=b""):
+        self.status = status
+        self.headers = _headers(headers or {})
+        self._body = body
+
+    def read(self):
+        return self._body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _http_error(request, status, headers=None, body=b""):
+    return urllib.error.HTTPError(
+        request.full_url, status, "error", _headers(headers or {}), io.BytesIO(body)
+    )
+
+
+@pytest.mark.parametrize(
+    "reference, expected",
+    [
+        ("public.ecr.aws/org/app:latest", ("public.ecr.aws", "org/app", "latest")),
+        ("python:3.12", ("registry-1.docker.io", "library/python", "3.12")),
+        ("localhost:5000/app", ("localhost:5000", "app", "latest")),
+        (f"org/app:1@{DIGEST}", ("registry-1.docker.io", "org/app", DIGEST)),
+    ],
+)
+def test_parse_reference(reference, expected):
+    """Test splitting image references."""
+    assert parse_reference(reference) == expected
+
+
+def test_resolve_digest_with_anonymous_token():
+    """Test the bearer challenge flow and digest lookup."""
+    requests = []
+
+    def urlopen(request, timeout=None):
+        requests.append(request)
+        if request.full_url.startswith("https://public.ecr.aws/token/"):
+            return FakeResponse(body=json.dumps({"token": "anon"}).encode())
+        if request.get_header("Authorization") != "Bearer anon":
+            raise _http_error(
+                request,
+                401,
+                {
+                    "WWW-Authenticate": 'Bearer realm="https://public.ecr.aws/token/",'
+                    'service="public.ecr.aws",scope="aws"'
+                },
+            )
+        return FakeResponse(headers={"Docker-Content-Digest": DIGEST})
+
+    client = RegistryClient("public.ecr.aws")
+    with patch("urllib.request.urlopen", side_effect=urlopen):
+        assert client.resolve_digest("org/app", "latest") == DIGEST
+        # The token is reused for the same scope
+        assert client.resolve_digest("org/app", "latest") == DIGEST
+
+    assert [r.get_method() for r in requests] == ["HEAD", "GET", "HEAD", "HEAD"]
+    assert "service=public.ecr.aws" in requests[1].full_url
+    assert "application/vnd.oci.image.index.v1+json" in requests[0].get_header("Accept")
+
+
+def test_request_uses_basic_credentials_for_token():
+    """Test that configured credentials are sent to the token realm."""
+    seen = {}
+
+    def urlopen(request, timeout=None):
+        if "/token" in request.full_url:
+            seen["token_auth"] = request.get_header("Authorization")
+            return FakeResponse(body=b'{"access_token": "t"}')
+        if request.get_header("Authorization") != "Bearer t":
+            raise _http_error(request, 401, {"WWW-Authenticate": 'Bearer realm="https://r/token"'})
+        return FakeResponse(body=b"{}")
+
+    client = RegistryClient("r", username="AWS", password="secret")
+    with patch("urllib.request.urlopen", side_effect=urlopen):
+        client.request("GET", "/v2/", scope="registry:catalog:*")
+
+    assert seen["token_auth"] == "Basic QVdTOnNlY3JldA=="
+
+
+def test_request_raises_on_missing_tag():
+    """Test that unexpected statuses raise RegistryError."""
+
+    def urlopen(request, timeout=None):
+        raise _http_error(request, 404, body=b"manifest unknown")
+
+    client = RegistryClient("r")
+    with patch("urllib.request.urlopen", side_effect=urlopen):
+        with pytest.raises(RegistryError, match="HTTP 404: manifest unknown"):
+            client.resolve_digest("org/app", "missing")
+
+
+def test_authorization_is_not_forwarded_on_redirect():
+    """Test that credentials stay with the registry when a blob redirects to storage."""
+    seen = []
+
+    def urlopen(request, timeout=None):
+        seen.append(request)
+        return FakeResponse(body=b"blob")
+
+    client = RegistryClient("r", username="AWS", password="secret")
+    client._authorization["repository:app:pull"] = "Basic x"
+    with patch("urllib.request.urlopen", side_effect=urlopen):
+        client.request("GET", f"/v2/app/blobs/{DIGEST}", scope="repository:app:pull")
+
+    assert seen[0].unredirected_hdrs == {"Authorization": "Basic x"}
+    assert "Authorization" not in seen[0].headers
+
+
+def test_upload_blob_and_manifest(local_registry):
+    """Test monolithic blob upload, existing-blob skip and manifest upload."""
+    client = RegistryClient(local_registry.host, insecure=True)
+    data = b"layer"
+    digest = "sha256:" + hashlib.sha256(data).hexdigest()
+
+    assert client.upload_blob("org/app", data, digest) == "uploaded"
+    assert client.upload_blob("org/app", data, digest) == "exists"
+    assert client.get_blob("org/app", digest) == data
+
+    manifest = json.dumps({"config": {"digest": digest}, "layers": []}).encode()
+    media_type = "application/vnd.oci.image.manifest.v1+json"
+    assert client.put_manifest("org/app", "1", manifest, media_type) == (
+        "sha256:" + hashlib.sha256(manifest).hexdigest()
+    )
+    assert client.resolve_digest("org/app", "1") == client.put_manifest(
+        "org/app", "1", manifest, media_type
+    )
@@ -0,0 +1,86 @@
+"""Tests for dependency-ordered deployment steps."""
+
+import threading
+import time
+
+import pytest
+
+from jvdeploy.aws.scheduler import (
+    StepGraphError,
+    format_timings,
+    order_steps,
+    run_steps,
+)
+
+
+def test_order_steps_respects_dependencies():
+    """Test that every step comes after the steps it depends on."""
+    steps = {
+        "function": (None, ["build", "iam"]),
+        "build": (None, ["ecr"]),
+        "ecr": (None, []),
+        "iam": (None, []),
+    }
+    order = order_steps(steps)
+    assert order.index("ecr") < order.index("build") < order.index("function")
+    assert order.index("iam") < order.index("function")
+
+
+def test_order_steps_rejects_invalid_graphs():
+    """Test that unknown dependencies and cycles are errors."""
+    with pytest.raises(StepGraphError, match="unknown step 'ecr'"):
+        order_steps({"build": (None, ["ecr"])})
+    with pytest.raises(StepGraphError, match="circular"):
+        order_steps({"a": (None, ["b"]), "b": (None, ["a"])})
+
+
+def test_run_steps_overlaps_independent_steps():
+    """Test that independent steps run at the same time and dependents wait."""
+    started = {}
+    both_running = threading.Barrier(2, timeout=5)
+
+    def step(name, barrier=None):
+        def run():
+            started[name] = time.perf_counter()
+            if barrier:
+                barrier.wait()
+
+        return run
+
+    timings = run_steps(
+        {
+            "build": (step("build", both_running), []),
+            "iam": (step("iam", both_running), []),
+            "function": (step("function"), ["build", "iam"]),
+        }
+    )
+
+    assert set(timings) == {"build", "iam", "function"}
+    assert started["function"] >= max(started["build"], started["iam"])
+
+
+def test_run_steps_stops_after_failure():
+    """Test that dependents of a failed step never start and the error is raised."""
+    ran = []
+    timings = {}
+
+    def fail():
+        raise ValueError("role cannot be created")
+
+    with pytest.raises(ValueError, match="role cannot be created"):
+        run_steps(
+            {
+                "iam": (fail, []),
+                "function": (lambda: ran.append("function"), ["iam"]),
+            },
+            timings=timings,
+        )
+
+    assert ran == []
+    assert "iam" in timings
+
+
+def test_format_timings_lists_slowest_first():
+    """Test the timing summary."""
+    text = format_timings({"iam": 0.5, "build": 90.25})
+    assert text.splitlines() == ["  build    90.2s", "  iam       0.5s"]
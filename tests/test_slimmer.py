@@ -0,0 +1,133 @@
+"""Tests for slimmer module."""
+
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from jvdeploy.slimmer import (
+    SlimmerError,
+    directory_sizes,
+    find_removable,
+    format_report,
+    slim_environment,
+    strip_shared_objects,
+)
+
+SITE = "lib/python3.12/site-packages"
+
+
+@pytest.fixture
+def venv(temp_dir: Path) -> Path:
+    """Create a small fake virtualenv."""
+    root = temp_dir / "venv"
+    files = {
+        f"{SITE}/pandas/__init__.py": 100,
+        f"{SITE}/pandas/tests/test_frame.py": 5000,
+        f"{SITE}/pandas/tests/__pycache__/test_frame.cpython-312.pyc": 4000,
+        f"{SITE}/pandas/__pycache__/__init__.cpython-312.pyc": 50,
+        f"{SITE}/pandas/_libs/lib.cpython-312-x86_64-linux-gnu.so": 2000,
+        f"{SITE}/pandas-2.2.0.dist-info/RECORD": 300,
+        f"{SITE}/pandas-2.2.0.dist-info/METADATA": 200,
+        f"{SITE}/tests/__init__.py": 10,
+        f"{SITE}/.pytest_cache/v/cache": 20,
+        "build/pip-req-build-abc123/setup.py": 700,
+        "leftover-1.0-py3-none-any.whl": 900,
+        "bin/python": 10,
+    }
+    for rel_path, size in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+    return root
+
+
+def test_directory_sizes_groups_by_package(venv):
+    """Test that site-packages sizes are reported per top-level package."""
+    sizes = directory_sizes(venv)
+
+    assert sizes[f"{SITE}/pandas"] == 100 + 5000 + 4000 + 50 + 2000
+    assert sizes[f"{SITE}/pandas-2.2.0.dist-info"] == 500
+    assert sizes["bin"] == 10
+    assert sizes["."] == 900
+
+
+def test_find_removable_defaults(venv):
+    """Test default removal of package tests and leftovers only."""
+    removable = {p.relative_to(venv).as_posix() for p in find_removable(venv)}
+
+    assert removable == {
+        f"{SITE}/pandas/tests",
+        f"{SITE}/.pytest_cache",
+        "build/pip-req-build-abc123",
+        "leftover-1.0-py3-none-any.whl",
+    }
+
+
+def test_find_removable_optional(venv):
+    """Test opt-in removal of bytecode and RECORD files."""
+    removable = {
+        p.relative_to(venv).as_posix()
+        for p in find_removable(venv, remove_tests=False, remove_bytecode=True, remove_records=True)
+    }
+
+    assert f"{SITE}/pandas/__pycache__" in removable
+    assert f"{SITE}/pandas/tests/__pycache__" in removable
+    assert f"{SITE}/pandas-2.2.0.dist-info/RECORD" in removable
+    assert f"{SITE}/pandas/tests" not in removable
+
+
+def test_slim_environment(venv):
+    """Test slimming removes files and reports before/after sizes."""
+    report = slim_environment(venv, strip_binaries=False)
+
+    assert not (venv / SITE / "pandas" / "tests").exists()
+    assert (venv / SITE / "tests" / "__init__.py").exists()
+    assert (venv / SITE / "pandas" / "__pycache__").exists()
+    assert report["removed"] == 4
+    assert report["before"][f"{SITE}/pandas"] - report["after"][f"{SITE}/pandas"] == 9000
+
+    text = format_report(report)
+    assert f"{SITE}/pandas" in text
+    assert text.splitlines()[1].startswith(f"{SITE}/pandas")
+    assert "Removed 4 paths" in text
+
+
+def test_slim_environment_dry_run(venv):
+    """Test that dry run predicts the same sizes without removing anything."""
+    predicted = slim_environment(venv, strip_binaries=False, dry_run=True)
+    assert (venv / SITE / "pandas" / "tests").exists()
+
+    actual = slim_environment(venv, strip_binaries=False)
+    assert {k: v for k, v in predicted["after"].items() if v} == {
+        k: v for k, v in actual["after"].items() if v
+    }
+
+
+def test_slim_environment_missing_dir(temp_dir):
+    """Test slimming a missing directory raises SlimmerError."""
+    with pytest.raises(SlimmerError):
+        slim_environment(temp_dir / "missing")
+
+
+def test_strip_shared_objects_batches_and_retries(temp_dir):
+    """Test that a failed batch is retried file by file."""
+    paths = [temp_dir / "a.so", temp_dir / "b.so"]
+    results = [
+        subprocess.CompletedProcess([], 1, "", "file format not recognized"),
+        subprocess.CompletedProcess([], 0, "", ""),
+        subprocess.CompletedProcess([], 1, "", "file format not recognized"),
+    ]
+
+    with patch("subprocess.run", side_effect=results) as run:
+        assert strip_shared_objects(paths, strip_cmd="strip") == 1
+
+    assert run.call_args_list[0].args[0] == ["strip", "--strip-unneeded", *map(str, paths)]
+    assert run.call_count == 3
+
+
+def test_strip_shared_objects_without_strip(temp_dir):
+    """Test that stripping is skipped when strip is not installed."""
+    with patch("shutil.which", return_value=None):
+        assert strip_shared_objects([temp_dir / "a.so"]) == 0
@@ -0,0 +1,127 @@
+"""Tests for the persistent deployment state."""
+
+import io
+import json
+
+import boto3
+import pytest
+from botocore.stub import ANY, Stubber
+
+from jvdeploy.aws import state as state_module
+from jvdeploy.aws.state import DeploymentState, DeploymentStateError, config_hash
+
+KEY = "123456789012/us-east-1/my-app"
+
+
+def test_records_survive_a_new_process(tmp_path):
+    """Test that saved records are read back by a new state object."""
+    path = tmp_path / "state.json"
+    state = DeploymentState(path=path)
+    state.put(KEY, "iam_role", {"arn": "arn:role"}, {"role_name": "my-role"})
+    state.save()
+
+    reloaded = DeploymentState(path=path)
+    assert reloaded.get(KEY, "iam_role", {"role_name": "my-role"}) == {"arn": "arn:role"}
+    assert reloaded.get("other/us-east-1/my-app", "iam_role") is None
+
+
+def test_records_from_other_config_or_too_old_are_ignored(tmp_path, monkeypatch):
+    """Test that a record is only trusted for its configuration and within the TTL."""
+    state = DeploymentState(path=tmp_path / "state.json", ttl=60)
+    state.put(KEY, "ecr_repository", {"repositoryName": "my-app"}, "my-app")
+
+    assert state.get(KEY, "ecr_repository", "my-app") is not None
+    assert state.get(KEY, "ecr_repository", "renamed-app") is None
+
+    now = state_module.time.time()
+    monkeypatch.setattr(state_module.time, "time", lambda: now + 61)
+    assert state.get(KEY, "ecr_repository", "my-app") is None
+
+
+def test_forget_and_save_only_when_changed(tmp_path):
+    """Test that forgetting records marks the state for saving, and nothing else is written."""
+    path = tmp_path / "state.json"
+    state = DeploymentState(path=path)
+    state.save()
+    assert not path.exists()
+
+    state.put(KEY, "function", {"arn": "arn:fn"})
+    state.put(KEY, "http_api", {"ApiId": "abc123"})
+    state.forget(KEY, "http_api")
+    state.save()
+    assert set(json.loads(path.read_text())["deployments"][KEY]) == {"function"}
+
+    state.forget(KEY)
+    state.save()
+    assert json.loads(path.read_text())["deployments"] == {}
+
+
+def test_corrupt_state_is_ignored(tmp_path):
+    """Test that an unreadable state file means rediscovering resources."""
+    path = tmp_path / "state.json"
+    path.write_text("{not json")
+
+    assert DeploymentState(path=path).get(KEY, "function") is None
+
+
+def test_state_in_s3(aws_credentials):
+    """Test that state is read from and written to an encrypted S3 object."""
+    client = boto3.client("s3", region_name="us-east-1")
+    state = DeploymentState(s3_uri="s3://my-bucket/jvdeploy/state.json", s3_client=lambda: client)
+    stub = Stubber(client)
+    stub.add_client_error(
+        "get_object",
+        "NoSuchKey",
+        expected_params={"Bucket": "my-bucket", "Key": "jvdeploy/state.json"},
+    )
+    stub.add_response(
+        "put_object",
+        {},
+        {
+            "Bucket": "my-bucket",
+            "Key": "jvdeploy/state.json",
+            "Body": ANY,
+            "ContentType": "application/json",
+            "ServerSideEncryption": "AES256",
+        },
+    )
+    body = {
+        "version": 1,
+        "deployments": {
+            KEY: {"function": {"value": {"arn": "arn:fn"}, "config_hash": None, "recorded_at": 1}}
+        },
+    }
+    stub.add_response(
+        "get_object",
+        {"Body": io.BytesIO(json.dumps(body).encode("utf-8"))},
+        {"Bucket": "my-bucket", "Key": "jvdeploy/state.json"},
+    )
+
+    with stub:
+        assert state.get(KEY, "function") is None
+        state.put(KEY, "function", {"arn": "arn:fn"})
+        state.save()
+
+        shared = DeploymentState(
+            s3_uri="s3://my-bucket/jvdeploy/state.json", ttl=float("inf"), s3_client=lambda: client
+        )
+        assert shared.get(KEY, "function") == {"arn": "arn:fn"}
+    stub.assert_no_pending_responses()
+
+
+def test_from_config_resolves_relative_path(tmp_path):
+    """Test that a relative state path is resolved against the app root."""
+    state = DeploymentState.from_config(
+        {"app_root": str(tmp_path), "state": {"path": ".jvdeploy/state.json", "ttl": 60}}
+    )
+    assert state.path == tmp_path / ".jvdeploy" / "state.json"
+    assert state.ttl == 60
+
+    with pytest.raises(DeploymentStateError, match="Invalid S3 URI"):
+        DeploymentState(s3_uri="my-bucket", s3_client=lambda: None).get(KEY, "function")
+
+
+def test_config_hash_ignores_key_order():
+    """Test that equal configurations hash the same."""
+    assert config_hash({"a": 1, "b": [2]}) == config_hash({"b": [2], "a": 1})
+    assert config_hash({"a": 1}) != config_hash({"a": 2})
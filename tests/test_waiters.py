@@ -0,0 +1,84 @@
+"""Tests for jittered backoff waits."""
+
+import itertools
+
+import pytest
+
+from jvdeploy.aws import waiters
+from jvdeploy.aws.waiters import (
+    WaitTimeoutError,
+    backoff_delays,
+    format_waits,
+    retry,
+    wait_until,
+)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record sleeps instead of sleeping."""
+    slept = []
+    monkeypatch.setattr(waiters.time, "sleep", slept.append)
+    return slept
+
+
+def test_backoff_delays_grow_with_jitter_up_to_the_maximum():
+    """Test that delays double, are jittered down by at most half, and are capped."""
+    delays = list(itertools.islice(backoff_delays(initial=1, maximum=4), 6))
+
+    for delay, base in zip(delays, [1, 2, 4, 4, 4, 4]):
+        assert base / 2 <= delay <= base
+
+
+def test_wait_until_polls_until_ready(sleeps):
+    """Test that the check's result is returned and the wait is recorded."""
+    states = iter(["creating", "creating", "available"])
+    stats = []
+
+    result = wait_until(
+        lambda: next(states) == "available" and "ready", "access point", stats=stats
+    )
+
+    assert result == "ready"
+    assert len(sleeps) == 2
+    assert stats[0]["name"] == "access point"
+    assert (stats[0]["attempts"], stats[0]["success"]) == (3, True)
+    assert "3 attempt(s)" in format_waits(stats)
+
+
+def test_wait_until_respects_deadline(sleeps):
+    """Test that a wait gives up once the deadline has passed."""
+    stats = []
+    with pytest.raises(WaitTimeoutError, match="function update"):
+        wait_until(lambda: False, "function update", timeout=0, stats=stats)
+
+    assert sleeps == []
+    assert stats[0]["success"] is False
+    assert "gave up" in format_waits(stats)
+
+
+def test_retry_retries_only_retryable_errors(sleeps):
+    """Test that retryable errors are retried and others raised at once."""
+    calls = []
+
+    def create():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ValueError("role cannot be assumed")
+        return "created"
+
+    assert retry(create, lambda e: "assumed" in str(e), "role") == "created"
+    assert len(calls) == 3
+
+    with pytest.raises(KeyError):
+        retry(lambda: {}["missing"], lambda e: False, "role")
+
+
+def test_retry_raises_last_error_at_deadline(sleeps):
+    """Test that the real error is raised when the deadline passes."""
+
+    def create():
+        raise ValueError("role cannot be assumed")
+
+    with pytest.raises(ValueError, match="cannot be assumed"):
+        retry(create, lambda e: True, "role", timeout=0)